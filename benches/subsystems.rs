@@ -0,0 +1,426 @@
+//! Per-subsystem benchmarks over a fixed position corpus.
+//!
+//! Each group measures one subsystem on four kinds of positions (openings,
+//! middlegames, king endgames and long capture chains) and reports throughput
+//! in elements per second: boards, actions, plies or squares, as named by the
+//! group. The corpus is rebuilt identically on every run, so numbers from two
+//! commits are directly comparable.
+//!
+//! Run with: `RUSTFLAGS="-C target-cpu=native" cargo bench --bench subsystems`,
+//! or compare against a saved baseline with `scripts/bench_compare.py`.
+
+use std::hint::black_box;
+use std::time::Duration;
+
+use criterion::{criterion_group, criterion_main, BenchmarkId, Criterion, Throughput};
+use kish::{
+    Action, Board, BookBuilder, Game, GameStatus, Network, NetworkWeights, Playouts, Rng, Square,
+    Team,
+};
+
+/// Seed of the playouts the opening and middlegame positions are taken from.
+const CORPUS_SEED: u64 = 2024;
+
+/// Number of playouts sampled for the corpus.
+const CORPUS_GAMES: u64 = 32;
+
+/// Plies of each corpus game stored in the benchmark opening book.
+const BOOK_PLIES: usize = 16;
+
+/// Accumulator and hidden layer sizes of the benchmark network.
+const NETWORK_SIZE: (usize, usize) = (128, 32);
+
+/// A named set of positions.
+struct Category {
+    name: &'static str,
+    boards: Vec<Board>,
+}
+
+/// Returns the move indices of the corpus playouts.
+fn corpus_games() -> Vec<Vec<u16>> {
+    let playouts = Playouts {
+        seed: CORPUS_SEED,
+        record_moves: true,
+        ..Playouts::default()
+    };
+    playouts.run(&Board::new_default(), CORPUS_GAMES).moves
+}
+
+/// Returns the positions of `moves` played from the standard start.
+fn replay(moves: &[u16]) -> Vec<Board> {
+    let mut board = Board::new_default();
+    let mut positions = vec![board];
+    for &index in moves {
+        board = board.apply(&board.actions()[index as usize]);
+        board.swap_turn_();
+        positions.push(board);
+    }
+    positions
+}
+
+/// Returns the position corpus.
+fn corpus() -> Vec<Category> {
+    let games: Vec<Vec<Board>> = corpus_games().iter().map(|moves| replay(moves)).collect();
+    let plies = |range: std::ops::Range<usize>| -> Vec<Board> {
+        games
+            .iter()
+            .flat_map(|positions| positions.get(range.clone()).unwrap_or_default())
+            .copied()
+            .collect()
+    };
+
+    let king_endgames = vec![
+        // 4v4 kings
+        Board::from_squares(
+            Team::White,
+            &[Square::A1, Square::A8, Square::D4, Square::E5],
+            &[Square::H1, Square::H8, Square::D5, Square::E4],
+            &[
+                Square::A1,
+                Square::A8,
+                Square::D4,
+                Square::E5,
+                Square::H1,
+                Square::H8,
+                Square::D5,
+                Square::E4,
+            ],
+        ),
+        // 2v2 kings on open lines
+        Board::from_squares(
+            Team::White,
+            &[Square::A1, Square::B1],
+            &[Square::H8, Square::G8],
+            &[Square::A1, Square::B1, Square::H8, Square::G8],
+        ),
+        // Two kings against men
+        Board::from_squares(
+            Team::Black,
+            &[Square::C2, Square::E2, Square::F3],
+            &[Square::B6, Square::G7],
+            &[Square::B6, Square::G7],
+        ),
+        // Kings and men on both sides
+        Board::from_squares(
+            Team::White,
+            &[Square::D1, Square::A4, Square::G3],
+            &[Square::H6, Square::B7, Square::E6],
+            &[Square::D1, Square::H6],
+        ),
+    ];
+
+    let capture_chains = vec![
+        // King flying capture chains
+        Board::from_squares(
+            Team::White,
+            &[Square::A1],
+            &[Square::A3, Square::C3, Square::C5, Square::E5, Square::E7],
+            &[Square::A1],
+        ),
+        // Dense captures for men and kings
+        Board::from_squares(
+            Team::White,
+            &[Square::A2, Square::C4, Square::E4, Square::G4],
+            &[
+                Square::B3,
+                Square::C5,
+                Square::D5,
+                Square::E5,
+                Square::F5,
+                Square::G5,
+                Square::H5,
+            ],
+            &[Square::C4, Square::E4],
+        ),
+        // A man jumping up the board and sideways
+        Board::from_squares(
+            Team::White,
+            &[Square::B2],
+            &[Square::B3, Square::B5, Square::C6, Square::E6, Square::F7],
+            &[],
+        ),
+        // A king with branching routes
+        Board::from_squares(
+            Team::Black,
+            &[
+                Square::B4,
+                Square::D2,
+                Square::D6,
+                Square::F4,
+                Square::F6,
+                Square::B6,
+            ],
+            &[Square::D4],
+            &[Square::D4],
+        ),
+    ];
+
+    vec![
+        Category {
+            name: "opening",
+            boards: plies(0..8),
+        },
+        Category {
+            name: "middlegame",
+            boards: plies(24..32),
+        },
+        Category {
+            name: "king_endgame",
+            boards: king_endgames,
+        },
+        Category {
+            name: "capture_chain",
+            boards: capture_chains,
+        },
+    ]
+}
+
+/// Benchmark `Board::status`, whose blocked check rotates the board.
+fn benchmark_status(c: &mut Criterion) {
+    let mut group = c.benchmark_group("Status");
+    for category in corpus() {
+        group.throughput(Throughput::Elements(category.boards.len() as u64));
+        group.bench_with_input(
+            BenchmarkId::new("boards", category.name),
+            &category.boards,
+            |b, boards| {
+                b.iter(|| {
+                    for board in boards {
+                        black_box(black_box(board).status());
+                    }
+                });
+            },
+        );
+    }
+    group.finish();
+}
+
+/// Benchmark `Board::count_actions`, with a reused scratch buffer.
+fn benchmark_count_actions(c: &mut Criterion) {
+    let mut group = c.benchmark_group("Count Actions");
+    let mut scratch = Vec::with_capacity(64);
+    for category in corpus() {
+        group.throughput(Throughput::Elements(category.boards.len() as u64));
+        group.bench_with_input(
+            BenchmarkId::new("boards", category.name),
+            &category.boards,
+            |b, boards| {
+                b.iter(|| {
+                    for board in boards {
+                        black_box(black_box(board).count_actions(&mut scratch));
+                    }
+                });
+            },
+        );
+    }
+    group.finish();
+}
+
+/// Benchmark `Action::to_detailed` path reconstruction for every legal action.
+fn benchmark_detailed_paths(c: &mut Criterion) {
+    let mut group = c.benchmark_group("Detailed Paths");
+    for category in corpus() {
+        let actions: Vec<(Board, Action)> = category
+            .boards
+            .iter()
+            .flat_map(|board| {
+                board
+                    .actions()
+                    .into_iter()
+                    .map(move |action| (*board, action))
+            })
+            .collect();
+        group.throughput(Throughput::Elements(actions.len() as u64));
+        group.bench_with_input(
+            BenchmarkId::new("actions", category.name),
+            &actions,
+            |b, actions| {
+                b.iter(|| {
+                    for (board, action) in actions {
+                        black_box(black_box(action).to_detailed(board.turn, &board.state));
+                    }
+                });
+            },
+        );
+    }
+    group.finish();
+}
+
+/// Benchmark `Game::make_move` and `Game::undo_move` over whole games, which
+/// exercises the position history map.
+fn benchmark_game_history(c: &mut Criterion) {
+    let mut group = c.benchmark_group("Game History");
+    let mut games = corpus_games();
+    games.sort_by_key(Vec::len);
+    for (name, moves) in [("short", &games[0]), ("long", &games[games.len() - 1])] {
+        let start = Board::new_default();
+        let actions: Vec<Action> = replay(moves)
+            .iter()
+            .zip(moves)
+            .map(|(board, &index)| board.actions()[index as usize])
+            .collect();
+        let mut game = Game::from_board(start);
+        group.throughput(Throughput::Elements(2 * actions.len() as u64));
+        group.bench_with_input(
+            BenchmarkId::new("plies", format!("{name}_{}", actions.len())),
+            &actions,
+            |b, actions| {
+                b.iter(|| {
+                    for action in actions {
+                        game.make_move(black_box(action));
+                    }
+                    while game.undo_move() {}
+                });
+            },
+        );
+    }
+    group.finish();
+}
+
+/// Returns a network of [`NETWORK_SIZE`] with fixed pseudo-random weights.
+fn network() -> Network {
+    let (l1, l2) = NETWORK_SIZE;
+    let mut rng = Rng::new(CORPUS_SEED);
+    let mut uniform = |count: usize, scale: f32| -> Vec<f32> {
+        (0..count)
+            .map(|_| (rng.below(2001) as f32 / 1000.0 - 1.0) * scale)
+            .collect()
+    };
+    Network::quantize(&NetworkWeights {
+        feature_weights: &uniform(l1 * 256, 0.2),
+        feature_bias: &uniform(l1, 0.2),
+        hidden_weights: &uniform(l2 * 2 * l1, 0.3),
+        hidden_bias: &uniform(l2, 0.5),
+        output_weights: &uniform(l2, 4.0),
+        output_bias: 0.0,
+    })
+}
+
+/// Benchmark `Network` evaluation, from scratch and with the accumulator
+/// updated incrementally for every legal action.
+fn benchmark_network_evaluation(c: &mut Criterion) {
+    let mut group = c.benchmark_group("Network Evaluation");
+    let network = network();
+    for category in corpus() {
+        group.throughput(Throughput::Elements(category.boards.len() as u64));
+        group.bench_with_input(
+            BenchmarkId::new("full", category.name),
+            &category.boards,
+            |b, boards| {
+                b.iter(|| {
+                    for board in boards {
+                        black_box(network.evaluate(black_box(board)));
+                    }
+                });
+            },
+        );
+
+        let positions: Vec<_> = category
+            .boards
+            .iter()
+            .map(|board| (*board, network.accumulator(board), board.actions()))
+            .collect();
+        let actions = positions
+            .iter()
+            .map(|(_, _, actions)| actions.len())
+            .sum::<usize>();
+        let mut child = network.accumulator(&category.boards[0]);
+        group.throughput(Throughput::Elements(actions as u64));
+        group.bench_with_input(
+            BenchmarkId::new("incremental", category.name),
+            &positions,
+            |b, positions| {
+                b.iter(|| {
+                    for (board, accumulator, actions) in positions {
+                        for action in actions {
+                            child.clone_from(accumulator);
+                            network.update(&mut child, board, black_box(action));
+                            black_box(network.evaluate_accumulator(&child, !board.turn));
+                        }
+                    }
+                });
+            },
+        );
+    }
+    group.finish();
+}
+
+/// Benchmark `Book` probes and weighted move choice, with a book built from
+/// the first plies of the corpus games: openings hit the book, the other
+/// categories miss it.
+fn benchmark_book_probe(c: &mut Criterion) {
+    let mut group = c.benchmark_group("Book Probe");
+    let mut builder = BookBuilder::new(BOOK_PLIES);
+    for moves in corpus_games() {
+        builder.add(&Board::new_default(), &moves, GameStatus::Draw);
+    }
+    let path = std::env::temp_dir().join(format!("kish-bench-{}.bk", std::process::id()));
+    let book = builder.build(&path, 1).unwrap();
+    std::fs::remove_file(&path).ok();
+
+    for category in corpus() {
+        group.throughput(Throughput::Elements(category.boards.len() as u64));
+        group.bench_with_input(
+            BenchmarkId::new("probe", category.name),
+            &category.boards,
+            |b, boards| {
+                b.iter(|| {
+                    for board in boards {
+                        black_box(book.probe(black_box(board)));
+                    }
+                });
+            },
+        );
+        let mut rng = Rng::new(CORPUS_SEED);
+        group.bench_with_input(
+            BenchmarkId::new("choose", category.name),
+            &category.boards,
+            |b, boards| {
+                b.iter(|| {
+                    for board in boards {
+                        black_box(book.choose(black_box(board), &mut rng));
+                    }
+                });
+            },
+        );
+    }
+    group.finish();
+}
+
+/// Benchmark `Square` parsing from notation, in both cases.
+fn benchmark_square_parsing(c: &mut Criterion) {
+    let mut group = c.benchmark_group("Square Parsing");
+    let lower: Vec<String> = (0..64)
+        .map(|index| {
+            Square::try_from_usize(index)
+                .unwrap()
+                .to_string()
+                .to_lowercase()
+        })
+        .collect();
+    let upper: Vec<String> = lower.iter().map(|text| text.to_uppercase()).collect();
+    for (name, texts) in [("lowercase", &lower), ("uppercase", &upper)] {
+        group.throughput(Throughput::Elements(texts.len() as u64));
+        group.bench_with_input(BenchmarkId::new("squares", name), texts, |b, texts| {
+            b.iter(|| {
+                for text in texts {
+                    black_box(black_box(text.as_str()).parse::<Square>().unwrap());
+                }
+            });
+        });
+    }
+    group.finish();
+}
+
+criterion_group!(
+    name = benches;
+    config = Criterion::default()
+        .sample_size(100)
+        .warm_up_time(Duration::from_secs(2))
+        .measurement_time(Duration::from_secs(5));
+    targets = benchmark_status, benchmark_count_actions, benchmark_detailed_paths,
+        benchmark_game_history, benchmark_square_parsing, benchmark_network_evaluation,
+        benchmark_book_probe
+);
+
+criterion_main!(benches);
@@ -0,0 +1,78 @@
+//! Checkpointed, sharded perft example.
+//!
+//! Counts the standard starting position to a given depth, one work unit at
+//! a time, saving every result to a checkpoint in a directory. Stop it at any
+//! time and run it again to resume. Give a shard to split the job across
+//! processes or machines sharing the directory, then merge:
+//!
+//! ```text
+//! cargo run --release --example perft_job -- 12 4 runs/          # whole job
+//! cargo run --release --example perft_job -- 12 4 runs/ 0 8      # shard 0 of 8
+//! cargo run --release --example perft_job -- 12 4 runs/ merge    # add up shards
+//! ```
+
+use kish::{Board, PerftJob, Shard, TranspositionTable};
+use std::time::Instant;
+
+const TT_SIZE_MB: usize = 1024;
+
+fn usage() -> ! {
+    eprintln!("usage: perft_job <depth> <split_depth> <dir> [<shard> <shards> | merge]");
+    std::process::exit(2);
+}
+
+fn main() {
+    let args: Vec<String> = std::env::args().skip(1).collect();
+    if args.len() < 3 {
+        usage();
+    }
+    let depth: u64 = args[0].parse().unwrap_or_else(|_| usage());
+    let split_depth: u64 = args[1].parse().unwrap_or_else(|_| usage());
+    let dir = &args[2];
+
+    let start = Instant::now();
+    let job = PerftJob::new(Board::new_default(), depth, split_depth);
+    println!(
+        "Perft({depth}) split into {} units at depth {split_depth} ({:.1}s)",
+        job.units().len(),
+        start.elapsed().as_secs_f64()
+    );
+
+    let progress = match args.get(3).map(String::as_str) {
+        Some("merge") => job.merge(dir),
+        shard => {
+            let shard = match shard {
+                None => Shard::ALL,
+                Some(index) => Shard {
+                    index: index.parse().unwrap_or_else(|_| usage()),
+                    count: args
+                        .get(4)
+                        .and_then(|n| n.parse().ok())
+                        .unwrap_or_else(|| usage()),
+                },
+            };
+            let table = TranspositionTable::new(TT_SIZE_MB);
+            job.run(dir, shard, &table, |progress| {
+                println!(
+                    "{:>8}/{} units  {:>20} nodes  {:.0}s",
+                    progress.done,
+                    progress.units,
+                    progress.nodes,
+                    start.elapsed().as_secs_f64()
+                );
+            })
+        }
+    };
+
+    match progress {
+        Ok(progress) if progress.is_complete() => println!("Completed: {} nodes", progress.nodes),
+        Ok(progress) => println!(
+            "Partial: {} of {} units, {} nodes so far",
+            progress.done, progress.units, progress.nodes
+        ),
+        Err(error) => {
+            eprintln!("error: {error}");
+            std::process::exit(1);
+        }
+    }
+}
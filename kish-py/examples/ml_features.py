@@ -129,6 +129,16 @@ def main():
         print("Fast conversion matches standard conversion")
         print()
 
+        # Native batched encoder (fills the whole batch in one call)
+        boards = [board.apply(a) for a in board.actions()]
+        batch = kish.encode_boards(boards, perspective=True)
+        print(f"Batched planes shape: {batch.shape}")
+        assert np.array_equal(
+            kish.encode_boards([board])[0], board_to_bitplanes(board)
+        ), "Mismatch!"
+        print("Native encoder matches standard conversion")
+        print()
+
         # Action features as dict
         features = action_to_features(action)
         print(f"Action features: {features}")
@@ -64,6 +64,22 @@ def main():
     print(f"  Draws: {results['Draw']} ({100*results['Draw']/n_games:.1f}%)")
     print(f"  Average moves per game: {total_moves/n_games:.1f}")
     print(f"  Time: {elapsed:.2f}s ({n_games/elapsed:.1f} games/sec)")
+    print()
+
+    # The native engine plays games in parallel without Python overhead
+    n_games = 100_000
+    print(f"Playing {n_games} games natively...")
+    start = time.perf_counter()
+    stats = kish.playouts(n_games, seed=42, max_plies=500)
+    elapsed = time.perf_counter() - start
+
+    plies = sum(length * count for length, count in enumerate(stats.lengths))
+    print(f"  White wins: {stats.white_wins} ({100*stats.white_wins/n_games:.1f}%)")
+    print(f"  Black wins: {stats.black_wins} ({100*stats.black_wins/n_games:.1f}%)")
+    print(f"  Draws: {stats.draws} ({100*stats.draws/n_games:.1f}%)")
+    print(f"  Truncated: {stats.truncated}")
+    print(f"  Average moves per game: {plies/n_games:.1f}")
+    print(f"  Time: {elapsed:.2f}s ({n_games/elapsed:.1f} games/sec)")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,71 @@
 # Re-export all types from the native module
-from .kish import Team, Square, GameStatus, Action, Board, Game
+from .kish import (
+    Team,
+    Square,
+    GameStatus,
+    Action,
+    Board,
+    Game,
+    SearchResult,
+    PerftStats,
+    PerftReport,
+    PerftJob,
+    PerftProgress,
+    TranspositionTable,
+    Tablebase,
+    RecordWriter,
+    RecordReader,
+    DatasetWriter,
+    DatasetStats,
+    ArchiveReader,
+    Network,
+    Book,
+    BookBuilder,
+    VecGame,
+    MCTS,
+    encode_boards,
+    encode_games,
+    perft_many,
+    status_many,
+    count_actions_many,
+    mobility_arrays,
+    PlayoutStats,
+    playouts,
+    legal_masks,
+)
 
-__all__ = ["Team", "Square", "GameStatus", "Action", "Board", "Game"]
+__all__ = [
+    "Team",
+    "Square",
+    "GameStatus",
+    "Action",
+    "Board",
+    "Game",
+    "SearchResult",
+    "PerftStats",
+    "PerftReport",
+    "PerftJob",
+    "PerftProgress",
+    "TranspositionTable",
+    "Tablebase",
+    "RecordWriter",
+    "RecordReader",
+    "DatasetWriter",
+    "DatasetStats",
+    "ArchiveReader",
+    "Network",
+    "Book",
+    "BookBuilder",
+    "VecGame",
+    "MCTS",
+    "encode_boards",
+    "encode_games",
+    "perft_many",
+    "status_many",
+    "count_actions_many",
+    "mobility_arrays",
+    "PlayoutStats",
+    "playouts",
+    "legal_masks",
+]
 __version__ = "1.0.0"
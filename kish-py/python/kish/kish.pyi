@@ -1,7 +1,11 @@
 """Type stubs for the kish Turkish Draughts engine."""
 
+import os
 from enum import IntEnum
-from typing import List, Optional
+from typing import Callable, Dict, List, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
 
 class Team(IntEnum):
     """Represents a player in the game (White or Black)."""
@@ -204,6 +208,20 @@ class Action:
         """
         ...
 
+    def index(self, perspective: bool = False) -> int:
+        """Returns the index of this action in the 4096-entry action space:
+        `source * 64 + destination`.
+
+        With `perspective=True` and Black moving, squares are rotated
+        (`square -> 63 - square`), matching `Board.legal_mask(perspective=True)`.
+        """
+        ...
+
+    @property
+    def key_delta(self) -> int:
+        """Change in `Board.key` caused by playing this action (including the turn change)."""
+        ...
+
     def captured_bitboard(self) -> int:
         """Returns the captured pieces as a bitboard (u64).
 
@@ -263,6 +281,82 @@ class Board:
         """Returns all legal actions from the current position."""
         ...
 
+    def has_capture(self) -> bool:
+        """Returns True if the side to move has a capture available.
+
+        Captures are mandatory, so this tells whether `actions()` returns
+        captures, without generating them.
+        """
+        ...
+
+    def has_legal_move(self) -> bool:
+        """Returns True if the side to move has any legal action."""
+        ...
+
+    def probe_tablebase(self, tablebase: Tablebase) -> Optional[Tuple[GameStatus, int]]:
+        """Looks the board up in an endgame tablebase.
+
+        Returns the outcome under perfect play and the number of plies until the
+        game ends (0 for draws). Returns None if the position has more pieces
+        than the tablebase holds.
+        """
+        ...
+
+    def expand(
+        self,
+    ) -> Tuple[
+        npt.NDArray[np.uint64],
+        npt.NDArray[np.uint64],
+        npt.NDArray[np.uint8],
+        npt.NDArray[np.bool_],
+    ]:
+        """Expands the board into NumPy arrays, one row per legal action.
+
+        Rows follow `actions()` order. Returns a tuple of:
+
+        - `deltas`: `(N, 3)` `uint64` array of `[white, black, kings]` deltas
+          (as `Action.delta_array()`).
+        - `children`: `(N, 4)` `uint64` array of the resulting positions as
+          `[white, black, kings, turn]` (as `Board.to_array()`), turn swapped.
+        - `capture_counts`: `uint8` array of pieces captured.
+        - `promotions`: `bool` array, true for moves that promote.
+
+        No `Action` or `Board` objects are created.
+        """
+        ...
+
+    def legal_mask(self, perspective: bool = False) -> npt.NDArray[np.bool_]:
+        """Returns a `bool` array of length 4096 that is true at `Action.index()`
+        of every legal action (`source * 64 + destination`).
+
+        With `perspective=True` and Black to move, squares are rotated
+        (`square -> 63 - square`), as in `encode_boards()`.
+        """
+        ...
+
+    def action_from_index(
+        self, index: int, perspective: bool = False
+    ) -> Optional[Action]:
+        """Returns the legal action with index `index`, or None if there is none.
+
+        Capture sequences sharing a source and destination share an index; the
+        first one in `actions()` order is returned.
+        """
+        ...
+
+    def parse_action(self, notation: str) -> Action:
+        """Returns the legal action written as `notation`.
+
+        Accepts the notation of `Action.notation()`, the short `fromxto` form
+        of a multi-capture, `:` for captures as in PDN, and moves without the
+        `=K` suffix.
+
+        Raises:
+            ValueError: If the notation is malformed, no legal action matches,
+                or a short capture notation matches several.
+        """
+        ...
+
     def apply(self, action: Action) -> Board:
         """Applies an action and returns a new board with the turn swapped."""
         ...
@@ -299,6 +393,110 @@ class Board:
         """Runs a perft (performance test) at the given depth.
 
         Returns the number of leaf nodes (positions) at that depth.
+        The GIL is released while counting.
+        """
+        ...
+
+    def perft_tt(
+        self,
+        depth: int,
+        tt_mb: int = 64,
+        *,
+        table: Optional[TranspositionTable] = None,
+    ) -> int:
+        """Runs a single-threaded perft with a ~`tt_mb` MB transposition table.
+
+        Pass a `TranspositionTable` as `table` to reuse it (and its contents)
+        across calls instead.
+        """
+        ...
+
+    def perft_parallel(
+        self,
+        depth: int,
+        tt_mb: int = 256,
+        threads: Optional[int] = None,
+        *,
+        table: Optional[TranspositionTable] = None,
+    ) -> int:
+        """Runs a parallel perft with a shared ~`tt_mb` MB transposition table.
+
+        Pass a `TranspositionTable` as `table` to reuse it (and its contents)
+        across calls instead. Uses `threads` worker threads (default: all
+        cores).
+
+        Raises:
+            ValueError: If `threads` is 0.
+        """
+        ...
+
+    def perft_split(
+        self,
+        depth: int,
+        split_depth: Optional[int] = None,
+        tt_mb: int = 256,
+        threads: Optional[int] = None,
+        *,
+        table: Optional[TranspositionTable] = None,
+    ) -> PerftReport:
+        """Runs a parallel perft that splits the tree into many tasks and reports
+        how they were spread over the threads.
+
+        Positions less than `split_depth` plies from the root are expanded in
+        parallel and every position at `split_depth` becomes one task, so that
+        all threads stay busy even when root moves differ in size. By default
+        the split depth grows with `depth`, up to 4 plies.
+
+        Uses `table` if given, otherwise a new table of about `tt_mb`
+        megabytes, and `threads` worker threads (default: all cores).
+
+        Raises:
+            ValueError: If `threads` is 0.
+        """
+        ...
+
+    def perft_detailed(self, depth: int, threads: Optional[int] = None) -> PerftStats:
+        """Runs a perft that also counts the kinds of moves and positions at every ply.
+
+        Counts captures (with a histogram of chain lengths), promotions, king
+        moves, terminal positions and one-piece draws. Uses `threads` worker
+        threads (default: all cores).
+
+        Raises:
+            ValueError: If `threads` is 0.
+        """
+        ...
+
+    def search(
+        self,
+        depth: Optional[int] = None,
+        time_ms: Optional[int] = None,
+        tt_mb: int = 16,
+        nodes: Optional[int] = None,
+        *,
+        network: Optional[Network] = None,
+    ) -> SearchResult:
+        """Searches for the best move with alpha-beta (PVS) and iterative deepening.
+
+        Stops at whichever limit is reached first. With no limits at all,
+        searches to depth 8. The GIL is released while searching.
+
+        Args:
+            depth: Maximum depth in plies.
+            time_ms: Time limit in milliseconds.
+            tt_mb: Transposition table size in megabytes.
+            nodes: Node limit.
+            network: Evaluate leaves with this `Network` instead of the
+                built-in evaluation, updating its accumulator move by move.
+        """
+        ...
+
+    def evaluate(self, network: Optional[Network] = None) -> int:
+        """Statically evaluates the position in centi-men from the side to
+        move's point of view.
+
+        Uses `network` if given, otherwise the material and advancement
+        evaluation of `search()`.
         """
         ...
 
@@ -325,6 +523,15 @@ class Board:
         """
         ...
 
+    @property
+    def key(self) -> int:
+        """Zobrist key of the position (including the side to move).
+
+        Equal boards have equal keys, and `board.apply(a).key == board.key ^ a.key_delta`.
+        Also used as the board's hash.
+        """
+        ...
+
     def bitboards(self) -> tuple[int, int, int, int]:
         """Returns all bitboards as a tuple: (white, black, kings, turn).
 
@@ -356,6 +563,352 @@ class Board:
         """
         ...
 
+class SearchResult:
+    """Result of `Board.search()`."""
+
+    @property
+    def best_move(self) -> Optional[Action]:
+        """The best move, or None if the side to move has no legal actions."""
+        ...
+
+    @property
+    def pv(self) -> List[Action]:
+        """Principal variation, starting with the best move."""
+        ...
+
+    @property
+    def score(self) -> int:
+        """Score in centi-men (a man is 100) from the side to move's point of view."""
+        ...
+
+    @property
+    def depth(self) -> int:
+        """Depth of the last completed iteration."""
+        ...
+
+    @property
+    def nodes(self) -> int:
+        """Number of nodes searched."""
+        ...
+
+    @property
+    def mate_in(self) -> Optional[int]:
+        """Plies to a forced result (negative if losing), or None."""
+        ...
+
+class PerftStats:
+    """Results of `Board.perft_detailed()`.
+
+    Every counter is a `uint64` array with one entry per ply: index 0 counts
+    the moves from the root and the positions they reach.
+    """
+
+    @property
+    def nodes(self) -> int:
+        """Leaf count, equal to `Board.perft()` at the same depth."""
+        ...
+
+    @property
+    def moves(self) -> npt.NDArray[np.uint64]:
+        """Moves played into each ply (the number of positions at that ply)."""
+        ...
+
+    @property
+    def captures(self) -> npt.NDArray[np.uint64]:
+        """Capturing moves."""
+        ...
+
+    @property
+    def chains(self) -> npt.NDArray[np.uint64]:
+        """Capture length histograms of shape `(depth, 17)`: `chains[p, n]`
+        captures at ply `p` took `n` pieces."""
+        ...
+
+    @property
+    def promotions(self) -> npt.NDArray[np.uint64]:
+        """Moves that promote a man to king."""
+        ...
+
+    @property
+    def king_moves(self) -> npt.NDArray[np.uint64]:
+        """Moves made by a king."""
+        ...
+
+    @property
+    def terminal(self) -> npt.NDArray[np.uint64]:
+        """Positions whose side to move has no actions (blocked or without pieces)."""
+        ...
+
+    @property
+    def draws(self) -> npt.NDArray[np.uint64]:
+        """Positions drawn because each side has a single piece."""
+        ...
+
+class PerftReport:
+    """Results of `Board.perft_split()`.
+
+    The per-thread arrays are indexed by worker thread and show how evenly
+    the subtrees were spread.
+    """
+
+    @property
+    def nodes(self) -> int:
+        """Leaf count, equal to `Board.perft()` at the same depth."""
+        ...
+
+    @property
+    def thread_tasks(self) -> npt.NDArray[np.uint64]:
+        """Subtrees counted by each thread."""
+        ...
+
+    @property
+    def thread_nodes(self) -> npt.NDArray[np.uint64]:
+        """Leaves counted by each thread."""
+        ...
+
+    @property
+    def thread_busy(self) -> npt.NDArray[np.float64]:
+        """Seconds each thread spent counting."""
+        ...
+
+    @property
+    def balance(self) -> float:
+        """Mean busy time over the largest: 1.0 when the work was spread evenly."""
+        ...
+
+class PerftProgress:
+    """Completed units of a `PerftJob` and the nodes counted so far."""
+
+    @property
+    def units(self) -> int:
+        """Units in scope: the shard for `PerftJob.run()`, the job for `PerftJob.merge()`."""
+        ...
+
+    @property
+    def done(self) -> int:
+        """Units completed."""
+        ...
+
+    @property
+    def nodes(self) -> int:
+        """Leaves of the completed units, weighted by multiplicity."""
+        ...
+
+    def is_complete(self) -> bool:
+        """Returns true if every unit in scope is completed, so that `nodes` is
+        the final count."""
+        ...
+
+class PerftJob:
+    """A deep perft split into work units that are checkpointed as they finish.
+
+    Units are the distinct positions `split_depth` plies from the root, with
+    the number of move sequences reaching them. `run()` appends each unit
+    result to a checkpoint file in a directory and skips the units already
+    there, so an interrupted run resumes where it stopped. With `shards > 1`
+    a process runs only every `shards`-th unit; run each shard anywhere the
+    directory is shared, then call `merge()`.
+
+    Example:
+        >>> job = PerftJob(Board(), 12, split_depth=4)
+        >>> job.run("runs/", shard=0, shards=8)  # on each of 8 machines
+        >>> job.merge("runs/").nodes
+    """
+
+    def __init__(self, board: Board, depth: int, split_depth: int = 4) -> None:
+        """Splits the perft of `board` to `depth` into units `split_depth` plies deep."""
+        ...
+
+    @property
+    def depth(self) -> int:
+        """The perft depth."""
+        ...
+
+    @property
+    def split_depth(self) -> int:
+        """The depth of the units."""
+        ...
+
+    def units(self) -> List[Tuple[Board, int]]:
+        """Returns the units as `(board, multiplicity)` pairs, in run order."""
+        ...
+
+    def checkpoint_name(self, shard: int = 0, shards: int = 1) -> str:
+        """Returns the name of the checkpoint file of a shard."""
+        ...
+
+    def run(
+        self,
+        directory: Union[str, "os.PathLike[str]"],
+        shard: int = 0,
+        shards: int = 1,
+        tt_mb: int = 256,
+        threads: Optional[int] = None,
+    ) -> PerftProgress:
+        """Runs the units of a shard that are not yet in its checkpoint.
+
+        Args:
+            directory: Directory of the checkpoint files, created if needed.
+            shard: Index of the shard to run.
+            shards: Number of shards.
+            tt_mb: Size of the transposition table shared by the units.
+            threads: Number of worker threads (default: all cores).
+
+        Returns the progress of the shard. The GIL is released while counting.
+
+        Raises:
+            OSError: If a checkpoint cannot be read or written, or belongs to
+                another job.
+            ValueError: If `shard` is not below `shards`, or `threads` is 0.
+        """
+        ...
+
+    def merge(self, directory: Union[str, "os.PathLike[str]"]) -> PerftProgress:
+        """Adds up the checkpoints of every shard in `directory`.
+
+        Raises:
+            OSError: If a checkpoint cannot be read, is corrupt, or two
+                checkpoints disagree.
+        """
+        ...
+
+class TranspositionTable:
+    """A transposition table of perft node counts, reusable across runs.
+
+    Pass it as `table=` to `Board.perft_tt()` or `Board.perft_parallel()` to
+    keep it warm between calls: counts stored by earlier runs are still hits.
+
+    Example:
+        >>> table = TranspositionTable(256)
+        >>> board.perft_parallel(10, table=table)
+        >>> table.new_generation()
+        >>> board.perft_parallel(11, table=table)
+        >>> table.hits / table.probes
+    """
+
+    def __init__(
+        self,
+        size_mb: int = 256,
+        *,
+        replacement: Literal["depth", "always"] = "depth",
+        huge_pages: bool = False,
+    ) -> None:
+        """Creates an empty table of at most `size_mb` megabytes.
+
+        Args:
+            size_mb: Size limit; the entry count is rounded down to a power of two.
+            replacement: `"depth"` keeps deeper entries when a bucket is full,
+                `"always"` always stores the new entry.
+            huge_pages: Ask Linux to back the table with transparent huge pages.
+
+        Raises:
+            ValueError: If `replacement` is not recognized.
+            OSError: If the huge-page memory cannot be mapped.
+        """
+        ...
+
+    @property
+    def capacity(self) -> int:
+        """Number of entries."""
+        ...
+
+    @property
+    def generation(self) -> int:
+        """Current generation; entries of older ones are evicted first."""
+        ...
+
+    @property
+    def probes(self) -> int:
+        """Lookups since the table was created or cleared."""
+        ...
+
+    @property
+    def hits(self) -> int:
+        """Lookups that found their entry."""
+        ...
+
+    @property
+    def stores(self) -> int:
+        """Stores."""
+        ...
+
+    @property
+    def collisions(self) -> int:
+        """Stores that found their bucket full of other entries."""
+        ...
+
+    @property
+    def overwrites(self) -> int:
+        """Stores that evicted another entry."""
+        ...
+
+    def occupancy(self) -> float:
+        """Returns the fraction of entries in use, estimated from a sample."""
+        ...
+
+    def new_generation(self) -> None:
+        """Starts a new generation, typically before a new run."""
+        ...
+
+    def clear(self) -> None:
+        """Empties the table and resets its counters and generation."""
+        ...
+
+class Tablebase:
+    """A memory-mapped endgame tablebase.
+
+    Holds the value of every position with up to `max_pieces` pieces under
+    perfect play, ignoring threefold repetition and the insufficient-progress
+    rule.
+
+    Example:
+        >>> tablebase = Tablebase.generate("kish-4.tb", 4)
+        >>> tablebase = Tablebase("kish-4.tb")  # later, opens instantly
+        >>> board.probe_tablebase(tablebase)
+        (GameStatus.Won(Team.White), 7)
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Opens a tablebase file written by `Tablebase.generate()`.
+
+        Raises:
+            OSError: If the file cannot be read or is not a tablebase.
+        """
+        ...
+
+    @staticmethod
+    def generate(
+        path: Union[str, "os.PathLike[str]"],
+        max_pieces: int = 4,
+        *,
+        threads: Optional[int] = None,
+    ) -> Tablebase:
+        """Solves every position with up to `max_pieces` pieces, writes the
+        tablebase to `path` and opens it.
+
+        Each extra piece multiplies the size and the time by about 40; up to
+        4 pieces takes 84 MB and a few CPU-minutes.
+
+        Args:
+            path: File to write.
+            max_pieces: Largest number of pieces on the board.
+            threads: Number of worker threads (default: all cores).
+
+        Raises:
+            OSError: If the file cannot be written.
+            ValueError: If `threads` is 0.
+        """
+        ...
+
+    @property
+    def max_pieces(self) -> int:
+        """Largest number of pieces solved."""
+        ...
+
+    def probe(self, board: Board) -> Optional[Tuple[GameStatus, int]]:
+        """Same as `board.probe_tablebase(self)`."""
+        ...
+
 class Game:
     """Full game with history tracking for proper draw detection.
 
@@ -386,7 +939,12 @@ class Game:
         ...
 
     def actions(self) -> List[Action]:
-        """Returns all legal actions from the current position."""
+        """Returns all legal actions from the current position.
+
+        The actions are generated and converted once per ply: repeated calls
+        return new lists of the same `Action` objects, and `status()` reuses
+        the generated list.
+        """
         ...
 
     def status(self) -> GameStatus:
@@ -423,6 +981,1024 @@ class Game:
         """Clears the game history and resets the halfmove clock."""
         ...
 
+    def fork(self) -> Game:
+        """Returns a lightweight copy for search or analysis.
+
+        The fork keeps the board, halfmove clock and repetition state, but only
+        the positions since the last capture and no undo history: `undo_move()`
+        cannot go back past the fork point and `move_count` restarts at zero.
+        """
+        ...
+
     def perft(self, depth: int) -> int:
-        """Runs a perft (performance test) at the given depth."""
+        """Runs a perft (performance test) at the given depth.
+
+        The GIL is released while counting.
+        """
+        ...
+
+# =============================================================================
+# Vectorized environments for RL
+# =============================================================================
+
+class VecGame:
+    """Many games stepped in lock-step, for reinforcement learning.
+
+    Every environment starts from the same board. `step()` takes one action
+    index per environment, indexing into that environment's legal actions in
+    the same order as `Board.actions()`, applies them all in Rust with the GIL
+    released, and resets finished games to the start board.
+
+    Observations are `(N, 4)` `uint64` arrays of `[white, black, kings, turn]`
+    (the same layout as `Board.bitboards()`). Status codes are `0` in progress,
+    `1` draw, `2` White won, `3` Black won.
+    """
+
+    def __init__(self, num_envs: int, board: Optional[Board] = None) -> None:
+        """Creates `num_envs` games starting from `board` (default: standard start)."""
         ...
+
+    @property
+    def num_envs(self) -> int:
+        """Number of environments."""
+        ...
+
+    def __len__(self) -> int: ...
+    def reset(self) -> npt.NDArray[np.uint64]:
+        """Resets every environment and returns the `(N, 4)` observations."""
+        ...
+
+    def step(
+        self, actions: npt.NDArray[np.int64]
+    ) -> Tuple[
+        npt.NDArray[np.uint64],
+        npt.NDArray[np.float32],
+        npt.NDArray[np.bool_],
+        npt.NDArray[np.int8],
+        npt.NDArray[np.int64],
+    ]:
+        """Applies one action per environment and auto-resets finished games.
+
+        Args:
+            actions: `int64` array of shape `(N,)` holding an index into each
+                environment's legal actions.
+
+        Returns:
+            `(obs, rewards, dones, status, legal_counts)`. `obs` is observed
+            after any reset; `rewards` are +1/-1/0 from the mover's point of
+            view; `status` is the code of the position reached before reset.
+
+        An environment whose start board is already over (for example a
+        blocked position) has no legal actions; every step ignores its index
+        and reports it as done, with reward 0 and the start board's status.
+
+        Raises:
+            ValueError: If `actions` has the wrong length.
+            IndexError: If an index is out of range (no environment is stepped).
+        """
+        ...
+
+    def observations(self) -> npt.NDArray[np.uint64]:
+        """Returns the `(N, 4)` observations of the current positions."""
+        ...
+
+    def legal_counts(self) -> npt.NDArray[np.int64]:
+        """Returns the number of legal actions in each environment."""
+        ...
+
+    def legal_actions(self, env: int) -> List[Action]:
+        """Returns the legal actions of environment `env`, in index order."""
+        ...
+
+    def game(self, env: int) -> Game:
+        """Returns a copy of the game in environment `env`."""
+        ...
+
+class MCTS:
+    """A Monte Carlo search tree rooted at a game position.
+
+    Leaves are evaluated in batches of up to `batch_size`, kept apart by
+    virtual loss. Without an evaluator, each leaf is scored by one random
+    playout, run in parallel with the GIL released. With an evaluator, it is
+    called once per batch as `evaluator(obs, legal_counts)`, where `obs` is an
+    `(N, 4)` `uint64` array of `[white, black, kings, turn]` and `legal_counts`
+    is an `int64` array. It returns the values (from the side to move's point
+    of view, in `[-1, 1]`), or a tuple `(values, priors)` where `priors` holds
+    the prior of every legal action of every position, concatenated in
+    `Board.actions()` order.
+
+    Draws by threefold repetition and insufficient progress are scored by the
+    rules, using the history of the game the tree was created from.
+    """
+
+    def __init__(
+        self,
+        game: Optional[Game] = None,
+        *,
+        exploration: float = 1.5,
+        selection: Literal["puct", "uct"] = "puct",
+        batch_size: int = 32,
+        virtual_loss: int = 1,
+        seed: int = 0,
+        policy: Literal["uniform", "capture", "heuristic"] = "uniform",
+        max_plies: int = 1000,
+    ) -> None:
+        """Creates an empty tree rooted at `game` (default: a new game).
+
+        Args:
+            game: Root position, including its repetition history.
+            exploration: Exploration constant of the selection formula.
+            selection: `"puct"` (uses priors) or `"uct"`.
+            batch_size: Maximum number of leaves evaluated together.
+            virtual_loss: Losses a pending leaf temporarily adds to its path.
+            seed: Seed of the rollout streams.
+            policy: Rollout policy, as in `playouts()`.
+            max_plies: Rollouts still running after this many plies are draws.
+
+        Raises:
+            ValueError: If `selection` or `policy` is unknown or `batch_size` is 0.
+        """
+        ...
+
+    def run(
+        self,
+        simulations: int,
+        evaluator: Optional[
+            Callable[
+                [npt.NDArray[np.uint64], npt.NDArray[np.int64]],
+                Union[npt.ArrayLike, Tuple[npt.ArrayLike, Optional[npt.ArrayLike]]],
+            ]
+        ] = None,
+        *,
+        threads: Optional[int] = None,
+    ) -> int:
+        """Runs `simulations` simulations and returns how many were completed.
+
+        Args:
+            simulations: Number of simulations.
+            evaluator: Optional batch evaluator (see the class documentation).
+                Rollouts are used when omitted.
+            threads: Number of rollout threads (default: all cores).
+
+        Raises:
+            ValueError: If the evaluator returns arrays of the wrong length.
+                Exceptions raised by the evaluator propagate; simulations of
+                earlier batches are kept.
+        """
+        ...
+
+    def game(self) -> Game:
+        """Returns a copy of the root game."""
+        ...
+
+    @property
+    def simulations(self) -> int:
+        """Number of completed simulations through the root."""
+        ...
+
+    @property
+    def node_count(self) -> int:
+        """Number of nodes in the tree."""
+        ...
+
+    @property
+    def root_value(self) -> float:
+        """Mean value of the root for its side to move."""
+        ...
+
+    def best_action(self) -> Optional[Action]:
+        """Returns the most visited root action, or None before the first simulation."""
+        ...
+
+    def actions(self) -> List[Action]:
+        """Returns the root actions the statistics refer to, in `Board.actions()` order.
+
+        Empty before the first simulation or if the game is over.
+        """
+        ...
+
+    def visit_counts(self) -> npt.NDArray[np.uint32]:
+        """Returns the visit count of each root action."""
+        ...
+
+    def values(self) -> npt.NDArray[np.float32]:
+        """Returns the mean value of each root action."""
+        ...
+
+    def priors(self) -> npt.NDArray[np.float32]:
+        """Returns the prior of each root action."""
+        ...
+
+    def policy(self, temperature: float = 1.0) -> npt.NDArray[np.float32]:
+        """Returns the visit distribution over root actions.
+
+        Visit counts are raised to `1 / temperature` and normalized. A
+        temperature of 0 puts all the mass on the best action.
+        """
+        ...
+
+    def advance(self, action: Action) -> None:
+        """Plays `action` at the root, keeping its subtree for the next search.
+
+        Raises:
+            ValueError: If the action is not legal at the root.
+        """
+        ...
+
+# =============================================================================
+# Feature encoding for ML
+# =============================================================================
+
+def encode_boards(
+    boards: Sequence[Board],
+    out: Optional[npt.NDArray[np.float32] | npt.NDArray[np.uint8]] = None,
+    *,
+    perspective: bool = False,
+    mirror: bool = False,
+    dtype: Literal["float32", "uint8"] = "float32",
+) -> npt.NDArray[np.float32] | npt.NDArray[np.uint8]:
+    """Encodes boards into a `(N, 4, 8, 8)` array of feature planes.
+
+    Planes are white pieces, black pieces, kings, and a turn plane (all ones
+    when Black is to move). The GIL is released while the planes are filled.
+
+    Args:
+        boards: The boards to encode.
+        out: Optional C-contiguous `float32` or `uint8` array of shape
+            `(N, 4, 8, 8)` to fill in place.
+        perspective: Rotate boards with Black to move so the side to move is
+            always shown as White.
+        mirror: Flip the board left/right (data augmentation).
+        dtype: Dtype of the new array when `out` is not given.
+
+    Raises:
+        ValueError: If `out` has the wrong shape or is not contiguous, or
+            `dtype` is not supported.
+    """
+    ...
+
+def encode_games(
+    games: Sequence[Game],
+    history: int = 8,
+    out: Optional[npt.NDArray[np.float32] | npt.NDArray[np.uint8]] = None,
+    *,
+    perspective: bool = False,
+    mirror: bool = False,
+    dtype: Literal["float32", "uint8"] = "float32",
+) -> npt.NDArray[np.float32] | npt.NDArray[np.uint8]:
+    """Encodes games with history into a `(N, 3 * history + 1, 8, 8)` array.
+
+    Each game contributes the white/black/kings planes of its current position
+    followed by those of the `history - 1` previous positions (zeros before the
+    start of the game), then a turn plane.
+
+    Args:
+        games: The games to encode.
+        history: Number of positions to stack (at least 1).
+        out: Optional C-contiguous `float32` or `uint8` array to fill in place.
+        perspective: Rotate positions so the side to move is always shown as White.
+        mirror: Flip the board left/right (data augmentation).
+        dtype: Dtype of the new array when `out` is not given.
+
+    Raises:
+        ValueError: If `history` is 0, `out` has the wrong shape or is not
+            contiguous, or `dtype` is not supported.
+    """
+    ...
+
+# =============================================================================
+# Batch analytics
+# =============================================================================
+
+def perft_many(
+    boards: Sequence[Board], depth: int, *, threads: Optional[int] = None
+) -> List[int]:
+    """Runs perft on every board in parallel, releasing the GIL.
+
+    Args:
+        boards: The boards to count from.
+        depth: The perft depth.
+        threads: Number of worker threads (default: all cores).
+    """
+    ...
+
+def status_many(
+    boards: Sequence[Board], *, threads: Optional[int] = None
+) -> List[GameStatus]:
+    """Computes the status of every board in parallel, releasing the GIL."""
+    ...
+
+def count_actions_many(
+    boards: Sequence[Board], *, threads: Optional[int] = None
+) -> List[int]:
+    """Counts the legal actions of every board in parallel, releasing the GIL."""
+    ...
+
+def mobility_arrays(
+    white: npt.NDArray[np.uint64],
+    black: npt.NDArray[np.uint64],
+    kings: npt.NDArray[np.uint64],
+    turn: npt.NDArray[np.uint64],
+    *,
+    threads: Optional[int] = None,
+) -> Tuple[npt.NDArray[np.uint32], npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+    """Counts legal actions and finds captures for positions stored as columns.
+
+    One `uint64` array per field of `Board.to_array()`, so an `(N, 4)` array
+    such as `VecGame` observations can be passed as `*positions.T`. No `Board`
+    objects are created, and the GIL is released.
+
+    Args:
+        white: White pieces bitboards.
+        black: Black pieces bitboards.
+        kings: Kings bitboards.
+        turn: Side to move (0 = White, 1 = Black).
+        threads: Number of worker threads (default: the global rayon pool).
+
+    Returns:
+        `(counts, captures, blocked)`: `uint32` legal-action counts, and `bool`
+        arrays for capture availability and for having no legal action.
+
+    Raises:
+        ValueError: If the arrays differ in length or a turn is not 0 or 1.
+    """
+    ...
+
+# =============================================================================
+# Random playouts
+# =============================================================================
+
+class PlayoutStats:
+    """Aggregated results of `playouts()`."""
+
+    @property
+    def white_wins(self) -> int:
+        """Games won by White."""
+        ...
+
+    @property
+    def black_wins(self) -> int:
+        """Games won by Black."""
+        ...
+
+    @property
+    def draws(self) -> int:
+        """Games drawn under the rules."""
+        ...
+
+    @property
+    def truncated(self) -> int:
+        """Games stopped at `max_plies`."""
+        ...
+
+    @property
+    def games(self) -> int:
+        """Total number of games played."""
+        ...
+
+    @property
+    def lengths(self) -> npt.NDArray[np.uint64]:
+        """Histogram of game lengths: `lengths[p]` games lasted `p` plies."""
+        ...
+
+    @property
+    def moves(self) -> Optional[List[npt.NDArray[np.uint16]]]:
+        """Per-game move indices (into `Board.actions()`), or None if not recorded."""
+        ...
+
+def playouts(
+    n_games: int,
+    seed: int = 0,
+    policy: Literal["uniform", "capture", "heuristic"] = "uniform",
+    threads: Optional[int] = None,
+    max_plies: int = 1000,
+    *,
+    board: Optional[Board] = None,
+    record_moves: bool = False,
+) -> PlayoutStats:
+    """Plays random games natively and returns aggregated statistics.
+
+    Games are spread across the rayon pool with the GIL released. Results are
+    deterministic for a given seed, regardless of the number of threads.
+
+    Args:
+        n_games: Number of games to play.
+        seed: Seed of the random streams.
+        policy: `"uniform"`, `"capture"` (prefer the largest material gain) or
+            `"heuristic"` (weighted towards captures, promotion and advancing).
+        threads: Number of worker threads (default: all cores).
+        max_plies: Games still running after this many plies are truncated.
+        board: Start position (default: the standard start).
+        record_moves: Also return the move indices of every game.
+
+    Raises:
+        ValueError: If `policy` is unknown or `threads` is 0.
+    """
+    ...
+
+# =============================================================================
+# Game records
+# =============================================================================
+
+class RecordWriter:
+    """Writes games to a compact binary record file.
+
+    Each move is stored as its index in `Board.actions()`, in a few bits.
+    Use as a context manager, or call `close()` when done.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Creates (or truncates) a record file at `path`.
+
+        Raises:
+            OSError: If the file cannot be created.
+        """
+        ...
+
+    @property
+    def offset(self) -> int:
+        """The byte offset at which the next game will be written."""
+        ...
+
+    def write(self, board: Board, moves: Sequence[int]) -> int:
+        """Writes a game given its starting board and move indices, such as
+        `PlayoutStats.moves` entries.
+
+        Returns:
+            The byte offset of the game, for `RecordReader.seek()`.
+
+        Raises:
+            ValueError: If a move index is out of range, or the file is closed.
+            OSError: If the file cannot be written.
+        """
+        ...
+
+    def write_game(self, game: Game) -> int:
+        """Writes `game` from the start of its history.
+
+        Returns:
+            The byte offset of the game, for `RecordReader.seek()`.
+
+        Raises:
+            ValueError: If the game holds an illegal move, or the file is closed.
+            OSError: If the file cannot be written.
+        """
+        ...
+
+    def flush(self) -> None:
+        """Flushes buffered games to the file."""
+        ...
+
+    def close(self) -> None:
+        """Flushes and closes the file. Closing twice does nothing."""
+        ...
+
+    def __enter__(self) -> RecordWriter: ...
+    def __exit__(self, *args: object) -> bool: ...
+
+class RecordReader:
+    """Reads games from a record file written by `RecordWriter`.
+
+    Iterating yields each game as a `Game`, replayed in Rust.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Opens the record file at `path`.
+
+        Raises:
+            OSError: If the file cannot be read or is not a record file.
+        """
+        ...
+
+    @property
+    def offset(self) -> int:
+        """The byte offset of the next game."""
+        ...
+
+    def read(self) -> Optional[Tuple[Board, npt.NDArray[np.uint16]]]:
+        """Reads the next game as `(board, moves)`: the starting board and a
+        `uint16` array of move indices. Returns None at the end of the file.
+
+        Raises:
+            OSError: If the file is corrupt or cannot be read.
+        """
+        ...
+
+    def read_game(self) -> Optional[Game]:
+        """Reads the next game and replays it into a `Game`. Returns None at
+        the end of the file.
+
+        Raises:
+            OSError: If the file is corrupt or cannot be read.
+        """
+        ...
+
+    def seek(self, offset: int) -> None:
+        """Moves to the game at byte `offset`, as returned by
+        `RecordWriter.write()` or `index()`."""
+        ...
+
+    def index(self) -> npt.NDArray[np.uint64]:
+        """Returns the byte offset of every game in the file, without
+        replaying them."""
+        ...
+
+    def __iter__(self) -> RecordReader: ...
+    def __next__(self) -> Game: ...
+
+# =============================================================================
+# Training datasets
+# =============================================================================
+
+class DatasetStats:
+    """Totals of a dataset written by `DatasetWriter`."""
+
+    @property
+    def games(self) -> int:
+        """Games added, unfinished ones included."""
+        ...
+
+    @property
+    def unfinished(self) -> int:
+        """Games that had not ended."""
+        ...
+
+    @property
+    def rows(self) -> int:
+        """Rows written."""
+        ...
+
+    @property
+    def duplicates(self) -> int:
+        """Rows dropped as repeated positions."""
+        ...
+
+    @property
+    def shards(self) -> int:
+        """Shard files written."""
+        ...
+
+class DatasetWriter:
+    """Writes games as training rows to `.npy` shard files.
+
+    Every position of every game becomes one row of a structured array with
+    the fields `white`, `black`, `kings` (`uint64` bitboards), `turn`
+    (`uint8`, 0 for White), `legal_moves` (`uint16`), `outcome` (`int8`, the
+    final result for the side to move: 1, -1 or 0 for a draw) and
+    `plies_to_end` (`uint16`). Rows go to `shard-00000.npy`,
+    `shard-00001.npy`, ... in `directory`; open them with
+    `numpy.load(path, mmap_mode="r")`.
+
+    Games are replayed on the rayon pool with the GIL released while a
+    background thread writes to disk. Use as a context manager, or call
+    `finish()` when done.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, "os.PathLike[str]"],
+        rows_per_shard: int = 1048576,
+        *,
+        deduplicate: bool = False,
+        keep_unfinished: bool = False,
+        threads: Optional[int] = None,
+    ) -> None:
+        """Starts a dataset in `directory`, creating it if needed. Existing
+        shards are overwritten.
+
+        Args:
+            directory: Where to write the shard files.
+            rows_per_shard: Maximum number of rows in a shard.
+            deduplicate: Write each position only the first time it is seen.
+            keep_unfinished: Also write games that have not ended, with an
+                outcome of 0. By default they are skipped.
+            threads: Number of worker threads (default: all cores).
+
+        Raises:
+            ValueError: If `rows_per_shard` or `threads` is zero.
+            OSError: If the directory cannot be created.
+        """
+        ...
+
+    def add_games(self, games: Sequence[Game]) -> None:
+        """Adds games, each from the start of its history.
+
+        Raises:
+            ValueError: If a game holds an illegal move, or the dataset is finished.
+            OSError: If the shards cannot be written.
+        """
+        ...
+
+    def add_moves(
+        self, moves: Sequence[Sequence[int]], board: Optional[Board] = None
+    ) -> None:
+        """Adds games given as move indices, such as `PlayoutStats.moves`.
+
+        Args:
+            moves: One `uint16` array (or sequence of integers) per game.
+            board: Start position of every game (default: the standard start).
+
+        Raises:
+            ValueError: If a move index is out of range, or the dataset is finished.
+            OSError: If the shards cannot be written.
+        """
+        ...
+
+    def add_records(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Adds every game of a record file written by `RecordWriter`.
+
+        Raises:
+            ValueError: If the dataset is finished.
+            OSError: If the file is corrupt or cannot be read, or the shards
+                cannot be written.
+        """
+        ...
+
+    def add_playouts(
+        self,
+        n_games: int,
+        seed: int = 0,
+        policy: str = "uniform",
+        max_plies: int = 1000,
+        *,
+        board: Optional[Board] = None,
+    ) -> None:
+        """Plays games natively and adds them. These are the same games as
+        `kish.playouts()` plays with the same arguments.
+
+        Args:
+            n_games: Number of games to play.
+            seed: Seed of the random streams.
+            policy: `"uniform"`, `"capture"` or `"heuristic"`.
+            max_plies: Games still running after this many plies are truncated.
+            board: Start position (default: the standard start).
+
+        Raises:
+            ValueError: If the policy is unknown, or the dataset is finished.
+            OSError: If the shards cannot be written.
+        """
+        ...
+
+    def finish(self) -> DatasetStats:
+        """Waits for every row to be written, completes the last shard and
+        returns the totals.
+
+        Raises:
+            ValueError: If the dataset is already finished.
+            OSError: If the shards cannot be written.
+        """
+        ...
+
+    def __enter__(self) -> DatasetWriter: ...
+    def __exit__(self, *args: object) -> bool: ...
+
+# =============================================================================
+# Game archives
+# =============================================================================
+
+class ArchiveReader:
+    """Reads games from PDN-style text archives.
+
+    Each game is an optional block of `[Name "value"]` headers followed by
+    numbered moves in the notation read by `Board.parse_action()` and a
+    result such as `1-0` or `*`. Comments, variations and annotations are
+    skipped, and a `[FEN "W:Wa2,Kd4:Bh7"]` header sets up a custom start.
+
+    Iterating yields a `Game` per archive game, or `(board, moves)` pairs of
+    the starting board and a `uint16` array of move indices when `moves` is
+    True. The files are read in order, in batches of games parsed in parallel.
+    """
+
+    def __init__(
+        self,
+        paths: Union[str, "os.PathLike[str]", Sequence[Union[str, "os.PathLike[str]"]]],
+        *,
+        moves: bool = False,
+        skip_invalid: bool = False,
+        threads: Optional[int] = None,
+    ) -> None:
+        """Opens archives for reading. Files are opened as they are reached.
+
+        Args:
+            paths: An archive path, or a list of paths read in order.
+            moves: Yield `(board, moves)` pairs instead of `Game` objects.
+            skip_invalid: Skip games that fail to parse, counting them in
+                `errors`, instead of raising.
+            threads: Number of worker threads (default: the global rayon pool).
+
+        Raises:
+            ValueError: If `threads` is zero.
+        """
+        ...
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """The headers of the game last returned, as a dict."""
+        ...
+
+    @property
+    def errors(self) -> int:
+        """The number of invalid games skipped so far."""
+        ...
+
+    def __iter__(self) -> ArchiveReader: ...
+    def __next__(self) -> Union[Game, Tuple[Board, npt.NDArray[np.uint16]]]:
+        """Returns the next game.
+
+        Raises:
+            ValueError: If a game fails to parse and `skip_invalid` is False.
+            OSError: If a file cannot be read.
+        """
+        ...
+
+# =============================================================================
+# Evaluation networks
+# =============================================================================
+
+class Network:
+    """A quantized NNUE-style evaluation network.
+
+    The accumulator (first layer) has one `int16` row per piece feature and
+    is updated incrementally from each move's delta during `Board.search()`;
+    the hidden and output layers run in integers. Networks are loaded from
+    files written by `Network.save()`, usually after `Network.quantize()` of
+    weights trained in PyTorch.
+
+    Example:
+        >>> network = Network.quantize(
+        ...     model.ft.weight.detach().numpy(),
+        ...     model.ft.bias.detach().numpy(),
+        ...     model.hidden.weight.detach().numpy(),
+        ...     model.hidden.bias.detach().numpy(),
+        ...     model.output.weight.detach().numpy()[0],
+        ...     model.output.bias.item(),
+        ... )
+        >>> network.save("kish.nnue")
+        >>> network = Network("kish.nnue")  # later, in the engine
+        >>> board.evaluate(network)
+        12
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Loads a network file written by `Network.save()`.
+
+        Raises:
+            OSError: If the file cannot be read or is not a network.
+        """
+        ...
+
+    @staticmethod
+    def quantize(
+        feature_weights: npt.NDArray[np.float32],
+        feature_bias: npt.NDArray[np.float32],
+        hidden_weights: npt.NDArray[np.float32],
+        hidden_bias: npt.NDArray[np.float32],
+        output_weights: npt.NDArray[np.float32],
+        output_bias: float,
+    ) -> Network:
+        """Quantizes float32 weights in the `[out, in]` layout of `nn.Linear`.
+
+        The float network computes, with `us` and `them` the 256 piece
+        features seen by the side to move and by the opponent:
+        `a = clamp(ft(us), 0, 1) ++ clamp(ft(them), 0, 1)`,
+        `h = clamp(hidden(a), 0, 1)` and `y = output(h)` in men.
+
+        Args:
+            feature_weights: `(L1, 256)` accumulator weights.
+            feature_bias: `(L1,)` accumulator bias; `L1` is a multiple of 16
+                up to 512.
+            hidden_weights: `(L2, 2 * L1)` hidden layer weights.
+            hidden_bias: `(L2,)` hidden layer bias; `L2` is at most 256.
+            output_weights: `(L2,)` output weights.
+            output_bias: Output bias.
+
+        Raises:
+            ValueError: If the shapes do not fit together.
+        """
+        ...
+
+    def save(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Writes the network to `path`.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        ...
+
+    @property
+    def accumulator_size(self) -> int:
+        """Accumulator size `L1`."""
+        ...
+
+    @property
+    def hidden_size(self) -> int:
+        """Hidden layer size `L2`."""
+        ...
+
+    def evaluate(self, board: Board) -> int:
+        """Same as `board.evaluate(self)`."""
+        ...
+
+    def evaluate_many(
+        self, boards: Sequence[Board], *, threads: Optional[int] = None
+    ) -> npt.NDArray[np.int32]:
+        """Evaluates many boards in parallel.
+
+        Args:
+            boards: The boards to evaluate.
+            threads: Number of worker threads (default: the global rayon pool).
+
+        Returns:
+            An `int32` array of scores in centi-men, each from its side to
+            move's point of view.
+        """
+        ...
+
+    def evaluate_arrays(
+        self,
+        white: npt.NDArray[np.uint64],
+        black: npt.NDArray[np.uint64],
+        kings: npt.NDArray[np.uint64],
+        turn: npt.NDArray[np.uint64],
+        *,
+        threads: Optional[int] = None,
+    ) -> npt.NDArray[np.int32]:
+        """Evaluates positions stored as `uint64` columns, as `mobility_arrays()`
+        takes them, without creating `Board` objects.
+
+        Args:
+            white: White pieces bitboards.
+            black: Black pieces bitboards.
+            kings: Kings bitboards.
+            turn: Side to move (0 = White, 1 = Black).
+            threads: Number of worker threads (default: the global rayon pool).
+
+        Returns:
+            An `int32` array of scores in centi-men.
+
+        Raises:
+            ValueError: If the arrays differ in length or a turn is not 0 or 1.
+        """
+        ...
+
+# =============================================================================
+# Opening books
+# =============================================================================
+
+class Book:
+    """A memory-mapped opening book.
+
+    Maps positions to the moves played from them, with a count, a score in
+    hundredths of a game for the side playing the move (+100 per win, -100
+    per loss) and a selection weight. Processes that open the same file share
+    its pages, so each worker can open the book without loading it.
+
+    Example:
+        >>> book = Book("openings.bk")
+        >>> for action, count, score, weight in book.probe(board):
+        ...     print(action, count, score, weight)
+        >>> action = book.choose(board)  # None when out of book
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"], *, seed: int = 0) -> None:
+        """Opens a book file written by `BookBuilder.build()`.
+
+        Args:
+            path: The book file.
+            seed: Seed of the random stream used by `choose()`.
+
+        Raises:
+            OSError: If the file cannot be read or is not a book.
+        """
+        ...
+
+    def probe(self, board: Board) -> List[Tuple[Action, int, int, int]]:
+        """Returns the book moves from `board` as `(action, count, score, weight)`
+        tuples, in `board.actions()` order. Empty if the position is not in
+        the book.
+        """
+        ...
+
+    def choose(self, board: Board) -> Optional[Action]:
+        """Picks a book move from `board` at random, in proportion to the move
+        weights. Returns None if the position is not in the book or all its
+        moves have zero weight.
+        """
+        ...
+
+    def __len__(self) -> int: ...
+
+class BookBuilder:
+    """Collects opening statistics from games or enumeration and writes a `Book`.
+
+    Each game adds its first `plies` moves, scored by the game's result for
+    the side that played them. Enumeration adds every move of every position
+    near a start, scored by a search. The weight of a move is 200 per win and
+    100 per draw, so moves that only lost are never chosen.
+
+    Example:
+        >>> builder = BookBuilder(plies=12)
+        >>> for game in ArchiveReader("club.pdn"):
+        ...     builder.add_game(game)
+        >>> builder.enumerate(Board(), plies=4, depth=6)
+        >>> book = builder.build("openings.bk", min_count=2)
+    """
+
+    def __init__(self, plies: int = 16) -> None:
+        """Creates an empty builder that keeps the first `plies` moves of each game."""
+        ...
+
+    def add(
+        self,
+        board: Board,
+        moves: Union[npt.NDArray[np.uint16], Sequence[int]],
+        winner: Optional[Team] = None,
+    ) -> None:
+        """Adds a game given its starting board and move indices, such as
+        `PlayoutStats.moves` entries or `ArchiveReader(moves=True)` pairs.
+
+        Args:
+            board: The starting board.
+            moves: Move indices into `Board.actions()`.
+            winner: The team that won, or None for a draw or unknown result.
+
+        Raises:
+            ValueError: If a move index is out of range for its position. No
+                move of the game is added in that case.
+        """
+        ...
+
+    def add_game(self, game: Game) -> None:
+        """Adds `game` from the start of its history, scored by its status."""
+        ...
+
+    def enumerate(
+        self,
+        board: Board,
+        plies: int = 4,
+        depth: int = 6,
+        *,
+        threads: Optional[int] = None,
+    ) -> None:
+        """Adds every move of every position less than `plies` plies from
+        `board`, scored by a `depth`-ply search of the position it leads to.
+
+        Args:
+            board: The starting board.
+            plies: Number of plies to enumerate.
+            depth: Search depth of each move.
+            threads: Number of worker threads (default: the global rayon pool).
+
+        Raises:
+            ValueError: If `threads` is 0.
+        """
+        ...
+
+    def build(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        min_count: int = 1,
+        *,
+        seed: int = 0,
+    ) -> Book:
+        """Writes the moves added at least `min_count` times to `path` and opens
+        the book.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        ...
+
+    def __len__(self) -> int: ...
+
+# =============================================================================
+# Action space for policy networks
+# =============================================================================
+
+def legal_masks(
+    boards: Sequence[Board],
+    perspective: bool = False,
+    *,
+    out: Optional[npt.NDArray[np.bool_]] = None,
+    threads: Optional[int] = None,
+) -> npt.NDArray[np.bool_]:
+    """Computes the legal-action masks of many boards in parallel.
+
+    Index `source * 64 + destination` of row `i` is true when board `i` has a
+    legal action from `source` to `destination` (squares numbered A1 = 0 to
+    H8 = 63). With `perspective=True`, squares of boards with Black to move
+    are rotated (`square -> 63 - square`), as in `encode_boards()`.
+
+    Args:
+        boards: The boards.
+        perspective: Rotate squares when Black is to move.
+        out: Optional writable `bool` array of shape `(N, 4096)` to fill.
+        threads: Number of worker threads (default: the global rayon pool).
+
+    Returns:
+        The filled `(N, 4096)` `bool` array.
+
+    Raises:
+        ValueError: If `out` has the wrong shape or is not writable.
+    """
+    ...
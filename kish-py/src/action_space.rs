@@ -0,0 +1,79 @@
+//! Legal-action masks over the fixed action-index space.
+//!
+//! Wraps the [`kish_core::ACTION_SPACE`] helpers so that masks for a whole
+//! batch of boards are written into one `(N, 4096)` NumPy array with the GIL
+//! released, instead of being rebuilt from `Action` objects in Python.
+
+use numpy::{PyArray1, PyArray2, PyArrayMethods, PyUntypedArrayMethods};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+use kish_core::ACTION_SPACE;
+
+use crate::{batch, Board};
+
+/// Returns the legal-action mask of `board` as a `bool` array.
+pub(crate) fn legal_mask<'py>(
+    py: Python<'py>,
+    board: &kish_core::Board,
+    perspective: bool,
+) -> Bound<'py, PyArray1<bool>> {
+    PyArray1::from_vec(py, board.legal_mask(perspective))
+}
+
+/// Computes the legal-action masks of many boards in parallel.
+///
+/// Index `source * 64 + destination` of row `i` is true when board `i` has a
+/// legal action from `source` to `destination` (squares numbered A1 = 0 to
+/// H8 = 63). With `perspective=True`, squares of boards with Black to move
+/// are rotated (`square -> 63 - square`), as in `encode_boards()`.
+///
+/// Args:
+///     boards: The boards.
+///     perspective: Rotate squares when Black is to move.
+///     out: Optional writable `bool` array of shape `(N, 4096)` to fill.
+///     threads: Number of worker threads (default: the global rayon pool).
+///
+/// Returns:
+///     The filled `(N, 4096)` `bool` array.
+///
+/// Raises:
+///     ValueError: If `out` has the wrong shape or is not writable.
+#[pyfunction]
+#[pyo3(signature = (boards, perspective=false, *, out=None, threads=None))]
+pub(crate) fn legal_masks<'py>(
+    py: Python<'py>,
+    boards: Vec<PyRef<'_, Board>>,
+    perspective: bool,
+    out: Option<Bound<'py, PyArray2<bool>>>,
+    threads: Option<usize>,
+) -> PyResult<Bound<'py, PyArray2<bool>>> {
+    let boards: Vec<kish_core::Board> = boards.iter().map(|board| board.inner).collect();
+    let shape = [boards.len(), ACTION_SPACE];
+    let array = match out {
+        Some(array) => array,
+        None => PyArray2::zeros(py, shape, false),
+    };
+    if array.shape() != shape.as_slice() {
+        return Err(PyValueError::new_err(format!(
+            "out has shape {:?}, expected {:?}",
+            array.shape(),
+            shape
+        )));
+    }
+    {
+        let mut guard = array
+            .try_readwrite()
+            .map_err(|e| PyValueError::new_err(e.to_string()))?;
+        let masks = guard
+            .as_slice_mut()
+            .map_err(|e| PyValueError::new_err(e.to_string()))?;
+        py.detach(|| {
+            batch::install(threads, || {
+                kish_core::Board::legal_masks(&boards, perspective, masks);
+            })
+        })?;
+    }
+    Ok(array)
+}
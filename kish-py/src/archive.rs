@@ -0,0 +1,157 @@
+//! PDN-style game archives for Python.
+//!
+//! Wraps [`kish_core::ArchiveReader`]: archive text is split into games and
+//! parsed on the rayon pool with the GIL released, and each game is replayed
+//! in Rust, so no `Action` objects are created while importing.
+
+use std::collections::HashMap;
+use std::io;
+use std::path::PathBuf;
+
+use numpy::PyArray1;
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::IntoPyObjectExt;
+
+use ::kish as kish_core;
+
+use crate::{Board, Game};
+
+/// Reads games from PDN-style text archives.
+///
+/// Each game is an optional block of `[Name "value"]` headers followed by
+/// numbered moves in the notation read by `Board.parse_action()` and a
+/// result such as `1-0` or `*`. Comments, variations and annotations are
+/// skipped, and a `[FEN "W:Wa2,Kd4:Bh7"]` header sets up a custom start.
+///
+/// Iterating yields a `Game` per archive game, or `(board, moves)` pairs of
+/// the starting board and a `uint16` array of move indices when `moves` is
+/// True. The files are read in order, in batches of games parsed in parallel.
+///
+/// Example:
+///     >>> reader = kish.ArchiveReader(["club.pdn", "online.pdn"], skip_invalid=True)
+///     >>> for game in reader:
+///     ...     print(reader.headers.get("Event"), game.move_count)
+///     >>> reader.errors
+#[pyclass]
+pub struct ArchiveReader {
+    inner: kish_core::ArchiveReader,
+    pool: Option<rayon::ThreadPool>,
+    moves: bool,
+    skip_invalid: bool,
+    headers: Vec<(String, String)>,
+    errors: u64,
+}
+
+impl ArchiveReader {
+    /// Returns the next game, parsing a batch with the GIL released if none
+    /// is buffered.
+    fn next_game(&mut self, py: Python<'_>) -> PyResult<Option<kish_core::ArchiveGame>> {
+        loop {
+            let (inner, pool) = (&mut self.inner, &self.pool);
+            let next = py.detach(|| match pool {
+                Some(pool) => pool.install(|| inner.next()),
+                None => inner.next(),
+            });
+            match next {
+                None => return Ok(None),
+                Some(Ok(game)) => return Ok(Some(game)),
+                Some(Err(error))
+                    if self.skip_invalid && error.kind() == io::ErrorKind::InvalidData =>
+                {
+                    self.errors += 1;
+                }
+                Some(Err(error)) if error.kind() == io::ErrorKind::InvalidData => {
+                    return Err(PyValueError::new_err(error.to_string()));
+                }
+                Some(Err(error)) => return Err(error.into()),
+            }
+        }
+    }
+}
+
+#[pymethods]
+impl ArchiveReader {
+    /// Opens archives for reading. Files are opened as they are reached.
+    ///
+    /// Args:
+    ///     paths: An archive path, or a list of paths read in order.
+    ///     moves: Yield `(board, moves)` pairs instead of `Game` objects.
+    ///     skip_invalid: Skip games that fail to parse, counting them in
+    ///         `errors`, instead of raising.
+    ///     threads: Number of worker threads (default: the global rayon pool).
+    ///
+    /// Raises:
+    ///     ValueError: If `threads` is zero.
+    #[new]
+    #[pyo3(signature = (paths, *, moves=false, skip_invalid=false, threads=None))]
+    fn new(
+        paths: &Bound<'_, PyAny>,
+        moves: bool,
+        skip_invalid: bool,
+        threads: Option<usize>,
+    ) -> PyResult<Self> {
+        let paths: Vec<PathBuf> = match paths.extract::<PathBuf>() {
+            Ok(path) => vec![path],
+            Err(_) => paths.extract()?,
+        };
+        let pool = match threads {
+            None => None,
+            Some(0) => return Err(PyValueError::new_err("threads must be at least 1")),
+            Some(threads) => Some(
+                rayon::ThreadPoolBuilder::new()
+                    .num_threads(threads)
+                    .build()
+                    .map_err(|e| PyValueError::new_err(e.to_string()))?,
+            ),
+        };
+        Ok(Self {
+            inner: kish_core::ArchiveReader::new(paths),
+            pool,
+            moves,
+            skip_invalid,
+            headers: Vec::new(),
+            errors: 0,
+        })
+    }
+
+    /// The headers of the game last returned, as a dict.
+    #[getter]
+    fn headers(&self) -> HashMap<String, String> {
+        self.headers.iter().cloned().collect()
+    }
+
+    /// The number of invalid games skipped so far.
+    #[getter]
+    fn errors(&self) -> u64 {
+        self.errors
+    }
+
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    /// Returns the next game.
+    ///
+    /// Raises:
+    ///     ValueError: If a game fails to parse and `skip_invalid` is False.
+    ///     OSError: If a file cannot be read.
+    fn __next__<'py>(&mut self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyAny>>> {
+        let Some(game) = self.next_game(py)? else {
+            return Ok(None);
+        };
+        self.headers = game.headers;
+        let record = game.record;
+        if self.moves {
+            let board = Board {
+                inner: record.start,
+            };
+            return (board, PyArray1::from_vec(py, record.moves))
+                .into_bound_py_any(py)
+                .map(Some);
+        }
+        // Parsing already replayed the moves, so they are legal.
+        let game = record.replay().expect("archive games hold legal moves");
+        Game::from_core(game).into_bound_py_any(py).map(Some)
+    }
+}
@@ -0,0 +1,234 @@
+//! Batch analytics over many boards on the rayon thread pool.
+//!
+//! Each function releases the GIL and spreads the boards across worker
+//! threads, so Python callers pay the FFI cost once per batch rather than
+//! once per board.
+
+use std::borrow::Cow;
+use std::collections::HashMap;
+use std::sync::{Arc, Mutex, OnceLock, PoisonError};
+
+use numpy::{PyArray1, PyArrayMethods, PyReadonlyArray1};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use rayon::prelude::*;
+
+use ::kish as kish_core;
+
+use crate::{Board, GameStatus};
+
+/// Dedicated pools built so far, by number of workers.
+static POOLS: OnceLock<Mutex<HashMap<usize, Arc<rayon::ThreadPool>>>> = OnceLock::new();
+
+/// Returns the pool of `threads` workers, building it on first use.
+///
+/// Pools are kept for the life of the process, so calls that pass the same
+/// `threads` share one set of workers instead of spawning their own.
+pub(crate) fn pool(threads: usize) -> PyResult<Arc<rayon::ThreadPool>> {
+    if threads == 0 {
+        return Err(PyValueError::new_err("threads must be at least 1"));
+    }
+    let mut pools = POOLS
+        .get_or_init(Mutex::default)
+        .lock()
+        .unwrap_or_else(PoisonError::into_inner);
+    if let Some(pool) = pools.get(&threads) {
+        return Ok(Arc::clone(pool));
+    }
+    let pool = rayon::ThreadPoolBuilder::new()
+        .num_threads(threads)
+        .build()
+        .map_err(|e| PyValueError::new_err(e.to_string()))?;
+    let pool = Arc::new(pool);
+    pools.insert(threads, Arc::clone(&pool));
+    Ok(pool)
+}
+
+/// Runs `f` on the shared pool of `threads` workers, or on the global pool
+/// when `threads` is `None`.
+pub(crate) fn install<R: Send>(
+    threads: Option<usize>,
+    f: impl FnOnce() -> R + Send,
+) -> PyResult<R> {
+    match threads {
+        None => Ok(f()),
+        Some(threads) => Ok(pool(threads)?.install(f)),
+    }
+}
+
+fn unwrap_boards(boards: &[PyRef<'_, Board>]) -> Vec<kish_core::Board> {
+    boards.iter().map(|board| board.inner).collect()
+}
+
+/// Runs perft on every board in parallel.
+///
+/// Args:
+///     boards: The boards to count from.
+///     depth: The perft depth.
+///     threads: Number of worker threads (default: the global rayon pool).
+///
+/// Returns:
+///     The leaf node count of each board, in order.
+#[pyfunction]
+#[pyo3(signature = (boards, depth, *, threads=None))]
+pub(crate) fn perft_many(
+    py: Python<'_>,
+    boards: Vec<PyRef<'_, Board>>,
+    depth: u64,
+    threads: Option<usize>,
+) -> PyResult<Vec<u64>> {
+    let boards = unwrap_boards(&boards);
+    py.detach(|| {
+        install(threads, || {
+            boards.par_iter().map(|board| board.perft(depth)).collect()
+        })
+    })
+}
+
+/// Computes the status of every board in parallel.
+///
+/// Args:
+///     boards: The boards to evaluate.
+///     threads: Number of worker threads (default: the global rayon pool).
+///
+/// Returns:
+///     The `GameStatus` of each board, in order.
+#[pyfunction]
+#[pyo3(signature = (boards, *, threads=None))]
+pub(crate) fn status_many(
+    py: Python<'_>,
+    boards: Vec<PyRef<'_, Board>>,
+    threads: Option<usize>,
+) -> PyResult<Vec<GameStatus>> {
+    let boards = unwrap_boards(&boards);
+    let statuses: Vec<kish_core::GameStatus> = py.detach(|| {
+        install(threads, || {
+            boards.par_iter().map(kish_core::Board::status).collect()
+        })
+    })?;
+    Ok(statuses.into_iter().map(GameStatus::from).collect())
+}
+
+/// Counts the legal actions of every board in parallel.
+///
+/// Args:
+///     boards: The boards to count from.
+///     threads: Number of worker threads (default: the global rayon pool).
+///
+/// Returns:
+///     The number of legal actions of each board, in order.
+#[pyfunction]
+#[pyo3(signature = (boards, *, threads=None))]
+pub(crate) fn count_actions_many(
+    py: Python<'_>,
+    boards: Vec<PyRef<'_, Board>>,
+    threads: Option<usize>,
+) -> PyResult<Vec<u64>> {
+    let boards = unwrap_boards(&boards);
+    py.detach(|| {
+        install(threads, || {
+            boards
+                .par_iter()
+                .map_init(
+                    || Vec::with_capacity(48),
+                    |scratch, board| board.count_actions(scratch),
+                )
+                .collect()
+        })
+    })
+}
+
+/// Borrows a `uint64` column, copying it only if it is not contiguous.
+pub(crate) fn column<'a>(array: &'a PyReadonlyArray1<'_, u64>) -> Cow<'a, [u64]> {
+    match array.as_slice() {
+        Ok(slice) => Cow::Borrowed(slice),
+        Err(_) => Cow::Owned(array.as_array().to_vec()),
+    }
+}
+
+/// Checks that position columns have the same length and valid turns.
+pub(crate) fn check_columns(
+    white: &[u64],
+    black: &[u64],
+    kings: &[u64],
+    turn: &[u64],
+) -> PyResult<()> {
+    let len = white.len();
+    if black.len() != len || kings.len() != len || turn.len() != len {
+        return Err(PyValueError::new_err(format!(
+            "arrays must have the same length, got {}, {}, {} and {}",
+            len,
+            black.len(),
+            kings.len(),
+            turn.len()
+        )));
+    }
+    if turn.iter().any(|&team| team > 1) {
+        return Err(PyValueError::new_err("turn must be 0 (White) or 1 (Black)"));
+    }
+    Ok(())
+}
+
+/// Counts legal actions and finds captures for positions stored as columns.
+///
+/// The positions are given in struct-of-arrays layout, one `uint64` array per
+/// field of `Board.to_array()`, so an `(N, 4)` array such as `VecGame`
+/// observations can be passed as `*positions.T`. No `Board` objects are
+/// created, and quiet positions are counted with branch-free bitboard shifts
+/// over the whole batch.
+///
+/// Args:
+///     white: White pieces bitboards.
+///     black: Black pieces bitboards.
+///     kings: Kings bitboards.
+///     turn: Side to move (0 = White, 1 = Black).
+///     threads: Number of worker threads (default: the global rayon pool).
+///
+/// Returns:
+///     A tuple `(counts, captures, blocked)`: the `uint32` number of legal
+///     actions, and `bool` arrays telling whether a capture is available and
+///     whether the side to move has no legal action.
+///
+/// Raises:
+///     ValueError: If the arrays differ in length or a turn is not 0 or 1.
+#[pyfunction]
+#[pyo3(signature = (white, black, kings, turn, *, threads=None))]
+#[allow(clippy::type_complexity)]
+pub(crate) fn mobility_arrays<'py>(
+    py: Python<'py>,
+    white: PyReadonlyArray1<'py, u64>,
+    black: PyReadonlyArray1<'py, u64>,
+    kings: PyReadonlyArray1<'py, u64>,
+    turn: PyReadonlyArray1<'py, u64>,
+    threads: Option<usize>,
+) -> PyResult<(
+    Bound<'py, PyArray1<u32>>,
+    Bound<'py, PyArray1<bool>>,
+    Bound<'py, PyArray1<bool>>,
+)> {
+    let (white, black, kings, turn) = (
+        column(&white),
+        column(&black),
+        column(&kings),
+        column(&turn),
+    );
+    check_columns(&white, &black, &kings, &turn)?;
+    let len = white.len();
+
+    let (counts, captures) = py.detach(|| {
+        install(threads, || {
+            let columns = kish_core::BoardColumns::new(&white, &black, &kings, &turn);
+            let mut counts = vec![0; len];
+            let mut captures = vec![false; len];
+            columns.count_actions(&mut counts);
+            columns.has_captures(&mut captures);
+            (counts, captures)
+        })
+    })?;
+    let blocked = counts.iter().map(|&count| count == 0).collect();
+    Ok((
+        PyArray1::from_vec(py, counts),
+        PyArray1::from_vec(py, captures),
+        PyArray1::from_vec(py, blocked),
+    ))
+}
@@ -0,0 +1,191 @@
+//! Opening books for Python.
+//!
+//! Wraps [`kish_core::Book`] and [`kish_core::BookBuilder`]. Enumeration
+//! searches on the rayon pool with the GIL released; probes read the
+//! memory-mapped file directly.
+
+use std::path::PathBuf;
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+use kish_core::{GameStatus, Rng};
+
+use crate::record::extract_moves;
+use crate::{batch, Action, Board, Game, Team};
+
+/// A memory-mapped opening book.
+///
+/// Maps positions to the moves played from them, with a count, a score in
+/// hundredths of a game for the side playing the move (+100 per win, -100
+/// per loss) and a selection weight. Processes that open the same file share
+/// its pages, so each worker can open the book without loading it.
+///
+/// Example:
+///     >>> book = kish.Book("openings.bk")
+///     >>> for action, count, score, weight in book.probe(board):
+///     ...     print(action, count, score, weight)
+///     >>> action = book.choose(board)  # None when out of book
+#[pyclass]
+pub struct Book {
+    inner: kish_core::Book,
+    rng: Rng,
+}
+
+#[pymethods]
+impl Book {
+    /// Opens a book file written by `BookBuilder.build()`.
+    ///
+    /// Args:
+    ///     path: The book file.
+    ///     seed: Seed of the random stream used by `choose()`.
+    ///
+    /// Raises:
+    ///     OSError: If the file cannot be read or is not a book.
+    #[new]
+    #[pyo3(signature = (path, *, seed=0))]
+    fn new(path: PathBuf, seed: u64) -> PyResult<Self> {
+        Ok(Self {
+            inner: kish_core::Book::open(path)?,
+            rng: Rng::new(seed),
+        })
+    }
+
+    /// Returns the book moves from `board` as `(action, count, score, weight)`
+    /// tuples, in `board.actions()` order. Empty if the position is not in
+    /// the book.
+    fn probe(&self, board: &Board) -> Vec<(Action, u32, i32, u32)> {
+        self.inner
+            .probe(&board.inner)
+            .into_iter()
+            .map(|entry| {
+                (
+                    Action::from_core(entry.action, &board.inner),
+                    entry.count,
+                    entry.score,
+                    entry.weight,
+                )
+            })
+            .collect()
+    }
+
+    /// Picks a book move from `board` at random, in proportion to the move
+    /// weights. Returns None if the position is not in the book or all its
+    /// moves have zero weight.
+    fn choose(&mut self, board: &Board) -> Option<Action> {
+        let action = self.inner.choose(&board.inner, &mut self.rng)?;
+        Some(Action::from_core(action, &board.inner))
+    }
+
+    fn __len__(&self) -> usize {
+        self.inner.len()
+    }
+
+    fn __repr__(&self) -> String {
+        format!("Book(entries={})", self.inner.len())
+    }
+}
+
+/// Collects opening statistics from games or enumeration and writes a `Book`.
+///
+/// Each game adds its first `plies` moves, scored by the game's result for
+/// the side that played them. Enumeration adds every move of every position
+/// near a start, scored by a search. The weight of a move is 200 per win and
+/// 100 per draw, so moves that only lost are never chosen.
+///
+/// Example:
+///     >>> builder = kish.BookBuilder(plies=12)
+///     >>> for game in kish.ArchiveReader("club.pdn"):
+///     ...     builder.add_game(game)
+///     >>> builder.enumerate(kish.Board(), plies=4, depth=6)
+///     >>> book = builder.build("openings.bk", min_count=2)
+#[pyclass]
+pub struct BookBuilder {
+    inner: kish_core::BookBuilder,
+}
+
+#[pymethods]
+impl BookBuilder {
+    /// Creates an empty builder that keeps the first `plies` moves of each game.
+    #[new]
+    #[pyo3(signature = (plies=16))]
+    fn new(plies: usize) -> Self {
+        Self {
+            inner: kish_core::BookBuilder::new(plies),
+        }
+    }
+
+    /// Adds a game given its starting board and move indices, such as
+    /// `PlayoutStats.moves` entries or `ArchiveReader(moves=True)` pairs.
+    ///
+    /// Args:
+    ///     board: The starting board.
+    ///     moves: Move indices into `Board.actions()`.
+    ///     winner: The team that won, or None for a draw or unknown result.
+    ///
+    /// Raises:
+    ///     ValueError: If a move index is out of range for its position. No
+    ///         move of the game is added in that case.
+    #[pyo3(signature = (board, moves, winner=None))]
+    fn add(
+        &mut self,
+        board: &Board,
+        moves: &Bound<'_, PyAny>,
+        winner: Option<Team>,
+    ) -> PyResult<()> {
+        let moves = extract_moves(moves)?;
+        let result = winner.map_or(GameStatus::Draw, |team| GameStatus::Won(team.into()));
+        if !self.inner.add(&board.inner, &moves, result) {
+            return Err(PyValueError::new_err("move index out of range"));
+        }
+        Ok(())
+    }
+
+    /// Adds `game` from the start of its history, scored by its status.
+    fn add_game(&mut self, game: &Game) {
+        self.inner.add_game(&game.inner);
+    }
+
+    /// Adds every move of every position less than `plies` plies from
+    /// `board`, scored by a `depth`-ply search of the position it leads to.
+    ///
+    /// Args:
+    ///     board: The starting board.
+    ///     plies: Number of plies to enumerate.
+    ///     depth: Search depth of each move.
+    ///     threads: Number of worker threads (default: the global rayon pool).
+    ///
+    /// Raises:
+    ///     ValueError: If `threads` is 0.
+    #[pyo3(signature = (board, plies=4, depth=6, *, threads=None))]
+    fn enumerate(
+        &mut self,
+        py: Python<'_>,
+        board: &Board,
+        plies: usize,
+        depth: u8,
+        threads: Option<usize>,
+    ) -> PyResult<()> {
+        let (inner, board) = (&mut self.inner, board.inner);
+        py.detach(|| batch::install(threads, || inner.enumerate(&board, plies, depth)))
+    }
+
+    /// Writes the moves added at least `min_count` times to `path` and opens
+    /// the book.
+    ///
+    /// Raises:
+    ///     OSError: If the file cannot be written.
+    #[pyo3(signature = (path, min_count=1, *, seed=0))]
+    fn build(&self, py: Python<'_>, path: PathBuf, min_count: u32, seed: u64) -> PyResult<Book> {
+        let inner = py.detach(|| self.inner.build(path, min_count))?;
+        Ok(Book {
+            inner,
+            rng: Rng::new(seed),
+        })
+    }
+
+    fn __len__(&self) -> usize {
+        self.inner.len()
+    }
+}
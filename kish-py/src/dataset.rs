@@ -0,0 +1,280 @@
+//! Streaming training datasets for Python.
+//!
+//! Wraps [`kish_core::DatasetWriter`]: games are replayed in Rust with the GIL
+//! released and written to `.npy` shards by a background thread, so no
+//! per-position Python objects are ever created.
+
+use std::fs::File;
+use std::io::BufReader;
+use std::path::PathBuf;
+use std::sync::Arc;
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::PyTuple;
+
+use ::kish as kish_core;
+
+use crate::batch;
+use crate::playout::parse_policy;
+use crate::record::{extract_moves, to_py_err};
+use crate::{Board, Game};
+
+/// Totals of a dataset written by `DatasetWriter`.
+#[pyclass(frozen)]
+pub struct DatasetStats {
+    inner: kish_core::DatasetStats,
+}
+
+#[pymethods]
+impl DatasetStats {
+    /// Games added, unfinished ones included.
+    #[getter]
+    fn games(&self) -> u64 {
+        self.inner.games
+    }
+
+    /// Games that had not ended.
+    #[getter]
+    fn unfinished(&self) -> u64 {
+        self.inner.unfinished
+    }
+
+    /// Rows written.
+    #[getter]
+    fn rows(&self) -> u64 {
+        self.inner.rows
+    }
+
+    /// Rows dropped as repeated positions.
+    #[getter]
+    fn duplicates(&self) -> u64 {
+        self.inner.duplicates
+    }
+
+    /// Shard files written.
+    #[getter]
+    fn shards(&self) -> u64 {
+        self.inner.shards
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "DatasetStats(games={}, unfinished={}, rows={}, duplicates={}, shards={})",
+            self.inner.games,
+            self.inner.unfinished,
+            self.inner.rows,
+            self.inner.duplicates,
+            self.inner.shards
+        )
+    }
+}
+
+/// Writes games as training rows to `.npy` shard files.
+///
+/// Every position of every game becomes one row of a structured array with
+/// the fields `white`, `black`, `kings` (`uint64` bitboards), `turn`
+/// (`uint8`, 0 for White), `legal_moves` (`uint16`), `outcome` (`int8`, the
+/// final result for the side to move: 1, -1 or 0 for a draw) and
+/// `plies_to_end` (`uint16`). Rows go to `shard-00000.npy`,
+/// `shard-00001.npy`, ... in `directory`; open them with
+/// `numpy.load(path, mmap_mode="r")`.
+///
+/// Games are replayed on the rayon pool with the GIL released while a
+/// background thread writes to disk. Use as a context manager, or call
+/// `finish()` when done.
+///
+/// Example:
+///     >>> with kish.DatasetWriter("data", deduplicate=True) as writer:
+///     ...     writer.add_playouts(100_000, seed=1, policy="heuristic")
+///     >>> rows = np.load("data/shard-00000.npy", mmap_mode="r")
+///     >>> rows["outcome"].mean()
+#[pyclass]
+pub struct DatasetWriter {
+    inner: Option<kish_core::DatasetWriter>,
+    pool: Option<Arc<rayon::ThreadPool>>,
+}
+
+impl DatasetWriter {
+    /// Runs `f` on the writer with the GIL released, on the writer's pool.
+    fn run<R: Send>(
+        &mut self,
+        py: Python<'_>,
+        f: impl FnOnce(&mut kish_core::DatasetWriter) -> R + Send,
+    ) -> PyResult<R> {
+        let writer = self
+            .inner
+            .as_mut()
+            .ok_or_else(|| PyValueError::new_err("the dataset is finished"))?;
+        let pool = &self.pool;
+        Ok(py.detach(|| match pool {
+            Some(pool) => pool.install(|| f(writer)),
+            None => f(writer),
+        }))
+    }
+
+    /// Adds `records` with the GIL released.
+    fn add(&mut self, py: Python<'_>, records: Vec<kish_core::GameRecord>) -> PyResult<()> {
+        self.run(py, |writer| writer.add_records(records))?
+            .map_err(to_py_err)
+    }
+}
+
+#[pymethods]
+impl DatasetWriter {
+    /// Starts a dataset in `directory`, creating it if needed. Existing
+    /// shards are overwritten.
+    ///
+    /// Args:
+    ///     directory: Where to write the shard files.
+    ///     rows_per_shard: Maximum number of rows in a shard.
+    ///     deduplicate: Write each position only the first time it is seen.
+    ///     keep_unfinished: Also write games that have not ended, with an
+    ///         outcome of 0. By default they are skipped.
+    ///     threads: Number of worker threads (default: all cores).
+    ///
+    /// Raises:
+    ///     ValueError: If `rows_per_shard` or `threads` is zero.
+    ///     OSError: If the directory cannot be created.
+    #[new]
+    #[pyo3(signature = (directory, rows_per_shard=1 << 20, *, deduplicate=false, keep_unfinished=false, threads=None))]
+    fn new(
+        directory: PathBuf,
+        rows_per_shard: usize,
+        deduplicate: bool,
+        keep_unfinished: bool,
+        threads: Option<usize>,
+    ) -> PyResult<Self> {
+        if rows_per_shard == 0 {
+            return Err(PyValueError::new_err("rows_per_shard must be at least 1"));
+        }
+        let pool = threads.map(batch::pool).transpose()?;
+        let config = kish_core::DatasetConfig {
+            rows_per_shard,
+            deduplicate,
+            keep_unfinished,
+        };
+        Ok(Self {
+            inner: Some(kish_core::DatasetWriter::create(directory, config)?),
+            pool,
+        })
+    }
+
+    /// Adds games, each from the start of its history.
+    ///
+    /// Raises:
+    ///     ValueError: If a game holds an illegal move, or the dataset is finished.
+    ///     OSError: If the shards cannot be written.
+    fn add_games(&mut self, py: Python<'_>, games: Vec<PyRef<'_, Game>>) -> PyResult<()> {
+        let records = games
+            .iter()
+            .map(|game| {
+                kish_core::GameRecord::from_game(&game.inner)
+                    .ok_or_else(|| PyValueError::new_err("a game holds an illegal move"))
+            })
+            .collect::<PyResult<Vec<_>>>()?;
+        self.add(py, records)
+    }
+
+    /// Adds games given as move indices, such as `PlayoutStats.moves`.
+    ///
+    /// Args:
+    ///     moves: One `uint16` array (or sequence of integers) per game.
+    ///     board: Start position of every game (default: the standard start).
+    ///
+    /// Raises:
+    ///     ValueError: If a move index is out of range, or the dataset is finished.
+    ///     OSError: If the shards cannot be written.
+    #[pyo3(signature = (moves, board=None))]
+    fn add_moves(
+        &mut self,
+        py: Python<'_>,
+        moves: Vec<Bound<'_, PyAny>>,
+        board: Option<PyRef<'_, Board>>,
+    ) -> PyResult<()> {
+        let start = board.map_or_else(kish_core::Board::new_default, |board| board.inner);
+        let records = moves
+            .iter()
+            .map(|moves| {
+                Ok(kish_core::GameRecord {
+                    start,
+                    moves: extract_moves(moves)?,
+                })
+            })
+            .collect::<PyResult<Vec<_>>>()?;
+        self.add(py, records)
+    }
+
+    /// Adds every game of a record file written by `RecordWriter`.
+    ///
+    /// Raises:
+    ///     ValueError: If the dataset is finished.
+    ///     OSError: If the file is corrupt or cannot be read, or the shards
+    ///         cannot be written.
+    fn add_records(&mut self, py: Python<'_>, path: PathBuf) -> PyResult<()> {
+        let mut reader = kish_core::RecordReader::new(BufReader::new(File::open(path)?))?;
+        self.run(py, |writer| writer.add_record_file(&mut reader))?
+            .map_err(to_py_err)
+    }
+
+    /// Plays games natively and adds them. These are the same games as
+    /// `kish.playouts()` plays with the same arguments.
+    ///
+    /// Args:
+    ///     n_games: Number of games to play.
+    ///     seed: Seed of the random streams.
+    ///     policy: `"uniform"`, `"capture"` or `"heuristic"`.
+    ///     max_plies: Games still running after this many plies are truncated.
+    ///     board: Start position (default: the standard start).
+    ///
+    /// Raises:
+    ///     ValueError: If the policy is unknown, or the dataset is finished.
+    ///     OSError: If the shards cannot be written.
+    #[pyo3(signature = (n_games, seed=0, policy="uniform", max_plies=1000, *, board=None))]
+    fn add_playouts(
+        &mut self,
+        py: Python<'_>,
+        n_games: u64,
+        seed: u64,
+        policy: &str,
+        max_plies: u32,
+        board: Option<PyRef<'_, Board>>,
+    ) -> PyResult<()> {
+        let playouts = kish_core::Playouts {
+            seed,
+            policy: parse_policy(policy)?,
+            max_plies,
+            record_moves: false,
+        };
+        let start = board.map_or_else(kish_core::Board::new_default, |board| board.inner);
+        self.run(py, |writer| writer.add_playouts(&playouts, &start, n_games))?
+            .map_err(to_py_err)
+    }
+
+    /// Waits for every row to be written, completes the last shard and
+    /// returns the totals.
+    ///
+    /// Raises:
+    ///     ValueError: If the dataset is already finished.
+    ///     OSError: If the shards cannot be written.
+    fn finish(&mut self, py: Python<'_>) -> PyResult<DatasetStats> {
+        let writer = self
+            .inner
+            .take()
+            .ok_or_else(|| PyValueError::new_err("the dataset is finished"))?;
+        let inner = py.detach(|| writer.finish())?;
+        Ok(DatasetStats { inner })
+    }
+
+    fn __enter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    #[pyo3(signature = (*_args))]
+    fn __exit__(&mut self, py: Python<'_>, _args: &Bound<'_, PyTuple>) -> PyResult<bool> {
+        if self.inner.is_some() {
+            self.finish(py)?;
+        }
+        Ok(false)
+    }
+}
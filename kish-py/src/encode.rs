@@ -0,0 +1,179 @@
+//! Batched feature-plane encoding into NumPy buffers.
+//!
+//! Wraps [`kish_core::Encoding`] so that a whole batch of boards or games is
+//! written into a `(N, planes, 8, 8)` array in one call, with the GIL released
+//! while the planes are filled.
+
+use numpy::{Element, PyArray4, PyArrayMethods, PyUntypedArrayMethods};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+use kish_core::{Encoding, PlaneValue};
+
+use crate::{Board, Game};
+
+/// A writable `float32` or `uint8` NumPy array of shape `(N, planes, 8, 8)`.
+#[derive(FromPyObject)]
+pub(crate) enum PlaneBuffer<'py> {
+    F32(Bound<'py, PyArray4<f32>>),
+    U8(Bound<'py, PyArray4<u8>>),
+}
+
+impl<'py> PlaneBuffer<'py> {
+    /// Allocates a zeroed buffer of the requested dtype.
+    fn allocate(py: Python<'py>, dtype: &str, shape: [usize; 4]) -> PyResult<Self> {
+        match dtype {
+            "float32" => Ok(Self::F32(PyArray4::zeros(py, shape, false))),
+            "uint8" => Ok(Self::U8(PyArray4::zeros(py, shape, false))),
+            _ => Err(PyValueError::new_err("dtype must be 'float32' or 'uint8'")),
+        }
+    }
+
+    fn into_any(self) -> Bound<'py, PyAny> {
+        match self {
+            Self::F32(array) => array.into_any(),
+            Self::U8(array) => array.into_any(),
+        }
+    }
+}
+
+/// A batch of positions that can be encoded into planes.
+trait Samples: Sync {
+    fn count(&self) -> usize;
+    fn encode_into<T: PlaneValue>(&self, encoding: &Encoding, out: &mut [T]);
+}
+
+impl Samples for [kish_core::Board] {
+    fn count(&self) -> usize {
+        self.len()
+    }
+
+    fn encode_into<T: PlaneValue>(&self, encoding: &Encoding, out: &mut [T]) {
+        encoding.encode_boards(self, out);
+    }
+}
+
+impl Samples for [&kish_core::Game] {
+    fn count(&self) -> usize {
+        self.len()
+    }
+
+    fn encode_into<T: PlaneValue>(&self, encoding: &Encoding, out: &mut [T]) {
+        encoding.encode_games(self, out);
+    }
+}
+
+/// Encodes `samples` into `out` (or a new array), returning the filled array.
+fn encode_samples<'py, S: Samples + ?Sized>(
+    py: Python<'py>,
+    samples: &S,
+    encoding: &Encoding,
+    out: Option<PlaneBuffer<'py>>,
+    dtype: &str,
+) -> PyResult<Bound<'py, PyAny>> {
+    let shape = [samples.count(), encoding.planes(), 8, 8];
+    let buffer = match out {
+        Some(buffer) => buffer,
+        None => PlaneBuffer::allocate(py, dtype, shape)?,
+    };
+    match &buffer {
+        PlaneBuffer::F32(array) => fill(py, array, shape, samples, encoding)?,
+        PlaneBuffer::U8(array) => fill(py, array, shape, samples, encoding)?,
+    }
+    Ok(buffer.into_any())
+}
+
+/// Fills a contiguous array in place without holding the GIL.
+fn fill<'py, T: Element + PlaneValue, S: Samples + ?Sized>(
+    py: Python<'py>,
+    array: &Bound<'py, PyArray4<T>>,
+    shape: [usize; 4],
+    samples: &S,
+    encoding: &Encoding,
+) -> PyResult<()> {
+    if array.shape() != shape.as_slice() {
+        return Err(PyValueError::new_err(format!(
+            "out has shape {:?}, expected {:?}",
+            array.shape(),
+            shape
+        )));
+    }
+    let mut guard = array
+        .try_readwrite()
+        .map_err(|e| PyValueError::new_err(e.to_string()))?;
+    let out = guard
+        .as_slice_mut()
+        .map_err(|e| PyValueError::new_err(e.to_string()))?;
+    py.detach(|| samples.encode_into(encoding, out));
+    Ok(())
+}
+
+/// Encodes boards into a `(N, 4, 8, 8)` array of feature planes.
+///
+/// Planes are white pieces, black pieces, kings, and a turn plane (all ones
+/// when Black is to move). With `perspective=True`, boards with Black to move
+/// are rotated so the side to move is always shown as White. With
+/// `mirror=True`, the board is flipped left/right.
+///
+/// Args:
+///     boards: The boards to encode.
+///     out: Optional C-contiguous `float32` or `uint8` array of shape
+///         `(N, 4, 8, 8)` to fill in place.
+///     perspective: Normalize to the side to move.
+///     mirror: Flip the board left/right.
+///     dtype: Dtype of the new array when `out` is not given (`"float32"` or `"uint8"`).
+#[pyfunction]
+#[pyo3(signature = (boards, out=None, *, perspective=false, mirror=false, dtype="float32"))]
+pub(crate) fn encode_boards<'py>(
+    py: Python<'py>,
+    boards: Vec<PyRef<'py, Board>>,
+    out: Option<PlaneBuffer<'py>>,
+    perspective: bool,
+    mirror: bool,
+    dtype: &str,
+) -> PyResult<Bound<'py, PyAny>> {
+    let encoding = Encoding {
+        history: 1,
+        perspective,
+        mirror,
+    };
+    let boards: Vec<kish_core::Board> = boards.iter().map(|board| board.inner).collect();
+    encode_samples(py, boards.as_slice(), &encoding, out, dtype)
+}
+
+/// Encodes games with their recent history into a `(N, 3 * history + 1, 8, 8)` array.
+///
+/// Each game contributes the white/black/kings planes of its current position
+/// followed by those of the `history - 1` previous positions (zeros before the
+/// start of the game), then a turn plane.
+///
+/// Args:
+///     games: The games to encode.
+///     history: Number of positions to stack (at least 1).
+///     out: Optional C-contiguous `float32` or `uint8` array to fill in place.
+///     perspective: Normalize to the side to move.
+///     mirror: Flip the board left/right.
+///     dtype: Dtype of the new array when `out` is not given (`"float32"` or `"uint8"`).
+#[pyfunction]
+#[pyo3(signature = (games, history=8, out=None, *, perspective=false, mirror=false, dtype="float32"))]
+pub(crate) fn encode_games<'py>(
+    py: Python<'py>,
+    games: Vec<PyRef<'py, Game>>,
+    history: usize,
+    out: Option<PlaneBuffer<'py>>,
+    perspective: bool,
+    mirror: bool,
+    dtype: &str,
+) -> PyResult<Bound<'py, PyAny>> {
+    if history == 0 {
+        return Err(PyValueError::new_err("history must be at least 1"));
+    }
+    let encoding = Encoding {
+        history,
+        perspective,
+        mirror,
+    };
+    let games: Vec<&kish_core::Game> = games.iter().map(|game| &game.inner).collect();
+    encode_samples(py, games.as_slice(), &encoding, out, dtype)
+}
@@ -0,0 +1,55 @@
+//! One-call node expansion for Python.
+//!
+//! Fills NumPy arrays with every legal action of a board and the positions
+//! they lead to, straight from the move generator, so that expanding a node
+//! costs one FFI call instead of an `Action` and a `Board` object per child.
+
+use numpy::{PyArray1, PyArray2, PyArrayMethods};
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+
+/// Arrays returned by `Board.expand()`: deltas, children, capture counts and
+/// promotion flags.
+pub(crate) type Expansion<'py> = (
+    Bound<'py, PyArray2<u64>>,
+    Bound<'py, PyArray2<u64>>,
+    Bound<'py, PyArray1<u8>>,
+    Bound<'py, PyArray1<bool>>,
+);
+
+/// Expands `board` into arrays with one row per legal action, in
+/// `Board.actions()` order.
+pub(crate) fn expand<'py>(py: Python<'py>, board: &kish_core::Board) -> PyResult<Expansion<'py>> {
+    let mut actions = Vec::with_capacity(48);
+    board.actions_into(&mut actions);
+    let team = board.turn;
+    let count = actions.len();
+
+    let mut deltas = Vec::with_capacity(count * 3);
+    let mut children = Vec::with_capacity(count * 4);
+    let mut captures = Vec::with_capacity(count);
+    let mut promotions = Vec::with_capacity(count);
+    for action in &actions {
+        let delta = action.delta;
+        deltas.extend_from_slice(&[delta.pieces[0], delta.pieces[1], delta.kings]);
+
+        let state = board.state.apply(&delta);
+        children.extend_from_slice(&[
+            state.pieces[0],
+            state.pieces[1],
+            state.kings,
+            team.opponent() as u64,
+        ]);
+
+        captures.push(action.capture_count(team) as u8);
+        promotions.push(action.is_promotion(team, &board.state));
+    }
+
+    Ok((
+        PyArray1::from_vec(py, deltas).reshape([count, 3])?,
+        PyArray1::from_vec(py, children).reshape([count, 4])?,
+        PyArray1::from_vec(py, captures),
+        PyArray1::from_vec(py, promotions),
+    ))
+}
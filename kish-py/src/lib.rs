@@ -11,6 +11,21 @@
 //! - [`Action`]: Move with notation and bitboard access
 //! - [`Board`]: Immutable game board
 //! - [`Game`]: Mutable game with history tracking
+//! - `VecGame`: Many games stepped in lock-step for reinforcement learning
+//! - `MCTS`: Monte Carlo tree search with rollouts or a batched Python evaluator
+//! - `RecordWriter` / `RecordReader`: Compact binary game record files
+//! - `DatasetWriter`: Training rows streamed to memory-mappable `.npy` shards
+//! - `ArchiveReader`: PDN-style text archives imported in parallel
+//! - `Network`: Quantized NNUE-style evaluation, batched or inside `Board.search()`
+//! - `Book` / `BookBuilder`: Memory-mapped opening books with weighted move choice
+//!
+//! # Functions
+//!
+//! - `encode_boards` / `encode_games`: Batched feature planes into NumPy arrays
+//! - `perft_many` / `status_many` / `count_actions_many`: Parallel batch analytics
+//! - `mobility_arrays`: Legal-action counts over NumPy bitboard columns
+//! - `playouts`: Native parallel random playouts
+//! - `legal_masks`: Batched legal-action masks over the 4096-entry action space
 //!
 //! # Design Philosophy
 //!
@@ -19,12 +34,30 @@
 //! - **Immutable Board**: `apply()` returns new board (functional style)
 //! - **Mutable Game**: `make_move()` mutates state (imperative style with undo)
 
+use std::sync::{Arc, OnceLock};
+
 use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 
 // Use explicit path to avoid collision with the Python module name
 use ::kish as kish_core;
 
+mod action_space;
+mod archive;
+mod batch;
+mod book;
+mod dataset;
+mod encode;
+mod expand;
+mod mcts;
+mod nnue;
+mod perft;
+mod playout;
+mod record;
+mod search;
+mod tablebase;
+mod vec_game;
+
 // ============================================================================
 // Team
 // ============================================================================
@@ -421,10 +454,12 @@ impl From<kish_core::GameStatus> for GameStatus {
 #[derive(Clone)]
 pub struct Action {
     inner: kish_core::Action,
-    /// Cached detailed representation for notation
-    detailed: kish_core::ActionPath,
-    /// The team that made this move (needed for captured_pieces)
+    /// The team that made this move
     team: kish_core::Team,
+    /// Pieces of the position the move is played from
+    state: kish_core::State,
+    /// Detailed path, reconstructed on first use (notation, path)
+    detailed: OnceLock<kish_core::ActionPath>,
 }
 
 #[pymethods]
@@ -432,47 +467,43 @@ impl Action {
     /// Returns the source square of this move.
     #[must_use]
     fn source(&self) -> Square {
-        self.detailed.source().into()
+        self.squares().0.into()
     }
 
     /// Returns the destination square of this move.
     #[must_use]
     fn destination(&self) -> Square {
-        self.detailed.destination().into()
+        self.squares().1.into()
     }
 
     /// Returns true if this move is a capture.
     #[must_use]
     fn is_capture(&self) -> bool {
-        self.detailed.is_capture()
+        self.inner.is_capture(self.team)
     }
 
     /// Returns true if this move results in promotion to king.
     #[must_use]
     fn is_promotion(&self) -> bool {
-        self.detailed.is_promotion()
+        self.inner.is_promotion(self.team, &self.state)
     }
 
     /// Returns the number of pieces captured (0 for non-captures).
     #[must_use]
     fn capture_count(&self) -> u8 {
-        if self.detailed.is_capture() {
-            (self.detailed.path_len() - 1) as u8
-        } else {
-            0
-        }
+        self.inner.capture_count(self.team) as u8
     }
 
     /// Returns the full path of squares visited during this move.
     #[must_use]
     fn path(&self) -> Vec<Square> {
-        self.detailed.path().iter().map(|&sq| sq.into()).collect()
+        self.detailed().path().iter().map(|&sq| sq.into()).collect()
     }
 
     /// Returns the algebraic notation for this move (e.g., "d3-d4", "d4xd6").
     #[must_use]
     fn notation(&self) -> String {
-        self.detailed.to_notation()
+        self.detailed().to_notation()
     }
 
     // =========================================================================
@@ -487,6 +518,29 @@ impl Action {
         Board::mask_to_squares(self.inner.captured_pieces(self.team))
     }
 
+    /// Returns the index of this action in the 4096-entry action space:
+    /// `source * 64 + destination`.
+    ///
+    /// With `perspective=True` and Black moving, squares are rotated
+    /// (`square -> 63 - square`), matching `Board.legal_mask(perspective=True)`.
+    #[pyo3(signature = (perspective=false))]
+    #[must_use]
+    fn index(&self, perspective: bool) -> usize {
+        let (source, destination) = self.squares();
+        let (source, destination) = (source as usize, destination as usize);
+        if perspective && self.team == kish_core::Team::Black {
+            (63 - source) * 64 + (63 - destination)
+        } else {
+            source * 64 + destination
+        }
+    }
+
+    /// Change in `Board.key` caused by playing this action (including the turn change).
+    #[getter]
+    fn key_delta(&self) -> u64 {
+        self.inner.zobrist_delta()
+    }
+
     /// Returns the captured pieces as a bitboard (u64).
     ///
     /// Zero for non-captures.
@@ -540,6 +594,41 @@ impl Action {
     }
 }
 
+impl Action {
+    /// Wraps a core action generated from `board`.
+    ///
+    /// Only copies bitboards; the path is reconstructed on first use.
+    fn from_core(action: kish_core::Action, board: &kish_core::Board) -> Self {
+        Self {
+            inner: action,
+            team: board.turn,
+            state: board.state,
+            detailed: OnceLock::new(),
+        }
+    }
+
+    /// Returns the detailed path, reconstructing it on first use.
+    fn detailed(&self) -> &kish_core::ActionPath {
+        self.detailed
+            .get_or_init(|| self.inner.to_detailed(self.team, &self.state))
+    }
+
+    /// Returns the source and destination squares.
+    fn squares(&self) -> (kish_core::Square, kish_core::Square) {
+        let pieces = self.state.pieces[self.team.to_usize()];
+        if self.inner.delta.pieces[self.team.to_usize()] == 0 {
+            // A capture loop back to the start square leaves no trace in the delta
+            let detailed = self.detailed();
+            (detailed.source(), detailed.destination())
+        } else {
+            (
+                self.inner.source(self.team, pieces),
+                self.inner.destination(self.team, pieces),
+            )
+        }
+    }
+}
+
 // ============================================================================
 // Board
 // ============================================================================
@@ -630,21 +719,101 @@ impl Board {
     /// Returns all legal actions from the current position.
     #[must_use]
     fn actions(&self) -> Vec<Action> {
-        let team = self.inner.turn;
         self.inner
             .actions()
             .into_iter()
-            .map(|action| {
-                let detailed = action.to_detailed(team, &self.inner.state);
-                Action {
-                    inner: action,
-                    detailed,
-                    team,
-                }
-            })
+            .map(|action| Action::from_core(action, &self.inner))
             .collect()
     }
 
+    /// Returns True if the side to move has a capture available.
+    ///
+    /// Captures are mandatory, so this tells whether `actions()` returns
+    /// captures, without generating them.
+    #[must_use]
+    fn has_capture(&self) -> bool {
+        self.inner.has_capture()
+    }
+
+    /// Returns True if the side to move has any legal action.
+    #[must_use]
+    fn has_legal_move(&self) -> bool {
+        self.inner.has_legal_move()
+    }
+
+    /// Looks the position up in an endgame tablebase.
+    ///
+    /// Returns `(status, plies)`: the outcome under perfect play, as a
+    /// `GameStatus` that is won or drawn, and the number of plies until the
+    /// game ends (0 for draws). Returns None if the position has more pieces
+    /// than the tablebase holds.
+    #[must_use]
+    fn probe_tablebase(&self, tablebase: &tablebase::Tablebase) -> Option<(GameStatus, u8)> {
+        tablebase::probe(tablebase.inner(), &self.inner)
+    }
+
+    /// Expands the board into NumPy arrays, one row per legal action.
+    ///
+    /// Rows follow `actions()` order. Returns a tuple of:
+    ///
+    /// - `deltas`: `(N, 3)` `uint64` array of `[white, black, kings]` deltas
+    ///   (as `Action.delta_array()`).
+    /// - `children`: `(N, 4)` `uint64` array of the resulting positions as
+    ///   `[white, black, kings, turn]` (as `Board.to_array()`), turn swapped.
+    /// - `capture_counts`: `uint8` array of pieces captured.
+    /// - `promotions`: `bool` array, true for moves that promote.
+    ///
+    /// No `Action` or `Board` objects are created.
+    fn expand<'py>(&self, py: Python<'py>) -> PyResult<expand::Expansion<'py>> {
+        expand::expand(py, &self.inner)
+    }
+
+    /// Returns a `bool` array of length 4096 that is true at `Action.index()`
+    /// of every legal action (`source * 64 + destination`).
+    ///
+    /// With `perspective=True` and Black to move, squares are rotated
+    /// (`square -> 63 - square`), as in `encode_boards()`.
+    #[pyo3(signature = (perspective=false))]
+    fn legal_mask<'py>(
+        &self,
+        py: Python<'py>,
+        perspective: bool,
+    ) -> Bound<'py, numpy::PyArray1<bool>> {
+        action_space::legal_mask(py, &self.inner, perspective)
+    }
+
+    /// Returns the legal action with index `index`, or None if there is none.
+    ///
+    /// Capture sequences sharing a source and destination share an index; the
+    /// first one in `actions()` order is returned.
+    #[pyo3(signature = (index, perspective=false))]
+    #[must_use]
+    fn action_from_index(&self, index: usize, perspective: bool) -> Option<Action> {
+        self.inner
+            .action_from_index(index, perspective)
+            .map(|action| Action::from_core(action, &self.inner))
+    }
+
+    /// Returns the legal action written as `notation`.
+    ///
+    /// Accepts the notation of `Action.notation()`, the short `fromxto` form
+    /// of a multi-capture, `:` for captures as in PDN, and moves without the
+    /// `=K` suffix.
+    ///
+    /// Raises:
+    ///     ValueError: If the notation is malformed, no legal action matches,
+    ///         or a short capture notation matches several.
+    ///
+    /// Example:
+    ///     >>> board = kish.Board()
+    ///     >>> board.parse_action("d3-d4")
+    fn parse_action(&self, notation: &str) -> PyResult<Action> {
+        self.inner
+            .parse_action(notation)
+            .map(|action| Action::from_core(action, &self.inner))
+            .map_err(|error| PyValueError::new_err(format!("{notation:?}: {error}")))
+    }
+
     /// Applies an action and returns a new board with the turn swapped.
     #[must_use]
     fn apply(&self, action: &Action) -> Self {
@@ -700,9 +869,147 @@ impl Board {
     /// Runs a perft (performance test) at the given depth.
     ///
     /// Returns the number of leaf nodes (positions) at that depth.
+    /// The GIL is released while counting.
+    #[must_use]
+    fn perft(&self, py: Python<'_>, depth: u64) -> u64 {
+        let board = self.inner;
+        py.detach(|| board.perft(depth))
+    }
+
+    /// Runs a perft using a transposition table of about `tt_mb` megabytes.
+    ///
+    /// Pass a `TranspositionTable` as `table` to reuse it (and its contents)
+    /// across calls instead. Single-threaded; the GIL is released while
+    /// counting.
     #[must_use]
-    fn perft(&self, depth: u64) -> u64 {
-        self.inner.perft(depth)
+    #[pyo3(signature = (depth, tt_mb=64, *, table=None))]
+    fn perft_tt(
+        &self,
+        py: Python<'_>,
+        depth: u64,
+        tt_mb: usize,
+        table: Option<PyRef<'_, perft::TranspositionTable>>,
+    ) -> u64 {
+        let board = self.inner;
+        match table {
+            Some(table) => {
+                let table = table.inner();
+                py.detach(|| board.perft_with_table(depth, table))
+            }
+            None => py.detach(|| board.perft_tt(depth, tt_mb)),
+        }
+    }
+
+    /// Runs a parallel perft sharing a transposition table of about `tt_mb` megabytes.
+    ///
+    /// Pass a `TranspositionTable` as `table` to reuse it (and its contents)
+    /// across calls instead. Uses `threads` worker threads (default: all
+    /// cores). The GIL is released while counting.
+    #[pyo3(signature = (depth, tt_mb=256, threads=None, *, table=None))]
+    fn perft_parallel(
+        &self,
+        py: Python<'_>,
+        depth: u64,
+        tt_mb: usize,
+        threads: Option<usize>,
+        table: Option<PyRef<'_, perft::TranspositionTable>>,
+    ) -> PyResult<u64> {
+        let board = self.inner;
+        match table {
+            Some(table) => {
+                let table = table.inner();
+                py.detach(|| {
+                    batch::install(threads, || board.perft_parallel_with_table(depth, table))
+                })
+            }
+            None => py.detach(|| batch::install(threads, || board.perft_parallel(depth, tt_mb))),
+        }
+    }
+
+    /// Runs a parallel perft that splits the tree into many tasks and reports
+    /// how they were spread over the threads.
+    ///
+    /// Positions less than `split_depth` plies from the root are expanded in
+    /// parallel and every position at `split_depth` becomes one task, so that
+    /// all threads stay busy even when root moves differ in size. By default
+    /// the split depth grows with `depth`, up to 4 plies.
+    ///
+    /// Uses `table` if given, otherwise a new table of about `tt_mb`
+    /// megabytes, and `threads` worker threads (default: all cores). The GIL
+    /// is released while counting.
+    #[pyo3(signature = (depth, split_depth=None, tt_mb=256, threads=None, *, table=None))]
+    fn perft_split(
+        &self,
+        py: Python<'_>,
+        depth: u64,
+        split_depth: Option<u64>,
+        tt_mb: usize,
+        threads: Option<usize>,
+        table: Option<PyRef<'_, perft::TranspositionTable>>,
+    ) -> PyResult<perft::PerftReport> {
+        match table {
+            Some(table) => {
+                perft::perft_split(py, self.inner, depth, split_depth, table.inner(), threads)
+            }
+            None => {
+                let table = kish_core::TranspositionTable::new(tt_mb);
+                perft::perft_split(py, self.inner, depth, split_depth, &table, threads)
+            }
+        }
+    }
+
+    /// Runs a perft that also counts the kinds of moves and positions at every ply.
+    ///
+    /// Counts captures (with a histogram of chain lengths), promotions, king
+    /// moves, terminal positions and one-piece draws. Uses `threads` worker
+    /// threads (default: all cores); the GIL is released while counting.
+    #[pyo3(signature = (depth, threads=None))]
+    fn perft_detailed(
+        &self,
+        py: Python<'_>,
+        depth: u64,
+        threads: Option<usize>,
+    ) -> PyResult<perft::PerftStats> {
+        perft::perft_detailed(py, self.inner, depth, threads)
+    }
+
+    /// Searches for the best move with alpha-beta (PVS) and iterative deepening.
+    ///
+    /// Stops at whichever limit is reached first. With no limits at all,
+    /// searches to depth 8. The GIL is released while searching.
+    ///
+    /// Args:
+    ///     depth: Maximum depth in plies.
+    ///     time_ms: Time limit in milliseconds.
+    ///     nodes: Node limit.
+    ///     tt_mb: Transposition table size in megabytes.
+    ///     network: Evaluate leaves with this `Network` instead of the
+    ///         built-in evaluation, updating its accumulator move by move.
+    #[pyo3(signature = (depth=None, time_ms=None, tt_mb=16, nodes=None, *, network=None))]
+    fn search(
+        &self,
+        py: Python<'_>,
+        depth: Option<u8>,
+        time_ms: Option<u64>,
+        tt_mb: usize,
+        nodes: Option<u64>,
+        network: Option<PyRef<'_, nnue::Network>>,
+    ) -> search::SearchResult {
+        let network = network.map(|network| Arc::clone(network.inner()));
+        search::search(py, self.inner, depth, time_ms, nodes, tt_mb, network)
+    }
+
+    /// Statically evaluates the position in centi-men from the side to
+    /// move's point of view.
+    ///
+    /// Uses `network` if given, otherwise the material and advancement
+    /// evaluation of `search()`.
+    #[pyo3(signature = (network=None))]
+    fn evaluate(&self, network: Option<PyRef<'_, nnue::Network>>) -> i32 {
+        match network {
+            Some(network) => self.inner.evaluate_network(network.inner()),
+            None => self.inner.evaluate(),
+        }
     }
 
     // =========================================================================
@@ -732,6 +1039,15 @@ impl Board {
         self.inner.state.kings
     }
 
+    /// Zobrist key of the position (including the side to move).
+    ///
+    /// Equal boards have equal keys; the key after a move is
+    /// `board.key ^ action.key_delta`. Also used as the board's hash.
+    #[getter]
+    fn key(&self) -> u64 {
+        self.inner.zobrist()
+    }
+
     /// Returns all bitboards as a tuple: (white, black, kings, turn).
     ///
     /// Turn is 0 for White, 1 for Black.
@@ -794,10 +1110,7 @@ impl Board {
     }
 
     fn __hash__(&self) -> u64 {
-        use std::hash::{Hash, Hasher};
-        let mut hasher = std::collections::hash_map::DefaultHasher::new();
-        self.inner.hash(&mut hasher);
-        hasher.finish()
+        self.inner.zobrist()
     }
 
     fn __eq__(&self, other: &Self) -> bool {
@@ -857,9 +1170,20 @@ impl Board {
 /// print(f"Halfmove clock: {game.halfmove_clock}")
 /// ```
 #[pyclass]
-#[derive(Clone)]
 pub struct Game {
     inner: kish_core::Game,
+    /// `Action` objects for the legal actions of the current ply, created on
+    /// the first `actions()` call and dropped when the position changes.
+    actions: Option<Vec<Py<Action>>>,
+}
+
+impl Game {
+    pub(crate) fn from_core(inner: kish_core::Game) -> Self {
+        Self {
+            inner,
+            actions: None,
+        }
+    }
 }
 
 #[pymethods]
@@ -867,17 +1191,13 @@ impl Game {
     /// Creates a new game with the standard starting position.
     #[new]
     fn new() -> Self {
-        Self {
-            inner: kish_core::Game::new(),
-        }
+        Self::from_core(kish_core::Game::new())
     }
 
     /// Creates a game from an existing board position.
     #[staticmethod]
     fn from_board(board: &Board) -> Self {
-        Self {
-            inner: kish_core::Game::from_board(board.inner),
-        }
+        Self::from_core(kish_core::Game::from_board(board.inner))
     }
 
     /// Returns the current board state.
@@ -895,22 +1215,27 @@ impl Game {
     }
 
     /// Returns all legal actions from the current position.
-    #[must_use]
-    fn actions(&self) -> Vec<Action> {
-        let board = self.inner.board();
-        let team = board.turn;
-        self.inner
-            .actions()
-            .into_iter()
-            .map(|action| {
-                let detailed = action.to_detailed(team, &board.state);
-                Action {
-                    inner: action,
-                    detailed,
-                    team,
-                }
-            })
-            .collect()
+    ///
+    /// The actions are generated and converted once per ply: repeated calls
+    /// return new lists of the same `Action` objects, and `status()` reuses
+    /// the generated list.
+    fn actions(&mut self, py: Python<'_>) -> PyResult<Vec<Py<Action>>> {
+        if self.actions.is_none() {
+            let board = *self.inner.board();
+            let actions = self
+                .inner
+                .legal_actions()
+                .iter()
+                .map(|&action| Py::new(py, Action::from_core(action, &board)))
+                .collect::<PyResult<Vec<_>>>()?;
+            self.actions = Some(actions);
+        }
+        Ok(self
+            .actions
+            .iter()
+            .flatten()
+            .map(|action| action.clone_ref(py))
+            .collect())
     }
 
     /// Returns the current game status (including draw conditions).
@@ -922,10 +1247,12 @@ impl Game {
     /// Makes a move and updates the game state.
     fn make_move(&mut self, action: &Action) {
         self.inner.make_move(&action.inner);
+        self.actions = None;
     }
 
     /// Undoes the last move. Returns true if a move was undone.
     fn undo_move(&mut self) -> bool {
+        self.actions = None;
         self.inner.undo_move()
     }
 
@@ -958,10 +1285,23 @@ impl Game {
         self.inner.clear_history();
     }
 
+    /// Returns a lightweight copy for search or analysis.
+    ///
+    /// The fork keeps the board, halfmove clock and repetition state, but only
+    /// the positions since the last capture and no undo history: `undo_move()`
+    /// cannot go back past the fork point and `move_count` restarts at zero.
+    #[must_use]
+    fn fork(&self) -> Self {
+        Self::from_core(self.inner.fork())
+    }
+
     /// Runs a perft (performance test) at the given depth.
+    ///
+    /// The GIL is released while counting.
     #[must_use]
-    fn perft(&mut self, depth: u64) -> u64 {
-        self.inner.perft(depth)
+    fn perft(&mut self, py: Python<'_>, depth: u64) -> u64 {
+        let game = &mut self.inner;
+        py.detach(|| game.perft(depth))
     }
 
     fn __repr__(&self) -> String {
@@ -991,5 +1331,31 @@ fn kish(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<Action>()?;
     m.add_class::<Board>()?;
     m.add_class::<Game>()?;
+    m.add_class::<vec_game::VecGame>()?;
+    m.add_class::<mcts::Mcts>()?;
+    m.add_function(wrap_pyfunction!(encode::encode_boards, m)?)?;
+    m.add_function(wrap_pyfunction!(encode::encode_games, m)?)?;
+    m.add_function(wrap_pyfunction!(batch::perft_many, m)?)?;
+    m.add_function(wrap_pyfunction!(batch::status_many, m)?)?;
+    m.add_function(wrap_pyfunction!(batch::count_actions_many, m)?)?;
+    m.add_function(wrap_pyfunction!(batch::mobility_arrays, m)?)?;
+    m.add_class::<playout::PlayoutStats>()?;
+    m.add_function(wrap_pyfunction!(playout::playouts, m)?)?;
+    m.add_function(wrap_pyfunction!(action_space::legal_masks, m)?)?;
+    m.add_class::<search::SearchResult>()?;
+    m.add_class::<perft::PerftStats>()?;
+    m.add_class::<perft::PerftReport>()?;
+    m.add_class::<perft::PerftJob>()?;
+    m.add_class::<perft::PerftProgress>()?;
+    m.add_class::<perft::TranspositionTable>()?;
+    m.add_class::<tablebase::Tablebase>()?;
+    m.add_class::<record::RecordWriter>()?;
+    m.add_class::<record::RecordReader>()?;
+    m.add_class::<dataset::DatasetWriter>()?;
+    m.add_class::<dataset::DatasetStats>()?;
+    m.add_class::<archive::ArchiveReader>()?;
+    m.add_class::<nnue::Network>()?;
+    m.add_class::<book::Book>()?;
+    m.add_class::<book::BookBuilder>()?;
     Ok(())
 }
@@ -0,0 +1,333 @@
+//! Monte Carlo tree search for Python.
+//!
+//! Wraps [`kish_core::Mcts`]. Rollouts run on the rayon pool with the GIL
+//! released; a Python evaluator instead receives each batch of leaves as
+//! NumPy arrays, so that a network can score them in one forward pass.
+
+use numpy::{PyArray1, PyArray2, PyArrayMethods};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+use kish_core::{Evaluation, Evaluator, MctsConfig, Playouts, Rollouts, Selection};
+
+use crate::{batch, playout, Action, Game};
+
+/// Calls a Python evaluator on each batch of leaves.
+struct PyEvaluator<'a, 'py> {
+    callback: &'a Bound<'py, PyAny>,
+}
+
+impl<'py> PyEvaluator<'_, 'py> {
+    /// Converts the evaluator's return value into one evaluation per leaf.
+    fn parse(result: &Bound<'py, PyAny>, counts: &[usize]) -> PyResult<Vec<Evaluation>> {
+        let (values, priors) = match result.extract::<(Bound<'py, PyAny>, Bound<'py, PyAny>)>() {
+            Ok((values, priors)) => (
+                values.extract::<Vec<f32>>()?,
+                priors.extract::<Option<Vec<f32>>>()?,
+            ),
+            Err(_) => (result.extract::<Vec<f32>>()?, None),
+        };
+        if values.len() != counts.len() {
+            return Err(PyValueError::new_err(format!(
+                "evaluator returned {} values for {} positions",
+                values.len(),
+                counts.len()
+            )));
+        }
+        let Some(priors) = priors else {
+            return Ok(values
+                .into_iter()
+                .map(|value| Evaluation {
+                    value,
+                    priors: Vec::new(),
+                })
+                .collect());
+        };
+
+        let total: usize = counts.iter().sum();
+        if priors.len() != total {
+            return Err(PyValueError::new_err(format!(
+                "evaluator returned {} priors for {} legal actions",
+                priors.len(),
+                total
+            )));
+        }
+        let mut rest = priors.as_slice();
+        Ok(values
+            .into_iter()
+            .zip(counts)
+            .map(|(value, &count)| {
+                let (priors, tail) = rest.split_at(count);
+                rest = tail;
+                Evaluation {
+                    value,
+                    priors: priors.to_vec(),
+                }
+            })
+            .collect())
+    }
+}
+
+impl Evaluator for PyEvaluator<'_, '_> {
+    type Error = PyErr;
+
+    fn evaluate(&mut self, games: &[kish_core::Game]) -> PyResult<Vec<Evaluation>> {
+        let py = self.callback.py();
+        let counts: Vec<usize> = games.iter().map(|game| game.actions().len()).collect();
+        let flat: Vec<u64> = games
+            .iter()
+            .flat_map(|game| {
+                let board = game.board();
+                [
+                    board.state.pieces[0],
+                    board.state.pieces[1],
+                    board.state.kings,
+                    board.turn as u64,
+                ]
+            })
+            .collect();
+        let obs: Bound<'_, PyArray2<u64>> =
+            PyArray1::from_vec(py, flat).reshape([games.len(), 4])?;
+        let legal_counts = PyArray1::from_iter(py, counts.iter().map(|&count| count as i64));
+        let result = self.callback.call1((obs, legal_counts))?;
+        Self::parse(&result, &counts)
+    }
+}
+
+/// A Monte Carlo search tree rooted at a game position.
+///
+/// Leaves are evaluated in batches of up to `batch_size`, kept apart by
+/// virtual loss. Without an evaluator, each leaf is scored by one random
+/// playout, run in parallel with the GIL released. With an evaluator, it is
+/// called once per batch as `evaluator(obs, legal_counts)`, where `obs` is an
+/// `(N, 4)` `uint64` array of `[white, black, kings, turn]` and `legal_counts`
+/// is an `int64` array. It returns the values (from the side to move's point
+/// of view, in `[-1, 1]`), or a tuple `(values, priors)` where `priors` holds
+/// the prior of every legal action of every position, concatenated in
+/// `Board.actions()` order.
+///
+/// Draws by threefold repetition and insufficient progress are scored by the
+/// rules, using the history of the game the tree was created from.
+///
+/// Example:
+///     >>> tree = MCTS(Game(), seed=1)
+///     >>> tree.run(800)
+///     800
+///     >>> action = tree.best_action()
+///     >>> tree.advance(action)
+#[pyclass(name = "MCTS")]
+pub struct Mcts {
+    inner: kish_core::Mcts,
+    rollouts: Rollouts,
+}
+
+impl Mcts {
+    /// Converts a root action to a Python action.
+    fn action(&self, action: kish_core::Action) -> Action {
+        Action::from_core(action, self.inner.game().board())
+    }
+}
+
+#[pymethods]
+impl Mcts {
+    /// Creates an empty tree rooted at `game` (default: a new game).
+    ///
+    /// Args:
+    ///     game: Root position, including its repetition history.
+    ///     exploration: Exploration constant of the selection formula.
+    ///     selection: `"puct"` (uses priors) or `"uct"`.
+    ///     batch_size: Maximum number of leaves evaluated together.
+    ///     virtual_loss: Losses a pending leaf temporarily adds to its path.
+    ///     seed: Seed of the rollout streams.
+    ///     policy: Rollout policy, as in `kish.playouts()`.
+    ///     max_plies: Rollouts still running after this many plies are draws.
+    #[new]
+    #[pyo3(signature = (game=None, *, exploration=1.5, selection="puct", batch_size=32, virtual_loss=1, seed=0, policy="uniform", max_plies=1000))]
+    #[allow(clippy::too_many_arguments)]
+    fn new(
+        game: Option<PyRef<'_, Game>>,
+        exploration: f32,
+        selection: &str,
+        batch_size: usize,
+        virtual_loss: u32,
+        seed: u64,
+        policy: &str,
+        max_plies: u32,
+    ) -> PyResult<Self> {
+        let selection = match selection {
+            "puct" => Selection::Puct,
+            "uct" => Selection::Uct,
+            _ => return Err(PyValueError::new_err("selection must be 'puct' or 'uct'")),
+        };
+        if batch_size == 0 {
+            return Err(PyValueError::new_err("batch_size must be positive"));
+        }
+        let config = MctsConfig {
+            exploration,
+            selection,
+            batch_size,
+            virtual_loss,
+        };
+        let rollouts = Rollouts::new(Playouts {
+            seed,
+            policy: playout::parse_policy(policy)?,
+            max_plies,
+            record_moves: false,
+        });
+        let inner = match game {
+            Some(game) => kish_core::Mcts::new(&game.inner, config),
+            None => kish_core::Mcts::new(&kish_core::Game::new(), config),
+        };
+        Ok(Self { inner, rollouts })
+    }
+
+    /// Runs `simulations` simulations and returns how many were completed.
+    ///
+    /// Args:
+    ///     simulations: Number of simulations.
+    ///     evaluator: Optional batch evaluator (see the class documentation).
+    ///         Rollouts are used when omitted.
+    ///     threads: Number of rollout threads (default: all cores).
+    ///
+    /// Raises:
+    ///     ValueError: If the evaluator returns arrays of the wrong length.
+    ///         Exceptions raised by the evaluator propagate; simulations of
+    ///         earlier batches are kept.
+    #[pyo3(signature = (simulations, evaluator=None, *, threads=None))]
+    fn run(
+        &mut self,
+        py: Python<'_>,
+        simulations: u64,
+        evaluator: Option<Bound<'_, PyAny>>,
+        threads: Option<usize>,
+    ) -> PyResult<u64> {
+        match evaluator {
+            Some(callback) => self.inner.run(
+                simulations,
+                &mut PyEvaluator {
+                    callback: &callback,
+                },
+            ),
+            None => {
+                let mcts = &mut self.inner;
+                let rollouts = &mut self.rollouts;
+                let done =
+                    py.detach(|| batch::install(threads, || mcts.run(simulations, rollouts)))?;
+                Ok(done.unwrap_or_else(|never| match never {}))
+            }
+        }
+    }
+
+    /// Returns a copy of the root game.
+    fn game(&self) -> Game {
+        Game::from_core(self.inner.game().clone())
+    }
+
+    /// Number of completed simulations through the root.
+    #[getter]
+    fn simulations(&self) -> u64 {
+        self.inner.simulations()
+    }
+
+    /// Number of nodes in the tree.
+    #[getter]
+    fn node_count(&self) -> usize {
+        self.inner.node_count()
+    }
+
+    /// Mean value of the root for its side to move.
+    #[getter]
+    fn root_value(&self) -> f32 {
+        self.inner.root_value()
+    }
+
+    /// Returns the most visited root action, or None before the first simulation.
+    fn best_action(&self) -> Option<Action> {
+        self.inner.best_action().map(|action| self.action(action))
+    }
+
+    /// Returns the root actions the statistics refer to, in `Board.actions()` order.
+    ///
+    /// Empty before the first simulation or if the game is over.
+    fn actions(&self) -> Vec<Action> {
+        self.inner
+            .children()
+            .iter()
+            .map(|child| self.action(child.action))
+            .collect()
+    }
+
+    /// Returns the visit count of each root action as a `uint32` array.
+    fn visit_counts<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u32>> {
+        PyArray1::from_iter(py, self.inner.children().iter().map(|child| child.visits))
+    }
+
+    /// Returns the mean value of each root action as a `float32` array.
+    fn values<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<f32>> {
+        PyArray1::from_iter(py, self.inner.children().iter().map(|child| child.value))
+    }
+
+    /// Returns the prior of each root action as a `float32` array.
+    fn priors<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<f32>> {
+        PyArray1::from_iter(py, self.inner.children().iter().map(|child| child.prior))
+    }
+
+    /// Returns the visit distribution over root actions as a `float32` array.
+    ///
+    /// Visit counts are raised to `1 / temperature` and normalized. A
+    /// temperature of 0 puts all the mass on the best action.
+    #[pyo3(signature = (temperature=1.0))]
+    fn policy<'py>(
+        &self,
+        py: Python<'py>,
+        temperature: f32,
+    ) -> PyResult<Bound<'py, PyArray1<f32>>> {
+        if temperature < 0.0 {
+            return Err(PyValueError::new_err("temperature must not be negative"));
+        }
+        let children = self.inner.children();
+        let mut policy = vec![0.0f32; children.len()];
+        if temperature == 0.0 {
+            let best = self.inner.best_action();
+            for (p, child) in policy.iter_mut().zip(&children) {
+                if Some(child.action) == best {
+                    *p = 1.0;
+                    break;
+                }
+            }
+        } else {
+            let max = children.iter().map(|c| c.visits).max().unwrap_or(0).max(1) as f64;
+            for (p, child) in policy.iter_mut().zip(&children) {
+                // Scale by the maximum first so large exponents do not overflow
+                *p = (f64::from(child.visits) / max).powf(1.0 / f64::from(temperature)) as f32;
+            }
+            let total: f32 = policy.iter().sum();
+            if total > 0.0 {
+                policy.iter_mut().for_each(|p| *p /= total);
+            }
+        }
+        Ok(PyArray1::from_vec(py, policy))
+    }
+
+    /// Plays `action` at the root, keeping its subtree for the next search.
+    ///
+    /// Raises:
+    ///     ValueError: If the action is not legal at the root.
+    fn advance(&mut self, action: &Action) -> PyResult<()> {
+        if !self.inner.game().actions().contains(&action.inner) {
+            return Err(PyValueError::new_err("action is not legal at the root"));
+        }
+        self.inner.advance(&action.inner);
+        Ok(())
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "MCTS(simulations={}, nodes={}, root_value={:.3})",
+            self.inner.simulations(),
+            self.inner.node_count(),
+            self.inner.root_value()
+        )
+    }
+}
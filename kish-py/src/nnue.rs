@@ -0,0 +1,248 @@
+//! NNUE-style evaluation networks for Python.
+//!
+//! Wraps [`kish_core::Network`]. Float weights from a training framework are
+//! quantized in Rust and saved in the engine's binary format, and batches are
+//! evaluated on the rayon pool with the GIL released.
+
+use std::path::PathBuf;
+use std::sync::Arc;
+
+use numpy::{PyArray1, PyArrayMethods, PyReadonlyArray1, PyReadonlyArray2, PyUntypedArrayMethods};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+use kish_core::{BoardColumns, NetworkWeights};
+
+use crate::{batch, Board};
+
+/// Number of input features per perspective.
+const FEATURES: usize = 256;
+
+/// Returns the values of `array` in row-major order.
+fn values<D: numpy::ndarray::Dimension>(array: &numpy::PyReadonlyArray<'_, f32, D>) -> Vec<f32> {
+    array.as_array().iter().copied().collect()
+}
+
+/// A quantized NNUE-style evaluation network.
+///
+/// The accumulator (first layer) has one `int16` row per piece feature and
+/// is updated incrementally from each move's delta during `Board.search()`;
+/// the hidden and output layers run in integers. Networks are loaded from
+/// files written by `Network.save()`, usually after `Network.quantize()` of
+/// weights trained in PyTorch.
+///
+/// Example:
+///     >>> network = kish.Network.quantize(
+///     ...     model.ft.weight.detach().numpy(),
+///     ...     model.ft.bias.detach().numpy(),
+///     ...     model.hidden.weight.detach().numpy(),
+///     ...     model.hidden.bias.detach().numpy(),
+///     ...     model.output.weight.detach().numpy()[0],
+///     ...     model.output.bias.item(),
+///     ... )
+///     >>> network.save("kish.nnue")
+///     >>> network = kish.Network("kish.nnue")  # later, in the engine
+///     >>> board.evaluate(network)
+///     12
+#[pyclass(frozen)]
+pub struct Network {
+    inner: Arc<kish_core::Network>,
+}
+
+#[pymethods]
+impl Network {
+    /// Loads a network file written by `Network.save()`.
+    ///
+    /// Raises:
+    ///     OSError: If the file cannot be read or is not a network.
+    #[new]
+    fn new(py: Python<'_>, path: PathBuf) -> PyResult<Self> {
+        let inner = py.detach(|| kish_core::Network::load(path))?;
+        Ok(Self {
+            inner: Arc::new(inner),
+        })
+    }
+
+    /// Quantizes float32 weights in the `[out, in]` layout of `nn.Linear`.
+    ///
+    /// The float network computes, with `us` and `them` the 256 piece
+    /// features seen by the side to move and by the opponent:
+    /// `a = clamp(ft(us), 0, 1) ++ clamp(ft(them), 0, 1)`,
+    /// `h = clamp(hidden(a), 0, 1)` and `y = output(h)` in men.
+    ///
+    /// Args:
+    ///     feature_weights: `(L1, 256)` accumulator weights.
+    ///     feature_bias: `(L1,)` accumulator bias; `L1` is a multiple of 16
+    ///         up to 512.
+    ///     hidden_weights: `(L2, 2 * L1)` hidden layer weights.
+    ///     hidden_bias: `(L2,)` hidden layer bias; `L2` is at most 256.
+    ///     output_weights: `(L2,)` output weights.
+    ///     output_bias: Output bias.
+    ///
+    /// Raises:
+    ///     ValueError: If the shapes do not fit together.
+    #[staticmethod]
+    fn quantize(
+        feature_weights: PyReadonlyArray2<'_, f32>,
+        feature_bias: PyReadonlyArray1<'_, f32>,
+        hidden_weights: PyReadonlyArray2<'_, f32>,
+        hidden_bias: PyReadonlyArray1<'_, f32>,
+        output_weights: PyReadonlyArray1<'_, f32>,
+        output_bias: f32,
+    ) -> PyResult<Self> {
+        let (l1, l2) = (feature_bias.len(), hidden_bias.len());
+        if l1 == 0 || l1 % 16 != 0 || l1 > 512 {
+            return Err(PyValueError::new_err(format!(
+                "accumulator size must be a multiple of 16 up to 512, got {l1}"
+            )));
+        }
+        if !(1..=256).contains(&l2) {
+            return Err(PyValueError::new_err(format!(
+                "hidden size must be between 1 and 256, got {l2}"
+            )));
+        }
+        let shapes = [
+            (
+                "feature_weights",
+                feature_weights.shape().to_vec(),
+                vec![l1, FEATURES],
+            ),
+            (
+                "hidden_weights",
+                hidden_weights.shape().to_vec(),
+                vec![l2, 2 * l1],
+            ),
+            ("output_weights", output_weights.shape().to_vec(), vec![l2]),
+        ];
+        for (name, shape, expected) in shapes {
+            if shape != expected {
+                return Err(PyValueError::new_err(format!(
+                    "{name} must have shape {expected:?}, got {shape:?}"
+                )));
+            }
+        }
+
+        let inner = kish_core::Network::quantize(&NetworkWeights {
+            feature_weights: &values(&feature_weights),
+            feature_bias: &values(&feature_bias),
+            hidden_weights: &values(&hidden_weights),
+            hidden_bias: &values(&hidden_bias),
+            output_weights: &values(&output_weights),
+            output_bias,
+        });
+        Ok(Self {
+            inner: Arc::new(inner),
+        })
+    }
+
+    /// Writes the network to `path`.
+    ///
+    /// Raises:
+    ///     OSError: If the file cannot be written.
+    fn save(&self, py: Python<'_>, path: PathBuf) -> PyResult<()> {
+        Ok(py.detach(|| self.inner.save(path))?)
+    }
+
+    /// Accumulator size `L1`.
+    #[getter]
+    fn accumulator_size(&self) -> usize {
+        self.inner.accumulator_size()
+    }
+
+    /// Hidden layer size `L2`.
+    #[getter]
+    fn hidden_size(&self) -> usize {
+        self.inner.hidden_size()
+    }
+
+    /// Same as `board.evaluate(self)`.
+    fn evaluate(&self, board: &Board) -> i32 {
+        self.inner.evaluate(&board.inner)
+    }
+
+    /// Evaluates many boards in parallel.
+    ///
+    /// Args:
+    ///     boards: The boards to evaluate.
+    ///     threads: Number of worker threads (default: the global rayon pool).
+    ///
+    /// Returns:
+    ///     An `int32` array of scores in centi-men, each from its side to
+    ///     move's point of view.
+    #[pyo3(signature = (boards, *, threads=None))]
+    fn evaluate_many<'py>(
+        &self,
+        py: Python<'py>,
+        boards: Vec<PyRef<'py, Board>>,
+        threads: Option<usize>,
+    ) -> PyResult<Bound<'py, PyArray1<i32>>> {
+        let boards: Vec<kish_core::Board> = boards.iter().map(|board| board.inner).collect();
+        let scores = py.detach(|| {
+            batch::install(threads, || {
+                let mut scores = vec![0; boards.len()];
+                self.inner.evaluate_many(&boards, &mut scores);
+                scores
+            })
+        })?;
+        Ok(PyArray1::from_vec(py, scores))
+    }
+
+    /// Evaluates positions stored as `uint64` columns, as `mobility_arrays()`
+    /// takes them, without creating `Board` objects.
+    ///
+    /// Args:
+    ///     white: White pieces bitboards.
+    ///     black: Black pieces bitboards.
+    ///     kings: Kings bitboards.
+    ///     turn: Side to move (0 = White, 1 = Black).
+    ///     threads: Number of worker threads (default: the global rayon pool).
+    ///
+    /// Returns:
+    ///     An `int32` array of scores in centi-men.
+    ///
+    /// Raises:
+    ///     ValueError: If the arrays differ in length or a turn is not 0 or 1.
+    #[pyo3(signature = (white, black, kings, turn, *, threads=None))]
+    fn evaluate_arrays<'py>(
+        &self,
+        py: Python<'py>,
+        white: PyReadonlyArray1<'py, u64>,
+        black: PyReadonlyArray1<'py, u64>,
+        kings: PyReadonlyArray1<'py, u64>,
+        turn: PyReadonlyArray1<'py, u64>,
+        threads: Option<usize>,
+    ) -> PyResult<Bound<'py, PyArray1<i32>>> {
+        let (white, black, kings, turn) = (
+            batch::column(&white),
+            batch::column(&black),
+            batch::column(&kings),
+            batch::column(&turn),
+        );
+        batch::check_columns(&white, &black, &kings, &turn)?;
+        let scores = py.detach(|| {
+            batch::install(threads, || {
+                let columns = BoardColumns::new(&white, &black, &kings, &turn);
+                let mut scores = vec![0; columns.len()];
+                self.inner.evaluate_columns(&columns, &mut scores);
+                scores
+            })
+        })?;
+        Ok(PyArray1::from_vec(py, scores))
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "Network(accumulator_size={}, hidden_size={})",
+            self.inner.accumulator_size(),
+            self.inner.hidden_size()
+        )
+    }
+}
+
+impl Network {
+    /// Returns the wrapped network.
+    pub(crate) fn inner(&self) -> &Arc<kish_core::Network> {
+        &self.inner
+    }
+}
@@ -0,0 +1,478 @@
+//! Perft statistics, transposition tables and checkpointed runs for Python.
+//!
+//! Wraps [`kish_core::PerftStats`] and [`kish_core::PerftReport`], exposing
+//! per-ply and per-thread counters as NumPy arrays,
+//! [`kish_core::TranspositionTable`], so that one warm table can serve many
+//! perft runs, and [`kish_core::PerftJob`], which splits deep runs into
+//! checkpointed units.
+
+use std::path::PathBuf;
+
+use numpy::{PyArray1, PyArray2, PyArrayMethods};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+use kish_core::{PerftCounts, Replacement, Shard};
+
+use crate::{batch, Board};
+
+/// Results of `Board.perft_detailed()`.
+///
+/// Every counter is a `uint64` array with one entry per ply: index 0 counts
+/// the moves from the root and the positions they reach.
+#[pyclass(frozen)]
+pub struct PerftStats {
+    inner: kish_core::PerftStats,
+}
+
+impl PerftStats {
+    /// Collects one counter of every ply into an array.
+    fn column<'py>(
+        &self,
+        py: Python<'py>,
+        counter: impl Fn(&PerftCounts) -> u64,
+    ) -> Bound<'py, PyArray1<u64>> {
+        PyArray1::from_iter(py, self.inner.plies.iter().map(counter))
+    }
+}
+
+#[pymethods]
+impl PerftStats {
+    /// Leaf count, equal to `Board.perft()` at the same depth.
+    #[getter]
+    fn nodes(&self) -> u64 {
+        self.inner.nodes
+    }
+
+    /// Moves played into each ply (the number of positions at that ply).
+    #[getter]
+    fn moves<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        self.column(py, |counts| counts.moves)
+    }
+
+    /// Capturing moves.
+    #[getter]
+    fn captures<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        self.column(py, |counts| counts.captures)
+    }
+
+    /// Capture length histograms as a `(depth, 17)` array: `chains[p, n]`
+    /// captures at ply `p` took `n` pieces.
+    #[getter]
+    fn chains<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyArray2<u64>>> {
+        let width = self
+            .inner
+            .plies
+            .first()
+            .map_or(0, |counts| counts.chains.len());
+        let flat: Vec<u64> = self
+            .inner
+            .plies
+            .iter()
+            .flat_map(|counts| counts.chains)
+            .collect();
+        PyArray1::from_vec(py, flat).reshape([self.inner.plies.len(), width])
+    }
+
+    /// Moves that promote a man to king.
+    #[getter]
+    fn promotions<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        self.column(py, |counts| counts.promotions)
+    }
+
+    /// Moves made by a king.
+    #[getter]
+    fn king_moves<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        self.column(py, |counts| counts.king_moves)
+    }
+
+    /// Positions whose side to move has no actions (blocked or without pieces).
+    #[getter]
+    fn terminal<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        self.column(py, |counts| counts.terminal)
+    }
+
+    /// Positions drawn because each side has a single piece.
+    #[getter]
+    fn draws<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        self.column(py, |counts| counts.draws)
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "PerftStats(depth={}, nodes={})",
+            self.inner.plies.len(),
+            self.inner.nodes
+        )
+    }
+}
+
+/// Runs a detailed perft on `threads` workers with the GIL released.
+pub(crate) fn perft_detailed(
+    py: Python<'_>,
+    board: kish_core::Board,
+    depth: u64,
+    threads: Option<usize>,
+) -> PyResult<PerftStats> {
+    let inner = py.detach(|| batch::install(threads, || board.perft_detailed_parallel(depth)))?;
+    Ok(PerftStats { inner })
+}
+
+/// Results of `Board.perft_split()`.
+///
+/// The per-thread arrays are indexed by worker thread and show how evenly
+/// the subtrees were spread.
+#[pyclass(frozen)]
+pub struct PerftReport {
+    inner: kish_core::PerftReport,
+}
+
+#[pymethods]
+impl PerftReport {
+    /// Leaf count, equal to `Board.perft()` at the same depth.
+    #[getter]
+    fn nodes(&self) -> u64 {
+        self.inner.nodes
+    }
+
+    /// Subtrees counted by each thread, as a `uint64` array.
+    #[getter]
+    fn thread_tasks<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        PyArray1::from_iter(py, self.inner.threads.iter().map(|thread| thread.tasks))
+    }
+
+    /// Leaves counted by each thread, as a `uint64` array.
+    #[getter]
+    fn thread_nodes<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        PyArray1::from_iter(py, self.inner.threads.iter().map(|thread| thread.nodes))
+    }
+
+    /// Seconds each thread spent counting, as a `float64` array.
+    #[getter]
+    fn thread_busy<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<f64>> {
+        PyArray1::from_iter(
+            py,
+            self.inner
+                .threads
+                .iter()
+                .map(|thread| thread.busy.as_secs_f64()),
+        )
+    }
+
+    /// Mean busy time over the largest: 1.0 when the work was spread evenly.
+    #[getter]
+    fn balance(&self) -> f64 {
+        self.inner.balance()
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "PerftReport(nodes={}, threads={}, balance={:.3})",
+            self.inner.nodes,
+            self.inner.threads.len(),
+            self.inner.balance()
+        )
+    }
+}
+
+/// Runs a split perft on `threads` workers with the GIL released.
+pub(crate) fn perft_split(
+    py: Python<'_>,
+    board: kish_core::Board,
+    depth: u64,
+    split_depth: Option<u64>,
+    table: &kish_core::TranspositionTable,
+    threads: Option<usize>,
+) -> PyResult<PerftReport> {
+    let inner =
+        py.detach(|| batch::install(threads, || board.perft_split(depth, split_depth, table)))?;
+    Ok(PerftReport { inner })
+}
+
+/// A transposition table of perft node counts, reusable across runs.
+///
+/// Pass it as `table=` to `Board.perft_tt()` or `Board.perft_parallel()` to
+/// keep it warm between calls: counts stored by earlier runs are still hits.
+///
+/// Example:
+///     >>> table = TranspositionTable(256)
+///     >>> board.perft_parallel(10, table=table)
+///     >>> table.new_generation()
+///     >>> board.perft_parallel(11, table=table)
+///     >>> table.hits / table.probes
+#[pyclass]
+pub struct TranspositionTable {
+    inner: kish_core::TranspositionTable,
+}
+
+#[pymethods]
+impl TranspositionTable {
+    /// Creates an empty table of at most `size_mb` megabytes.
+    ///
+    /// Args:
+    ///     size_mb: Size limit; the entry count is rounded down to a power of two.
+    ///     replacement: `"depth"` keeps deeper entries when a bucket is full,
+    ///         `"always"` always stores the new entry.
+    ///     huge_pages: Ask Linux to back the table with transparent huge pages.
+    ///
+    /// Raises:
+    ///     ValueError: If `replacement` is not recognized.
+    ///     OSError: If the huge-page memory cannot be mapped.
+    #[new]
+    #[pyo3(signature = (size_mb=256, *, replacement="depth", huge_pages=false))]
+    fn new(size_mb: usize, replacement: &str, huge_pages: bool) -> PyResult<Self> {
+        let replacement = match replacement {
+            "depth" => Replacement::DepthPreferred,
+            "always" => Replacement::Always,
+            _ => {
+                return Err(PyValueError::new_err(
+                    "replacement must be 'depth' or 'always'",
+                ))
+            }
+        };
+        let inner = if huge_pages {
+            kish_core::TranspositionTable::with_huge_pages(size_mb)?
+        } else {
+            kish_core::TranspositionTable::new(size_mb)
+        };
+        Ok(Self {
+            inner: inner.with_replacement(replacement),
+        })
+    }
+
+    /// Number of entries.
+    #[getter]
+    fn capacity(&self) -> usize {
+        self.inner.capacity()
+    }
+
+    /// Current generation; entries of older ones are evicted first.
+    #[getter]
+    fn generation(&self) -> u8 {
+        self.inner.generation()
+    }
+
+    /// Lookups since the table was created or cleared.
+    #[getter]
+    fn probes(&self) -> u64 {
+        self.inner.stats().probes
+    }
+
+    /// Lookups that found their entry.
+    #[getter]
+    fn hits(&self) -> u64 {
+        self.inner.stats().hits
+    }
+
+    /// Stores.
+    #[getter]
+    fn stores(&self) -> u64 {
+        self.inner.stats().stores
+    }
+
+    /// Stores that found their bucket full of other entries.
+    #[getter]
+    fn collisions(&self) -> u64 {
+        self.inner.stats().collisions
+    }
+
+    /// Stores that evicted another entry.
+    #[getter]
+    fn overwrites(&self) -> u64 {
+        self.inner.stats().overwrites
+    }
+
+    /// Returns the fraction of entries in use, estimated from a sample.
+    fn occupancy(&self) -> f64 {
+        self.inner.occupancy()
+    }
+
+    /// Starts a new generation, typically before a new run.
+    fn new_generation(&mut self) {
+        self.inner.new_generation();
+    }
+
+    /// Empties the table and resets its counters and generation.
+    fn clear(&mut self) {
+        self.inner.clear();
+    }
+
+    fn __repr__(&self) -> String {
+        let stats = self.inner.stats();
+        format!(
+            "TranspositionTable(capacity={}, probes={}, hits={})",
+            self.inner.capacity(),
+            stats.probes,
+            stats.hits
+        )
+    }
+}
+
+impl TranspositionTable {
+    /// Returns the wrapped table.
+    pub(crate) fn inner(&self) -> &kish_core::TranspositionTable {
+        &self.inner
+    }
+}
+
+/// Completed units of a `PerftJob` and the nodes counted so far.
+#[pyclass(frozen)]
+pub struct PerftProgress {
+    inner: kish_core::PerftProgress,
+}
+
+#[pymethods]
+impl PerftProgress {
+    /// Units in scope: the shard for `PerftJob.run()`, the job for `PerftJob.merge()`.
+    #[getter]
+    fn units(&self) -> usize {
+        self.inner.units
+    }
+
+    /// Units completed.
+    #[getter]
+    fn done(&self) -> usize {
+        self.inner.done
+    }
+
+    /// Leaves of the completed units, weighted by multiplicity.
+    #[getter]
+    fn nodes(&self) -> u64 {
+        self.inner.nodes
+    }
+
+    /// Returns true if every unit in scope is completed, so that `nodes` is
+    /// the final count.
+    fn is_complete(&self) -> bool {
+        self.inner.is_complete()
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "PerftProgress(done={}, units={}, nodes={})",
+            self.inner.done, self.inner.units, self.inner.nodes
+        )
+    }
+}
+
+/// A deep perft split into work units that are checkpointed as they finish.
+///
+/// Units are the distinct positions `split_depth` plies from the root, with
+/// the number of move sequences reaching them. `run()` appends each unit
+/// result to a checkpoint file in a directory and skips the units already
+/// there, so an interrupted run resumes where it stopped. With `shards > 1`
+/// a process runs only every `shards`-th unit; run each shard anywhere the
+/// directory is shared, then call `merge()`.
+///
+/// Example:
+///     >>> job = PerftJob(Board(), 12, split_depth=4)
+///     >>> job.run("runs/", shard=0, shards=8)  # on each of 8 machines
+///     >>> job.merge("runs/").nodes
+#[pyclass(frozen)]
+pub struct PerftJob {
+    inner: kish_core::PerftJob,
+}
+
+#[pymethods]
+impl PerftJob {
+    /// Splits the perft of `board` to `depth` into units `split_depth` plies deep.
+    #[new]
+    #[pyo3(signature = (board, depth, split_depth=4))]
+    fn new(py: Python<'_>, board: &Board, depth: u64, split_depth: u64) -> Self {
+        let board = board.inner;
+        let inner = py.detach(|| kish_core::PerftJob::new(board, depth, split_depth));
+        Self { inner }
+    }
+
+    /// The perft depth.
+    #[getter]
+    fn depth(&self) -> u64 {
+        self.inner.depth()
+    }
+
+    /// The depth of the units.
+    #[getter]
+    fn split_depth(&self) -> u64 {
+        self.inner.split_depth()
+    }
+
+    /// Returns the units as `(board, multiplicity)` pairs, in run order.
+    fn units(&self) -> Vec<(Board, u64)> {
+        self.inner
+            .units()
+            .iter()
+            .map(|unit| (Board { inner: unit.board }, unit.multiplicity))
+            .collect()
+    }
+
+    /// Returns the name of the checkpoint file of a shard.
+    #[pyo3(signature = (shard=0, shards=1))]
+    fn checkpoint_name(&self, shard: u32, shards: u32) -> PyResult<String> {
+        Ok(self.inner.checkpoint_name(parse_shard(shard, shards)?))
+    }
+
+    /// Runs the units of a shard that are not yet in its checkpoint.
+    ///
+    /// Args:
+    ///     directory: Directory of the checkpoint files, created if needed.
+    ///     shard: Index of the shard to run.
+    ///     shards: Number of shards.
+    ///     tt_mb: Size of the transposition table shared by the units.
+    ///     threads: Number of worker threads (default: all cores).
+    ///
+    /// Returns the progress of the shard. The GIL is released while counting.
+    ///
+    /// Raises:
+    ///     OSError: If a checkpoint cannot be read or written, or belongs to
+    ///         another job.
+    ///     ValueError: If `shard` is not below `shards`, or `threads` is 0.
+    #[pyo3(signature = (directory, shard=0, shards=1, tt_mb=256, threads=None))]
+    fn run(
+        &self,
+        py: Python<'_>,
+        directory: PathBuf,
+        shard: u32,
+        shards: u32,
+        tt_mb: usize,
+        threads: Option<usize>,
+    ) -> PyResult<PerftProgress> {
+        let shard = parse_shard(shard, shards)?;
+        let job = &self.inner;
+        let inner = py.detach(|| {
+            batch::install(threads, || {
+                let table = kish_core::TranspositionTable::new(tt_mb);
+                job.run(&directory, shard, &table, |_| {})
+            })
+        })??;
+        Ok(PerftProgress { inner })
+    }
+
+    /// Adds up the checkpoints of every shard in `directory`.
+    ///
+    /// Raises:
+    ///     OSError: If a checkpoint cannot be read, is corrupt, or two
+    ///         checkpoints disagree.
+    fn merge(&self, directory: PathBuf) -> PyResult<PerftProgress> {
+        Ok(PerftProgress {
+            inner: self.inner.merge(directory)?,
+        })
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "PerftJob(depth={}, split_depth={}, units={})",
+            self.inner.depth(),
+            self.inner.split_depth(),
+            self.inner.units().len()
+        )
+    }
+}
+
+/// Checks a shard index against the shard count.
+fn parse_shard(index: u32, count: u32) -> PyResult<Shard> {
+    if index >= count {
+        return Err(PyValueError::new_err("shard must be below shards"));
+    }
+    Ok(Shard { index, count })
+}
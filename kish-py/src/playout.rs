@@ -0,0 +1,142 @@
+//! Native parallel random playouts.
+//!
+//! Wraps [`kish_core::Playouts`] so that millions of self-play games run on the
+//! rayon pool with the GIL released, returning only aggregated statistics
+//! (and, optionally, the move indices of every game).
+
+use numpy::PyArray1;
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+use kish_core::{HeuristicWeights, Policy};
+
+use crate::batch;
+use crate::Board;
+
+/// Aggregated results of `kish.playouts()`.
+#[pyclass(frozen)]
+pub struct PlayoutStats {
+    inner: kish_core::PlayoutStats,
+    recorded: bool,
+}
+
+#[pymethods]
+impl PlayoutStats {
+    /// Games won by White.
+    #[getter]
+    fn white_wins(&self) -> u64 {
+        self.inner.white_wins
+    }
+
+    /// Games won by Black.
+    #[getter]
+    fn black_wins(&self) -> u64 {
+        self.inner.black_wins
+    }
+
+    /// Games drawn under the rules.
+    #[getter]
+    fn draws(&self) -> u64 {
+        self.inner.draws
+    }
+
+    /// Games stopped at `max_plies`.
+    #[getter]
+    fn truncated(&self) -> u64 {
+        self.inner.truncated
+    }
+
+    /// Total number of games played.
+    #[getter]
+    fn games(&self) -> u64 {
+        self.inner.games()
+    }
+
+    /// Histogram of game lengths as a `uint64` array: `lengths[p]` games lasted `p` plies.
+    #[getter]
+    fn lengths<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u64>> {
+        PyArray1::from_slice(py, &self.inner.lengths)
+    }
+
+    /// Per-game `uint16` arrays of move indices, or `None` if not recorded.
+    ///
+    /// Each index refers to `Board.actions()` of the position it was played in.
+    #[getter]
+    fn moves<'py>(&self, py: Python<'py>) -> Option<Vec<Bound<'py, PyArray1<u16>>>> {
+        self.recorded.then(|| {
+            self.inner
+                .moves
+                .iter()
+                .map(|moves| PyArray1::from_slice(py, moves))
+                .collect()
+        })
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "PlayoutStats(games={}, white_wins={}, black_wins={}, draws={}, truncated={})",
+            self.inner.games(),
+            self.inner.white_wins,
+            self.inner.black_wins,
+            self.inner.draws,
+            self.inner.truncated
+        )
+    }
+}
+
+/// Parses a playout policy name.
+pub(crate) fn parse_policy(policy: &str) -> PyResult<Policy> {
+    match policy {
+        "uniform" => Ok(Policy::Uniform),
+        "capture" => Ok(Policy::CapturePreferring),
+        "heuristic" => Ok(Policy::Heuristic(HeuristicWeights::default())),
+        _ => Err(PyValueError::new_err(
+            "policy must be 'uniform', 'capture' or 'heuristic'",
+        )),
+    }
+}
+
+/// Plays random games natively and returns aggregated statistics.
+///
+/// Games are spread across the rayon pool with the GIL released. Results are
+/// deterministic for a given seed, regardless of the number of threads.
+///
+/// Args:
+///     n_games: Number of games to play.
+///     seed: Seed of the random streams.
+///     policy: `"uniform"`, `"capture"` (prefer the largest material gain)
+///         or `"heuristic"` (weighted towards captures, promotion and advancing).
+///     threads: Number of worker threads (default: all cores).
+///     max_plies: Games still running after this many plies are truncated.
+///     board: Start position (default: the standard start).
+///     record_moves: Also return the move indices of every game.
+///
+/// Returns:
+///     A `PlayoutStats` with outcome counts and a length histogram.
+#[pyfunction]
+#[pyo3(signature = (n_games, seed=0, policy="uniform", threads=None, max_plies=1000, *, board=None, record_moves=false))]
+#[allow(clippy::too_many_arguments)]
+pub(crate) fn playouts(
+    py: Python<'_>,
+    n_games: u64,
+    seed: u64,
+    policy: &str,
+    threads: Option<usize>,
+    max_plies: u32,
+    board: Option<PyRef<'_, Board>>,
+    record_moves: bool,
+) -> PyResult<PlayoutStats> {
+    let config = kish_core::Playouts {
+        seed,
+        policy: parse_policy(policy)?,
+        max_plies,
+        record_moves,
+    };
+    let start = board.map_or_else(kish_core::Board::new_default, |board| board.inner);
+    let inner = py.detach(|| batch::install(threads, || config.run(&start, n_games)))?;
+    Ok(PlayoutStats {
+        inner,
+        recorded: record_moves,
+    })
+}
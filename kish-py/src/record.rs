@@ -0,0 +1,214 @@
+//! Compact binary game records for Python.
+//!
+//! Wraps [`kish_core::RecordWriter`] and [`kish_core::RecordReader`] over
+//! buffered files. Games are replayed in Rust: iterating a reader yields one
+//! `Game` per record without creating any `Action` objects.
+
+use std::fs::File;
+use std::io::{self, BufReader, BufWriter};
+use std::path::PathBuf;
+
+use numpy::{PyArray1, PyArrayMethods, PyReadonlyArray1};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::PyTuple;
+
+use ::kish as kish_core;
+
+use crate::{Board, Game};
+
+/// Converts an I/O error to `ValueError` for bad input, `OSError` otherwise.
+pub(crate) fn to_py_err(error: io::Error) -> PyErr {
+    if error.kind() == io::ErrorKind::InvalidInput {
+        PyValueError::new_err(error.to_string())
+    } else {
+        error.into()
+    }
+}
+
+/// Extracts move indices from a `uint16` array or a sequence of integers.
+pub(crate) fn extract_moves(moves: &Bound<'_, PyAny>) -> PyResult<Vec<u16>> {
+    match moves.extract::<PyReadonlyArray1<'_, u16>>() {
+        Ok(array) => Ok(array.as_array().to_vec()),
+        Err(_) => moves.extract(),
+    }
+}
+
+/// Writes games to a compact binary record file.
+///
+/// Each move is stored as its index in `Board.actions()`, in a few bits.
+/// Use as a context manager, or call `close()` when done.
+///
+/// Example:
+///     >>> with kish.RecordWriter("games.kgr") as writer:
+///     ...     offset = writer.write_game(game)
+///     ...     writer.write(kish.Board(), stats.moves[0])
+#[pyclass]
+pub struct RecordWriter {
+    inner: Option<kish_core::RecordWriter<BufWriter<File>>>,
+}
+
+impl RecordWriter {
+    fn writer(&mut self) -> PyResult<&mut kish_core::RecordWriter<BufWriter<File>>> {
+        self.inner
+            .as_mut()
+            .ok_or_else(|| PyValueError::new_err("the record file is closed"))
+    }
+}
+
+#[pymethods]
+impl RecordWriter {
+    /// Creates (or truncates) a record file at `path`.
+    ///
+    /// Raises:
+    ///     OSError: If the file cannot be created.
+    #[new]
+    fn new(path: PathBuf) -> PyResult<Self> {
+        let file = BufWriter::new(File::create(path)?);
+        Ok(Self {
+            inner: Some(kish_core::RecordWriter::new(file)?),
+        })
+    }
+
+    /// The byte offset at which the next game will be written.
+    #[getter]
+    fn offset(&mut self) -> PyResult<u64> {
+        Ok(self.writer()?.offset())
+    }
+
+    /// Writes a game given its starting board and move indices, such as
+    /// `PlayoutStats.moves` entries.
+    ///
+    /// Returns:
+    ///     The byte offset of the game, for `RecordReader.seek()`.
+    ///
+    /// Raises:
+    ///     ValueError: If a move index is out of range, or the file is closed.
+    ///     OSError: If the file cannot be written.
+    fn write(&mut self, board: &Board, moves: &Bound<'_, PyAny>) -> PyResult<u64> {
+        let moves = extract_moves(moves)?;
+        self.writer()?
+            .write(&board.inner, &moves)
+            .map_err(to_py_err)
+    }
+
+    /// Writes `game` from the start of its history.
+    ///
+    /// Returns:
+    ///     The byte offset of the game, for `RecordReader.seek()`.
+    ///
+    /// Raises:
+    ///     ValueError: If the game holds an illegal move, or the file is closed.
+    ///     OSError: If the file cannot be written.
+    fn write_game(&mut self, game: &Game) -> PyResult<u64> {
+        self.writer()?.write_game(&game.inner).map_err(to_py_err)
+    }
+
+    /// Flushes buffered games to the file.
+    fn flush(&mut self) -> PyResult<()> {
+        Ok(self.writer()?.flush()?)
+    }
+
+    /// Flushes and closes the file. Closing twice does nothing.
+    fn close(&mut self) -> PyResult<()> {
+        if let Some(mut writer) = self.inner.take() {
+            writer.flush()?;
+        }
+        Ok(())
+    }
+
+    fn __enter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    #[pyo3(signature = (*_args))]
+    fn __exit__(&mut self, _args: &Bound<'_, PyTuple>) -> PyResult<bool> {
+        self.close()?;
+        Ok(false)
+    }
+}
+
+/// Reads games from a record file written by `RecordWriter`.
+///
+/// Iterating yields each game as a `Game`, replayed in Rust.
+///
+/// Example:
+///     >>> reader = kish.RecordReader("games.kgr")
+///     >>> for game in reader:
+///     ...     print(game.move_count, game.status())
+///     >>> reader.seek(offset)
+///     >>> board, moves = reader.read()
+#[pyclass]
+pub struct RecordReader {
+    inner: kish_core::RecordReader<BufReader<File>>,
+}
+
+#[pymethods]
+impl RecordReader {
+    /// Opens the record file at `path`.
+    ///
+    /// Raises:
+    ///     OSError: If the file cannot be read or is not a record file.
+    #[new]
+    fn new(path: PathBuf) -> PyResult<Self> {
+        let file = BufReader::new(File::open(path)?);
+        Ok(Self {
+            inner: kish_core::RecordReader::new(file)?,
+        })
+    }
+
+    /// The byte offset of the next game.
+    #[getter]
+    fn offset(&self) -> u64 {
+        self.inner.offset()
+    }
+
+    /// Reads the next game as `(board, moves)`: the starting board and a
+    /// `uint16` array of move indices. Returns None at the end of the file.
+    ///
+    /// Raises:
+    ///     OSError: If the file is corrupt or cannot be read.
+    fn read<'py>(
+        &mut self,
+        py: Python<'py>,
+    ) -> PyResult<Option<(Board, Bound<'py, PyArray1<u16>>)>> {
+        Ok(self.inner.read()?.map(|record| {
+            (
+                Board {
+                    inner: record.start,
+                },
+                PyArray1::from_vec(py, record.moves),
+            )
+        }))
+    }
+
+    /// Reads the next game and replays it into a `Game`. Returns None at the
+    /// end of the file.
+    ///
+    /// Raises:
+    ///     OSError: If the file is corrupt or cannot be read.
+    fn read_game(&mut self) -> PyResult<Option<Game>> {
+        Ok(self.inner.read_game()?.map(Game::from_core))
+    }
+
+    /// Moves to the game at byte `offset`, as returned by
+    /// `RecordWriter.write()` or `index()`.
+    fn seek(&mut self, offset: u64) -> PyResult<()> {
+        Ok(self.inner.seek(offset)?)
+    }
+
+    /// Returns a `uint64` array with the byte offset of every game in the
+    /// file, without replaying them.
+    fn index<'py>(&mut self, py: Python<'py>) -> PyResult<Bound<'py, PyArray1<u64>>> {
+        let offsets = py.detach(|| self.inner.index())?;
+        Ok(PyArray1::from_vec(py, offsets))
+    }
+
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self) -> PyResult<Option<Game>> {
+        self.read_game()
+    }
+}
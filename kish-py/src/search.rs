@@ -0,0 +1,131 @@
+//! Best-move search for Python.
+//!
+//! Runs [`kish_core::Search`] with the GIL released and converts the result,
+//! including the principal variation, into Python objects.
+
+use std::sync::Arc;
+use std::time::Duration;
+
+use pyo3::prelude::*;
+
+use ::kish as kish_core;
+use kish_core::{Search, SearchLimits};
+
+use crate::Action;
+
+/// Depth searched when no depth, time or node limit is given.
+const DEFAULT_DEPTH: u8 = 8;
+
+/// Result of `Board.search()`.
+#[pyclass(frozen)]
+pub struct SearchResult {
+    best_move: Option<Action>,
+    pv: Vec<Action>,
+    score: i32,
+    depth: u8,
+    nodes: u64,
+    mate_in: Option<i32>,
+}
+
+#[pymethods]
+impl SearchResult {
+    /// The best move, or None if the side to move has no legal actions.
+    #[getter]
+    fn best_move(&self) -> Option<Action> {
+        self.best_move.clone()
+    }
+
+    /// Principal variation, starting with the best move.
+    #[getter]
+    fn pv(&self) -> Vec<Action> {
+        self.pv.clone()
+    }
+
+    /// Score in centi-men from the side to move's point of view.
+    #[getter]
+    fn score(&self) -> i32 {
+        self.score
+    }
+
+    /// Depth of the last completed iteration.
+    #[getter]
+    fn depth(&self) -> u8 {
+        self.depth
+    }
+
+    /// Number of nodes searched.
+    #[getter]
+    fn nodes(&self) -> u64 {
+        self.nodes
+    }
+
+    /// Plies to a forced result (negative if losing), or None.
+    #[getter]
+    fn mate_in(&self) -> Option<i32> {
+        self.mate_in
+    }
+
+    fn __repr__(&self) -> String {
+        let best = self.best_move.as_ref().map_or_else(
+            || "None".to_string(),
+            |action| action.detailed().to_notation(),
+        );
+        format!(
+            "SearchResult(best_move={}, score={}, depth={}, nodes={})",
+            best, self.score, self.depth, self.nodes
+        )
+    }
+}
+
+/// Searches `board` with the GIL released.
+pub(crate) fn search(
+    py: Python<'_>,
+    board: kish_core::Board,
+    depth: Option<u8>,
+    time_ms: Option<u64>,
+    nodes: Option<u64>,
+    tt_mb: usize,
+    network: Option<Arc<kish_core::Network>>,
+) -> SearchResult {
+    let unbounded = time_ms.is_none() && nodes.is_none();
+    let limits = SearchLimits {
+        depth: depth.unwrap_or(if unbounded {
+            DEFAULT_DEPTH
+        } else {
+            kish_core::MAX_DEPTH
+        }),
+        nodes,
+        time: time_ms.map(Duration::from_millis),
+    };
+    let result = py.detach(|| {
+        let mut search = match network {
+            Some(network) => Search::with_network(tt_mb, network),
+            None => Search::new(tt_mb),
+        };
+        search.search(&board, &limits)
+    });
+
+    // Convert the PV, replaying it to know each move's position
+    let mut position = board;
+    let pv: Vec<Action> = result
+        .pv
+        .iter()
+        .map(|&action| {
+            let converted = Action::from_core(action, &position);
+            position.apply_(&action);
+            position.swap_turn_();
+            converted
+        })
+        .collect();
+
+    SearchResult {
+        best_move: result
+            .best_move
+            .map(|action| Action::from_core(action, &board)),
+        pv,
+        score: result.score,
+        depth: result.depth,
+        nodes: result.nodes,
+        mate_in: result.mate_in(),
+    }
+}
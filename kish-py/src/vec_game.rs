@@ -0,0 +1,293 @@
+//! Vectorized games stepped in lock-step for reinforcement learning.
+//!
+//! [`VecGame`] keeps many [`kish_core::Game`] instances together with their
+//! legal actions in Rust, so that choosing one action per game, applying it,
+//! scoring the result, and resetting finished games is a single call with the
+//! GIL released.
+
+use numpy::{PyArray1, PyArray2, PyArrayMethods, PyReadonlyArray1};
+use pyo3::exceptions::{PyIndexError, PyValueError};
+use pyo3::prelude::*;
+use rayon::prelude::*;
+
+use ::kish as kish_core;
+
+use crate::{Action, Board, Game};
+
+/// Status code for a game still in progress.
+const STATUS_IN_PROGRESS: i8 = 0;
+/// Status code for a drawn game.
+const STATUS_DRAW: i8 = 1;
+/// Status code for a game won by White.
+const STATUS_WHITE_WON: i8 = 2;
+/// Status code for a game won by Black.
+const STATUS_BLACK_WON: i8 = 3;
+
+/// Maps a game status to its status code.
+const fn status_code(status: kish_core::GameStatus) -> i8 {
+    match status {
+        kish_core::GameStatus::InProgress => STATUS_IN_PROGRESS,
+        kish_core::GameStatus::Draw => STATUS_DRAW,
+        kish_core::GameStatus::Won(kish_core::Team::White) => STATUS_WHITE_WON,
+        kish_core::GameStatus::Won(kish_core::Team::Black) => STATUS_BLACK_WON,
+    }
+}
+
+/// A single environment: a game whose cached legal actions, in canonical
+/// order, are shared with its status.
+struct Env {
+    game: kish_core::Game,
+}
+
+impl Env {
+    fn new(board: kish_core::Board) -> Self {
+        let game = kish_core::Game::from_board(board);
+        let _ = game.status();
+        Self { game }
+    }
+
+    /// Restarts the game from `board` in place, reusing its buffers, and
+    /// generates its legal actions through the status so later calls only
+    /// read them.
+    fn reset(&mut self, board: kish_core::Board) {
+        self.game.reset(board);
+        let _ = self.game.status();
+    }
+
+    /// Returns the legal actions of the current position.
+    fn legal(&self) -> &[kish_core::Action] {
+        self.game.legal_actions()
+    }
+
+    /// Returns true if the game is over before moving, which only happens
+    /// when the start board itself is over.
+    fn is_over(&self) -> bool {
+        self.game.status().is_over()
+    }
+
+    /// Plays legal action `index`, resetting to `start` if the game ends.
+    ///
+    /// Returns the reward from the mover's point of view and the status code
+    /// of the position reached (before any reset). A game that is already
+    /// over is reported as such again, without moving.
+    fn step(&mut self, index: usize, start: kish_core::Board) -> (f32, i8) {
+        let status = self.game.status();
+        if status.is_over() {
+            return (0.0, status_code(status));
+        }
+        let mover = self.game.turn();
+        let action = self.legal()[index];
+        self.game.make_move(&action);
+        let status = self.game.status();
+        let reward = match status {
+            kish_core::GameStatus::Won(team) if team == mover => 1.0,
+            kish_core::GameStatus::Won(_) => -1.0,
+            _ => 0.0,
+        };
+        if status.is_over() {
+            self.reset(start);
+        }
+        (reward, status_code(status))
+    }
+
+    /// Returns `[white, black, kings, turn]` for the current position.
+    fn observation(&self) -> [u64; 4] {
+        let board = self.game.board();
+        [
+            board.state.pieces[0],
+            board.state.pieces[1],
+            board.state.kings,
+            board.turn as u64,
+        ]
+    }
+}
+
+/// Many games stepped in lock-step, for reinforcement learning.
+///
+/// Every environment starts from the same board. Each call to `step()` takes
+/// one action index per environment, indexing into that environment's legal
+/// actions in the same order as `Board.actions()`, applies them all in Rust,
+/// and resets finished games to the start board.
+///
+/// Observations are `(N, 4)` `uint64` arrays of `[white, black, kings, turn]`
+/// (the same layout as `Board.bitboards()`). Status codes are `0` in progress,
+/// `1` draw, `2` White won, `3` Black won.
+///
+/// Example:
+///     >>> import numpy as np
+///     >>> envs = VecGame(1024)
+///     >>> obs = envs.reset()
+///     >>> counts = envs.legal_counts()
+///     >>> choice = (np.random.random(len(envs)) * counts).astype(np.int64)
+///     >>> obs, rewards, dones, status, counts = envs.step(choice)
+#[pyclass]
+pub struct VecGame {
+    envs: Vec<Env>,
+    start: kish_core::Board,
+}
+
+impl VecGame {
+    fn observations_array<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyArray2<u64>>> {
+        let flat: Vec<u64> = self.envs.iter().flat_map(Env::observation).collect();
+        PyArray1::from_vec(py, flat).reshape([self.envs.len(), 4])
+    }
+
+    fn legal_counts_array<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<i64>> {
+        let counts = self
+            .envs
+            .iter()
+            .map(|env| env.legal().len() as i64)
+            .collect();
+        PyArray1::from_vec(py, counts)
+    }
+
+    fn env(&self, index: usize) -> PyResult<&Env> {
+        self.envs.get(index).ok_or_else(|| {
+            PyIndexError::new_err(format!(
+                "environment index {index} out of range for {} environments",
+                self.envs.len()
+            ))
+        })
+    }
+}
+
+#[pymethods]
+impl VecGame {
+    /// Creates `num_envs` games starting from `board` (default: the standard start).
+    #[new]
+    #[pyo3(signature = (num_envs, board=None))]
+    fn new(num_envs: usize, board: Option<PyRef<'_, Board>>) -> Self {
+        let start = board.map_or_else(kish_core::Board::new_default, |board| board.inner);
+        Self {
+            envs: (0..num_envs).map(|_| Env::new(start)).collect(),
+            start,
+        }
+    }
+
+    /// Number of environments.
+    #[getter]
+    fn num_envs(&self) -> usize {
+        self.envs.len()
+    }
+
+    fn __len__(&self) -> usize {
+        self.envs.len()
+    }
+
+    /// Resets every environment to the start board and returns the observations.
+    fn reset<'py>(&mut self, py: Python<'py>) -> PyResult<Bound<'py, PyArray2<u64>>> {
+        let start = self.start;
+        for env in &mut self.envs {
+            env.reset(start);
+        }
+        self.observations_array(py)
+    }
+
+    /// Applies one action per environment and auto-resets finished games.
+    ///
+    /// Args:
+    ///     actions: `int64` array of shape `(N,)` holding an index into each
+    ///         environment's legal actions.
+    ///
+    /// Returns:
+    ///     A tuple `(obs, rewards, dones, status, legal_counts)`:
+    ///     `obs` is the `(N, 4)` observation after any reset, `rewards` is
+    ///     `float32` (+1 win, -1 loss, 0 otherwise) from the mover's point of
+    ///     view, `dones` is `bool`, `status` is the `int8` status code of the
+    ///     position reached before reset, and `legal_counts` is `int64`.
+    ///
+    /// Raises:
+    ///     ValueError: If `actions` has the wrong length.
+    ///     IndexError: If an index is out of range for its environment. No
+    ///         environment is stepped in that case.
+    ///
+    /// An environment whose start board is already over (for example a
+    /// blocked position) has no legal actions; every step ignores its index
+    /// and reports it as done, with reward 0 and the start board's status.
+    #[allow(clippy::type_complexity)]
+    fn step<'py>(
+        &mut self,
+        py: Python<'py>,
+        actions: PyReadonlyArray1<'py, i64>,
+    ) -> PyResult<(
+        Bound<'py, PyArray2<u64>>,
+        Bound<'py, PyArray1<f32>>,
+        Bound<'py, PyArray1<bool>>,
+        Bound<'py, PyArray1<i8>>,
+        Bound<'py, PyArray1<i64>>,
+    )> {
+        let indices = actions
+            .as_slice()
+            .map_err(|e| PyValueError::new_err(e.to_string()))?;
+        if indices.len() != self.envs.len() {
+            return Err(PyValueError::new_err(format!(
+                "expected {} actions, got {}",
+                self.envs.len(),
+                indices.len()
+            )));
+        }
+        for (i, (env, &index)) in self.envs.iter().zip(indices).enumerate() {
+            if env.is_over() {
+                continue;
+            }
+            if index < 0 || index as usize >= env.legal().len() {
+                return Err(PyIndexError::new_err(format!(
+                    "action index {index} out of range for environment {i} ({} legal actions)",
+                    env.legal().len()
+                )));
+            }
+        }
+
+        let start = self.start;
+        let envs = &mut self.envs;
+        let results: Vec<(f32, i8)> = py.detach(|| {
+            envs.par_iter_mut()
+                .zip(indices.par_iter())
+                .map(|(env, &index)| env.step(index as usize, start))
+                .collect()
+        });
+
+        let (rewards, status): (Vec<f32>, Vec<i8>) = results.into_iter().unzip();
+        let dones = status
+            .iter()
+            .map(|&code| code != STATUS_IN_PROGRESS)
+            .collect();
+        Ok((
+            self.observations_array(py)?,
+            PyArray1::from_vec(py, rewards),
+            PyArray1::from_vec(py, dones),
+            PyArray1::from_vec(py, status),
+            self.legal_counts_array(py),
+        ))
+    }
+
+    /// Returns the `(N, 4)` `uint64` observations of the current positions.
+    fn observations<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyArray2<u64>>> {
+        self.observations_array(py)
+    }
+
+    /// Returns the number of legal actions in each environment as an `int64` array.
+    fn legal_counts<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<i64>> {
+        self.legal_counts_array(py)
+    }
+
+    /// Returns the legal actions of environment `env`, in index order.
+    fn legal_actions(&self, env: usize) -> PyResult<Vec<Action>> {
+        let env = self.env(env)?;
+        let board = env.game.board();
+        Ok(env
+            .legal()
+            .iter()
+            .map(|&action| Action::from_core(action, board))
+            .collect())
+    }
+
+    /// Returns a copy of the game in environment `env`.
+    fn game(&self, env: usize) -> PyResult<Game> {
+        Ok(Game::from_core(self.env(env)?.game.clone()))
+    }
+
+    fn __repr__(&self) -> String {
+        format!("VecGame(num_envs={})", self.envs.len())
+    }
+}
@@ -109,6 +109,24 @@ def test_action_path():
     assert path[-1] == action.destination()
 
 
+def test_action_capture_loop():
+    """Test a king capture that ends on its start square."""
+    board = kish.Board.from_squares(
+        turn=kish.Team.Black,
+        white_squares=[kish.Square.A3, kish.Square.C5, kish.Square.E3, kish.Square.C1],
+        black_squares=[kish.Square.A1],
+        king_squares=[kish.Square.A1],
+    )
+    loops = [a for a in board.actions() if a.source() == a.destination()]
+    assert len(loops) == 1
+    action = loops[0]
+
+    assert action.source() == kish.Square.A1
+    assert action.capture_count() == 4
+    assert action.path()[0] == action.path()[-1] == kish.Square.A1
+    assert action.notation().startswith("a1x")
+
+
 def test_action_delta():
     """Test Action.delta() returns bitboard tuple."""
     board = kish.Board()
@@ -0,0 +1,79 @@
+"""Tests for the fixed action-index space and legal masks."""
+
+import pytest
+
+import kish
+
+np = pytest.importorskip("numpy")
+
+
+def black_start():
+    white, black, kings, _ = kish.Board().bitboards()
+    return kish.Board.from_bitboards(1, white, black, kings)
+
+
+def capture_board():
+    return kish.Board.from_squares(
+        kish.Team.White,
+        [kish.Square.B6, kish.Square.D4, kish.Square.E3],
+        [kish.Square.D5, kish.Square.C7, kish.Square.F4, kish.Square.G7],
+        [kish.Square.E3],
+    )
+
+
+@pytest.mark.parametrize("board", [kish.Board(), black_start(), capture_board()])
+@pytest.mark.parametrize("perspective", [False, True])
+def test_legal_mask_matches_actions(board, perspective):
+    """Test the mask is true exactly at the indices of the legal actions."""
+    mask = board.legal_mask(perspective)
+    assert mask.shape == (4096,)
+    assert mask.dtype == np.bool_
+    expected = np.zeros(4096, dtype=bool)
+    for action in board.actions():
+        expected[action.index(perspective)] = True
+    assert (mask == expected).all()
+
+
+def test_action_index_layout():
+    """Test indices are source * 64 + destination."""
+    board = kish.Board()
+    for action in board.actions():
+        assert action.index() == int(action.source()) * 64 + int(action.destination())
+
+
+def test_action_from_index_round_trips():
+    """Test every legal index maps back to an action with that index."""
+    board = capture_board()
+    for action in board.actions():
+        found = board.action_from_index(action.index())
+        assert found.index() == action.index()
+    assert board.action_from_index(0) is None
+    assert board.action_from_index(4096) is None
+
+
+def test_perspective_rotates_black():
+    """Test perspective indices of Black match the rotated board's."""
+    black = black_start()
+    indices = sorted(a.index(perspective=True) for a in black.actions())
+    white = sorted(a.index() for a in kish.Board().actions())
+    assert indices == white
+
+
+def test_legal_masks_batch():
+    """Test the batched masks match the single-board masks."""
+    boards = [kish.Board(), black_start(), capture_board()]
+    masks = kish.legal_masks(boards, perspective=True)
+    assert masks.shape == (3, 4096)
+    for board, mask in zip(boards, masks):
+        assert (mask == board.legal_mask(perspective=True)).all()
+
+
+def test_legal_masks_out():
+    """Test masks are written into a caller-provided buffer."""
+    boards = [kish.Board()] * 2
+    out = np.ones((2, 4096), dtype=bool)
+    result = kish.legal_masks(boards, out=out, threads=2)
+    assert result is out
+    assert out.sum() == 2 * len(kish.Board().actions())
+    with pytest.raises(ValueError):
+        kish.legal_masks(boards, out=np.zeros((3, 4096), dtype=bool))
@@ -0,0 +1,72 @@
+"""Tests for PDN-style game archives."""
+
+import pytest
+
+import kish
+
+ARCHIVE = """[Event "First"]
+[Result "*"]
+
+1. a3-a4 {opening} h6-h5 2. b3-b4 (2. c3-c4 g6-g5) g6-g5! *
+
+[Event "Second"]
+[FEN "W:Wd4:Bd5,h8"]
+1. d4xd6 1-0
+"""
+
+
+def test_archive_games(tmp_path):
+    """Test games, headers and custom starts are read back."""
+    path = tmp_path / "games.pdn"
+    path.write_text(ARCHIVE)
+    reader = kish.ArchiveReader(path)
+
+    first = next(reader)
+    assert reader.headers == {"Event": "First", "Result": "*"}
+    board = kish.Board()
+    for notation in ["a3-a4", "h6-h5", "b3-b4", "g6-g5"]:
+        board = board.apply(board.parse_action(notation))
+    assert first.move_count == 4
+    assert first.board() == board
+
+    second = next(reader)
+    assert reader.headers["Event"] == "Second"
+    assert second.move_count == 1
+    assert second.board().black_pieces() == [kish.Square.H8]
+    with pytest.raises(StopIteration):
+        next(reader)
+
+
+def test_archive_moves_across_files(tmp_path):
+    """Test move arrays match the games, across several files."""
+    np = pytest.importorskip("numpy")
+    paths = []
+    for index in range(3):
+        paths.append(tmp_path / f"games-{index}.pdn")
+        paths[-1].write_text(ARCHIVE)
+    games = list(kish.ArchiveReader(paths))
+    pairs = list(kish.ArchiveReader(paths, moves=True, threads=2))
+
+    assert len(games) == len(pairs) == 6
+    for game, (board, moves) in zip(games, pairs):
+        assert moves.dtype == np.uint16
+        for index in moves:
+            board = board.apply(board.actions()[index])
+        assert board == game.board()
+
+
+def test_archive_invalid_games(tmp_path):
+    """Test invalid games raise ValueError, or are counted when skipped."""
+    path = tmp_path / "games.pdn"
+    path.write_text("1. d3-d5 *\n\n" + ARCHIVE)
+    with pytest.raises(ValueError, match="line 1"):
+        list(kish.ArchiveReader(path))
+
+    reader = kish.ArchiveReader(path, skip_invalid=True)
+    assert len(list(reader)) == 2
+    assert reader.errors == 1
+
+    with pytest.raises(OSError):
+        list(kish.ArchiveReader(tmp_path / "missing.pdn"))
+    with pytest.raises(ValueError):
+        kish.ArchiveReader(path, threads=0)
@@ -0,0 +1,70 @@
+"""Tests for the parallel batch analytics functions."""
+
+import pytest
+
+import kish
+
+
+@pytest.fixture
+def boards(default_board, capture_position, draw_position):
+    """Return a mixed batch of positions."""
+    children = [default_board.apply(a) for a in default_board.actions()]
+    return [default_board, capture_position, draw_position] + children
+
+
+def test_perft_many_matches_perft(boards):
+    """Test perft_many() matches per-board perft()."""
+    assert kish.perft_many(boards, 3) == [b.perft(3) for b in boards]
+
+
+def test_perft_many_with_threads(boards):
+    """Test perft_many() on a dedicated pool."""
+    assert kish.perft_many(boards, 2, threads=2) == [b.perft(2) for b in boards]
+
+
+def test_status_many_matches_status(boards):
+    """Test status_many() matches per-board status()."""
+    statuses = kish.status_many(boards)
+    assert [repr(s) for s in statuses] == [repr(b.status()) for b in boards]
+
+
+def test_count_actions_many_matches_actions(boards):
+    """Test count_actions_many() matches len(actions())."""
+    assert kish.count_actions_many(boards) == [len(b.actions()) for b in boards]
+
+
+def test_mobility_arrays_matches_boards(boards):
+    """Test mobility_arrays() matches per-board queries."""
+    np = pytest.importorskip("numpy")
+    positions = np.array([b.to_array() for b in boards], dtype=np.uint64)
+    counts, captures, blocked = kish.mobility_arrays(*positions.T)
+    assert counts.dtype == np.uint32
+    assert counts.tolist() == [len(b.actions()) for b in boards]
+    assert captures.tolist() == [b.has_capture() for b in boards]
+    assert blocked.tolist() == [not b.has_legal_move() for b in boards]
+
+
+def test_mobility_arrays_rejects_bad_input():
+    """Test mobility_arrays() validates lengths and turns."""
+    np = pytest.importorskip("numpy")
+    column = np.zeros(2, dtype=np.uint64)
+    with pytest.raises(ValueError):
+        kish.mobility_arrays(column, column, column, column[:1])
+    with pytest.raises(ValueError):
+        kish.mobility_arrays(column, column, column, column + 2)
+
+
+def test_batch_empty():
+    """Test batch functions accept an empty list."""
+    np = pytest.importorskip("numpy")
+    assert kish.perft_many([], 3) == []
+    assert kish.status_many([]) == []
+    assert kish.count_actions_many([]) == []
+    empty = np.zeros(0, dtype=np.uint64)
+    assert len(kish.mobility_arrays(empty, empty, empty, empty)[0]) == 0
+
+
+def test_batch_rejects_zero_threads(boards):
+    """Test threads=0 is rejected."""
+    with pytest.raises(ValueError):
+        kish.count_actions_many(boards, threads=0)
@@ -1,5 +1,7 @@
 """Tests for the Board class."""
 
+import pytest
+
 import kish
 
 
@@ -54,6 +56,15 @@ def test_board_actions():
     assert all(isinstance(a, kish.Action) for a in actions)
 
 
+def test_board_has_capture(default_board, capture_position):
+    """Test Board.has_capture() and has_legal_move() agree with actions()."""
+    assert not default_board.has_capture()
+    assert default_board.has_legal_move()
+    assert capture_position.has_capture()
+    assert capture_position.has_legal_move()
+    assert all(a.is_capture() for a in capture_position.actions())
+
+
 def test_board_apply():
     """Test Board.apply() returns new board."""
     board = kish.Board()
@@ -145,6 +156,105 @@ def test_board_perft_depth_2():
     assert board.perft(2) == 64
 
 
+def test_board_perft_tt_matches_perft():
+    """Test perft_tt() matches perft()."""
+    board = kish.Board()
+    assert board.perft_tt(5, tt_mb=4) == board.perft(5)
+
+
+def test_board_perft_parallel_matches_perft():
+    """Test perft_parallel() matches perft() with an explicit thread count."""
+    board = kish.Board()
+    assert board.perft_parallel(5, tt_mb=4, threads=2) == board.perft(5)
+
+
+def test_board_perft_reuses_table():
+    """Test a TranspositionTable stays warm across perft calls."""
+    board = kish.Board()
+    table = kish.TranspositionTable(4)
+    assert board.perft_tt(6, table=table) == board.perft(6)
+    probes, hits = table.probes, table.hits
+    assert table.stores > 0
+
+    table.new_generation()
+    assert table.generation == 1
+    assert board.perft_parallel(6, threads=2, table=table) == board.perft(6)
+    # The root is answered from the table
+    assert (table.probes - probes, table.hits - hits) == (1, 1)
+
+    table.clear()
+    assert (table.probes, table.hits, table.generation) == (0, 0, 0)
+
+
+def test_transposition_table_rejects_unknown_replacement():
+    """Test TranspositionTable() validates the replacement policy."""
+    assert kish.TranspositionTable(1, replacement="always").capacity == 65536
+    with pytest.raises(ValueError):
+        kish.TranspositionTable(1, replacement="never")
+
+
+def test_board_perft_split(king_position):
+    """Test perft_split() matches perft() and reports every thread's work."""
+    pytest.importorskip("numpy")
+    board = kish.Board()
+    report = board.perft_split(6, split_depth=2, tt_mb=4, threads=2)
+    assert report.nodes == board.perft(6)
+    assert report.thread_nodes.shape == (2,)
+    assert report.thread_nodes.sum() == report.nodes
+    assert report.thread_tasks.sum() == board.perft(2)
+    assert 0.0 < report.balance <= 1.0
+
+    table = kish.TranspositionTable(4)
+    assert king_position.perft_split(5, table=table).nodes == king_position.perft(5)
+
+
+def test_perft_job_shards_and_resumes(tmp_path):
+    """Test PerftJob shards merge to perft() and finished runs are skipped."""
+    board = kish.Board()
+    job = kish.PerftJob(board, 5, split_depth=2)
+    assert sum(count for _, count in job.units()) == 64
+
+    first = job.run(tmp_path, shard=1, shards=2, tt_mb=4)
+    assert first.is_complete()
+    assert not job.merge(tmp_path).is_complete()
+    assert (tmp_path / job.checkpoint_name(1, 2)).exists()
+
+    job.run(tmp_path, shard=0, shards=2, tt_mb=4)
+    total = job.merge(tmp_path)
+    assert total.is_complete()
+    assert total.nodes == board.perft(5)
+
+    # Everything is already checkpointed
+    assert job.run(tmp_path, shard=1, shards=2).nodes == first.nodes
+    with pytest.raises(ValueError):
+        job.run(tmp_path, shard=2, shards=2)
+
+
+def test_board_perft_parallel_rejects_zero_threads():
+    """Test perft_parallel() rejects threads=0."""
+    with pytest.raises(ValueError):
+        kish.Board().perft_parallel(4, threads=0)
+
+
+def test_board_perft_detailed(capture_position, promotion_position):
+    """Test perft_detailed() per-ply counters."""
+    pytest.importorskip("numpy")
+    stats = kish.Board().perft_detailed(4, threads=2)
+    assert stats.nodes == kish.Board().perft(4)
+    assert stats.moves.tolist() == [8, 64, 708, 7538]
+    assert stats.chains.shape == (4, 17)
+    assert stats.chains.sum(axis=1).tolist() == stats.captures.tolist()
+
+    stats = capture_position.perft_detailed(1)
+    assert stats.captures.tolist() == [1]
+    assert stats.chains[0, 1] == 1
+    assert stats.draws.tolist() == [1]
+
+    stats = promotion_position.perft_detailed(1)
+    assert stats.promotions.tolist() == [1]
+    assert stats.king_moves.tolist() == [0]
+
+
 def test_board_hash():
     """Test Board is hashable."""
     board1 = kish.Board()
@@ -152,6 +262,21 @@ def test_board_hash():
     assert hash(board1) == hash(board2)
 
 
+def test_board_key_matches_hash():
+    """Test Board.key is stable and used as the hash."""
+    board = kish.Board()
+    assert board.key == kish.Board().key
+    assert hash(board) == hash(board.key)
+    assert board.key != board.apply(board.actions()[0]).key
+
+
+def test_board_key_incremental(capture_position):
+    """Test the key after a move is the key XOR the action's key delta."""
+    for board in [kish.Board(), capture_position]:
+        for action in board.actions():
+            assert board.apply(action).key == board.key ^ action.key_delta
+
+
 def test_board_equality():
     """Test Board equality."""
     board1 = kish.Board()
@@ -160,3 +285,14 @@ def test_board_equality():
 
     board3 = board1.apply(board1.actions()[0])
     assert board1 != board3
+
+
+def test_board_parse_action(capture_position, promotion_position):
+    """Test actions are parsed back from their notation."""
+    for board in [kish.Board(), capture_position, promotion_position]:
+        for action in board.actions():
+            assert board.parse_action(action.notation()) == action
+    assert capture_position.parse_action("D4:D6") == capture_position.actions()[0]
+    for notation in ["d3", "d3-d5", "d6-d5", "d3xd5"]:
+        with pytest.raises(ValueError):
+            kish.Board().parse_action(notation)
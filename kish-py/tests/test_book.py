@@ -0,0 +1,92 @@
+"""Tests for opening books."""
+
+import pytest
+
+import kish
+
+
+@pytest.fixture
+def book(tmp_path):
+    """Return a book of three games from the starting position."""
+    builder = kish.BookBuilder(plies=2)
+    board = kish.Board()
+    builder.add(board, [0, 1, 2], winner=kish.Team.White)
+    builder.add(board, [0, 3])
+    builder.add(board, [1], winner=kish.Team.Black)
+    assert len(builder) == 4
+    return builder.build(tmp_path / "openings.bk")
+
+
+def test_probe_statistics(book, default_board):
+    """Test probing returns each book move with its statistics."""
+    actions = default_board.actions()
+    assert book.probe(default_board) == [
+        (actions[0], 2, 100, 300),
+        (actions[1], 1, -100, 0),
+    ]
+    assert len(book) == 4
+    assert repr(book) == "Book(entries=4)"
+
+
+def test_probe_out_of_book(book, king_position):
+    """Test positions missing from the book have no moves."""
+    assert book.probe(king_position) == []
+    assert book.choose(king_position) is None
+
+
+def test_choose_skips_zero_weight(book, default_board):
+    """Test moves that only lost are never chosen."""
+    first = default_board.actions()[0]
+    for _ in range(50):
+        assert book.choose(default_board) == first
+
+
+def test_reopen_with_seed(tmp_path, default_board):
+    """Test a reopened book makes the same choices for the same seed."""
+    path = tmp_path / "enumerated.bk"
+    builder = kish.BookBuilder()
+    builder.enumerate(default_board, plies=2, depth=2, threads=2)
+    builder.build(path)
+    first = kish.Book(path, seed=5)
+    second = kish.Book(path, seed=5)
+    assert len(first.probe(default_board)) == len(default_board.actions())
+    choices = [first.choose(default_board) for _ in range(20)]
+    assert choices == [second.choose(default_board) for _ in range(20)]
+
+
+def test_add_game():
+    """Test games are added from the start of their history."""
+    game = kish.Game()
+    for _ in range(3):
+        game.make_move(game.actions()[0])
+    builder = kish.BookBuilder()
+    builder.add_game(game)
+    assert len(builder) == 3
+
+
+def test_min_count(tmp_path, default_board):
+    """Test moves added fewer than min_count times are left out."""
+    builder = kish.BookBuilder(plies=1)
+    builder.add(default_board, [0])
+    builder.add(default_board, [0])
+    builder.add(default_board, [1])
+    book = builder.build(tmp_path / "openings.bk", min_count=2)
+    assert [entry[0] for entry in book.probe(default_board)] == [
+        default_board.actions()[0]
+    ]
+
+
+def test_add_rejects_illegal_moves(default_board):
+    """Test a move index out of range raises ValueError and adds nothing."""
+    builder = kish.BookBuilder()
+    with pytest.raises(ValueError):
+        builder.add(default_board, [0, 500])
+    assert len(builder) == 0
+
+
+def test_book_rejects_other_files(tmp_path):
+    """Test opening a file that is not a book raises OSError."""
+    path = tmp_path / "not-a-book"
+    path.write_bytes(b"hello")
+    with pytest.raises(OSError):
+        kish.Book(path)
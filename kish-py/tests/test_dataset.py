@@ -0,0 +1,106 @@
+"""Tests for streaming training datasets."""
+
+import pytest
+
+import kish
+
+np = pytest.importorskip("numpy")
+
+
+def load(directory, stats):
+    """Load every shard of a dataset, memory-mapped, into one array."""
+    shards = [
+        np.load(directory / f"shard-{index:05}.npy", mmap_mode="r")
+        for index in range(stats.shards)
+    ]
+    return np.concatenate(shards)
+
+
+def test_dataset_rows(tmp_path):
+    """Test rows describe every position of a game."""
+    game = kish.Game()
+    for _ in range(6):
+        game.make_move(game.actions()[0])
+    with kish.DatasetWriter(tmp_path, keep_unfinished=True) as writer:
+        writer.add_games([game])
+    rows = np.load(tmp_path / "shard-00000.npy", mmap_mode="r")
+
+    assert rows.shape == (7,)
+    assert rows["plies_to_end"].tolist() == [6, 5, 4, 3, 2, 1, 0]
+    assert rows["outcome"].tolist() == [0] * 7
+    assert rows["turn"].tolist() == [0, 1, 0, 1, 0, 1, 0]
+    white, black, kings, turn = kish.Board().bitboards()
+    assert (rows["white"][0], rows["black"][0], rows["kings"][0]) == (
+        white,
+        black,
+        kings,
+    )
+    assert rows["legal_moves"][0] == len(kish.Board().actions())
+    final = game.board().bitboards()
+    assert (rows["white"][-1], rows["black"][-1], rows["turn"][-1]) == (
+        final[0],
+        final[1],
+        final[3],
+    )
+
+
+def test_dataset_playouts_match_moves(tmp_path):
+    """Test playouts and their recorded moves give the same rows."""
+    recorded = kish.playouts(20, seed=3, policy="capture", record_moves=True)
+    arrays = []
+    for name in ("playouts", "moves"):
+        directory = tmp_path / name
+        writer = kish.DatasetWriter(directory, rows_per_shard=200, threads=2)
+        if name == "playouts":
+            writer.add_playouts(20, seed=3, policy="capture")
+        else:
+            writer.add_moves(recorded.moves)
+        stats = writer.finish()
+        assert stats.games == 20
+        assert stats.unfinished == recorded.truncated
+        assert stats.shards == -(-stats.rows // 200)
+        arrays.append(load(directory, stats))
+
+    assert np.array_equal(arrays[0], arrays[1])
+    rows = arrays[0]
+    assert len(rows) == stats.rows
+    assert set(np.unique(rows["outcome"]).tolist()) <= {-1, 0, 1}
+    assert rows["plies_to_end"][rows["plies_to_end"] == 0].size == 20 - stats.unfinished
+
+
+def test_dataset_deduplicate(tmp_path, draw_position):
+    """Test repeated positions are written once."""
+    writer = kish.DatasetWriter(tmp_path, deduplicate=True)
+    writer.add_games([kish.Game.from_board(draw_position)] * 3)
+    stats = writer.finish()
+    assert (stats.games, stats.rows, stats.duplicates) == (3, 1, 2)
+    assert "rows=1" in repr(stats)
+    rows = np.load(tmp_path / "shard-00000.npy")
+    assert rows["outcome"].tolist() == [0]
+
+
+def test_dataset_skips_unfinished(tmp_path):
+    """Test unfinished games are counted but not written by default."""
+    writer = kish.DatasetWriter(tmp_path)
+    writer.add_playouts(5, max_plies=3)
+    stats = writer.finish()
+    assert (stats.games, stats.unfinished, stats.rows, stats.shards) == (5, 5, 0, 0)
+
+
+def test_dataset_errors(tmp_path):
+    """Test invalid input and use after finish raise ValueError."""
+    with pytest.raises(ValueError):
+        kish.DatasetWriter(tmp_path, rows_per_shard=0)
+    with pytest.raises(ValueError):
+        kish.DatasetWriter(tmp_path, threads=0)
+
+    writer = kish.DatasetWriter(tmp_path)
+    with pytest.raises(ValueError):
+        writer.add_moves([[500]])
+    with pytest.raises(ValueError):
+        writer.add_playouts(1, policy="greedy")
+    writer.finish()
+    with pytest.raises(ValueError):
+        writer.add_playouts(1)
+    with pytest.raises(ValueError):
+        writer.finish()
@@ -0,0 +1,109 @@
+"""Tests for the batched feature-plane encoders."""
+
+import pytest
+
+import kish
+
+np = pytest.importorskip("numpy")
+
+
+def unpack(bitboard):
+    """Unpack a bitboard into an 8x8 array (row 0 = rank 1)."""
+    bits = [(bitboard >> i) & 1 for i in range(64)]
+    return np.array(bits, dtype=np.float32).reshape(8, 8)
+
+
+def test_encode_boards_shape_and_dtype():
+    """Test encode_boards() allocates a (N, 4, 8, 8) float32 array."""
+    planes = kish.encode_boards([kish.Board(), kish.Board()])
+    assert planes.shape == (2, 4, 8, 8)
+    assert planes.dtype == np.float32
+
+
+def test_encode_boards_matches_bitboards(king_position):
+    """Test planes match the board's bitboards."""
+    board = king_position.apply(king_position.actions()[0])
+    planes = kish.encode_boards([board])[0]
+
+    white, black, kings, turn = board.bitboards()
+    assert np.array_equal(planes[0], unpack(white))
+    assert np.array_equal(planes[1], unpack(black))
+    assert np.array_equal(planes[2], unpack(kings))
+    assert np.all(planes[3] == turn)
+
+
+def test_encode_boards_uint8():
+    """Test encode_boards() with dtype='uint8'."""
+    planes = kish.encode_boards([kish.Board()], dtype="uint8")
+    assert planes.dtype == np.uint8
+    assert planes[0, 0].sum() == 16
+
+
+def test_encode_boards_fills_out_in_place():
+    """Test encode_boards() writes into a caller-provided buffer."""
+    out = np.full((1, 4, 8, 8), 7, dtype=np.uint8)
+    result = kish.encode_boards([kish.Board()], out=out)
+    assert result is out
+    assert out.max() == 1
+    assert out[0, 0, 1:3].sum() == 16
+
+
+def test_encode_boards_rejects_wrong_shape():
+    """Test encode_boards() rejects an out buffer of the wrong shape."""
+    out = np.zeros((2, 4, 8, 8), dtype=np.float32)
+    with pytest.raises(ValueError):
+        kish.encode_boards([kish.Board()], out=out)
+
+
+def test_encode_boards_rejects_bad_dtype():
+    """Test encode_boards() rejects unsupported dtypes."""
+    with pytest.raises(ValueError):
+        kish.encode_boards([kish.Board()], dtype="int64")
+
+
+def test_encode_boards_perspective():
+    """Test perspective normalization rotates boards with Black to move."""
+    board = kish.Board.from_squares(
+        turn=kish.Team.Black,
+        white_squares=[kish.Square.A1],
+        black_squares=[kish.Square.B7],
+        king_squares=[],
+    )
+    planes = kish.encode_boards([board], perspective=True)[0]
+    # Side to move (Black) is shown as White, rotated 180 degrees
+    assert planes[0, 1, 6] == 1  # G2
+    assert planes[1, 7, 7] == 1  # H8
+    assert planes[0].sum() == 1
+    assert planes[1].sum() == 1
+
+
+def test_encode_boards_mirror():
+    """Test mirror flips the board left/right."""
+    board = kish.Board()
+    board = board.apply(board.actions()[0])
+    plain = kish.encode_boards([board])[0]
+    mirrored = kish.encode_boards([board], mirror=True)[0]
+    assert np.array_equal(mirrored[:3], plain[:3, :, ::-1])
+
+
+def test_encode_games_history():
+    """Test encode_games() stacks previous positions."""
+    game = kish.Game()
+    start = game.board()
+    game.make_move(game.actions()[0])
+
+    planes = kish.encode_games([game], history=3)[0]
+    assert planes.shape == (10, 8, 8)
+
+    current = kish.encode_boards([game.board()])[0]
+    previous = kish.encode_boards([start])[0]
+    assert np.array_equal(planes[0:3], current[0:3])
+    assert np.array_equal(planes[3:6], previous[0:3])
+    assert not planes[6:9].any()
+    assert np.all(planes[9] == 1)
+
+
+def test_encode_games_rejects_zero_history():
+    """Test encode_games() requires at least one position."""
+    with pytest.raises(ValueError):
+        kish.encode_games([kish.Game()], history=0)
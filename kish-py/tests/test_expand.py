@@ -0,0 +1,46 @@
+"""Tests for Board.expand()."""
+
+import pytest
+
+import kish
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize(
+    "fixture",
+    ["default_board", "capture_position", "promotion_position", "king_position"],
+)
+def test_expand_matches_actions(fixture, request):
+    """Test every row matches the corresponding action and child board."""
+    board = request.getfixturevalue(fixture)
+    deltas, children, capture_counts, promotions = board.expand()
+    actions = board.actions()
+
+    assert deltas.shape == (len(actions), 3)
+    assert children.shape == (len(actions), 4)
+    assert deltas.dtype == np.uint64
+    assert children.dtype == np.uint64
+    assert capture_counts.dtype == np.uint8
+    assert promotions.dtype == np.bool_
+
+    for i, action in enumerate(actions):
+        assert deltas[i].tolist() == action.delta_array()
+        assert children[i].tolist() == board.apply(action).to_array()
+        assert capture_counts[i] == action.capture_count()
+        assert promotions[i] == action.is_promotion()
+
+
+def test_expand_terminal_position():
+    """Test a position without actions expands to empty arrays."""
+    board = kish.Board.from_squares(
+        turn=kish.Team.White,
+        white_squares=[],
+        black_squares=[kish.Square.D4],
+        king_squares=[],
+    )
+    deltas, children, capture_counts, promotions = board.expand()
+    assert deltas.shape == (0, 3)
+    assert children.shape == (0, 4)
+    assert len(capture_counts) == 0
+    assert len(promotions) == 0
@@ -38,6 +38,23 @@ def test_game_actions():
     assert len(actions) > 0
 
 
+def test_game_actions_cached_per_ply():
+    """Test Game.actions() reuses its Action objects until the position changes."""
+    game = kish.Game()
+    first = game.actions()
+    second = game.actions()
+    assert first is not second
+    assert all(a is b for a, b in zip(first, second))
+    first.clear()
+    assert len(game.actions()) == len(second)
+
+    game.make_move(second[0])
+    assert game.actions() == game.board().actions()
+    game.undo_move()
+    assert game.actions() == second
+    assert game.actions()[0] is not second[0]
+
+
 def test_game_make_move():
     """Test Game.make_move() updates state."""
     game = kish.Game()
@@ -144,6 +161,22 @@ def test_game_clear_history():
     assert game.position_count() == 1
 
 
+def test_game_fork():
+    """Test Game.fork() keeps the position but not the undo history."""
+    game = kish.Game()
+    game.make_move(game.actions()[0])
+
+    fork = game.fork()
+
+    assert fork.board() == game.board()
+    assert fork.halfmove_clock == game.halfmove_clock
+    assert fork.move_count == 0
+    assert not fork.undo_move()
+
+    fork.make_move(fork.actions()[0])
+    assert game.move_count == 1
+
+
 def test_game_perft():
     """Test Game.perft() matches Board.perft()."""
     game = kish.Game()
@@ -0,0 +1,136 @@
+"""Tests for Monte Carlo tree search."""
+
+import pytest
+
+import kish
+
+np = pytest.importorskip("numpy")
+
+
+def test_mcts_rollouts_run_simulations():
+    """Test rollout search completes every simulation and picks a legal move."""
+    tree = kish.MCTS(seed=1)
+    assert tree.run(200) == 200
+    assert tree.simulations == 200
+    assert int(tree.visit_counts().sum()) == 199
+    assert tree.best_action() in kish.Game().actions()
+
+
+def test_mcts_statistics_follow_action_order():
+    """Test root statistics are aligned with Board.actions()."""
+    tree = kish.MCTS(seed=2)
+    tree.run(50)
+    actions = kish.Game().actions()
+    assert tree.actions() == actions
+    assert len(tree.values()) == len(actions)
+    assert np.allclose(tree.priors(), 1.0 / len(actions))
+
+
+def test_mcts_deterministic_across_threads():
+    """Test rollout results depend on the seed, not the thread count."""
+    a = kish.MCTS(seed=3)
+    b = kish.MCTS(seed=3)
+    a.run(300, threads=1)
+    b.run(300, threads=4)
+    assert list(a.visit_counts()) == list(b.visit_counts())
+
+
+def test_mcts_python_evaluator_batches():
+    """Test a Python evaluator receives batches and its priors steer PUCT."""
+    batches = []
+
+    def evaluate(obs, legal_counts):
+        batches.append(len(obs))
+        assert obs.shape == (len(legal_counts), 4)
+        priors = []
+        for count in legal_counts:
+            p = np.zeros(count, dtype=np.float32)
+            p[-1] = 1.0
+            priors.append(p)
+        return np.zeros(len(obs)), np.concatenate(priors)
+
+    tree = kish.MCTS(batch_size=16)
+    assert tree.run(100, evaluate) == 100
+    assert sum(batches) == 100
+    assert max(batches) > 1
+    assert tree.best_action() == kish.Game().actions()[-1]
+
+
+def test_mcts_evaluator_values_only():
+    """Test an evaluator may return values alone for uniform priors."""
+    tree = kish.MCTS()
+    tree.run(20, lambda obs, counts: [0.0] * len(obs))
+    assert tree.simulations == 20
+
+
+def test_mcts_evaluator_errors():
+    """Test evaluator exceptions and bad shapes surface without losing the tree."""
+    tree = kish.MCTS()
+    tree.run(10)
+
+    def fail(obs, counts):
+        raise RuntimeError("no network")
+
+    with pytest.raises(RuntimeError):
+        tree.run(10, fail)
+    with pytest.raises(ValueError):
+        tree.run(10, lambda obs, counts: [0.0])
+    with pytest.raises(ValueError):
+        tree.run(10, lambda obs, counts: (np.zeros(len(obs)), np.ones(1)))
+    assert tree.simulations == 10
+    assert tree.run(5) == 5
+
+
+def test_mcts_policy_temperature():
+    """Test the visit distribution sums to one and is one-hot at zero temperature."""
+    tree = kish.MCTS(seed=4)
+    tree.run(100)
+    assert tree.policy().sum() == pytest.approx(1.0)
+    greedy = tree.policy(0.0)
+    assert greedy.sum() == 1.0
+    assert tree.actions()[int(greedy.argmax())] == tree.best_action()
+    with pytest.raises(ValueError):
+        tree.policy(-1.0)
+
+
+def test_mcts_advance_reuses_subtree():
+    """Test advancing keeps the chosen subtree and moves the root."""
+    tree = kish.MCTS(seed=5)
+    tree.run(300)
+    action = tree.best_action()
+    visits = int(tree.visit_counts()[tree.actions().index(action)])
+    tree.advance(action)
+    assert tree.simulations == visits
+    assert tree.game().turn == kish.Team.Black
+
+    with pytest.raises(ValueError):
+        tree.advance(action)
+
+
+def test_mcts_threefold_root_is_draw():
+    """Test the root game's repetition history ends the search in a draw."""
+    board = kish.Board.from_squares(
+        kish.Team.White,
+        [kish.Square.A1, kish.Square.B1],
+        [kish.Square.H7, kish.Square.H8],
+        [kish.Square.A1, kish.Square.B1, kish.Square.H7, kish.Square.H8],
+    )
+    game = kish.Game.from_board(board)
+    shuffle = ["a1-a2", "h8-g8", "a2-a1", "g8-h8"] * 2
+    for notation in shuffle:
+        game.make_move(next(a for a in game.actions() if a.notation() == notation))
+    assert game.status().is_draw()
+
+    tree = kish.MCTS(game)
+    tree.run(5, lambda obs, counts: pytest.fail("evaluator called"))
+    assert tree.root_value == 0.0
+    assert tree.best_action() is None
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"selection": "minimax"}, {"policy": "greedy"}, {"batch_size": 0}]
+)
+def test_mcts_invalid_arguments(kwargs):
+    """Test invalid configuration raises ValueError."""
+    with pytest.raises(ValueError):
+        kish.MCTS(**kwargs)
@@ -0,0 +1,124 @@
+"""Tests for NNUE-style evaluation networks."""
+
+import pytest
+
+import kish
+
+np = pytest.importorskip("numpy")
+
+
+def random_weights(l1=32, l2=8, seed=0):
+    """Return random float weights for a network of the given sizes."""
+    rng = np.random.default_rng(seed)
+    return (
+        rng.normal(0, 0.1, (l1, 256)).astype(np.float32),
+        rng.uniform(0, 0.5, l1).astype(np.float32),
+        rng.normal(0, 0.1, (l2, 2 * l1)).astype(np.float32),
+        rng.uniform(0, 0.5, l2).astype(np.float32),
+        rng.normal(0, 1, l2).astype(np.float32),
+        0.1,
+    )
+
+
+@pytest.fixture
+def network():
+    """Return a small random network."""
+    return kish.Network.quantize(*random_weights())
+
+
+def test_quantize_sizes(network):
+    """Test the layer sizes come from the weight shapes."""
+    assert network.accumulator_size == 32
+    assert network.hidden_size == 8
+    assert repr(network) == "Network(accumulator_size=32, hidden_size=8)"
+
+
+def test_bias_only_network():
+    """Test a network with zero weights returns its output bias."""
+    l1, l2 = 16, 4
+    network = kish.Network.quantize(
+        np.zeros((l1, 256), np.float32),
+        np.zeros(l1, np.float32),
+        np.zeros((l2, 2 * l1), np.float32),
+        np.zeros(l2, np.float32),
+        np.zeros(l2, np.float32),
+        1.5,
+    )
+    assert kish.Board().evaluate(network) == 150
+
+
+def test_save_and_load(network, tmp_path):
+    """Test a saved network loads with the same evaluations."""
+    path = tmp_path / "kish.nnue"
+    network.save(path)
+    loaded = kish.Network(path)
+    board = kish.Board()
+    for action in board.actions():
+        child = board.apply(action)
+        assert loaded.evaluate(child) == network.evaluate(child)
+
+
+def test_rejects_other_files(tmp_path):
+    """Test opening a file that is not a network raises OSError."""
+    path = tmp_path / "not-a-network"
+    path.write_bytes(b"hello")
+    with pytest.raises(OSError):
+        kish.Network(path)
+
+
+@pytest.mark.parametrize("l1", [0, 24, 528])
+def test_quantize_rejects_accumulator_size(l1):
+    """Test accumulator sizes that are not multiples of 16 up to 512 raise ValueError."""
+    weights = list(random_weights(l1=16))
+    weights[0] = np.zeros((l1, 256), np.float32)
+    weights[1] = np.zeros(l1, np.float32)
+    with pytest.raises(ValueError):
+        kish.Network.quantize(*weights)
+
+
+def test_quantize_rejects_mismatched_shapes():
+    """Test weights that do not fit together raise ValueError."""
+    weights = list(random_weights(l1=16, l2=4))
+    weights[2] = np.zeros((4, 16), np.float32)
+    with pytest.raises(ValueError):
+        kish.Network.quantize(*weights)
+
+
+def test_board_evaluate_default():
+    """Test Board.evaluate() without a network uses the built-in evaluation."""
+    assert kish.Board().evaluate() == 0
+
+
+def test_batched_evaluation_matches(network):
+    """Test evaluate_many() and evaluate_arrays() match evaluate()."""
+    boards = [kish.Board()]
+    while len(boards) < 200:
+        board = boards[-1]
+        actions = board.actions()
+        if not actions:
+            break
+        boards.append(board.apply(actions[len(boards) % len(actions)]))
+    expected = [board.evaluate(network) for board in boards]
+
+    scores = network.evaluate_many(boards, threads=2)
+    assert scores.dtype == np.int32
+    assert scores.tolist() == expected
+
+    columns = np.array([board.to_array() for board in boards], dtype=np.uint64)
+    scores = network.evaluate_arrays(*columns.T, threads=2)
+    assert scores.tolist() == expected
+
+
+def test_evaluate_arrays_rejects_bad_turn(network):
+    """Test a turn other than 0 or 1 raises ValueError."""
+    column = np.zeros(1, np.uint64)
+    with pytest.raises(ValueError):
+        network.evaluate_arrays(column, column, column, np.array([2], np.uint64))
+
+
+def test_search_with_network(network):
+    """Test a search with a network returns a legal move."""
+    board = kish.Board()
+    result = board.search(depth=4, network=network)
+    assert result.best_move in board.actions()
+    assert result.depth == 4
@@ -0,0 +1,59 @@
+"""Tests for native random playouts."""
+
+import pytest
+
+import kish
+
+pytest.importorskip("numpy")
+
+
+def test_playouts_counts_every_game():
+    """Test outcome counts and the length histogram cover every game."""
+    stats = kish.playouts(200, seed=1)
+    assert stats.games == 200
+    assert stats.white_wins + stats.black_wins + stats.draws + stats.truncated == 200
+    assert int(stats.lengths.sum()) == 200
+    assert stats.moves is None
+
+
+def test_playouts_deterministic_across_threads():
+    """Test results depend on the seed, not the thread count."""
+    a = kish.playouts(300, seed=7, threads=1)
+    b = kish.playouts(300, seed=7, threads=4)
+    assert list(a.lengths) == list(b.lengths)
+    assert (a.white_wins, a.black_wins, a.draws) == (
+        b.white_wins,
+        b.black_wins,
+        b.draws,
+    )
+
+
+@pytest.mark.parametrize("policy", ["uniform", "capture", "heuristic"])
+def test_playouts_recorded_moves_replay(policy):
+    """Test recorded move indices replay legal games of the recorded length."""
+    stats = kish.playouts(20, seed=3, policy=policy, record_moves=True)
+    assert len(stats.moves) == 20
+    for moves in stats.moves:
+        game = kish.Game()
+        for index in moves:
+            game.make_move(game.actions()[int(index)])
+        assert game.status().is_over() or len(moves) == 1000
+
+
+def test_playouts_max_plies_truncates():
+    """Test games are truncated at max_plies."""
+    stats = kish.playouts(10, max_plies=3)
+    assert stats.truncated == 10
+    assert list(stats.lengths) == [0, 0, 0, 10]
+
+
+def test_playouts_custom_board(capture_position):
+    """Test playouts from a custom start position."""
+    stats = kish.playouts(5, board=capture_position, max_plies=50)
+    assert stats.games == 5
+
+
+def test_playouts_rejects_unknown_policy():
+    """Test an unknown policy raises ValueError."""
+    with pytest.raises(ValueError):
+        kish.playouts(1, policy="greedy")
@@ -0,0 +1,71 @@
+"""Tests for binary game records."""
+
+import pytest
+
+import kish
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def games():
+    """Return recorded playout move indices."""
+    return kish.playouts(10, seed=5, record_moves=True).moves
+
+
+def replay(board, moves):
+    """Replay move indices into a Game from Python."""
+    game = kish.Game.from_board(board)
+    for index in moves:
+        game.make_move(game.actions()[index])
+    return game
+
+
+def test_record_round_trip(tmp_path, games):
+    """Test games read back as written, as Games and as move indices."""
+    path = tmp_path / "games.kgr"
+    with kish.RecordWriter(path) as writer:
+        offsets = [writer.write(kish.Board(), moves) for moves in games]
+
+    reader = kish.RecordReader(path)
+    assert reader.index().tolist() == offsets
+    read = list(reader)
+    assert [g.move_count for g in read] == [len(moves) for moves in games]
+    assert read[3].board() == replay(kish.Board(), games[3]).board()
+
+    reader.seek(offsets[4])
+    board, moves = reader.read()
+    assert board == kish.Board()
+    assert moves.dtype == np.uint16
+    assert moves.tolist() == games[4].tolist()
+
+
+def test_record_write_game(tmp_path, capture_position):
+    """Test a Game is written from the start of its history."""
+    game = kish.Game.from_board(capture_position)
+    game.make_move(game.actions()[0])
+    path = tmp_path / "game.kgr"
+    with kish.RecordWriter(path) as writer:
+        writer.write_game(game)
+
+    reader = kish.RecordReader(path)
+    read = reader.read_game()
+    assert read.board() == game.board()
+    assert read.move_count == 1
+    assert reader.read_game() is None
+
+
+def test_record_rejects_bad_input(tmp_path):
+    """Test illegal moves, closed writers and foreign files are rejected."""
+    path = tmp_path / "games.kgr"
+    writer = kish.RecordWriter(path)
+    with pytest.raises(ValueError):
+        writer.write(kish.Board(), [999])
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.write(kish.Board(), [0])
+
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a record file")
+    with pytest.raises(OSError):
+        kish.RecordReader(other)
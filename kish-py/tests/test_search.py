@@ -0,0 +1,60 @@
+"""Tests for Board.search()."""
+
+import kish
+
+
+def test_search_returns_legal_move(default_board):
+    """Test search() returns a legal best move and the requested depth."""
+    result = default_board.search(depth=5)
+    assert result.depth == 5
+    assert result.best_move in default_board.actions()
+    assert result.nodes > 0
+
+
+def test_search_pv_is_playable(default_board):
+    """Test the principal variation is a legal line starting with best_move."""
+    result = default_board.search(depth=6)
+    assert result.pv[0] == result.best_move
+    board = default_board
+    for action in result.pv:
+        assert action in board.actions()
+        board = board.apply(action)
+
+
+def test_search_finds_winning_capture():
+    """Test search() finds a capture that wins the game."""
+    board = kish.Board.from_squares(
+        turn=kish.Team.White,
+        white_squares=[kish.Square.D4, kish.Square.A1],
+        black_squares=[kish.Square.D5],
+        king_squares=[],
+    )
+    result = board.search(depth=4)
+    assert result.best_move.is_capture()
+    assert result.mate_in == 1
+
+
+def test_search_no_moves():
+    """Test search() on a lost position."""
+    board = kish.Board.from_squares(
+        turn=kish.Team.White,
+        white_squares=[],
+        black_squares=[kish.Square.D5],
+        king_squares=[],
+    )
+    result = board.search(depth=3)
+    assert result.best_move is None
+    assert result.mate_in == 0
+
+
+def test_search_node_limit(default_board):
+    """Test search() respects a node limit."""
+    result = default_board.search(nodes=2000)
+    assert result.nodes <= 2000
+    assert result.best_move is not None
+
+
+def test_search_time_limit(default_board):
+    """Test search() with a time limit returns a move."""
+    result = default_board.search(time_ms=20, tt_mb=1)
+    assert result.best_move is not None
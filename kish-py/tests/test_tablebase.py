@@ -0,0 +1,60 @@
+"""Tests for endgame tablebases."""
+
+import pytest
+
+import kish
+
+
+@pytest.fixture(scope="module")
+def tablebase_path(tmp_path_factory):
+    """Return the path of a 3-piece tablebase, generated once for the module."""
+    path = tmp_path_factory.mktemp("tablebase") / "kish-3.tb"
+    kish.Tablebase.generate(path, max_pieces=3)
+    return path
+
+
+@pytest.fixture
+def tablebase(tablebase_path):
+    """Return the 3-piece tablebase."""
+    return kish.Tablebase(tablebase_path)
+
+
+def test_tablebase_reopens(tablebase_path):
+    """Test a generated file opens again."""
+    reopened = kish.Tablebase(tablebase_path)
+    assert reopened.max_pieces == 3
+    assert repr(reopened) == "Tablebase(max_pieces=3)"
+
+
+def test_tablebase_rejects_other_files(tmp_path):
+    """Test opening a file that is not a tablebase raises OSError."""
+    path = tmp_path / "not-a-tablebase"
+    path.write_bytes(b"hello")
+    with pytest.raises(OSError):
+        kish.Tablebase(path)
+
+
+def test_probe_draw(tablebase, draw_position):
+    """Test one piece each is a draw."""
+    status, plies = draw_position.probe_tablebase(tablebase)
+    assert status.is_draw()
+    assert plies == 0
+    assert repr(tablebase.probe(draw_position)) == repr((status, plies))
+
+
+def test_probe_win(tablebase):
+    """Test a king taking both men at once wins in one ply."""
+    board = kish.Board.from_squares(
+        turn=kish.Team.Black,
+        white_squares=[kish.Square.D4, kish.Square.D2],
+        black_squares=[kish.Square.D5],
+        king_squares=[kish.Square.D5],
+    )
+    status, plies = board.probe_tablebase(tablebase)
+    assert status.winner() == kish.Team.Black
+    assert plies == 1
+
+
+def test_probe_too_many_pieces(tablebase, default_board):
+    """Test positions with more pieces than the tablebase are not found."""
+    assert default_board.probe_tablebase(tablebase) is None
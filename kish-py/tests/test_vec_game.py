@@ -0,0 +1,117 @@
+"""Tests for the vectorized VecGame environments."""
+
+import pytest
+
+import kish
+
+np = pytest.importorskip("numpy")
+
+
+def test_reset_observations():
+    """Test reset() returns start-position bitboards for every environment."""
+    envs = kish.VecGame(3)
+    obs = envs.reset()
+    assert obs.shape == (3, 4)
+    assert obs.dtype == np.uint64
+    expected = kish.Board().bitboards()
+    for row in obs:
+        assert tuple(int(v) for v in row) == expected
+
+
+def test_len_and_legal_counts():
+    """Test num_envs and legal_counts() at the start position."""
+    envs = kish.VecGame(5)
+    assert len(envs) == 5
+    assert envs.num_envs == 5
+    counts = envs.legal_counts()
+    assert counts.dtype == np.int64
+    assert np.all(counts == len(kish.Board().actions()))
+
+
+def test_step_matches_board_apply():
+    """Test step() applies the indexed action in Board.actions() order."""
+    envs = kish.VecGame(2)
+    board = kish.Board()
+    obs, rewards, dones, status, counts = envs.step(np.array([0, 3], dtype=np.int64))
+
+    for i, index in enumerate([0, 3]):
+        after = board.apply(board.actions()[index])
+        assert tuple(int(v) for v in obs[i]) == after.bitboards()
+        assert counts[i] == len(after.actions())
+    assert not dones.any()
+    assert np.all(rewards == 0)
+    assert np.all(status == 0)
+
+
+def test_legal_actions_match_board(capture_position):
+    """Test legal_actions() follows Board.actions() order."""
+    envs = kish.VecGame(1, capture_position)
+    assert envs.legal_actions(0) == capture_position.actions()
+
+
+def test_win_rewards_and_auto_reset():
+    """Test a winning move rewards the mover and resets the environment."""
+    board = kish.Board.from_squares(
+        turn=kish.Team.White,
+        white_squares=[kish.Square.D4],
+        black_squares=[kish.Square.D5],
+        king_squares=[],
+    )
+    envs = kish.VecGame(1, board)
+    obs, rewards, dones, status, counts = envs.step(np.array([0], dtype=np.int64))
+    assert dones[0]
+    assert rewards[0] == 1.0
+    assert status[0] == 2
+    assert tuple(int(v) for v in obs[0]) == board.bitboards()
+    assert envs.game(0).move_count == 0
+
+
+def test_terminal_start_reports_done():
+    """Test environments whose start board is over report it on every step."""
+    board = kish.Board.from_squares(
+        turn=kish.Team.White,
+        white_squares=[kish.Square.A1],
+        black_squares=[kish.Square.A2, kish.Square.A3, kish.Square.B1, kish.Square.C1],
+        king_squares=[],
+    )
+    envs = kish.VecGame(2, board)
+    assert envs.legal_counts().tolist() == [0, 0]
+    for _ in range(2):
+        obs, rewards, dones, status, counts = envs.step(np.zeros(2, dtype=np.int64))
+        assert dones.tolist() == [True, True]
+        assert rewards.tolist() == [0.0, 0.0]
+        assert status.tolist() == [3, 3]
+        assert counts.tolist() == [0, 0]
+        assert tuple(int(v) for v in obs[0]) == board.bitboards()
+
+
+def test_step_rejects_out_of_range():
+    """Test step() rejects bad indices without stepping any environment."""
+    envs = kish.VecGame(2)
+    with pytest.raises(IndexError):
+        envs.step(np.array([0, 1000], dtype=np.int64))
+    with pytest.raises(IndexError):
+        envs.step(np.array([-1, 0], dtype=np.int64))
+    assert envs.game(0).move_count == 0
+
+
+def test_step_rejects_wrong_length():
+    """Test step() requires one action per environment."""
+    envs = kish.VecGame(2)
+    with pytest.raises(ValueError):
+        envs.step(np.array([0], dtype=np.int64))
+
+
+def test_random_rollout_terminates():
+    """Test random play keeps counts valid and eventually finishes games."""
+    rng = np.random.default_rng(0)
+    envs = kish.VecGame(16)
+    counts = envs.legal_counts()
+    finished = 0
+    for _ in range(400):
+        choice = (rng.random(len(envs)) * counts).astype(np.int64)
+        _, _, dones, status, counts = envs.step(choice)
+        assert np.all(counts > 0)
+        assert np.all((status != 0) == dones)
+        finished += int(dones.sum())
+    assert finished > 0
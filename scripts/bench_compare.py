@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Save Criterion baselines and compare benchmark runs against them.
+
+Usage:
+  ./scripts/bench_compare.py save main             # Run benches, save as baseline "main"
+  ./scripts/bench_compare.py compare main          # Run benches, compare with "main"
+  ./scripts/bench_compare.py report main           # Compare the last run with "main"
+  ./scripts/bench_compare.py compare main --bench perft --threshold 3
+
+The comparison is printed as a Markdown table (time per iteration, change and
+throughput) ready to paste into PERFORMANCE.md. With --threshold, the script
+exits with status 1 if any benchmark got slower by more than that percentage.
+
+Set RUSTFLAGS="-C target-cpu=native" as for any other benchmark run.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CRITERION_DIR = ROOT / "target" / "criterion"
+
+
+def run_benches(bench, criterion_args):
+    """Run `cargo bench`, passing `criterion_args` through to Criterion."""
+    command = ["cargo", "bench"]
+    if bench != "all":
+        command += ["--bench", bench]
+    command += ["--", *criterion_args]
+    print("+", " ".join(command), file=sys.stderr)
+    subprocess.run(command, cwd=ROOT, check=True)
+
+
+def typical_time(directory):
+    """Return the typical time per iteration in nanoseconds, as Criterion reports it."""
+    estimates = json.loads((directory / "estimates.json").read_text())
+    estimate = estimates.get("slope") or estimates["mean"]
+    return estimate["point_estimate"]
+
+
+def collect(baseline, current):
+    """Return `(id, elements, baseline_ns, current_ns)` for every benchmark in both runs."""
+    rows = []
+    for path in sorted(CRITERION_DIR.glob(f"**/{current}/benchmark.json")):
+        directory = path.parent.parent
+        if not (directory / baseline / "estimates.json").exists():
+            continue
+        benchmark = json.loads(path.read_text())
+        throughput = benchmark.get("throughput") or {}
+        rows.append(
+            (
+                benchmark["full_id"],
+                throughput.get("Elements"),
+                typical_time(directory / baseline),
+                typical_time(directory / current),
+            )
+        )
+    return rows
+
+
+def format_time(ns):
+    """Format a duration in nanoseconds with a fitting unit."""
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.2f} ns"
+
+
+def format_rate(elements, ns):
+    """Format a throughput in elements per second."""
+    rate = elements / ns * 1e9
+    for unit, scale in (("G", 1e9), ("M", 1e6), ("K", 1e3)):
+        if rate >= scale:
+            return f"{rate / scale:.1f} {unit}elem/s"
+    return f"{rate:.1f} elem/s"
+
+
+def report(baseline, current, threshold):
+    """Print the comparison table and return the number of regressions above `threshold`."""
+    rows = collect(baseline, current)
+    if not rows:
+        sys.exit(
+            f"No benchmarks found with both '{baseline}' and '{current}' results in {CRITERION_DIR}"
+        )
+
+    regressions = 0
+    print(f"| Benchmark | {baseline} | {current} | Change | Throughput |")
+    print("|-----------|-----:|-----:|-------:|-----------:|")
+    for full_id, elements, old, new in rows:
+        change = (new - old) / old * 100
+        marker = ""
+        if threshold is not None and change > threshold:
+            regressions += 1
+            marker = " ⚠"
+        rate = format_rate(elements, new) if elements else "—"
+        print(
+            f"| {full_id} | {format_time(old)} | {format_time(new)} | {change:+.1f}%{marker} | {rate} |"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("command", choices=["save", "compare", "report"])
+    parser.add_argument("baseline", help="Name of the Criterion baseline")
+    parser.add_argument(
+        "--bench",
+        default="subsystems",
+        help="Bench target to run, or 'all' (default: subsystems)",
+    )
+    parser.add_argument(
+        "--current",
+        default="new",
+        help="Run compared with the baseline by 'report' (default: the last run)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="Fail if any benchmark is slower by more than this percentage",
+    )
+    args = parser.parse_args()
+
+    if args.command == "save":
+        run_benches(args.bench, ["--save-baseline", args.baseline])
+        return
+    if args.command == "compare":
+        run_benches(args.bench, ["--baseline", args.baseline])
+    if report(args.baseline, args.current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
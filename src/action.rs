@@ -72,7 +72,7 @@ use crate::state::{MASK_COL_A, MASK_COL_H, MASK_ROW_1, MASK_ROW_8};
 
 /// Maximum number of squares in a move path (source + up to 16 landing squares for captures).
 /// A king can theoretically capture all 16 enemy pieces in a single chain.
-const MAX_PATH_LEN: usize = 17;
+pub(crate) const MAX_PATH_LEN: usize = 17;
 
 /// Lookup table for file letters (a-h).
 const FILE_CHARS: [u8; 8] = [b'a', b'b', b'c', b'd', b'e', b'f', b'g', b'h'];
@@ -687,6 +687,10 @@ impl Action {
         let our_delta = self.delta.pieces[team_index];
         let original_pieces = original_state.pieces[team_index];
 
+        if our_delta == 0 {
+            return self.loop_to_detailed(team, original_state);
+        }
+
         // Source: bit that was set in original AND is toggled in delta
         let src_mask = our_delta & original_pieces;
         // SAFETY: src_mask is a single bit (XOR of single pieces).
@@ -746,6 +750,36 @@ impl Action {
         ActionPath::new_capture(src, &landings[..landing_count], is_promotion)
     }
 
+    /// Reconstructs a king capture sequence that ends on its start square.
+    ///
+    /// Such an action toggles no friendly bits, so the source is found by
+    /// trying each friendly king.
+    fn loop_to_detailed(self, team: Team, original_state: &State) -> ActionPath {
+        let captured_mask = self.delta.pieces[1 - team.to_usize()];
+        let mut kings = original_state.pieces[team.to_usize()] & original_state.kings;
+        while kings != 0 {
+            let king_mask = kings & kings.wrapping_neg();
+            // SAFETY: king_mask has exactly one bit set.
+            let src = unsafe { Square::from_mask(king_mask) };
+            let mut landings = [Square::A1; MAX_PATH_LEN - 1];
+            let mut landing_count = 0;
+            if Self::reconstruct_capture_path(
+                src,
+                captured_mask,
+                king_mask,
+                true,
+                team,
+                None,
+                &mut landings,
+                &mut landing_count,
+            ) {
+                return ActionPath::new_capture(src, &landings[..landing_count], false);
+            }
+            kings ^= king_mask;
+        }
+        unreachable!("a capture loop must start from a friendly king")
+    }
+
     /// Recursively reconstructs the capture path using backtracking.
     /// Returns true if a valid path was found, false otherwise.
     ///
@@ -2634,4 +2668,26 @@ mod tests {
         let capture_action = Action::new(Team::White, Square::D4, Square::D6, &[Square::D5], 0);
         assert!(!capture_action.is_empty());
     }
+
+    #[test]
+    fn to_detailed_capture_loop() {
+        // The black king can capture all four men and land back on A1
+        let board = crate::Board::from_squares(
+            Team::Black,
+            &[Square::A3, Square::C5, Square::E3, Square::C1],
+            &[Square::A1],
+            &[Square::A1],
+        );
+        let actions = board.actions();
+        let looped = actions
+            .iter()
+            .find(|action| action.delta.pieces[1] == 0)
+            .expect("capture loop not generated");
+
+        let detailed = looped.to_detailed(Team::Black, &board.state);
+        assert_eq!(detailed.source(), Square::A1);
+        assert_eq!(detailed.destination(), Square::A1);
+        assert_eq!(detailed.path_len(), 5);
+        assert!(!detailed.is_promotion());
+    }
 }
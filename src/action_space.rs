@@ -0,0 +1,272 @@
+//! A fixed action-index space for policy networks.
+//!
+//! Every action is identified by the square its piece starts on and the square
+//! it ends on:
+//!
+//! ```text
+//! index = source * 64 + destination        (0 <= index < ACTION_SPACE = 4096)
+//! ```
+//!
+//! Squares are numbered as in the bitboards (A1 = 0, H8 = 63). For captures the
+//! destination is the final landing square; a king capture that ends where it
+//! started has `source == destination`.
+//!
+//! # Ambiguous Captures
+//!
+//! A flying king can sometimes reach the same landing square by capturing
+//! different pieces. Such actions share an index, and
+//! [`Board::action_from_index`] resolves it to the first of them in
+//! [`Board::actions`] order, so the mapping is deterministic.
+//!
+//! # Perspective
+//!
+//! With `perspective` set and Black to move, squares are rotated by 180
+//! degrees (`square -> 63 - square`), matching [`Encoding::perspective`]: the
+//! side to move always plays "up" the board, and a network sees the same index
+//! for the same move of either side.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, ACTION_SPACE};
+//!
+//! let board = Board::new_default();
+//! let mask = board.legal_mask(false);
+//! assert_eq!(mask.len(), ACTION_SPACE);
+//!
+//! for action in board.actions() {
+//!     let index = action.index(&board, false);
+//!     assert!(mask[index]);
+//!     assert_eq!(board.action_from_index(index, false), Some(action));
+//! }
+//! ```
+//!
+//! [`Encoding::perspective`]: crate::Encoding::perspective
+
+use rayon::prelude::*;
+
+use crate::{Action, Board, Team};
+
+/// Number of indices in the action space (source × destination).
+pub const ACTION_SPACE: usize = 64 * 64;
+
+/// Returns the index of a move from `source` to `destination`.
+#[inline]
+const fn index_of(source: usize, destination: usize, rotate: bool) -> usize {
+    if rotate {
+        (63 - source) * 64 + (63 - destination)
+    } else {
+        source * 64 + destination
+    }
+}
+
+impl Board {
+    /// Returns true if squares are rotated for this board's side to move.
+    #[inline]
+    const fn rotates(&self, perspective: bool) -> bool {
+        perspective && matches!(self.turn, Team::Black)
+    }
+
+    /// Returns a mask over [`ACTION_SPACE`] that is true at the index of every
+    /// legal action.
+    #[must_use]
+    pub fn legal_mask(&self, perspective: bool) -> Vec<bool> {
+        let mut mask = vec![false; ACTION_SPACE];
+        self.legal_mask_into(perspective, &mut mask, &mut Vec::with_capacity(32));
+        mask
+    }
+
+    /// Writes the legal-action mask into `mask`, reusing `scratch`.
+    ///
+    /// Quiet positions are read directly from the move tables without
+    /// building actions; only captures go through full generation.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `mask.len()` is not [`ACTION_SPACE`].
+    pub fn legal_mask_into(&self, perspective: bool, mask: &mut [bool], scratch: &mut Vec<Action>) {
+        assert_eq!(
+            mask.len(),
+            ACTION_SPACE,
+            "mask must have ACTION_SPACE entries"
+        );
+        mask.fill(false);
+        let rotate = self.rotates(perspective);
+
+        self.captures_into(scratch);
+        if scratch.is_empty() {
+            self.for_each_quiet_move(|source, mut targets| {
+                while targets != 0 {
+                    let destination = targets.trailing_zeros() as usize;
+                    mask[index_of(source, destination, rotate)] = true;
+                    targets &= targets - 1;
+                }
+            });
+        } else {
+            for action in scratch.iter() {
+                mask[action.index(self, perspective)] = true;
+            }
+        }
+    }
+
+    /// Writes the legal-action masks of `boards` into `out` in parallel.
+    ///
+    /// `out` holds one [`ACTION_SPACE`]-long mask per board, in order.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len()` is not `boards.len() * ACTION_SPACE`.
+    pub fn legal_masks(boards: &[Self], perspective: bool, out: &mut [bool]) {
+        assert_eq!(
+            out.len(),
+            boards.len() * ACTION_SPACE,
+            "output must have ACTION_SPACE entries per board"
+        );
+        out.par_chunks_mut(ACTION_SPACE)
+            .zip(boards.par_iter())
+            .for_each_init(
+                || Vec::with_capacity(32),
+                |scratch, (mask, board)| board.legal_mask_into(perspective, mask, scratch),
+            );
+    }
+
+    /// Returns the legal action with index `index`, or `None` if there is none.
+    ///
+    /// When several capture sequences share the index, the first one in
+    /// [`actions`](Self::actions) order is returned.
+    #[must_use]
+    pub fn action_from_index(&self, index: usize, perspective: bool) -> Option<Action> {
+        if index >= ACTION_SPACE {
+            return None;
+        }
+        self.actions()
+            .into_iter()
+            .find(|action| action.index(self, perspective) == index)
+    }
+}
+
+impl Action {
+    /// Returns the index of this action in the action space, for the `board`
+    /// it is played on.
+    #[must_use]
+    pub fn index(&self, board: &Board, perspective: bool) -> usize {
+        let own = board.friendly_pieces();
+        let delta = self.delta.pieces[board.turn.to_usize()];
+        let (source, destination) = if delta == 0 {
+            // A capture loop back to the start square leaves no trace in the delta
+            let square = self.to_detailed(board.turn, &board.state).source() as usize;
+            (square, square)
+        } else {
+            (
+                (delta & own).trailing_zeros() as usize,
+                (delta & !own).trailing_zeros() as usize,
+            )
+        };
+        index_of(source, destination, board.rotates(perspective))
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::Square;
+
+    /// Checks the mask against the indices of the generated actions.
+    fn assert_mask_matches_actions(board: &Board, perspective: bool) {
+        let mask = board.legal_mask(perspective);
+        let mut expected = vec![false; ACTION_SPACE];
+        for action in board.actions() {
+            expected[action.index(board, perspective)] = true;
+        }
+        assert_eq!(mask, expected);
+    }
+
+    #[test]
+    fn start_position_indices() {
+        let board = Board::new_default();
+        let mask = board.legal_mask(false);
+        // A3-A4 is legal, A3-B3 is blocked
+        assert!(mask[Square::A3 as usize * 64 + Square::A4 as usize]);
+        assert!(!mask[Square::A3 as usize * 64 + Square::B3 as usize]);
+        assert_eq!(
+            mask.iter().filter(|&&legal| legal).count(),
+            board.actions().len()
+        );
+    }
+
+    #[test]
+    fn masks_match_actions() {
+        let positions = [
+            Board::new_default(),
+            Board::new_default().swap_turn(),
+            // Quiet king slides
+            Board::from_squares(
+                Team::White,
+                &[Square::D4, Square::A1],
+                &[Square::H8],
+                &[Square::D4],
+            ),
+            // Captures by a man and a flying king
+            Board::from_squares(
+                Team::Black,
+                &[Square::B6, Square::D4, Square::E3],
+                &[Square::D5, Square::C7, Square::F4, Square::G7],
+                &[Square::E3, Square::F4],
+            ),
+            // A king capture loop back to its start square
+            Board::from_squares(
+                Team::Black,
+                &[Square::A3, Square::C5, Square::E3, Square::C1],
+                &[Square::A1],
+                &[Square::A1],
+            ),
+        ];
+        for board in &positions {
+            assert_mask_matches_actions(board, false);
+            assert_mask_matches_actions(board, true);
+        }
+    }
+
+    #[test]
+    fn perspective_matches_rotated_board() {
+        let black = Board::new_default().swap_turn();
+        let mut rotated = black;
+        rotated.state.rotate_();
+        rotated.turn = Team::White;
+        assert_eq!(black.legal_mask(true), rotated.legal_mask(false));
+        assert_ne!(black.legal_mask(true), black.legal_mask(false));
+    }
+
+    #[test]
+    fn action_from_index_round_trips() {
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::B6, Square::D4, Square::E3],
+            &[Square::D5, Square::C7, Square::F4, Square::G7],
+            &[Square::E3],
+        );
+        for perspective in [false, true] {
+            for action in board.actions() {
+                let index = action.index(&board, perspective);
+                let found = board.action_from_index(index, perspective).unwrap();
+                assert_eq!(found.index(&board, perspective), index);
+            }
+        }
+        assert_eq!(board.action_from_index(0, false), None);
+        assert_eq!(board.action_from_index(ACTION_SPACE, false), None);
+    }
+
+    #[test]
+    fn batched_masks_match_single() {
+        let boards = [
+            Board::new_default(),
+            Board::new_default().swap_turn(),
+            Board::from_squares(Team::White, &[Square::D4], &[Square::D5], &[]),
+        ];
+        let mut out = vec![true; boards.len() * ACTION_SPACE];
+        Board::legal_masks(&boards, true, &mut out);
+        for (board, mask) in boards.iter().zip(out.chunks(ACTION_SPACE)) {
+            assert_eq!(mask, board.legal_mask(true).as_slice());
+        }
+    }
+}
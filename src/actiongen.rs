@@ -37,6 +37,13 @@
 //!
 //! This approach is cache-friendly and avoids allocating new board states.
 //!
+//! ## Staged Generation
+//!
+//! [`MoveGenerator`] yields the same actions lazily: captures first, then quiet
+//! moves one piece at a time, so a search that cuts off early does not pay
+//! for the rest. [`Board::has_capture`] and [`Board::has_legal_move`] answer
+//! the common questions with bulk bitboard checks and no generation at all.
+//!
 //! ## Const Generics
 //!
 //! Team-specific logic uses `const TEAM_INDEX: usize` to generate specialized
@@ -60,6 +67,7 @@ use crate::state::{
     MASK_COL_A, MASK_COL_B, MASK_COL_G, MASK_COL_H, MASK_ROW_1, MASK_ROW_2, MASK_ROW_7, MASK_ROW_8,
     MASK_ROW_PROMOTIONS,
 };
+use std::iter::FusedIterator;
 
 /// Precomputed ray masks for each direction from each square.
 /// Used for early-exit checks in king capture generation.
@@ -305,6 +313,134 @@ impl Board {
         }
     }
 
+    /// Computes only the capture actions (empty if no capture is available).
+    #[inline]
+    pub(crate) fn captures_into(&self, actions: &mut Vec<Action>) {
+        actions.clear();
+        if self.turn == Team::White {
+            self.generate_captures::<0>(actions);
+        } else {
+            self.generate_captures::<1>(actions);
+        }
+    }
+
+    /// Returns a [`MoveGenerator`] over the valid actions, produced on demand.
+    #[must_use]
+    #[inline]
+    pub fn move_generator(&self) -> MoveGenerator {
+        MoveGenerator::new(self)
+    }
+
+    /// Returns true if the side to move has a capture available.
+    ///
+    /// Captures are mandatory, so this tells whether [`actions`](Self::actions)
+    /// holds captures without generating any capture sequence.
+    #[must_use]
+    #[inline]
+    pub fn has_capture(&self) -> bool {
+        let pawn_captures = if self.turn == Team::White {
+            self.has_any_pawn_captures::<0>()
+        } else {
+            self.has_any_pawn_captures::<1>()
+        };
+        pawn_captures || self.has_any_king_captures()
+    }
+
+    /// Returns true if the side to move has any valid action.
+    #[must_use]
+    #[inline]
+    pub const fn has_legal_move(&self) -> bool {
+        !self.is_blocked()
+    }
+
+    /// Quick check if any king can start a capture: the first piece along one
+    /// of its rays is hostile, with an empty square right behind it.
+    fn has_any_king_captures(&self) -> bool {
+        let empty = self.state.empty();
+        let hostile = self.hostile_pieces();
+        let mut friendly_kings = self.friendly_pieces() & self.state.kings;
+
+        while friendly_kings != 0 {
+            let sq = friendly_kings.trailing_zeros() as usize;
+            let mut targets = Self::king_attacks_lut(sq, !empty) & hostile;
+            while targets != 0 {
+                let target = targets.trailing_zeros() as usize;
+                let target_mask = 1u64 << target;
+                let landing = if target / 8 == sq / 8 {
+                    if target < sq {
+                        (target_mask & !MASK_COL_A) >> 1
+                    } else {
+                        (target_mask & !MASK_COL_H) << 1
+                    }
+                } else if target > sq {
+                    (target_mask & !MASK_ROW_8) << 8
+                } else {
+                    (target_mask & !MASK_ROW_1) >> 8
+                };
+                if landing & empty != 0 {
+                    return true;
+                }
+                targets ^= target_mask;
+            }
+            friendly_kings &= friendly_kings - 1;
+        }
+        false
+    }
+
+    /// Calls `f(source, destinations)` for every friendly piece, with the
+    /// bitboard of its non-capturing destinations (possibly empty).
+    ///
+    /// These are the legal actions only when no capture is available.
+    #[inline]
+    pub(crate) fn for_each_quiet_move(&self, mut f: impl FnMut(usize, u64)) {
+        let empty = self.state.empty();
+        let kings = self.state.kings;
+        let mut pieces = self.friendly_pieces();
+        while pieces != 0 {
+            let src_mask = pieces & pieces.wrapping_neg();
+            let sq = src_mask.trailing_zeros() as usize;
+            let targets = if kings & src_mask != 0 {
+                Self::king_attacks_lut(sq, !empty)
+            } else if self.turn == Team::White {
+                WHITE_PAWN_MOVES[sq]
+            } else {
+                BLACK_PAWN_MOVES[sq]
+            };
+            f(sq, targets & empty);
+            pieces ^= src_mask;
+        }
+    }
+
+    /// Calls `f(destination, sources)` for every piece of the side that just
+    /// moved, with the bitboard of squares it could have come from by a
+    /// non-capturing, non-promoting move (possibly empty).
+    ///
+    /// This is quiet move generation run backwards, for retrograde analysis.
+    /// It does not check that the move was legal (captures are mandatory).
+    #[inline]
+    pub(crate) fn for_each_quiet_unmove(&self, mut f: impl FnMut(usize, u64)) {
+        let empty = self.state.empty();
+        let kings = self.state.kings;
+        let mover = self.turn.opponent();
+        let mut pieces = self.hostile_pieces();
+        while pieces != 0 {
+            let dest_mask = pieces & pieces.wrapping_neg();
+            let sq = dest_mask.trailing_zeros() as usize;
+            // A man steps forward or sideways, so it came from behind or beside
+            let sources = if kings & dest_mask != 0 {
+                Self::king_attacks_lut(sq, !empty)
+            } else if dest_mask & MASK_ROW_PROMOTIONS[mover.to_usize()] != 0 {
+                0
+            } else if mover == Team::White {
+                BLACK_PAWN_MOVES[sq]
+            } else {
+                WHITE_PAWN_MOVES[sq]
+            };
+            f(sq, sources & empty);
+            pieces ^= dest_mask;
+        }
+    }
+
     /// Counts the number of valid actions using the provided scratch buffer.
     ///
     /// This is faster than `actions_into` when you only need the count,
@@ -989,6 +1125,179 @@ impl Board {
     }
 }
 
+/// Generates the valid actions of a board in stages, on demand.
+///
+/// Captures come first: they are generated together, since the maximum
+/// capture rule needs every sequence to pick the longest ones. Only when there
+/// are none are quiet moves produced, one piece at a time as the iterator is
+/// advanced, so a search that cuts off early skips the rest. Actions come in
+/// the same order as [`Board::actions`].
+///
+/// # Example
+///
+/// ```rust
+/// use kish::Board;
+///
+/// let board = Board::new_default();
+/// let mut moves = board.move_generator();
+/// let first = moves.next().unwrap();
+/// assert_eq!(first, board.actions()[0]);
+/// assert!(!moves.is_capturing());
+/// ```
+#[derive(Debug, Clone)]
+pub struct MoveGenerator {
+    board: Board,
+    stage: Stage,
+    captures: Vec<Action>,
+    next_capture: usize,
+    empty: u64,
+    /// Friendly kings, then pawns, whose quiet moves are still to generate.
+    kings: u64,
+    pawns: u64,
+    /// The piece whose quiet moves are being produced, and its destinations left.
+    source: u64,
+    source_is_king: bool,
+    targets: u64,
+}
+
+/// How far a [`MoveGenerator`] has got.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+enum Stage {
+    Start,
+    Captures,
+    Quiet,
+}
+
+impl MoveGenerator {
+    /// Creates a generator over the valid actions of `board`.
+    #[must_use]
+    pub fn new(board: &Board) -> Self {
+        Self::with_buffer(board, Vec::new())
+    }
+
+    /// Creates a generator that collects captures into `buffer`, reusing its
+    /// allocation. Get it back with [`into_buffer`](Self::into_buffer).
+    #[must_use]
+    pub fn with_buffer(board: &Board, mut buffer: Vec<Action>) -> Self {
+        buffer.clear();
+        Self {
+            board: *board,
+            stage: Stage::Start,
+            captures: buffer,
+            next_capture: 0,
+            empty: 0,
+            kings: 0,
+            pawns: 0,
+            source: 0,
+            source_is_king: false,
+            targets: 0,
+        }
+    }
+
+    /// Returns the capture buffer, for reuse by another generator.
+    #[must_use]
+    pub fn into_buffer(self) -> Vec<Action> {
+        self.captures
+    }
+
+    /// Returns true if the actions are captures.
+    ///
+    /// This generates the captures if they have not been yet.
+    pub fn is_capturing(&mut self) -> bool {
+        self.start();
+        self.stage == Stage::Captures
+    }
+
+    /// Generates the captures, and if there are none sets up the quiet moves.
+    fn start(&mut self) {
+        if self.stage != Stage::Start {
+            return;
+        }
+        self.board.captures_into(&mut self.captures);
+        if self.captures.is_empty() {
+            let friendly = self.board.friendly_pieces();
+            self.empty = self.board.state.empty();
+            self.kings = friendly & self.board.state.kings;
+            self.pawns = friendly & !self.board.state.kings;
+            self.stage = Stage::Quiet;
+        } else {
+            self.stage = Stage::Captures;
+        }
+    }
+
+    /// Moves on to the next piece with quiet moves, returning false if none is left.
+    fn next_source(&mut self) -> bool {
+        while self.targets == 0 {
+            let (pieces, is_king) = if self.kings != 0 {
+                (&mut self.kings, true)
+            } else if self.pawns != 0 {
+                (&mut self.pawns, false)
+            } else {
+                return false;
+            };
+            let src_mask = *pieces & pieces.wrapping_neg();
+            *pieces ^= src_mask;
+            let sq = src_mask.trailing_zeros() as usize;
+            let targets = if is_king {
+                Board::king_attacks_lut(sq, !self.empty)
+            } else if self.board.turn == Team::White {
+                WHITE_PAWN_MOVES[sq]
+            } else {
+                BLACK_PAWN_MOVES[sq]
+            };
+            self.source = src_mask;
+            self.source_is_king = is_king;
+            self.targets = targets & self.empty;
+        }
+        true
+    }
+}
+
+impl Iterator for MoveGenerator {
+    type Item = Action;
+
+    #[inline]
+    fn next(&mut self) -> Option<Action> {
+        self.start();
+        if self.stage == Stage::Captures {
+            let action = self.captures.get(self.next_capture).copied();
+            self.next_capture += action.is_some() as usize;
+            return action;
+        }
+        if !self.next_source() {
+            return None;
+        }
+        let dest_mask = self.targets & self.targets.wrapping_neg();
+        self.targets ^= dest_mask;
+        Some(match (self.board.turn, self.source_is_king) {
+            (Team::White, true) => Action::new_move_as_king::<0>(self.source, dest_mask),
+            (Team::White, false) => Action::new_move_as_pawn::<0>(self.source, dest_mask),
+            (Team::Black, true) => Action::new_move_as_king::<1>(self.source, dest_mask),
+            (Team::Black, false) => Action::new_move_as_pawn::<1>(self.source, dest_mask),
+        })
+    }
+
+    fn size_hint(&self) -> (usize, Option<usize>) {
+        match self.stage {
+            Stage::Start => (0, None),
+            Stage::Captures => {
+                let left = self.captures.len() - self.next_capture;
+                (left, Some(left))
+            }
+            Stage::Quiet => {
+                let lower = self.targets.count_ones() as usize;
+                if self.kings | self.pawns == 0 {
+                    (lower, Some(lower))
+                } else {
+                    (lower, None)
+                }
+            }
+        }
+    }
+}
+
+impl FusedIterator for MoveGenerator {}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -2672,4 +2981,104 @@ mod tests {
             }
         }
     }
+
+    /// Positions along a few deterministic games, covering captures, kings,
+    /// promotions and both sides to move.
+    fn game_positions() -> Vec<Board> {
+        let mut positions = Vec::new();
+        for stride in [1usize, 3, 7, 11] {
+            let mut board = Board::new_default();
+            for ply in 0..200 {
+                let actions = board.actions();
+                positions.push(board);
+                if actions.is_empty() {
+                    break;
+                }
+                board = board.apply(&actions[(ply * stride) % actions.len()]);
+                board.swap_turn_();
+            }
+        }
+        positions
+    }
+
+    #[test]
+    fn move_generator_matches_actions() {
+        let mut buffer = Vec::new();
+        for board in game_positions() {
+            let mut generator = MoveGenerator::with_buffer(&board, buffer);
+            let actions = board.actions();
+            assert_eq!(
+                generator.is_capturing(),
+                actions.first().is_some_and(|a| a.is_capture(board.turn))
+            );
+            let generated: Vec<Action> = generator.by_ref().collect();
+            assert_eq!(generated, actions, "{board}");
+            assert_eq!(generator.next(), None);
+            assert_eq!(generator.size_hint(), (0, Some(0)));
+            buffer = generator.into_buffer();
+        }
+    }
+
+    #[test]
+    fn move_generator_quiet_moves_are_lazy() {
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::D4, Square::A2, Square::H2],
+            &[Square::H8],
+            &[Square::D4],
+        );
+        let mut generator = board.move_generator();
+        let first = generator.next().unwrap();
+        assert!(!generator.is_capturing());
+        // Only the king's slides are generated so far, the pawns come later
+        assert_eq!(generator.size_hint(), (13, None));
+        assert_eq!(first, board.actions()[0]);
+    }
+
+    #[test]
+    fn move_generator_yields_only_captures() {
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::D4, Square::A2],
+            &[Square::D5, Square::H8],
+            &[],
+        );
+        let mut generator = board.move_generator();
+        assert!(generator.is_capturing());
+        assert_eq!(generator.size_hint(), (1, Some(1)));
+        assert_eq!(generator.count(), 1);
+    }
+
+    #[test]
+    fn has_capture_and_has_legal_move_match_actions() {
+        for board in game_positions() {
+            let actions = board.actions();
+            assert_eq!(board.has_legal_move(), !actions.is_empty(), "{board}");
+            assert_eq!(
+                board.has_capture(),
+                actions.first().is_some_and(|a| a.is_capture(board.turn)),
+                "{board}"
+            );
+        }
+    }
+
+    #[test]
+    fn king_capture_from_distance_is_detected() {
+        // Hostile piece far along the file with room behind it
+        let board = Board::from_squares(Team::White, &[Square::D1], &[Square::D6], &[Square::D1]);
+        assert!(board.has_capture());
+        // Blocked behind by another piece
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::D1],
+            &[Square::D6, Square::D7],
+            &[Square::D1],
+        );
+        assert!(!board.has_capture());
+        // Hostile piece on the edge cannot be jumped
+        let board = Board::from_squares(Team::White, &[Square::A4], &[Square::H4], &[Square::A4]);
+        assert!(!board.has_capture());
+        let board = Board::from_squares(Team::Black, &[Square::H4], &[Square::A4], &[Square::A4]);
+        assert!(!board.has_capture());
+    }
 }
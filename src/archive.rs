@@ -0,0 +1,673 @@
+//! Importing game archives in a PDN-style text format.
+//!
+//! An archive holds any number of games, each an optional block of
+//! `[Name "value"]` headers followed by numbered moves in the notation read by
+//! [`Board::parse_action`] and a result:
+//!
+//! ```text
+//! [Event "Club championship"]
+//! [White "Ayşe"]
+//! [Black "Mehmet"]
+//! [Result "1-0"]
+//!
+//! 1. a3-a4 h6-h5 2. b3-b4 {quiet opening} g6-g5 ...
+//! 17. c7-c8=K 1-0
+//! ```
+//!
+//! Move numbers, `{...}` and `;` comments, `(...)` variations, `$n`
+//! annotations and `!`/`?` suffixes are skipped. Results are `1-0`, `0-1`,
+//! `1/2-1/2`, `2-0`, `0-2`, `1-1` or `*`. A `[FEN "W:Wa2,Kd4:Bh7"]` header
+//! sets up a custom starting position: the side to move, then each side's
+//! pieces, kings prefixed with `K`. Otherwise games start from the standard
+//! position.
+//!
+//! Each game is replayed as it is parsed, and stored as a [`GameRecord`]: the
+//! index of every move in [`Board::actions`] order, ready for a
+//! [`RecordWriter`](crate::RecordWriter) or a
+//! [`DatasetWriter`](crate::DatasetWriter). Games are split apart first, then
+//! parsed in parallel on the rayon pool.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::parse_archive;
+//!
+//! let text = "[Event \"Demo\"]\n1. a3-a4 h6-h5 2. b3-b4 *\n\n1. e3-e4 1/2-1/2\n";
+//! let games = parse_archive(text);
+//! assert_eq!(games.len(), 2);
+//! let first = games[0].as_ref().unwrap();
+//! assert_eq!(first.header("Event"), Some("Demo"));
+//! assert_eq!(first.record.moves.len(), 3);
+//! assert_eq!(first.record.replay().unwrap().move_count(), 3);
+//! ```
+
+use std::collections::VecDeque;
+use std::fmt;
+use std::fs::File;
+use std::io::{self, BufRead, BufReader};
+use std::path::{Path, PathBuf};
+
+use rayon::prelude::*;
+
+use crate::notation::parse_square;
+use crate::{Action, Board, GameRecord, State, Team};
+
+/// Tokens that end a game.
+const RESULTS: [&str; 7] = ["1-0", "0-1", "1/2-1/2", "2-0", "0-2", "1-1", "*"];
+
+/// Number of games an [`ArchiveReader`] parses in parallel at a time.
+const BATCH_GAMES: usize = 4096;
+
+/// A game read from an archive.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct ArchiveGame {
+    /// The `[Name "value"]` headers, in order.
+    pub headers: Vec<(String, String)>,
+    /// The starting position and the index of every move.
+    pub record: GameRecord,
+}
+
+impl ArchiveGame {
+    /// Returns the value of the first header called `name`.
+    #[must_use]
+    pub fn header(&self, name: &str) -> Option<&str> {
+        self.headers
+            .iter()
+            .find(|(key, _)| key == name)
+            .map(|(_, value)| value.as_str())
+    }
+}
+
+/// A game of an archive that could not be read.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct ArchiveError {
+    /// The line of the archive where the problem is, counting from 1.
+    pub line: usize,
+    /// What went wrong.
+    pub message: String,
+}
+
+impl fmt::Display for ArchiveError {
+    fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        write!(f, "line {}: {}", self.line, self.message)
+    }
+}
+
+impl std::error::Error for ArchiveError {}
+
+/// Parses every game of an archive held in memory, in parallel.
+///
+/// Returns one entry per game, in order. A game with a bad header or an
+/// illegal move is an error; the others are unaffected.
+#[must_use]
+pub fn parse_archive(text: &str) -> Vec<Result<ArchiveGame, ArchiveError>> {
+    let mut splitter = Splitter::default();
+    let mut chunks = Vec::new();
+    for (index, line) in text.lines().enumerate() {
+        chunks.extend(splitter.push(line, index + 1));
+    }
+    chunks.extend(splitter.finish());
+    let parsed: Vec<Vec<_>> = chunks
+        .par_iter()
+        .map(|chunk| parse_chunk(&chunk.text, chunk.line))
+        .collect();
+    parsed.into_iter().flatten().collect()
+}
+
+/// The text of one game (or more, if the archive does not separate them).
+#[derive(Debug)]
+struct Chunk {
+    text: String,
+    line: usize,
+}
+
+/// Cuts an archive into games, line by line.
+#[derive(Debug, Default)]
+struct Splitter {
+    text: String,
+    line: usize,
+    has_moves: bool,
+}
+
+impl Splitter {
+    /// Adds line number `line`, returning the previous game if it ended.
+    fn push(&mut self, text: &str, line: usize) -> Option<Chunk> {
+        let trimmed = text.trim();
+        let mut done = None;
+        if trimmed.starts_with('[') && self.has_moves {
+            done = self.finish();
+        }
+        if self.text.is_empty() {
+            if trimmed.is_empty() {
+                return done;
+            }
+            self.line = line;
+        }
+        self.text.push_str(text);
+        self.text.push('\n');
+        if !trimmed.is_empty() && !trimmed.starts_with('[') {
+            self.has_moves = true;
+            let last = trimmed.rsplit(char::is_whitespace).next();
+            if last.is_some_and(|token| RESULTS.contains(&token)) {
+                // Only one game can end here, so `done` is still empty.
+                return self.finish();
+            }
+        }
+        done
+    }
+
+    /// Returns the game being collected, if any.
+    fn finish(&mut self) -> Option<Chunk> {
+        self.has_moves = false;
+        if self.text.is_empty() {
+            return None;
+        }
+        Some(Chunk {
+            text: std::mem::take(&mut self.text),
+            line: self.line,
+        })
+    }
+}
+
+/// A game being parsed.
+struct Parser {
+    headers: Vec<(String, String)>,
+    start: Board,
+    board: Board,
+    moves: Vec<u16>,
+    error: Option<ArchiveError>,
+    started: bool,
+    scratch: Vec<Action>,
+}
+
+impl Parser {
+    fn new() -> Self {
+        Self {
+            headers: Vec::new(),
+            start: Board::new_default(),
+            board: Board::new_default(),
+            moves: Vec::new(),
+            error: None,
+            started: false,
+            scratch: Vec::with_capacity(48),
+        }
+    }
+
+    fn fail(&mut self, line: usize, message: String) {
+        if self.error.is_none() {
+            self.error = Some(ArchiveError { line, message });
+        }
+    }
+
+    fn header(&mut self, text: &str, line: usize) {
+        let inner = text.trim_start_matches('[').trim_end_matches(']').trim();
+        let (name, value) = inner.split_once(char::is_whitespace).unwrap_or((inner, ""));
+        let value = value.trim().trim_matches('"');
+        if name == "FEN" {
+            match parse_fen(value) {
+                Some(board) if !self.started => {
+                    self.start = board;
+                    self.board = board;
+                }
+                Some(_) => self.fail(line, "FEN header after the moves".into()),
+                None => self.fail(line, format!("invalid FEN '{value}'")),
+            }
+        }
+        self.headers.push((name.to_string(), value.to_string()));
+    }
+
+    fn token(&mut self, token: &str, line: usize) {
+        let token = token.trim_start_matches(|c: char| c.is_ascii_digit());
+        let token = token.trim_start_matches('.');
+        let token = token.trim_end_matches(['!', '?']);
+        if token.is_empty() || token.starts_with('$') || self.error.is_some() {
+            return;
+        }
+        self.started = true;
+        match self.board.parse_action_index(token, &mut self.scratch) {
+            Ok((index, action)) => {
+                self.moves.push(index as u16);
+                self.board = self.board.apply(&action);
+                self.board.swap_turn_();
+            }
+            Err(error) => self.fail(line, format!("'{token}': {error}")),
+        }
+    }
+
+    /// Returns the game parsed so far and starts the next one.
+    fn take(&mut self) -> Result<ArchiveGame, ArchiveError> {
+        let game = std::mem::replace(self, Self::new());
+        self.scratch = game.scratch;
+        match game.error {
+            Some(error) => Err(error),
+            None => Ok(ArchiveGame {
+                headers: game.headers,
+                record: GameRecord {
+                    start: game.start,
+                    moves: game.moves,
+                },
+            }),
+        }
+    }
+
+    fn is_empty(&self) -> bool {
+        !self.started && self.headers.is_empty() && self.error.is_none()
+    }
+}
+
+/// Parses the games in `text`, whose first line is line number `first_line`.
+fn parse_chunk(text: &str, first_line: usize) -> Vec<Result<ArchiveGame, ArchiveError>> {
+    let mut games = Vec::new();
+    let mut parser = Parser::new();
+    let mut token = String::new();
+    let mut in_comment = false;
+    let mut variations = 0usize;
+
+    for (offset, text) in text.lines().enumerate() {
+        let line = first_line + offset;
+        let trimmed = text.trim();
+        if !in_comment && variations == 0 && trimmed.starts_with('[') {
+            if parser.started {
+                games.push(parser.take());
+            }
+            parser.header(trimmed, line);
+            continue;
+        }
+        for ch in text.chars().chain(std::iter::once(' ')) {
+            if in_comment {
+                in_comment = ch != '}';
+                continue;
+            }
+            if variations > 0 {
+                match ch {
+                    '(' => variations += 1,
+                    ')' => variations -= 1,
+                    '{' => in_comment = true,
+                    _ => {}
+                }
+                continue;
+            }
+            match ch {
+                '{' => in_comment = true,
+                '(' => variations = 1,
+                ';' => {}
+                c if !c.is_whitespace() => {
+                    token.push(c);
+                    continue;
+                }
+                _ => {}
+            }
+            if RESULTS.contains(&token.as_str()) {
+                games.push(parser.take());
+            } else if !token.is_empty() {
+                parser.token(&token, line);
+            }
+            token.clear();
+            if ch == ';' {
+                break;
+            }
+        }
+    }
+    if !parser.is_empty() {
+        games.push(parser.take());
+    }
+    games
+}
+
+/// Parses a PDN-style `FEN` value such as `W:Wa2,Kd4:Bh7`.
+fn parse_fen(text: &str) -> Option<Board> {
+    let mut fields = text.split(':');
+    let turn = match fields.next()?.trim() {
+        "W" => Team::White,
+        "B" => Team::Black,
+        _ => return None,
+    };
+    let mut pieces = [0u64; 2];
+    let mut kings = 0;
+    for field in fields {
+        let field = field.trim();
+        let team = match field.as_bytes().first()? {
+            b'W' => Team::White,
+            b'B' => Team::Black,
+            _ => return None,
+        };
+        for square in field[1..]
+            .split(',')
+            .map(str::trim)
+            .filter(|s| !s.is_empty())
+        {
+            let (is_king, square) = match square.strip_prefix('K') {
+                Some(square) => (true, square),
+                None => (false, square),
+            };
+            let &[file, rank] = square.as_bytes() else {
+                return None;
+            };
+            let mask = parse_square(file, rank)?.to_mask();
+            if (pieces[0] | pieces[1]) & mask != 0 {
+                return None;
+            }
+            pieces[team.to_usize()] |= mask;
+            if is_king {
+                kings |= mask;
+            }
+        }
+    }
+    if pieces.iter().any(|pieces| pieces.count_ones() > 16) {
+        return None;
+    }
+    Some(Board::new(turn, State::new(pieces, kings)))
+}
+
+/// Reads games from archive files, parsing them in parallel.
+///
+/// Files are read one line at a time and cut into games; once a few thousand
+/// are collected, from one file or across several, they are parsed on the
+/// rayon pool together. Memory stays bounded by that batch, however large the
+/// files.
+///
+/// Yields each game in file order. A game that cannot be parsed is an
+/// `InvalidData` error naming its file and line; reading carries on with the
+/// next game. Errors from opening or reading a file are returned as they are,
+/// and the rest of that file is skipped.
+///
+/// # Example
+///
+/// ```rust,no_run
+/// use kish::ArchiveReader;
+///
+/// for game in ArchiveReader::new(["club.pdn", "online.pdn"]) {
+///     match game {
+///         Ok(game) => println!("{} moves", game.record.moves.len()),
+///         Err(error) => eprintln!("skipped: {error}"),
+///     }
+/// }
+/// ```
+#[derive(Debug)]
+pub struct ArchiveReader {
+    paths: VecDeque<PathBuf>,
+    file: Option<OpenArchive>,
+    /// The game being cut from `file`, which may span batches.
+    splitter: Splitter,
+    games: VecDeque<io::Result<ArchiveGame>>,
+}
+
+/// The file an [`ArchiveReader`] is reading.
+#[derive(Debug)]
+struct OpenArchive {
+    path: PathBuf,
+    reader: BufReader<File>,
+    line: usize,
+}
+
+/// A batch entry: a game's text, or an error met while reading.
+enum Pending {
+    Game(Chunk, usize),
+    Error(io::Error),
+}
+
+impl ArchiveReader {
+    /// Creates a reader over the archive files at `paths`, read in order.
+    /// Files are opened as they are reached.
+    pub fn new<P: AsRef<Path>>(paths: impl IntoIterator<Item = P>) -> Self {
+        Self {
+            paths: paths
+                .into_iter()
+                .map(|path| path.as_ref().to_path_buf())
+                .collect(),
+            file: None,
+            splitter: Splitter::default(),
+            games: VecDeque::new(),
+        }
+    }
+
+    /// Reads and parses the next batch of games.
+    fn fill(&mut self) {
+        let mut files: Vec<PathBuf> = Vec::new();
+        let mut batch = Vec::new();
+        let mut text = String::new();
+        let mut games = 0;
+        while games < BATCH_GAMES {
+            let Some(file) = &mut self.file else {
+                let Some(path) = self.paths.pop_front() else {
+                    break;
+                };
+                match File::open(&path) {
+                    Ok(file) => {
+                        self.file = Some(OpenArchive {
+                            path,
+                            reader: BufReader::new(file),
+                            line: 0,
+                        });
+                    }
+                    Err(error) => batch.push(Pending::Error(error)),
+                }
+                continue;
+            };
+            if files.last() != Some(&file.path) {
+                files.push(file.path.clone());
+            }
+            text.clear();
+            let chunk = match file.reader.read_line(&mut text) {
+                Ok(0) => {
+                    self.file = None;
+                    self.splitter.finish()
+                }
+                Ok(_) => {
+                    file.line += 1;
+                    self.splitter
+                        .push(text.trim_end_matches(['\n', '\r']), file.line)
+                }
+                Err(error) => {
+                    self.file = None;
+                    batch.extend(
+                        self.splitter
+                            .finish()
+                            .map(|chunk| Pending::Game(chunk, files.len() - 1)),
+                    );
+                    batch.push(Pending::Error(error));
+                    continue;
+                }
+            };
+            if let Some(chunk) = chunk {
+                batch.push(Pending::Game(chunk, files.len() - 1));
+                games += 1;
+            }
+        }
+        let parsed: Vec<Vec<io::Result<ArchiveGame>>> = batch
+            .into_par_iter()
+            .map(|pending| match pending {
+                Pending::Game(chunk, file) => parse_chunk(&chunk.text, chunk.line)
+                    .into_iter()
+                    .map(|game| {
+                        game.map_err(|error| {
+                            io::Error::new(
+                                io::ErrorKind::InvalidData,
+                                format!("{}: {error}", files[file].display()),
+                            )
+                        })
+                    })
+                    .collect(),
+                Pending::Error(error) => vec![Err(error)],
+            })
+            .collect();
+        self.games.extend(parsed.into_iter().flatten());
+    }
+}
+
+impl Iterator for ArchiveReader {
+    type Item = io::Result<ArchiveGame>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        while self.games.is_empty() && (self.file.is_some() || !self.paths.is_empty()) {
+            self.fill();
+        }
+        self.games.pop_front()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{GameStatus, Playouts, Square};
+    use std::fs;
+
+    /// Returns recorded playouts written as an archive, with their records.
+    fn playout_archive(games: u64) -> (String, Vec<GameRecord>) {
+        let playouts = Playouts {
+            seed: 4,
+            record_moves: true,
+            ..Playouts::default()
+        };
+        let start = Board::new_default();
+        let mut text = String::new();
+        let mut records = Vec::new();
+        for (number, moves) in playouts.run(&start, games).moves.into_iter().enumerate() {
+            text.push_str(&format!("[Event \"Game {number}\"]\n[Result \"*\"]\n\n"));
+            let mut board = start;
+            for (ply, &index) in moves.iter().enumerate() {
+                if ply % 2 == 0 {
+                    text.push_str(&format!("{}. ", ply / 2 + 1));
+                }
+                let action = board.actions()[index as usize];
+                text.push_str(&action.to_detailed(board.turn, &board.state).to_notation());
+                text.push(if ply % 12 == 11 { '\n' } else { ' ' });
+                board = board.apply(&action);
+                board.swap_turn_();
+            }
+            text.push_str("*\n\n");
+            records.push(canonical(GameRecord { start, moves }));
+        }
+        (text, records)
+    }
+
+    /// Returns `record` with each move index pointing at the first of any
+    /// identical actions, as parsing does.
+    fn canonical(mut record: GameRecord) -> GameRecord {
+        let mut board = record.start;
+        for index in &mut record.moves {
+            let actions = board.actions();
+            let action = actions[*index as usize];
+            *index = actions.iter().position(|other| *other == action).unwrap() as u16;
+            board = board.apply(&action);
+            board.swap_turn_();
+        }
+        record
+    }
+
+    #[test]
+    fn archive_round_trips_playouts() {
+        let (text, records) = playout_archive(40);
+        let games = parse_archive(&text);
+        assert_eq!(games.len(), records.len());
+        for (number, (game, record)) in games.iter().zip(&records).enumerate() {
+            let game = game.as_ref().unwrap();
+            assert_eq!(&game.record, record);
+            assert_eq!(
+                game.header("Event"),
+                Some(format!("Game {number}").as_str())
+            );
+            assert_eq!(game.header("Result"), Some("*"));
+        }
+    }
+
+    #[test]
+    fn comments_variations_and_annotations_are_skipped() {
+        let text = "1. a3-a4! {a comment\nover two lines} h6-h5 (2. e3-e4 {side line (} e6-e5)\n\
+                    2. b3-b4?! $1 ; the rest of the line\n\n1/2-1/2\n";
+        let games = parse_archive(text);
+        assert_eq!(games.len(), 1);
+        let game = games[0].as_ref().unwrap();
+        let replayed = game.record.replay().unwrap();
+        let mut board = Board::new_default();
+        for notation in ["a3-a4", "h6-h5", "b3-b4"] {
+            board = board.apply(&board.parse_action(notation).unwrap());
+            board.swap_turn_();
+        }
+        assert_eq!(replayed.board(), &board);
+    }
+
+    #[test]
+    fn games_without_headers_split_on_results() {
+        let text = "1. d3-d4 d6-d5 1-0 1. e3-e4 0-1\n1. a3-a4 *";
+        let games: Vec<_> = parse_archive(text)
+            .into_iter()
+            .map(Result::unwrap)
+            .collect();
+        let lengths: Vec<_> = games.iter().map(|game| game.record.moves.len()).collect();
+        assert_eq!(lengths, [2, 1, 1]);
+        assert!(games.iter().all(|game| game.headers.is_empty()));
+    }
+
+    #[test]
+    fn illegal_move_fails_only_its_game() {
+        let text = "[Event \"A\"]\n1. d3-d4 d6-d5\n*\n\n[Event \"B\"]\n1. d3-d5 *\n\n[Event \"C\"]\n1. h3-h4 *\n";
+        let games = parse_archive(text);
+        assert_eq!(games.len(), 3);
+        assert!(games[0].is_ok() && games[2].is_ok());
+        let error = games[1].as_ref().unwrap_err();
+        assert_eq!(error.line, 6);
+        assert!(error.to_string().contains("'d3-d5'"), "{error}");
+    }
+
+    #[test]
+    fn fen_header_sets_the_start() {
+        let text = "[FEN \"B:Wa2,Kd4:Bh7,Kh8\"]\n1. h7-h6 d4-d5 *\n";
+        let game = parse_archive(text).remove(0).unwrap();
+        let expected = Board::from_squares(
+            Team::Black,
+            &[Square::A2, Square::D4],
+            &[Square::H7, Square::H8],
+            &[Square::D4, Square::H8],
+        );
+        assert_eq!(game.record.start, expected);
+        assert_eq!(game.record.moves.len(), 2);
+
+        for fen in ["X:Wa2:Bh7", "W:Wa2,a2:Bh7", "W:Wz9:Bh7", "W:Qa2"] {
+            assert!(parse_fen(fen).is_none(), "{fen}");
+        }
+        assert!(parse_archive("[FEN \"X\"]\n1. d3-d4 *\n")[0].is_err());
+    }
+
+    #[test]
+    fn finished_game_replays_to_its_result() {
+        let board = Board::from_squares(Team::White, &[Square::D4], &[Square::D5], &[]);
+        let text = "[FEN \"W:Wd4:Bd5\"]\n1. d4xd6 1-0\n";
+        let game = parse_archive(text).remove(0).unwrap();
+        assert_eq!(game.record.start, board);
+        assert_eq!(
+            game.record.replay().unwrap().status(),
+            GameStatus::Won(Team::White)
+        );
+    }
+
+    #[test]
+    fn reader_matches_parse_across_files() {
+        let dir = std::env::temp_dir().join(format!("kish-archive-{}", std::process::id()));
+        fs::create_dir_all(&dir).unwrap();
+        let (first, mut records) = playout_archive(30);
+        let (second, more) = playout_archive(5);
+        records.extend(more);
+        let paths = [
+            dir.join("a.pdn"),
+            dir.join("missing.pdn"),
+            dir.join("b.pdn"),
+        ];
+        fs::write(&paths[0], &first).unwrap();
+        fs::write(&paths[2], format!("{second}[Event \"bad\"]\n1. a1-a2 *\n")).unwrap();
+
+        let games: Vec<_> = ArchiveReader::new(&paths).collect();
+        assert_eq!(games.len(), records.len() + 2);
+        let (ok, errors): (Vec<_>, Vec<_>) = games.into_iter().partition(Result::is_ok);
+        let read: Vec<GameRecord> = ok.into_iter().map(|game| game.unwrap().record).collect();
+        assert_eq!(read, records);
+        assert_eq!(
+            errors[0].as_ref().unwrap_err().kind(),
+            io::ErrorKind::NotFound
+        );
+        let error = errors[1].as_ref().unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidData);
+        assert!(error.to_string().contains("b.pdn: line"), "{error}");
+        fs::remove_dir_all(&dir).unwrap();
+    }
+}
@@ -196,6 +196,14 @@ impl Board {
     /// Computes the status of the board.
     #[must_use]
     pub fn status(&self) -> GameStatus {
+        self.status_with_blocked(Self::is_blocked)
+    }
+
+    /// Computes the status of the board, asking `is_blocked` whether the side
+    /// to move has no legal action. Lets callers that already generated the
+    /// actions skip the scan.
+    #[inline]
+    pub(crate) fn status_with_blocked(&self, is_blocked: impl FnOnce(&Self) -> bool) -> GameStatus {
         let friendly_pieces = self.friendly_pieces();
         let hostile_pieces = self.hostile_pieces();
 
@@ -215,7 +223,7 @@ impl Board {
         }
 
         // If friendlies have no actions, then hostiles have won
-        if self.is_blocked() {
+        if is_blocked(self) {
             return GameStatus::Won(self.turn.opponent());
         }
 
@@ -232,7 +240,7 @@ impl Board {
     ///
     /// # Preconditions
     /// Caller must ensure both teams have pieces (checked by `status()`).
-    const fn is_blocked(&self) -> bool {
+    pub(crate) const fn is_blocked(&self) -> bool {
         let friendly_pieces = self.friendly_pieces();
         let hostile_pieces = self.hostile_pieces();
         let friendly_kings = friendly_pieces & self.state.kings;
@@ -248,13 +256,37 @@ impl Board {
             return false;
         }
 
+        // Check if any king can capture an adjacent hostile backwards
+        if self.can_any_king_capture_backward(friendly_kings, hostile_pieces, empty) {
+            return false;
+        }
+
         // Note: King flying captures are NOT checked here because they're redundant:
-        // - Adjacent hostile with empty landing → found by can_any_piece_capture_simple
+        // - Adjacent hostile with empty landing → found by the two capture checks above
         // - Non-adjacent hostile (via ray) → requires empty adjacent squares → found by can_any_piece_move
 
         true
     }
 
+    /// Returns the empty squares that some friendly piece can step to (1 square).
+    pub(crate) const fn step_targets(&self) -> u64 {
+        let friendly_pieces = self.friendly_pieces();
+        let friendly_kings = friendly_pieces & self.state.kings;
+        let (forward, backward) = match self.turn {
+            Team::White => (
+                (friendly_pieces & !MASK_ROW_8) << 8,
+                (friendly_kings & !MASK_ROW_1) >> 8,
+            ),
+            Team::Black => (
+                (friendly_pieces & !MASK_ROW_1) >> 8,
+                (friendly_kings & !MASK_ROW_8) << 8,
+            ),
+        };
+        let sideways =
+            ((friendly_pieces & !MASK_COL_A) >> 1) | ((friendly_pieces & !MASK_COL_H) << 1);
+        (forward | backward | sideways) & self.state.empty()
+    }
+
     /// Checks if any piece can make a simple 1-square move.
     const fn can_any_piece_move(
         &self,
@@ -323,6 +355,24 @@ impl Board {
         };
         vertical_captures != 0
     }
+
+    /// Checks if any king can capture an adjacent hostile behind it (jumping 1 square).
+    const fn can_any_king_capture_backward(
+        &self,
+        friendly_kings: u64,
+        hostile_pieces: u64,
+        empty: u64,
+    ) -> bool {
+        let backward_captures = match self.turn {
+            Team::White => {
+                (((friendly_kings & !(MASK_ROW_1 | MASK_ROW_2)) >> 8) & hostile_pieces) >> 8 & empty
+            }
+            Team::Black => {
+                (((friendly_kings & !(MASK_ROW_7 | MASK_ROW_8)) << 8) & hostile_pieces) << 8 & empty
+            }
+        };
+        backward_captures != 0
+    }
 }
 
 impl fmt::Display for Board {
@@ -549,6 +599,28 @@ mod tests {
         assert_eq!(board.status(), GameStatus::Won(Team::Black));
     }
 
+    #[test]
+    fn status_king_blocked_can_capture_backward() {
+        // The white king on A8 can only move by capturing A7 behind it
+        let board = Board::from_squares(
+            Team::White,
+            &[
+                Square::A8,
+                Square::B8,
+                Square::C8,
+                Square::D8,
+                Square::E8,
+                Square::F8,
+                Square::G8,
+                Square::H8,
+            ],
+            &[Square::A7],
+            &[Square::A8],
+        );
+        assert!(!board.actions().is_empty());
+        assert_eq!(board.status(), GameStatus::InProgress);
+    }
+
     #[test]
     fn swap_turn_returns_new_board() {
         let board = Board::new_default();
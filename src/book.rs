@@ -0,0 +1,562 @@
+//! Opening books built from game corpora or searched enumeration.
+//!
+//! A [`Book`] maps positions, by [`Board::zobrist`] key, to statistics of the
+//! moves played from them. Engines probe it for the first plies of a game and
+//! pick a move at random in proportion to its weight, instead of searching
+//! well-known openings again.
+//!
+//! # Building
+//!
+//! A [`BookBuilder`] collects statistics in memory from two sources:
+//!
+//! - Games, with [`add`](BookBuilder::add) or
+//!   [`add_game`](BookBuilder::add_game): the first plies of every game count
+//!   each move played, scored by the game's result for the side that played it.
+//! - Enumeration, with [`enumerate`](BookBuilder::enumerate): every position
+//!   within a number of plies of a start, found with [`Board::actions`], has
+//!   each of its moves scored by a shallow [`Search`] of the position it leads
+//!   to. Positions are searched in parallel on the rayon pool.
+//!
+//! Scores are in hundredths of a game: a win adds 100, a loss subtracts 100
+//! and a draw or unknown result adds nothing. A search score is clamped to
+//! ±100, so that being a man up counts as a win. The weight of a move is
+//! `100 × count + score`, which is 200 per win and 100 per draw as in
+//! Polyglot books, and 0 for moves that only lost.
+//!
+//! # File Format
+//!
+//! Little-endian. An 8-byte magic `KISHBK\0` plus a version byte and the
+//! number of entries (`u64`), then one 24-byte entry per position and move,
+//! sorted by key and move:
+//!
+//! ```text
+//! key     u64  Board::zobrist of the position
+//! count   u32  number of times the move was added
+//! score   i32  sum of results, in hundredths of a game
+//! weight  u32  selection weight
+//! move    u16  index of the move in Board::actions order
+//! pad     u16
+//! ```
+//!
+//! Probes binary search the file through a memory map, so opening is instant,
+//! only the pages touched are loaded, and processes that open the same file
+//! share its pages through the page cache.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, BookBuilder, Rng};
+//!
+//! let mut builder = BookBuilder::new(8);
+//! builder.enumerate(&Board::new_default(), 2, 2);
+//! let path = std::env::temp_dir().join("kish-book-doc.bk");
+//! let book = builder.build(&path, 1)?;
+//!
+//! let board = Board::new_default();
+//! let moves = book.probe(&board);
+//! assert_eq!(moves.len(), board.actions().len());
+//! let action = book.choose(&board, &mut Rng::new(7)).unwrap();
+//! assert!(board.actions().contains(&action));
+//! # std::fs::remove_file(&path)?;
+//! # Ok::<(), std::io::Error>(())
+//! ```
+
+use std::collections::{BTreeMap, HashSet};
+use std::fs::File;
+use std::io::{self, BufWriter, Write};
+use std::path::Path;
+
+use memmap2::Mmap;
+use rayon::prelude::*;
+
+use crate::{Action, Board, Game, GameRecord, GameStatus, Rng, Search, SearchLimits};
+
+/// File magic, ending with the format version.
+const MAGIC: &[u8; 8] = b"KISHBK\0\x01";
+
+/// Bytes before the entries: magic and entry count.
+const HEADER_LEN: usize = 16;
+
+/// Bytes per entry.
+const ENTRY_LEN: usize = 24;
+
+/// Score of a won game, and the clamp of search scores.
+const WIN_SCORE: i32 = 100;
+
+/// Transposition table size of each enumeration worker, in megabytes.
+const SEARCH_TT_MB: usize = 4;
+
+/// Statistics of a move from a book position.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct BookMove {
+    /// The move.
+    pub action: Action,
+    /// Number of times the move was added to the book.
+    pub count: u32,
+    /// Sum of results for the side playing the move, in hundredths of a game.
+    pub score: i32,
+    /// Selection weight.
+    pub weight: u32,
+}
+
+/// Move statistics accumulated by a [`BookBuilder`].
+#[derive(Debug, Clone, Copy, Default)]
+struct Stats {
+    count: u32,
+    score: i64,
+}
+
+impl Stats {
+    /// Score clamped to the file's range.
+    fn score(&self) -> i32 {
+        self.score.clamp(i32::MIN.into(), i32::MAX.into()) as i32
+    }
+
+    /// Selection weight: 200 per win and 100 per draw.
+    fn weight(&self) -> u32 {
+        let weight = i64::from(self.count) * i64::from(WIN_SCORE) + self.score;
+        weight.clamp(0, u32::MAX.into()) as u32
+    }
+}
+
+/// Collects opening statistics and writes them as a [`Book`].
+///
+/// See the [module documentation](self) for how moves are scored.
+#[derive(Debug, Clone, Default)]
+pub struct BookBuilder {
+    plies: usize,
+    /// Statistics by position key and move index, in file order.
+    moves: BTreeMap<(u64, u16), Stats>,
+}
+
+impl BookBuilder {
+    /// Creates an empty builder that keeps the first `plies` moves of each game.
+    #[must_use]
+    pub fn new(plies: usize) -> Self {
+        Self {
+            plies,
+            moves: BTreeMap::new(),
+        }
+    }
+
+    /// Returns the number of distinct position and move pairs collected.
+    #[must_use]
+    pub fn len(&self) -> usize {
+        self.moves.len()
+    }
+
+    /// Returns true if nothing has been collected.
+    #[must_use]
+    pub fn is_empty(&self) -> bool {
+        self.moves.is_empty()
+    }
+
+    /// Adds the first plies of a game given as a starting position and move
+    /// indices in [`Board::actions`] order, as in a [`GameRecord`].
+    ///
+    /// Games without a result (`GameStatus::InProgress`) count as draws.
+    /// Returns false, adding nothing, if a move index is out of range for its
+    /// position.
+    pub fn add(&mut self, start: &Board, moves: &[u16], result: GameStatus) -> bool {
+        let moves = &moves[..moves.len().min(self.plies)];
+        let mut positions = Vec::with_capacity(moves.len());
+        let mut board = *start;
+        let mut actions = Vec::with_capacity(48);
+        for &index in moves {
+            board.actions_into(&mut actions);
+            let Some(action) = actions.get(index as usize) else {
+                return false;
+            };
+            positions.push((board.zobrist(), index, board.turn));
+            board = board.apply(action);
+            board.swap_turn_();
+        }
+
+        for (key, index, turn) in positions {
+            let score = match result {
+                GameStatus::Won(team) if team == turn => WIN_SCORE,
+                GameStatus::Won(_) => -WIN_SCORE,
+                GameStatus::Draw | GameStatus::InProgress => 0,
+            };
+            self.insert(key, index, 1, score);
+        }
+        true
+    }
+
+    /// Adds the first plies of `game`, from the start of its history, scored
+    /// by its current status.
+    pub fn add_game(&mut self, game: &Game) {
+        if let Some(record) = GameRecord::from_game(game) {
+            self.add(&record.start, &record.moves, game.status());
+        }
+    }
+
+    /// Adds every move of every position less than `plies` plies from
+    /// `start`, scored by a search of the position it leads to.
+    ///
+    /// Each position is added once, however many move orders reach it, and
+    /// each move is scored by a `depth`-ply search of the position it leads
+    /// to. Runs on the rayon pool.
+    pub fn enumerate(&mut self, start: &Board, plies: usize, depth: u8) {
+        let limits = SearchLimits {
+            depth,
+            ..SearchLimits::default()
+        };
+        let mut seen = HashSet::from([start.zobrist()]);
+        let mut frontier = vec![*start];
+        for _ in 0..plies {
+            let scored: Vec<(Board, Vec<(Board, i32)>)> = frontier
+                .par_iter()
+                .map_init(
+                    || Search::new(SEARCH_TT_MB),
+                    |search, board| {
+                        let children = board
+                            .actions()
+                            .iter()
+                            .map(|action| {
+                                let mut child = board.apply(action);
+                                child.swap_turn_();
+                                let score = -search.search(&child, &limits).score;
+                                (child, score.clamp(-WIN_SCORE, WIN_SCORE))
+                            })
+                            .collect();
+                        (*board, children)
+                    },
+                )
+                .collect();
+
+            frontier.clear();
+            for (board, children) in scored {
+                let key = board.zobrist();
+                for (index, (child, score)) in children.into_iter().enumerate() {
+                    self.insert(key, index as u16, 1, score);
+                    if seen.insert(child.zobrist()) {
+                        frontier.push(child);
+                    }
+                }
+            }
+        }
+    }
+
+    /// Adds `count` occurrences of a move with a total of `score`.
+    fn insert(&mut self, key: u64, index: u16, count: u32, score: i32) {
+        let stats = self.moves.entry((key, index)).or_default();
+        stats.count = stats.count.saturating_add(count);
+        stats.score += i64::from(score);
+    }
+
+    /// Writes the moves added at least `min_count` times to `path` and opens
+    /// the book.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the file cannot be written or mapped.
+    pub fn build(&self, path: impl AsRef<Path>, min_count: u32) -> io::Result<Book> {
+        let path = path.as_ref();
+        let entries: Vec<_> = self
+            .moves
+            .iter()
+            .filter(|(_, stats)| stats.count >= min_count)
+            .collect();
+
+        let mut writer = BufWriter::new(File::create(path)?);
+        writer.write_all(MAGIC)?;
+        writer.write_all(&(entries.len() as u64).to_le_bytes())?;
+        for (&(key, index), stats) in entries {
+            writer.write_all(&key.to_le_bytes())?;
+            writer.write_all(&stats.count.to_le_bytes())?;
+            writer.write_all(&stats.score().to_le_bytes())?;
+            writer.write_all(&stats.weight().to_le_bytes())?;
+            writer.write_all(&index.to_le_bytes())?;
+            writer.write_all(&[0, 0])?;
+        }
+        writer.flush()?;
+        drop(writer);
+        Book::open(path)
+    }
+}
+
+/// A memory-mapped opening book.
+///
+/// See the [module documentation](self) for how books are built and stored.
+pub struct Book {
+    map: Mmap,
+    len: usize,
+}
+
+impl Book {
+    /// Opens a book written by [`BookBuilder::build`].
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the file cannot be mapped, or
+    /// [`io::ErrorKind::InvalidData`] if it is not a valid book.
+    pub fn open(path: impl AsRef<Path>) -> io::Result<Self> {
+        let file = File::open(path)?;
+        // SAFETY: the map is read-only; book files are not modified while in use
+        let map = unsafe { Mmap::map(&file)? };
+
+        let invalid =
+            |message: &str| io::Error::new(io::ErrorKind::InvalidData, message.to_owned());
+        if map.len() < HEADER_LEN || &map[..8] != MAGIC {
+            return Err(invalid("not a kish opening book"));
+        }
+        let len = u64::from_le_bytes(map[8..16].try_into().unwrap());
+        let size = len
+            .checked_mul(ENTRY_LEN as u64)
+            .and_then(|size| size.checked_add(HEADER_LEN as u64));
+        if size != Some(map.len() as u64) {
+            return Err(invalid("truncated opening book"));
+        }
+
+        Ok(Self {
+            map,
+            len: len as usize,
+        })
+    }
+
+    /// Returns the number of position and move entries.
+    #[must_use]
+    pub const fn len(&self) -> usize {
+        self.len
+    }
+
+    /// Returns true if the book has no entries.
+    #[must_use]
+    pub const fn is_empty(&self) -> bool {
+        self.len == 0
+    }
+
+    /// Returns the bytes of entry `index`.
+    #[inline]
+    fn entry(&self, index: usize) -> &[u8] {
+        let start = HEADER_LEN + index * ENTRY_LEN;
+        &self.map[start..start + ENTRY_LEN]
+    }
+
+    /// Returns the key of entry `index`.
+    #[inline]
+    fn key(&self, index: usize) -> u64 {
+        u64::from_le_bytes(self.entry(index)[..8].try_into().unwrap())
+    }
+
+    /// Returns the statistics of every book move from `board`, in
+    /// [`Board::actions`] order, or an empty list if the position is not in
+    /// the book.
+    #[must_use]
+    pub fn probe(&self, board: &Board) -> Vec<BookMove> {
+        let key = board.zobrist();
+        // First entry with a key not below `key`.
+        let (mut low, mut high) = (0, self.len);
+        while low < high {
+            let middle = low + (high - low) / 2;
+            if self.key(middle) < key {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+        if low == self.len || self.key(low) != key {
+            return Vec::new();
+        }
+
+        let actions = board.actions();
+        let word =
+            |entry: &[u8], at: usize| u32::from_le_bytes(entry[at..at + 4].try_into().unwrap());
+        (low..self.len)
+            .take_while(|&index| self.key(index) == key)
+            .filter_map(|index| {
+                let entry = self.entry(index);
+                let action = u16::from_le_bytes([entry[20], entry[21]]);
+                Some(BookMove {
+                    action: *actions.get(action as usize)?,
+                    count: word(entry, 8),
+                    score: word(entry, 12) as i32,
+                    weight: word(entry, 16),
+                })
+            })
+            .collect()
+    }
+
+    /// Picks a book move from `board` at random, in proportion to the move
+    /// weights, or returns `None` if the position is not in the book or all
+    /// its moves have zero weight.
+    pub fn choose(&self, board: &Board, rng: &mut Rng) -> Option<Action> {
+        let moves = self.probe(board);
+        let total: u64 = moves.iter().map(|entry| u64::from(entry.weight)).sum();
+        if total == 0 {
+            return None;
+        }
+        let mut target = rng.below(total);
+        moves.into_iter().find_map(|entry| {
+            let weight = u64::from(entry.weight);
+            if target < weight {
+                Some(entry.action)
+            } else {
+                target -= weight;
+                None
+            }
+        })
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::Team;
+
+    /// Returns a path in the temporary directory unique to this process.
+    fn temp_path(name: &str) -> std::path::PathBuf {
+        std::env::temp_dir().join(format!("kish-test-{}-{name}.bk", std::process::id()))
+    }
+
+    #[test]
+    fn games_are_scored_by_result() {
+        let start = Board::new_default();
+        let mut builder = BookBuilder::new(2);
+        builder.add(&start, &[0, 1, 2], GameStatus::Won(Team::White));
+        builder.add(&start, &[0, 3], GameStatus::Draw);
+        builder.add(&start, &[1], GameStatus::Won(Team::Black));
+        // The third move of the first game is beyond the ply limit.
+        assert_eq!(builder.len(), 4);
+
+        let path = temp_path("scores");
+        let book = builder.build(&path, 1).unwrap();
+        std::fs::remove_file(&path).ok();
+        assert_eq!(book.len(), 4);
+
+        let actions = start.actions();
+        let moves = book.probe(&start);
+        assert_eq!(
+            moves,
+            vec![
+                BookMove {
+                    action: actions[0],
+                    count: 2,
+                    score: 100,
+                    weight: 300,
+                },
+                BookMove {
+                    action: actions[1],
+                    count: 1,
+                    score: -100,
+                    weight: 0,
+                },
+            ]
+        );
+
+        let mut child = start.apply(&actions[0]);
+        child.swap_turn_();
+        let moves = book.probe(&child);
+        assert_eq!(moves.len(), 2);
+        assert_eq!((moves[0].count, moves[0].score), (1, -100));
+        assert_eq!((moves[1].count, moves[1].score), (1, 0));
+    }
+
+    #[test]
+    fn min_count_drops_rare_moves() {
+        let start = Board::new_default();
+        let mut builder = BookBuilder::new(1);
+        builder.add(&start, &[0], GameStatus::Draw);
+        builder.add(&start, &[0], GameStatus::Draw);
+        builder.add(&start, &[1], GameStatus::Draw);
+        let path = temp_path("min-count");
+        let book = builder.build(&path, 2).unwrap();
+        std::fs::remove_file(&path).ok();
+        assert_eq!(book.len(), 1);
+        assert_eq!(book.probe(&start)[0].action, start.actions()[0]);
+    }
+
+    #[test]
+    fn add_rejects_illegal_moves() {
+        let mut builder = BookBuilder::new(10);
+        assert!(!builder.add(&Board::new_default(), &[0, 500], GameStatus::Draw));
+        assert!(builder.is_empty());
+    }
+
+    #[test]
+    fn add_game_uses_history() {
+        let mut game = Game::new();
+        for _ in 0..3 {
+            let action = game.actions()[0];
+            game.make_move(&action);
+        }
+        let mut builder = BookBuilder::new(10);
+        builder.add_game(&game);
+        assert_eq!(builder.len(), 3);
+    }
+
+    #[test]
+    fn enumeration_covers_every_position() {
+        let start = Board::new_default();
+        let mut builder = BookBuilder::new(0);
+        builder.enumerate(&start, 2, 1);
+        // One entry per move from the start and from each distinct child.
+        let children: HashSet<Board> = start
+            .actions()
+            .iter()
+            .map(|action| {
+                let mut child = start.apply(action);
+                child.swap_turn_();
+                child
+            })
+            .collect();
+        let expected = start.actions().len()
+            + children
+                .iter()
+                .map(|child| child.actions().len())
+                .sum::<usize>();
+        assert_eq!(builder.len(), expected);
+
+        let path = temp_path("enumeration");
+        let book = builder.build(&path, 1).unwrap();
+        std::fs::remove_file(&path).ok();
+        for child in &children {
+            let moves = book.probe(child);
+            assert_eq!(moves.len(), child.actions().len());
+            assert!(moves
+                .iter()
+                .all(|entry| entry.count == 1 && entry.score.abs() <= 100));
+        }
+        assert!(book
+            .probe(&Board::from_squares(Team::White, &[], &[], &[]))
+            .is_empty());
+    }
+
+    #[test]
+    fn choose_follows_weights() {
+        let start = Board::new_default();
+        let mut builder = BookBuilder::new(1);
+        for _ in 0..3 {
+            builder.add(&start, &[2], GameStatus::Won(Team::White));
+        }
+        builder.add(&start, &[5], GameStatus::Draw);
+        builder.add(&start, &[6], GameStatus::Won(Team::Black));
+        let path = temp_path("choose");
+        let book = builder.build(&path, 1).unwrap();
+        std::fs::remove_file(&path).ok();
+
+        let actions = start.actions();
+        let mut rng = Rng::new(11);
+        let mut counts = [0; 2];
+        for _ in 0..7000 {
+            let action = book.choose(&start, &mut rng).unwrap();
+            assert_ne!(action, actions[6]);
+            counts[usize::from(action == actions[5])] += 1;
+        }
+        // Weights 600 and 100.
+        assert!((5600..6400).contains(&counts[0]), "{counts:?}");
+        let mut child = start.apply(&actions[2]);
+        child.swap_turn_();
+        assert!(book.choose(&child, &mut rng).is_none());
+    }
+
+    #[test]
+    fn open_rejects_other_files() {
+        let path = temp_path("invalid");
+        std::fs::write(&path, b"KISHBK\0\x01\x05\0\0\0\0\0\0\0").unwrap();
+        let error = Book::open(&path).err().unwrap();
+        std::fs::remove_file(&path).ok();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidData);
+    }
+}
@@ -0,0 +1,454 @@
+//! Move counting over many boards at once, in struct-of-arrays layout.
+//!
+//! [`BoardColumns`] views a batch of positions as four parallel slices: white
+//! pieces, black pieces, kings and the side to move. Its methods answer the
+//! same questions as [`Board::count_actions`], [`Board::has_capture`] and
+//! [`Board::has_legal_move`] for every position, without per-board branching:
+//!
+//! - Men step and jump by shifting whole bitboards, one shift per direction.
+//! - Kings slide by occluded (Kogge-Stone) fills through the empty squares,
+//!   so every king on the board is handled in three shifts per direction.
+//! - The side to move is applied as a bit mask rather than a branch.
+//!
+//! The kernel is straight-line integer code over plain slices, which the
+//! compiler can auto-vectorize for whatever SIMD width the target supports.
+//! Only positions with a capture fall back to full generation, since the
+//! maximum capture rule needs every sequence to count them.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, BoardColumns};
+//!
+//! let boards = [Board::new_default(), Board::new_default().swap_turn()];
+//! let white: Vec<u64> = boards.iter().map(|b| b.state.pieces[0]).collect();
+//! let black: Vec<u64> = boards.iter().map(|b| b.state.pieces[1]).collect();
+//! let kings: Vec<u64> = boards.iter().map(|b| b.state.kings).collect();
+//! let turn: Vec<u64> = boards.iter().map(|b| b.turn.to_usize() as u64).collect();
+//!
+//! let columns = BoardColumns::new(&white, &black, &kings, &turn);
+//! let mut counts = vec![0; columns.len()];
+//! columns.count_actions(&mut counts);
+//! assert_eq!(counts[0] as usize, boards[0].actions().len());
+//! ```
+
+use rayon::prelude::*;
+
+use crate::state::{MASK_COL_A, MASK_COL_H, MASK_ROW_1, MASK_ROW_8};
+use crate::{Board, State, Team};
+
+/// Boards per parallel task; large enough to amortize scheduling, small
+/// enough for the columns of a task to stay in cache.
+const CHUNK: usize = 4096;
+
+/// A batch of positions stored as one slice per bitboard.
+///
+/// `turn` holds 0 for White to move and 1 for Black.
+#[derive(Debug, Clone, Copy)]
+pub struct BoardColumns<'a> {
+    white: &'a [u64],
+    black: &'a [u64],
+    kings: &'a [u64],
+    turn: &'a [u64],
+}
+
+impl<'a> BoardColumns<'a> {
+    /// Creates a view over the given columns.
+    ///
+    /// # Panics
+    ///
+    /// Panics if the slices do not all have the same length.
+    #[must_use]
+    pub fn new(white: &'a [u64], black: &'a [u64], kings: &'a [u64], turn: &'a [u64]) -> Self {
+        let len = white.len();
+        assert!(
+            black.len() == len && kings.len() == len && turn.len() == len,
+            "columns must have the same length"
+        );
+        Self {
+            white,
+            black,
+            kings,
+            turn,
+        }
+    }
+
+    /// Returns the number of positions.
+    #[must_use]
+    pub const fn len(&self) -> usize {
+        self.white.len()
+    }
+
+    /// Returns true if there are no positions.
+    #[must_use]
+    pub const fn is_empty(&self) -> bool {
+        self.white.is_empty()
+    }
+
+    /// Returns the position at `index`.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `index` is out of range.
+    #[must_use]
+    pub fn board(&self, index: usize) -> Board {
+        let turn = if self.turn[index] == 0 {
+            Team::White
+        } else {
+            Team::Black
+        };
+        Board::new(
+            turn,
+            State::new([self.white[index], self.black[index]], self.kings[index]),
+        )
+    }
+
+    /// Returns the positions in `start..start + len`.
+    fn range(&self, start: usize, len: usize) -> Self {
+        let end = start + len;
+        Self {
+            white: &self.white[start..end],
+            black: &self.black[start..end],
+            kings: &self.kings[start..end],
+            turn: &self.turn[start..end],
+        }
+    }
+
+    /// Writes the number of valid actions of every position into `out`, as
+    /// [`Board::count_actions`] would.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len()` is not [`len`](Self::len).
+    pub fn count_actions(&self, out: &mut [u32]) {
+        assert_eq!(
+            out.len(),
+            self.len(),
+            "output must have one entry per board"
+        );
+        out.par_chunks_mut(CHUNK).enumerate().for_each_init(
+            || Vec::with_capacity(48),
+            |scratch, (chunk, out)| {
+                let columns = self.range(chunk * CHUNK, out.len());
+                let mut any_capture = false;
+                for (i, count) in out.iter_mut().enumerate() {
+                    let (quiet, capture) = mobility(
+                        columns.white[i],
+                        columns.black[i],
+                        columns.kings[i],
+                        columns.turn[i],
+                    );
+                    // Flag captures in the high bit for the second pass
+                    *count = quiet | u32::from(capture) << 31;
+                    any_capture |= capture;
+                }
+                if any_capture {
+                    for (i, count) in out.iter_mut().enumerate() {
+                        if *count >> 31 != 0 {
+                            *count = columns.board(i).count_actions(scratch) as u32;
+                        }
+                    }
+                }
+            },
+        );
+    }
+
+    /// Writes whether each position has a capture available into `out`, as
+    /// [`Board::has_capture`] would.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len()` is not [`len`](Self::len).
+    pub fn has_captures(&self, out: &mut [bool]) {
+        self.fill(out, |white, black, kings, turn| {
+            mobility(white, black, kings, turn).1
+        });
+    }
+
+    /// Writes whether each position has any valid action into `out`, as
+    /// [`Board::has_legal_move`] would. A position without one is blocked.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len()` is not [`len`](Self::len).
+    pub fn has_legal_moves(&self, out: &mut [bool]) {
+        self.fill(out, has_action);
+    }
+
+    /// Writes `f(white, black, kings, turn)` for every position into `out`.
+    fn fill(&self, out: &mut [bool], f: impl Fn(u64, u64, u64, u64) -> bool + Sync) {
+        assert_eq!(
+            out.len(),
+            self.len(),
+            "output must have one entry per board"
+        );
+        out.par_chunks_mut(CHUNK)
+            .enumerate()
+            .for_each(|(chunk, out)| {
+                let columns = self.range(chunk * CHUNK, out.len());
+                for (i, value) in out.iter_mut().enumerate() {
+                    *value = f(
+                        columns.white[i],
+                        columns.black[i],
+                        columns.kings[i],
+                        columns.turn[i],
+                    );
+                }
+            });
+    }
+}
+
+/// Shifts every piece one square towards column A, dropping those on it.
+#[inline(always)]
+const fn west(pieces: u64) -> u64 {
+    (pieces & !MASK_COL_A) >> 1
+}
+
+/// Shifts every piece one square towards column H, dropping those on it.
+#[inline(always)]
+const fn east(pieces: u64) -> u64 {
+    (pieces & !MASK_COL_H) << 1
+}
+
+/// Shifts every piece one row up, dropping those on row 8.
+#[inline(always)]
+const fn north(pieces: u64) -> u64 {
+    (pieces & !MASK_ROW_8) << 8
+}
+
+/// Shifts every piece one row down, dropping those on row 1.
+#[inline(always)]
+const fn south(pieces: u64) -> u64 {
+    (pieces & !MASK_ROW_1) >> 8
+}
+
+/// Shifts every piece one row towards the promotion row of the side to move.
+#[inline(always)]
+const fn forward(pieces: u64, black_to_move: u64) -> u64 {
+    (north(pieces) & !black_to_move) | (south(pieces) & black_to_move)
+}
+
+/// Shifts every piece one row away from the promotion row of the side to move.
+#[inline(always)]
+const fn backward(pieces: u64, black_to_move: u64) -> u64 {
+    (south(pieces) & !black_to_move) | (north(pieces) & black_to_move)
+}
+
+/// Extends every piece in `pieces` towards column A over `empty` squares.
+#[inline(always)]
+const fn fill_west(mut pieces: u64, empty: u64) -> u64 {
+    let mut open = empty & !MASK_COL_H;
+    pieces |= open & (pieces >> 1);
+    open &= open >> 1;
+    pieces |= open & (pieces >> 2);
+    open &= open >> 2;
+    pieces | (open & (pieces >> 4))
+}
+
+/// Extends every piece in `pieces` towards column H over `empty` squares.
+#[inline(always)]
+const fn fill_east(mut pieces: u64, empty: u64) -> u64 {
+    let mut open = empty & !MASK_COL_A;
+    pieces |= open & (pieces << 1);
+    open &= open << 1;
+    pieces |= open & (pieces << 2);
+    open &= open << 2;
+    pieces | (open & (pieces << 4))
+}
+
+/// Extends every piece in `pieces` upwards over `empty` squares.
+#[inline(always)]
+const fn fill_north(mut pieces: u64, empty: u64) -> u64 {
+    let mut open = empty;
+    pieces |= open & (pieces << 8);
+    open &= open << 8;
+    pieces |= open & (pieces << 16);
+    open &= open << 16;
+    pieces | (open & (pieces << 32))
+}
+
+/// Extends every piece in `pieces` downwards over `empty` squares.
+#[inline(always)]
+const fn fill_south(mut pieces: u64, empty: u64) -> u64 {
+    let mut open = empty;
+    pieces |= open & (pieces >> 8);
+    open &= open >> 8;
+    pieces |= open & (pieces >> 16);
+    open &= open >> 16;
+    pieces | (open & (pieces >> 32))
+}
+
+/// Returns the number of non-capturing moves of the side to move, and whether
+/// it has a capture (in which case only captures are valid).
+///
+/// Within one direction, no two pieces can reach the same square (a slide
+/// stops at the first occupied square), so destinations are counted with one
+/// popcount per direction.
+#[inline(always)]
+const fn mobility(white: u64, black: u64, kings: u64, turn: u64) -> (u32, bool) {
+    let black_to_move = 0u64.wrapping_sub((turn != 0) as u64);
+    let occupied = white | black;
+    let empty = !occupied;
+    let friendly = (white & !black_to_move) | (black & black_to_move);
+    let hostile = occupied ^ friendly;
+    let friendly_kings = friendly & kings;
+    let friendly_pawns = friendly & !kings;
+
+    // Men step forward or sideways, and capture the same way
+    let forward_pawns = forward(friendly_pawns, black_to_move);
+    let pawn_moves = (west(friendly_pawns) & empty).count_ones()
+        + (east(friendly_pawns) & empty).count_ones()
+        + (forward_pawns & empty).count_ones();
+    let pawn_jumps = west(west(friendly_pawns) & hostile)
+        | east(east(friendly_pawns) & hostile)
+        | forward(forward_pawns & hostile, black_to_move);
+
+    // Kings slide in all four directions up to the first piece, which they
+    // can capture if it is hostile with an empty square behind it
+    let to_west = fill_west(friendly_kings, empty);
+    let to_east = fill_east(friendly_kings, empty);
+    let to_north = fill_north(friendly_kings, empty);
+    let to_south = fill_south(friendly_kings, empty);
+    let king_moves = (to_west ^ friendly_kings).count_ones()
+        + (to_east ^ friendly_kings).count_ones()
+        + (to_north ^ friendly_kings).count_ones()
+        + (to_south ^ friendly_kings).count_ones();
+    let king_jumps = west(west(to_west) & hostile)
+        | east(east(to_east) & hostile)
+        | north(north(to_north) & hostile)
+        | south(south(to_south) & hostile);
+
+    (
+        pawn_moves + king_moves,
+        (pawn_jumps | king_jumps) & empty != 0,
+    )
+}
+
+/// Returns whether the side to move has any valid action.
+///
+/// A king that can slide or capture at a distance has an empty square next to
+/// it, so single steps and jumps over a neighbour of every piece suffice.
+#[inline(always)]
+const fn has_action(white: u64, black: u64, kings: u64, turn: u64) -> bool {
+    let black_to_move = 0u64.wrapping_sub((turn != 0) as u64);
+    let occupied = white | black;
+    let friendly = (white & !black_to_move) | (black & black_to_move);
+    let hostile = occupied ^ friendly;
+    let friendly_kings = friendly & kings;
+
+    let forward_steps = forward(friendly, black_to_move);
+    let backward_steps = backward(friendly_kings, black_to_move);
+    let steps = west(friendly) | east(friendly) | forward_steps | backward_steps;
+    let jumps = west(west(friendly) & hostile)
+        | east(east(friendly) & hostile)
+        | forward(forward_steps & hostile, black_to_move)
+        | backward(backward_steps & hostile, black_to_move);
+    (steps | jumps) & !occupied != 0
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{Rng, Square};
+
+    /// Positions from a few deterministic games, plus random ones with many
+    /// kings, for both sides to move.
+    fn positions() -> Vec<Board> {
+        let mut positions = Vec::new();
+        for stride in [1usize, 5, 13] {
+            let mut board = Board::new_default();
+            for ply in 0..150 {
+                let actions = board.actions();
+                positions.push(board);
+                positions.push(board.swap_turn());
+                if actions.is_empty() {
+                    break;
+                }
+                board = board.apply(&actions[(ply * stride) % actions.len()]);
+                board.swap_turn_();
+            }
+        }
+        let mut rng = Rng::new(7);
+        for _ in 0..2000 {
+            let white = rng.next_u64() & rng.next_u64() & rng.next_u64();
+            let black = rng.next_u64() & rng.next_u64() & rng.next_u64() & !white;
+            if white.count_ones() > 16 || black.count_ones() > 16 {
+                continue;
+            }
+            // Men on their promotion row would have been crowned
+            let kings = ((white | black) & rng.next_u64() & rng.next_u64())
+                | (white & MASK_ROW_8)
+                | (black & MASK_ROW_1);
+            let board = Board::new(Team::White, State::new([white, black], kings));
+            positions.push(board);
+            positions.push(board.swap_turn());
+        }
+        positions
+    }
+
+    fn columns_of(boards: &[Board]) -> [Vec<u64>; 4] {
+        let mut columns: [Vec<u64>; 4] = Default::default();
+        for board in boards {
+            columns[0].push(board.state.pieces[0]);
+            columns[1].push(board.state.pieces[1]);
+            columns[2].push(board.state.kings);
+            columns[3].push(board.turn.to_usize() as u64);
+        }
+        columns
+    }
+
+    #[test]
+    fn matches_single_board_queries() {
+        let boards = positions();
+        let [white, black, kings, turn] = columns_of(&boards);
+        let columns = BoardColumns::new(&white, &black, &kings, &turn);
+        assert_eq!(columns.len(), boards.len());
+
+        let mut counts = vec![0; boards.len()];
+        let mut captures = vec![false; boards.len()];
+        let mut legal = vec![false; boards.len()];
+        columns.count_actions(&mut counts);
+        columns.has_captures(&mut captures);
+        columns.has_legal_moves(&mut legal);
+
+        let mut scratch = Vec::new();
+        for (i, board) in boards.iter().enumerate() {
+            assert_eq!(columns.board(i), *board);
+            assert_eq!(
+                u64::from(counts[i]),
+                board.count_actions(&mut scratch),
+                "{board}"
+            );
+            assert_eq!(captures[i], board.has_capture(), "{board}");
+            assert_eq!(legal[i], board.has_legal_move(), "{board}");
+        }
+    }
+
+    #[test]
+    fn king_slides_are_counted() {
+        // Kings on D4 and D6 share a file; H4 blocks the rank
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::D4, Square::D6],
+            &[Square::H4],
+            &[Square::D4, Square::D6],
+        );
+        let [white, black, kings, turn] = columns_of(&[board]);
+        let mut counts = [0];
+        BoardColumns::new(&white, &black, &kings, &turn).count_actions(&mut counts);
+        assert_eq!(counts[0] as usize, board.actions().len());
+    }
+
+    #[test]
+    fn empty_batch() {
+        let columns = BoardColumns::new(&[], &[], &[], &[]);
+        assert!(columns.is_empty());
+        columns.count_actions(&mut []);
+    }
+
+    #[test]
+    #[should_panic(expected = "same length")]
+    fn mismatched_columns_panic() {
+        let _ = BoardColumns::new(&[0], &[0], &[0], &[]);
+    }
+}
@@ -0,0 +1,683 @@
+//! Streaming training datasets written to NumPy shards.
+//!
+//! A [`DatasetWriter`] turns games into one row per position: the bitboards,
+//! the side to move, the number of legal moves, the final outcome and the
+//! number of plies left to the end. Games are replayed on the rayon pool in
+//! waves while a background thread writes the previous wave, so memory stays
+//! bounded by a few waves however many games go through.
+//!
+//! # Shard Files
+//!
+//! Rows are written to `shard-00000.npy`, `shard-00001.npy`, ... in the
+//! directory, each holding up to [`DatasetConfig::rows_per_shard`] rows. A
+//! shard is a `.npy` file with a one-dimensional structured array, so it can
+//! be memory-mapped with `numpy.load(path, mmap_mode="r")` and sliced by
+//! column without reading the rest:
+//!
+//! ```text
+//! field         dtype  meaning
+//! white         <u8    White's pieces
+//! black         <u8    Black's pieces
+//! kings         <u8    kings of either side
+//! turn          |u1    side to move: 0 for White, 1 for Black
+//! legal_moves   <u2    number of legal actions
+//! outcome       |i1    final result for the side to move: 1 won, -1 lost, 0 draw
+//! plies_to_end  <u2    plies from this position to the last one
+//! ```
+//!
+//! Rows are packed in 30 bytes, without padding. Every position of a game is
+//! a row, the final one included. Games that have not ended are skipped
+//! unless [`DatasetConfig::keep_unfinished`] is set, in which case their
+//! outcome is 0.
+//!
+//! With [`DatasetConfig::deduplicate`], a position (by [`Board::zobrist`]) is
+//! written only the first time it is seen, with the outcome and distance of
+//! that game.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, DatasetConfig, DatasetWriter, Playouts};
+//!
+//! let dir = std::env::temp_dir().join(format!("kish-doc-dataset-{}", std::process::id()));
+//! let config = DatasetConfig {
+//!     rows_per_shard: 4096,
+//!     deduplicate: true,
+//!     ..DatasetConfig::default()
+//! };
+//! let mut writer = DatasetWriter::create(&dir, config)?;
+//! writer.add_playouts(&Playouts::default(), &Board::new_default(), 100)?;
+//! let stats = writer.finish()?;
+//! assert_eq!(stats.games, 100);
+//! assert!(stats.rows > 0 && stats.duplicates > 0);
+//! assert!(dir.join("shard-00000.npy").exists());
+//! # std::fs::remove_dir_all(&dir)?;
+//! # Ok::<(), std::io::Error>(())
+//! ```
+
+use std::collections::HashSet;
+use std::fs::{self, File};
+use std::io::{self, BufWriter, Read, Seek, SeekFrom, Write};
+use std::path::{Path, PathBuf};
+use std::sync::mpsc::{self, Receiver, SyncSender};
+use std::thread::{self, JoinHandle};
+
+use rayon::prelude::*;
+
+use crate::{Action, Board, Game, GameRecord, GameStatus, Playouts, RecordReader, Team};
+
+/// Number of bytes in a row.
+const ROW_BYTES: usize = 30;
+
+/// Total size of a shard header, padded so that rows start aligned.
+const HEADER_BYTES: usize = 256;
+
+/// Number of games replayed in parallel before handing rows to the writer.
+const WAVE_GAMES: usize = 1024;
+
+/// Number of waves that may wait for the writer thread.
+const QUEUED_WAVES: usize = 2;
+
+/// NumPy dtype of a row.
+const DESCR: &str = "[('white', '<u8'), ('black', '<u8'), ('kings', '<u8'), \
+    ('turn', '|u1'), ('legal_moves', '<u2'), ('outcome', '|i1'), ('plies_to_end', '<u2')]";
+
+/// Settings of a [`DatasetWriter`].
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct DatasetConfig {
+    /// Maximum number of rows in a shard file.
+    pub rows_per_shard: usize,
+    /// Writes each position only the first time it is seen.
+    pub deduplicate: bool,
+    /// Also writes games that have not ended, with an outcome of 0.
+    pub keep_unfinished: bool,
+}
+
+impl Default for DatasetConfig {
+    fn default() -> Self {
+        Self {
+            rows_per_shard: 1 << 20,
+            deduplicate: false,
+            keep_unfinished: false,
+        }
+    }
+}
+
+/// Totals of a finished dataset.
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub struct DatasetStats {
+    /// Games added, unfinished ones included.
+    pub games: u64,
+    /// Games that had not ended.
+    pub unfinished: u64,
+    /// Rows written.
+    pub rows: u64,
+    /// Rows dropped as repeated positions.
+    pub duplicates: u64,
+    /// Shard files written.
+    pub shards: u64,
+}
+
+/// One row, with the key of its position.
+struct Row {
+    key: u64,
+    bytes: [u8; ROW_BYTES],
+}
+
+/// The rows of a wave of games, in game order.
+struct Wave {
+    games: u64,
+    unfinished: u64,
+    rows: Vec<Row>,
+}
+
+/// Writes games as rows of NumPy shard files. See the
+/// [module documentation](self) for the layout.
+///
+/// Rows are written by a background thread; call [`finish`](Self::finish) to
+/// complete the last shard and get the totals. Dropping the writer also
+/// completes the files, ignoring errors.
+#[derive(Debug)]
+pub struct DatasetWriter {
+    config: DatasetConfig,
+    sender: Option<SyncSender<Wave>>,
+    worker: Option<JoinHandle<io::Result<DatasetStats>>>,
+}
+
+impl DatasetWriter {
+    /// Starts a dataset in `dir`, creating it if needed. Existing shards in
+    /// the directory are overwritten.
+    ///
+    /// # Errors
+    ///
+    /// Returns any error from creating the directory or starting the thread.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `config.rows_per_shard` is zero.
+    pub fn create(dir: impl AsRef<Path>, config: DatasetConfig) -> io::Result<Self> {
+        assert!(config.rows_per_shard > 0, "rows_per_shard must be positive");
+        let dir = dir.as_ref().to_path_buf();
+        fs::create_dir_all(&dir)?;
+        let (sender, receiver) = mpsc::sync_channel(QUEUED_WAVES);
+        let worker = thread::Builder::new()
+            .name("kish-dataset".into())
+            .spawn(move || write_shards(&dir, config, receiver))?;
+        Ok(Self {
+            config,
+            sender: Some(sender),
+            worker: Some(worker),
+        })
+    }
+
+    /// Adds games given as records.
+    ///
+    /// # Errors
+    ///
+    /// Returns `InvalidInput` if a game holds an out-of-range move index; the
+    /// games before it are still written. Returns any error from writing the
+    /// shards.
+    pub fn add_records(&mut self, records: impl IntoIterator<Item = GameRecord>) -> io::Result<()> {
+        let mut records = records.into_iter();
+        loop {
+            let wave: Vec<GameRecord> = records.by_ref().take(WAVE_GAMES).collect();
+            if wave.is_empty() {
+                return Ok(());
+            }
+            self.add_wave(&wave)?;
+        }
+    }
+
+    /// Adds every game of a record file written by
+    /// [`RecordWriter`](crate::RecordWriter).
+    ///
+    /// # Errors
+    ///
+    /// Returns any error from reading the records or writing the shards.
+    pub fn add_record_file<R: Read>(&mut self, reader: &mut RecordReader<R>) -> io::Result<()> {
+        loop {
+            let mut wave = Vec::with_capacity(WAVE_GAMES);
+            while wave.len() < WAVE_GAMES {
+                match reader.read()? {
+                    Some(record) => wave.push(record),
+                    None => break,
+                }
+            }
+            if wave.is_empty() {
+                return Ok(());
+            }
+            self.add_wave(&wave)?;
+        }
+    }
+
+    /// Plays games `0..games` of `playouts` from `start` and adds them.
+    ///
+    /// These are the same games as [`Playouts::run`] plays.
+    ///
+    /// # Errors
+    ///
+    /// Returns any error from writing the shards.
+    pub fn add_playouts(
+        &mut self,
+        playouts: &Playouts,
+        start: &Board,
+        games: u64,
+    ) -> io::Result<()> {
+        let mut first = 0;
+        while first < games {
+            let last = (first + WAVE_GAMES as u64).min(games);
+            let wave: Vec<GameRecord> = (first..last)
+                .into_par_iter()
+                .map(|index| {
+                    let mut moves = Vec::new();
+                    playouts.play_into(start, index, Some(&mut moves));
+                    GameRecord {
+                        start: *start,
+                        moves,
+                    }
+                })
+                .collect();
+            self.add_wave(&wave)?;
+            first = last;
+        }
+        Ok(())
+    }
+
+    /// Waits for every row to be written, completes the last shard and
+    /// returns the totals.
+    ///
+    /// # Errors
+    ///
+    /// Returns the first error met while writing the shards.
+    pub fn finish(mut self) -> io::Result<DatasetStats> {
+        self.sender = None;
+        self.join()
+    }
+
+    /// Replays `records` in parallel and queues their rows for the writer.
+    fn add_wave(&mut self, records: &[GameRecord]) -> io::Result<()> {
+        let keep_unfinished = self.config.keep_unfinished;
+        let games: Vec<Option<(GameStatus, Vec<Row>)>> = records
+            .par_iter()
+            .map_init(
+                || Vec::with_capacity(48),
+                |scratch, record| game_rows(record, scratch),
+            )
+            .collect();
+
+        let mut wave = Wave {
+            games: 0,
+            unfinished: 0,
+            rows: Vec::new(),
+        };
+        let mut error = None;
+        for game in games {
+            let Some((status, rows)) = game else {
+                error = Some(io::Error::new(
+                    io::ErrorKind::InvalidInput,
+                    "a game holds an out-of-range move index",
+                ));
+                break;
+            };
+            wave.games += 1;
+            if status == GameStatus::InProgress {
+                wave.unfinished += 1;
+                if !keep_unfinished {
+                    continue;
+                }
+            }
+            wave.rows.extend(rows);
+        }
+
+        let Some(sender) = &self.sender else {
+            return Err(failed());
+        };
+        if sender.send(wave).is_err() {
+            // The writer thread stopped on an error; report it.
+            self.sender = None;
+            return match self.join() {
+                Ok(_) => Err(failed()),
+                Err(error) => Err(error),
+            };
+        }
+        error.map_or(Ok(()), Err)
+    }
+
+    /// Waits for the writer thread and returns its result.
+    fn join(&mut self) -> io::Result<DatasetStats> {
+        let worker = self.worker.take().ok_or_else(failed)?;
+        worker.join().unwrap_or_else(|_| Err(failed()))
+    }
+}
+
+impl Drop for DatasetWriter {
+    fn drop(&mut self) {
+        self.sender = None;
+        if self.worker.is_some() {
+            self.join().ok();
+        }
+    }
+}
+
+/// Returns the error reported once the writer thread has stopped.
+fn failed() -> io::Error {
+    io::Error::new(io::ErrorKind::Other, "the dataset writer has failed")
+}
+
+/// Replays a game and returns its final status and the row of every
+/// position, or `None` if a move index is out of range.
+fn game_rows(record: &GameRecord, scratch: &mut Vec<Action>) -> Option<(GameStatus, Vec<Row>)> {
+    let mut game = Game::from_board(record.start);
+    let mut positions = Vec::with_capacity(record.moves.len() + 1);
+    for &index in &record.moves {
+        let board = *game.board();
+        board.actions_into(scratch);
+        positions.push((board, scratch.len()));
+        game.make_move(scratch.get(index as usize)?);
+    }
+    let board = *game.board();
+    board.actions_into(scratch);
+    positions.push((board, scratch.len()));
+
+    let status = game.status();
+    let last = positions.len() - 1;
+    let rows = positions
+        .iter()
+        .enumerate()
+        .map(|(ply, &(board, legal_moves))| {
+            let outcome = match status {
+                GameStatus::Won(team) if team == board.turn => 1,
+                GameStatus::Won(_) => -1,
+                _ => 0,
+            };
+            let plies_to_end = (last - ply).min(u16::MAX as usize) as u16;
+            Row {
+                key: board.zobrist(),
+                bytes: encode_row(&board, legal_moves as u16, outcome, plies_to_end),
+            }
+        })
+        .collect();
+    Some((status, rows))
+}
+
+/// Packs a row in the shard layout.
+fn encode_row(board: &Board, legal_moves: u16, outcome: i8, plies_to_end: u16) -> [u8; ROW_BYTES] {
+    let mut bytes = [0; ROW_BYTES];
+    bytes[0..8].copy_from_slice(&board.state.pieces[Team::White.to_usize()].to_le_bytes());
+    bytes[8..16].copy_from_slice(&board.state.pieces[Team::Black.to_usize()].to_le_bytes());
+    bytes[16..24].copy_from_slice(&board.state.kings.to_le_bytes());
+    bytes[24] = board.turn.to_usize() as u8;
+    bytes[25..27].copy_from_slice(&legal_moves.to_le_bytes());
+    bytes[27] = outcome as u8;
+    bytes[28..30].copy_from_slice(&plies_to_end.to_le_bytes());
+    bytes
+}
+
+/// Returns the `.npy` header of a shard holding `rows` rows.
+fn npy_header(rows: u64) -> Vec<u8> {
+    let mut header = b"\x93NUMPY\x01\x00".to_vec();
+    let dict = format!("{{'descr': {DESCR}, 'fortran_order': False, 'shape': ({rows},), }}");
+    let length = HEADER_BYTES - 10;
+    header.extend_from_slice(&(length as u16).to_le_bytes());
+    header.extend_from_slice(dict.as_bytes());
+    header.resize(HEADER_BYTES - 1, b' ');
+    header.push(b'\n');
+    header
+}
+
+/// A shard file being written.
+struct Shard {
+    file: BufWriter<File>,
+    rows: u64,
+}
+
+impl Shard {
+    /// Creates shard number `index` in `dir`, with an empty header.
+    fn create(dir: &Path, index: u64) -> io::Result<Self> {
+        let mut file = BufWriter::new(File::create(shard_path(dir, index))?);
+        file.write_all(&npy_header(0))?;
+        Ok(Self { file, rows: 0 })
+    }
+
+    fn write(&mut self, row: &Row) -> io::Result<()> {
+        self.rows += 1;
+        self.file.write_all(&row.bytes)
+    }
+
+    /// Writes the final row count into the header.
+    fn close(self) -> io::Result<()> {
+        let mut file = self
+            .file
+            .into_inner()
+            .map_err(io::IntoInnerError::into_error)?;
+        file.seek(SeekFrom::Start(0))?;
+        file.write_all(&npy_header(self.rows))
+    }
+}
+
+/// Returns the path of shard number `index` in `dir`.
+fn shard_path(dir: &Path, index: u64) -> PathBuf {
+    dir.join(format!("shard-{index:05}.npy"))
+}
+
+/// Body of the writer thread: writes every row it receives to shards.
+fn write_shards(
+    dir: &Path,
+    config: DatasetConfig,
+    waves: Receiver<Wave>,
+) -> io::Result<DatasetStats> {
+    let mut stats = DatasetStats::default();
+    let mut seen = HashSet::new();
+    let mut shard: Option<Shard> = None;
+    for wave in waves {
+        stats.games += wave.games;
+        stats.unfinished += wave.unfinished;
+        for row in &wave.rows {
+            if config.deduplicate && !seen.insert(row.key) {
+                stats.duplicates += 1;
+                continue;
+            }
+            let current = match &mut shard {
+                Some(current) => current,
+                None => {
+                    stats.shards += 1;
+                    shard.insert(Shard::create(dir, stats.shards - 1)?)
+                }
+            };
+            current.write(row)?;
+            stats.rows += 1;
+            if current.rows == config.rows_per_shard as u64 {
+                shard.take().map_or(Ok(()), Shard::close)?;
+            }
+        }
+    }
+    shard.map_or(Ok(()), Shard::close)?;
+    Ok(stats)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{Policy, RecordWriter};
+    use std::io::Cursor;
+
+    /// Returns an empty scratch directory for `name`.
+    fn scratch_dir(name: &str) -> PathBuf {
+        let dir = std::env::temp_dir().join(format!("kish-{name}-{}", std::process::id()));
+        fs::remove_dir_all(&dir).ok();
+        dir
+    }
+
+    /// Reads the rows of shard `index` in `dir`, checking its header.
+    fn read_shard(dir: &Path, index: u64) -> Vec<[u8; ROW_BYTES]> {
+        let bytes = fs::read(shard_path(dir, index)).unwrap();
+        let header = std::str::from_utf8(&bytes[10..HEADER_BYTES]).unwrap();
+        let rows = (bytes.len() - HEADER_BYTES) / ROW_BYTES;
+        assert_eq!(&bytes[..8], b"\x93NUMPY\x01\x00");
+        assert!(header.contains(&format!("'shape': ({rows},)")), "{header}");
+        assert!(header.ends_with('\n'));
+        assert_eq!((bytes.len() - HEADER_BYTES) % ROW_BYTES, 0);
+        bytes[HEADER_BYTES..]
+            .chunks_exact(ROW_BYTES)
+            .map(|row| row.try_into().unwrap())
+            .collect()
+    }
+
+    fn finished_playouts() -> Playouts {
+        Playouts {
+            seed: 3,
+            policy: Policy::CapturePreferring,
+            ..Playouts::default()
+        }
+    }
+
+    #[test]
+    fn header_is_padded_and_parsable() {
+        for rows in [0, 7, u64::MAX] {
+            let header = npy_header(rows);
+            assert_eq!(header.len(), HEADER_BYTES);
+            assert_eq!(
+                u16::from_le_bytes([header[8], header[9]]) as usize,
+                HEADER_BYTES - 10
+            );
+            assert!(header.ends_with(b" \n"));
+        }
+    }
+
+    #[test]
+    fn rows_describe_every_position() {
+        let dir = scratch_dir("dataset-rows");
+        let playouts = finished_playouts();
+        let start = Board::new_default();
+        let mut moves = Vec::new();
+        let (status, plies) = playouts.play_into(&start, 0, Some(&mut moves));
+        assert_ne!(status, GameStatus::InProgress);
+
+        let mut writer = DatasetWriter::create(&dir, DatasetConfig::default()).unwrap();
+        writer
+            .add_records([GameRecord {
+                start,
+                moves: moves.clone(),
+            }])
+            .unwrap();
+        let stats = writer.finish().unwrap();
+        assert_eq!(stats.rows, u64::from(plies) + 1);
+        assert_eq!(stats.shards, 1);
+
+        let rows = read_shard(&dir, 0);
+        let mut game = Game::from_board(start);
+        for (ply, row) in rows.iter().enumerate() {
+            let board = *game.board();
+            let outcome = match status {
+                GameStatus::Won(team) if team == board.turn => 1,
+                GameStatus::Won(_) => -1,
+                _ => 0,
+            };
+            let expected = encode_row(
+                &board,
+                board.actions().len() as u16,
+                outcome,
+                (rows.len() - 1 - ply) as u16,
+            );
+            assert_eq!(row, &expected, "ply {ply}");
+            if let Some(&index) = moves.get(ply) {
+                game.make_move(&board.actions()[index as usize]);
+            }
+        }
+        assert_eq!(rows.last().unwrap()[25..27], [0, 0]);
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn shards_split_and_match_one_shard() {
+        let playouts = finished_playouts();
+        let start = Board::new_default();
+        let mut all = Vec::new();
+        for rows_per_shard in [1 << 20, 100] {
+            let dir = scratch_dir(&format!("dataset-split-{rows_per_shard}"));
+            let config = DatasetConfig {
+                rows_per_shard,
+                ..DatasetConfig::default()
+            };
+            let mut writer = DatasetWriter::create(&dir, config).unwrap();
+            writer.add_playouts(&playouts, &start, 20).unwrap();
+            let stats = writer.finish().unwrap();
+            let expected_shards = (stats.rows + rows_per_shard as u64 - 1) / rows_per_shard as u64;
+            assert_eq!(stats.shards, expected_shards);
+            let rows: Vec<_> = (0..stats.shards)
+                .flat_map(|index| read_shard(&dir, index))
+                .collect();
+            assert_eq!(rows.len() as u64, stats.rows);
+            all.push(rows);
+            fs::remove_dir_all(&dir).unwrap();
+        }
+        assert_eq!(all[0], all[1]);
+    }
+
+    #[test]
+    fn playouts_match_their_records() {
+        let playouts = Playouts {
+            record_moves: true,
+            ..finished_playouts()
+        };
+        let start = Board::new_default();
+        let recorded = playouts.run(&start, 30);
+        let records = recorded
+            .moves
+            .into_iter()
+            .map(|moves| GameRecord { start, moves });
+
+        let mut bytes = Vec::new();
+        let mut file = RecordWriter::new(&mut bytes).unwrap();
+        for record in records.clone() {
+            file.write(&record.start, &record.moves).unwrap();
+        }
+        drop(file);
+
+        let mut shards = Vec::new();
+        for source in 0..3 {
+            let dir = scratch_dir(&format!("dataset-source-{source}"));
+            let mut writer = DatasetWriter::create(&dir, DatasetConfig::default()).unwrap();
+            match source {
+                0 => writer.add_playouts(&playouts, &start, 30).unwrap(),
+                1 => writer.add_records(records.clone()).unwrap(),
+                _ => {
+                    let mut reader = RecordReader::new(Cursor::new(&bytes)).unwrap();
+                    writer.add_record_file(&mut reader).unwrap();
+                }
+            }
+            let stats = writer.finish().unwrap();
+            assert_eq!(stats.games, 30);
+            shards.push(read_shard(&dir, 0));
+            fs::remove_dir_all(&dir).unwrap();
+        }
+        assert_eq!(shards[0], shards[1]);
+        assert_eq!(shards[0], shards[2]);
+    }
+
+    #[test]
+    fn deduplicate_keeps_first_occurrence() {
+        let dir = scratch_dir("dataset-dedup");
+        let start = Board::new_default();
+        let config = DatasetConfig {
+            deduplicate: true,
+            keep_unfinished: true,
+            ..DatasetConfig::default()
+        };
+        let mut writer = DatasetWriter::create(&dir, config).unwrap();
+        let game = GameRecord {
+            start,
+            moves: vec![0, 0, 0],
+        };
+        writer.add_records([game.clone(), game]).unwrap();
+        let stats = writer.finish().unwrap();
+        assert_eq!(stats.games, 2);
+        assert_eq!(stats.unfinished, 2);
+        assert_eq!(stats.rows, 4);
+        assert_eq!(stats.duplicates, 4);
+
+        let rows = read_shard(&dir, 0);
+        let plies_to_end: Vec<u16> = rows
+            .iter()
+            .map(|row| u16::from_le_bytes([row[28], row[29]]))
+            .collect();
+        assert_eq!(plies_to_end, [3, 2, 1, 0]);
+        assert!(rows.iter().all(|row| row[27] == 0));
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn unfinished_games_are_skipped_by_default() {
+        let dir = scratch_dir("dataset-unfinished");
+        let playouts = Playouts {
+            max_plies: 4,
+            ..Playouts::default()
+        };
+        let mut writer = DatasetWriter::create(&dir, DatasetConfig::default()).unwrap();
+        writer
+            .add_playouts(&playouts, &Board::new_default(), 10)
+            .unwrap();
+        let stats = writer.finish().unwrap();
+        assert_eq!(stats.games, 10);
+        assert_eq!(stats.unfinished, 10);
+        assert_eq!((stats.rows, stats.shards), (0, 0));
+        assert!(!shard_path(&dir, 0).exists());
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn out_of_range_move_is_rejected() {
+        let dir = scratch_dir("dataset-invalid");
+        let start = Board::new_default();
+        let mut writer = DatasetWriter::create(&dir, DatasetConfig::default()).unwrap();
+        let error = writer
+            .add_records([GameRecord {
+                start,
+                moves: vec![200],
+            }])
+            .unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidInput);
+        assert_eq!(writer.finish().unwrap().games, 0);
+        fs::remove_dir_all(&dir).unwrap();
+    }
+}
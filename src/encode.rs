@@ -0,0 +1,406 @@
+//! Dense feature-plane encoding for neural network input.
+//!
+//! This module turns positions into the `(planes, 8, 8)` tensors consumed by
+//! convolutional policy/value networks, writing straight into caller-provided
+//! buffers so that batches can be filled without intermediate allocations.
+//!
+//! # Plane Layout
+//!
+//! Each encoded position contributes [`POSITION_PLANES`] planes, followed by a
+//! single turn plane at the end:
+//!
+//! | Plane | Contents |
+//! |-------|----------|
+//! | `3k + 0` | White pieces of the `k`-th most recent position |
+//! | `3k + 1` | Black pieces of the `k`-th most recent position |
+//! | `3k + 2` | Kings of the `k`-th most recent position |
+//! | last | All ones if Black is to move, all zeros otherwise |
+//!
+//! Square `i` of a plane maps to `(row, col) = (i / 8, i % 8)`, matching the
+//! bitboard layout (A1 = `[0, 0]`, H8 = `[7, 7]`). History planes beyond the
+//! start of a game are left as zeros.
+//!
+//! # Normalization and Augmentation
+//!
+//! - **Perspective**: when Black is to move, every position is rotated with
+//!   [`State::rotate_`], so the side to move always appears as White moving up
+//!   the board.
+//! - **Mirror**: flips the board left/right. The rules are symmetric under this
+//!   reflection, which makes it a free data augmentation.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, Encoding};
+//!
+//! let boards = [Board::new_default(), Board::new_default().swap_turn()];
+//! let encoding = Encoding {
+//!     perspective: true,
+//!     ..Encoding::default()
+//! };
+//!
+//! let mut out = vec![0.0f32; boards.len() * encoding.len()];
+//! encoding.encode_boards(&boards, &mut out);
+//!
+//! // White pieces plane of the first board covers rows 2-3
+//! assert_eq!(out[8..24].iter().sum::<f32>(), 16.0);
+//! ```
+
+use std::borrow::Borrow;
+
+use rayon::prelude::*;
+
+use crate::{Board, Game, State, Team};
+
+/// Number of planes produced for each position (white, black, kings).
+pub const POSITION_PLANES: usize = 3;
+
+/// Number of values in a single plane (one per square).
+const PLANE_SIZE: usize = 64;
+
+/// A numeric type that can be written into feature planes.
+pub trait PlaneValue: Copy + Send + Sync {
+    /// Value written for an empty square.
+    const ZERO: Self;
+    /// Value written for an occupied square.
+    const ONE: Self;
+}
+
+impl PlaneValue for f32 {
+    const ZERO: Self = 0.0;
+    const ONE: Self = 1.0;
+}
+
+impl PlaneValue for u8 {
+    const ZERO: Self = 0;
+    const ONE: Self = 1;
+}
+
+/// Configuration for encoding positions into feature planes.
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub struct Encoding {
+    /// Number of positions to stack, most recent first (1 = current position only).
+    pub history: usize,
+    /// Rotate positions so that the side to move is always shown as White.
+    pub perspective: bool,
+    /// Mirror the board left/right (A-file becomes H-file).
+    pub mirror: bool,
+}
+
+impl Default for Encoding {
+    /// Returns an encoding of the current position only, without any transformation.
+    fn default() -> Self {
+        Self {
+            history: 1,
+            perspective: false,
+            mirror: false,
+        }
+    }
+}
+
+impl Encoding {
+    /// Returns the number of planes per encoded sample.
+    #[inline]
+    #[must_use]
+    pub const fn planes(&self) -> usize {
+        self.history * POSITION_PLANES + 1
+    }
+
+    /// Returns the number of values per encoded sample (`planes * 64`).
+    #[inline]
+    #[must_use]
+    pub const fn len(&self) -> usize {
+        self.planes() * PLANE_SIZE
+    }
+
+    /// Returns true if a sample has no values (never the case for a valid encoding).
+    #[inline]
+    #[must_use]
+    pub const fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+
+    /// Encodes a single board into `out`.
+    ///
+    /// History planes other than the first are zeroed, since a [`Board`]
+    /// carries no history.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len() != self.len()`.
+    pub fn encode_board<T: PlaneValue>(&self, board: &Board, out: &mut [T]) {
+        assert_eq!(out.len(), self.len(), "output buffer has the wrong length");
+        self.encode_positions(board.turn, std::iter::once(*board), out);
+    }
+
+    /// Encodes the current position of a game and up to `history - 1` previous
+    /// positions into `out`.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len() != self.len()`.
+    pub fn encode_game<T: PlaneValue>(&self, game: &Game, out: &mut [T]) {
+        assert_eq!(out.len(), self.len(), "output buffer has the wrong length");
+        self.encode_positions(game.turn(), game.positions(), out);
+    }
+
+    /// Encodes a batch of boards into `out`, one sample after another.
+    ///
+    /// Samples are filled in parallel on the rayon thread pool.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len() != boards.len() * self.len()`.
+    pub fn encode_boards<T: PlaneValue>(&self, boards: &[Board], out: &mut [T]) {
+        assert_eq!(
+            out.len(),
+            boards.len() * self.len(),
+            "output buffer has the wrong length"
+        );
+        if boards.is_empty() {
+            return;
+        }
+        out.par_chunks_mut(self.len())
+            .zip(boards.par_iter())
+            .for_each(|(sample, board)| self.encode_board(board, sample));
+    }
+
+    /// Encodes a batch of games into `out`, one sample after another.
+    ///
+    /// Accepts either owned games or references to them. Samples are filled in
+    /// parallel on the rayon thread pool.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len() != games.len() * self.len()`.
+    pub fn encode_games<T: PlaneValue, G: Borrow<Game> + Sync>(&self, games: &[G], out: &mut [T]) {
+        assert_eq!(
+            out.len(),
+            games.len() * self.len(),
+            "output buffer has the wrong length"
+        );
+        if games.is_empty() {
+            return;
+        }
+        out.par_chunks_mut(self.len())
+            .zip(games.par_iter())
+            .for_each(|(sample, game)| self.encode_game(game.borrow(), sample));
+    }
+
+    /// Fills one sample from positions ordered most recent first.
+    fn encode_positions<T: PlaneValue>(
+        &self,
+        turn: Team,
+        positions: impl Iterator<Item = Board>,
+        out: &mut [T],
+    ) {
+        let rotate = self.perspective && turn == Team::Black;
+        let (history_planes, turn_plane) =
+            out.split_at_mut(self.history * POSITION_PLANES * PLANE_SIZE);
+
+        let mut filled = 0;
+        for (board, planes) in
+            positions.zip(history_planes.chunks_exact_mut(POSITION_PLANES * PLANE_SIZE))
+        {
+            let state = self.transform(&board.state, rotate);
+            let (white, rest) = planes.split_at_mut(PLANE_SIZE);
+            let (black, kings) = rest.split_at_mut(PLANE_SIZE);
+            fill_plane(state.pieces[0], white);
+            fill_plane(state.pieces[1], black);
+            fill_plane(state.kings, kings);
+            filled += 1;
+        }
+        history_planes[filled * POSITION_PLANES * PLANE_SIZE..].fill(T::ZERO);
+
+        let turn_value = if turn == Team::Black { T::ONE } else { T::ZERO };
+        turn_plane.fill(turn_value);
+    }
+
+    /// Applies the perspective rotation and mirror to a state.
+    #[inline]
+    fn transform(&self, state: &State, rotate: bool) -> State {
+        let mut state = *state;
+        if rotate {
+            state.rotate_();
+        }
+        if self.mirror {
+            state.pieces[0] = mirror_bitboard(state.pieces[0]);
+            state.pieces[1] = mirror_bitboard(state.pieces[1]);
+            state.kings = mirror_bitboard(state.kings);
+        }
+        state
+    }
+}
+
+/// Mirrors a bitboard left/right (column `c` maps to column `7 - c`).
+#[inline(always)]
+const fn mirror_bitboard(bitboard: u64) -> u64 {
+    // Reversing all bits flips rows and columns; swapping bytes flips the rows back.
+    bitboard.reverse_bits().swap_bytes()
+}
+
+/// Writes one bitboard as 64 values, square 0 first.
+#[inline(always)]
+fn fill_plane<T: PlaneValue>(bitboard: u64, plane: &mut [T]) {
+    for (square, value) in plane.iter_mut().enumerate() {
+        *value = if (bitboard >> square) & 1 != 0 {
+            T::ONE
+        } else {
+            T::ZERO
+        };
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::Square;
+
+    fn plane<T: PlaneValue>(out: &[T], index: usize) -> &[T] {
+        &out[index * PLANE_SIZE..(index + 1) * PLANE_SIZE]
+    }
+
+    #[test]
+    fn planes_and_len() {
+        let encoding = Encoding::default();
+        assert_eq!(encoding.planes(), 4);
+        assert_eq!(encoding.len(), 256);
+
+        let encoding = Encoding {
+            history: 8,
+            ..Encoding::default()
+        };
+        assert_eq!(encoding.planes(), 25);
+    }
+
+    #[test]
+    fn encode_board_matches_bitboards() {
+        let board = Board::from_squares(
+            Team::Black,
+            &[Square::A1, Square::D4],
+            &[Square::H8],
+            &[Square::D4],
+        );
+        let encoding = Encoding::default();
+        let mut out = vec![0u8; encoding.len()];
+        encoding.encode_board(&board, &mut out);
+
+        for square in 0..64 {
+            let bit = |bitboard: u64| ((bitboard >> square) & 1) as u8;
+            assert_eq!(plane(&out, 0)[square], bit(board.state.pieces[0]));
+            assert_eq!(plane(&out, 1)[square], bit(board.state.pieces[1]));
+            assert_eq!(plane(&out, 2)[square], bit(board.state.kings));
+        }
+        assert!(plane(&out, 3).iter().all(|&v| v == 1));
+    }
+
+    #[test]
+    fn perspective_rotates_black_to_move() {
+        let board = Board::from_squares(Team::Black, &[Square::A1], &[Square::B7], &[]);
+        let encoding = Encoding {
+            perspective: true,
+            ..Encoding::default()
+        };
+        let mut out = vec![0.0f32; encoding.len()];
+        encoding.encode_board(&board, &mut out);
+
+        // Black's B7 becomes the side-to-move piece on G2, White's A1 becomes H8
+        assert_eq!(plane(&out, 0)[Square::G2.to_usize()], 1.0);
+        assert_eq!(plane(&out, 1)[Square::H8.to_usize()], 1.0);
+        assert_eq!(plane(&out, 0).iter().sum::<f32>(), 1.0);
+        assert_eq!(plane(&out, 1).iter().sum::<f32>(), 1.0);
+    }
+
+    #[test]
+    fn perspective_keeps_white_to_move() {
+        let board = Board::new_default();
+        let plain = Encoding::default();
+        let normalized = Encoding {
+            perspective: true,
+            ..Encoding::default()
+        };
+        let mut a = vec![0u8; plain.len()];
+        let mut b = vec![0u8; normalized.len()];
+        plain.encode_board(&board, &mut a);
+        normalized.encode_board(&board, &mut b);
+        assert_eq!(a, b);
+    }
+
+    #[test]
+    fn mirror_flips_columns() {
+        let board = Board::from_squares(Team::White, &[Square::A1, Square::C5], &[Square::H8], &[]);
+        let encoding = Encoding {
+            mirror: true,
+            ..Encoding::default()
+        };
+        let mut out = vec![0u8; encoding.len()];
+        encoding.encode_board(&board, &mut out);
+
+        assert_eq!(plane(&out, 0)[Square::H1.to_usize()], 1);
+        assert_eq!(plane(&out, 0)[Square::F5.to_usize()], 1);
+        assert_eq!(plane(&out, 1)[Square::A8.to_usize()], 1);
+    }
+
+    #[test]
+    fn game_history_planes() {
+        let mut game = Game::new();
+        let first = *game.board();
+        let action = game.actions()[0];
+        game.make_move(&action);
+
+        let encoding = Encoding {
+            history: 3,
+            ..Encoding::default()
+        };
+        let mut out = vec![0u8; encoding.len()];
+        encoding.encode_game(&game, &mut out);
+
+        let mut expected = vec![0u8; Encoding::default().len()];
+        Encoding::default().encode_board(game.board(), &mut expected);
+        assert_eq!(&out[..3 * PLANE_SIZE], &expected[..3 * PLANE_SIZE]);
+
+        Encoding::default().encode_board(&first, &mut expected);
+        assert_eq!(
+            &out[3 * PLANE_SIZE..6 * PLANE_SIZE],
+            &expected[..3 * PLANE_SIZE]
+        );
+
+        // Third position precedes the start of the game
+        assert!(out[6 * PLANE_SIZE..9 * PLANE_SIZE].iter().all(|&v| v == 0));
+        // Black to move
+        assert!(plane(&out, 9).iter().all(|&v| v == 1));
+    }
+
+    #[test]
+    fn encode_boards_matches_single() {
+        let boards: Vec<Board> = Board::new_default()
+            .actions()
+            .iter()
+            .map(|action| Board::new_default().apply(action).swap_turn())
+            .collect();
+        let encoding = Encoding {
+            perspective: true,
+            mirror: true,
+            ..Encoding::default()
+        };
+
+        let mut batch = vec![0.0f32; boards.len() * encoding.len()];
+        encoding.encode_boards(&boards, &mut batch);
+
+        let mut single = vec![0.0f32; encoding.len()];
+        for (i, board) in boards.iter().enumerate() {
+            encoding.encode_board(board, &mut single);
+            assert_eq!(
+                &batch[i * encoding.len()..(i + 1) * encoding.len()],
+                &single[..]
+            );
+        }
+    }
+
+    #[test]
+    #[should_panic(expected = "wrong length")]
+    fn encode_board_rejects_wrong_length() {
+        let mut out = vec![0u8; 10];
+        Encoding::default().encode_board(&Board::new_default(), &mut out);
+    }
+}
@@ -65,12 +65,34 @@
 //!
 //! A draw is declared after 50 consecutive plies (25 full moves) without any
 //! capture. This prevents indefinitely prolonged endgames.
+//!
+//! # Cached Queries
+//!
+//! [`Game::legal_actions`], [`Game::status`] and
+//! [`Game::position_occurrence_count`] are computed at most once per ply and
+//! kept until the next [`make_move`](Game::make_move),
+//! [`undo_move`](Game::undo_move) or [`clear_history`](Game::clear_history),
+//! so a play loop can query them freely. The status tells whether the side
+//! to move is blocked from the cached legal actions, generating them if
+//! needed, so a ply generates its moves once whichever is asked first.
+//!
+//! ```rust
+//! use kish::Game;
+//!
+//! let mut game = Game::new();
+//! while !game.status().is_over() && game.move_count() < 10 {
+//!     let action = game.legal_actions()[0];
+//!     game.make_move(&action);
+//! }
+//! ```
 
-use rustc_hash::FxHashMap;
+use std::cell::UnsafeCell;
+use std::fmt;
+use std::sync::atomic::{AtomicU8, Ordering};
 
 use crate::{Action, Board, GameStatus, Team};
 
-/// Hash type for position lookup (single u64 for fast hashing).
+/// Zobrist key of a position (see [`Board::zobrist`]).
 type PositionHash = u64;
 
 /// Number of half-moves (plies) without a capture before a draw is declared.
@@ -82,28 +104,194 @@ const INSUFFICIENT_PROGRESS_THRESHOLD: u16 = 50;
 /// A full game with history tracking for proper draw detection.
 ///
 /// This struct wraps a [`Board`] and maintains:
-/// - A count of each position occurrence (for threefold repetition)
+/// - A stack of position keys (for threefold repetition)
 /// - A counter of half-moves since last capture (for insufficient progress)
 /// - A history stack for undo functionality
 ///
 /// # Memory Usage
 ///
-/// The position history uses a `FxHashMap` which grows with unique positions.
-/// For typical games, this is negligible. For very long games or analysis,
-/// consider periodically clearing irrelevant history.
-#[derive(Debug, Clone, PartialEq, Eq)]
+/// Each ply costs one 8-byte key plus one undo record. Only positions since
+/// the last capture can repeat (a capture removes material for good), so the
+/// repetition check scans back at most `halfmove_clock` keys. Use
+/// [`fork`](Self::fork) for search or analysis copies: it keeps only those
+/// keys and no undo history, so its size is bounded regardless of game length.
+#[derive(Debug, Clone)]
 pub struct Game {
     /// The current board state.
     board: Board,
-    /// Count of each position occurrence for threefold repetition detection.
-    position_counts: FxHashMap<PositionHash, u8>,
+    /// Zobrist keys of every recorded position, oldest first, ending with the
+    /// current one. Never empty.
+    keys: Vec<PositionHash>,
     /// Number of half-moves since last capture.
     /// A draw is declared at [`INSUFFICIENT_PROGRESS_THRESHOLD`] half-moves.
     halfmove_clock: u16,
     /// History stack for undo: (action, previous halfmove_clock, was_capture).
     history: Vec<(Action, u16, bool)>,
+    /// Values derived from the current ply, computed on first use.
+    cache: PlyCache,
+}
+
+/// Values derived from the current position and history, cleared whenever
+/// either changes.
+///
+/// The status and occurrence count are plain relaxed atomics, so checking
+/// them costs a load: every thread computes the same value, so a race only
+/// repeats the work. The action list cannot be rebuilt under a reader, so it
+/// is claimed by one thread instead (see [`ActionCache`]).
+#[derive(Debug, Default)]
+struct PlyCache {
+    /// Legal actions of the current board.
+    actions: ActionCache,
+    /// Status including draw conditions, as encoded by [`encode_status`], or
+    /// [`UNKNOWN`].
+    status: AtomicU8,
+    /// Occurrences of the current position, or [`UNKNOWN`].
+    occurrences: AtomicU8,
+}
+
+/// Marks a cached value that has not been computed.
+const UNKNOWN: u8 = 0;
+
+impl PlyCache {
+    /// Forgets every cached value.
+    #[inline]
+    fn clear(&mut self) {
+        self.actions.clear();
+        self.clear_history_values();
+    }
+
+    /// Forgets the values that depend on the history rather than the board.
+    #[inline]
+    fn clear_history_values(&mut self) {
+        *self.status.get_mut() = UNKNOWN;
+        *self.occurrences.get_mut() = UNKNOWN;
+    }
+}
+
+impl Clone for PlyCache {
+    fn clone(&self) -> Self {
+        Self {
+            actions: self.actions.clone(),
+            status: AtomicU8::new(self.status.load(Ordering::Relaxed)),
+            occurrences: AtomicU8::new(self.occurrences.load(Ordering::Relaxed)),
+        }
+    }
+}
+
+/// Marks an action list being generated by one thread.
+const FILLING: u8 = 1;
+
+/// Marks an action list ready to be read.
+const READY: u8 = 2;
+
+/// Legal actions generated through a shared reference at most once per ply.
+///
+/// `state` guards `actions`: only the thread that moves it from [`UNKNOWN`]
+/// to [`FILLING`] writes the list, and readers only look at it once it is
+/// [`READY`]. Clearing takes `&mut self`, so the buffer is reused from ply to
+/// ply.
+#[derive(Default)]
+struct ActionCache {
+    state: AtomicU8,
+    actions: UnsafeCell<Vec<Action>>,
 }
 
+// SAFETY: `actions` is only written by the thread that claimed the cache and
+// only read once that thread has published it (see `get_or_fill`).
+unsafe impl Sync for ActionCache {}
+
+impl ActionCache {
+    /// Returns the list if it has been generated.
+    #[inline]
+    fn get(&self) -> Option<&[Action]> {
+        // SAFETY: a ready list is never written again through `&self`
+        (self.state.load(Ordering::Acquire) == READY)
+            .then(|| unsafe { (*self.actions.get()).as_slice() })
+    }
+
+    /// Returns the list, generating it from `board` if needed.
+    #[inline]
+    fn get_or_fill(&self, board: &Board) -> &[Action] {
+        loop {
+            if let Some(actions) = self.get() {
+                return actions;
+            }
+            if self
+                .state
+                .compare_exchange(UNKNOWN, FILLING, Ordering::Acquire, Ordering::Relaxed)
+                .is_ok()
+            {
+                // SAFETY: claiming the cache excludes every other reader and
+                // writer until it is marked ready
+                board.actions_into(unsafe { &mut *self.actions.get() });
+                self.state.store(READY, Ordering::Release);
+            } else {
+                // Another thread is generating the same list
+                std::hint::spin_loop();
+            }
+        }
+    }
+
+    /// Forgets the list, keeping its buffer.
+    #[inline]
+    fn clear(&mut self) {
+        *self.state.get_mut() = UNKNOWN;
+    }
+}
+
+impl Clone for ActionCache {
+    fn clone(&self) -> Self {
+        match self.get() {
+            Some(actions) => Self {
+                state: AtomicU8::new(READY),
+                actions: UnsafeCell::new(actions.to_vec()),
+            },
+            None => Self::default(),
+        }
+    }
+}
+
+impl fmt::Debug for ActionCache {
+    fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        f.debug_tuple("ActionCache").field(&self.get()).finish()
+    }
+}
+
+/// Encodes a status as a non-zero byte.
+#[inline]
+const fn encode_status(status: GameStatus) -> u8 {
+    match status {
+        GameStatus::InProgress => 1,
+        GameStatus::Draw => 2,
+        GameStatus::Won(Team::White) => 3,
+        GameStatus::Won(Team::Black) => 4,
+    }
+}
+
+/// Decodes a byte written by [`encode_status`].
+#[inline]
+const fn decode_status(byte: u8) -> GameStatus {
+    match byte {
+        1 => GameStatus::InProgress,
+        2 => GameStatus::Draw,
+        3 => GameStatus::Won(Team::White),
+        _ => GameStatus::Won(Team::Black),
+    }
+}
+
+impl PartialEq for Game {
+    /// Games are equal when their positions and histories are, whatever has
+    /// been cached.
+    fn eq(&self, other: &Self) -> bool {
+        self.board == other.board
+            && self.keys == other.keys
+            && self.halfmove_clock == other.halfmove_clock
+            && self.history == other.history
+    }
+}
+
+impl Eq for Game {}
+
 /// Typical game length for pre-allocation (most games end within 100 moves).
 const TYPICAL_GAME_LENGTH: usize = 100;
 
@@ -112,17 +300,7 @@ impl Game {
     #[must_use]
     pub fn new() -> Self {
         let board = Board::new_default();
-        let mut game = Self {
-            board,
-            position_counts: FxHashMap::with_capacity_and_hasher(
-                TYPICAL_GAME_LENGTH,
-                Default::default(),
-            ),
-            halfmove_clock: 0,
-            history: Vec::with_capacity(TYPICAL_GAME_LENGTH),
-        };
-        game.record_position();
-        game
+        Self::from_board(board)
     }
 
     /// Creates a game from an existing board position.
@@ -131,17 +309,36 @@ impl Game {
     /// as the first occurrence.
     #[must_use]
     pub fn from_board(board: Board) -> Self {
-        let mut game = Self {
+        let mut keys = Vec::with_capacity(TYPICAL_GAME_LENGTH);
+        keys.push(board.zobrist());
+        Self {
             board,
-            position_counts: FxHashMap::with_capacity_and_hasher(
-                TYPICAL_GAME_LENGTH,
-                Default::default(),
-            ),
+            keys,
             halfmove_clock: 0,
             history: Vec::with_capacity(TYPICAL_GAME_LENGTH),
-        };
-        game.record_position();
-        game
+            cache: PlyCache::default(),
+        }
+    }
+
+    /// Returns a lightweight copy for search or analysis.
+    ///
+    /// The fork has the same board, halfmove clock and repetition state, so
+    /// [`status`](Self::status) agrees with this game now and after any moves.
+    /// It keeps only the keys since the last capture and no undo history, so
+    /// its cost is bounded by the insufficient-progress limit rather than the
+    /// game length: [`undo_move`](Self::undo_move) cannot go back past the fork
+    /// point, and [`move_count`](Self::move_count) and
+    /// [`positions`](Self::positions) start from it.
+    #[must_use]
+    pub fn fork(&self) -> Self {
+        let start = self.keys.len() - 1 - self.repetition_span();
+        Self {
+            board: self.board,
+            keys: self.keys[start..].to_vec(),
+            halfmove_clock: self.halfmove_clock,
+            history: Vec::new(),
+            cache: self.cache.clone(),
+        }
     }
 
     /// Returns a reference to the current board.
@@ -158,6 +355,15 @@ impl Game {
         self.board.turn
     }
 
+    /// Returns the Zobrist key of the current position.
+    ///
+    /// Equal to `self.board().zobrist()`, but maintained incrementally.
+    #[inline]
+    #[must_use]
+    pub fn zobrist(&self) -> u64 {
+        self.position_hash()
+    }
+
     /// Returns the number of half-moves since the last capture.
     #[inline]
     #[must_use]
@@ -172,11 +378,51 @@ impl Game {
         self.history.len()
     }
 
+    /// Returns an iterator over the positions of this game, most recent first.
+    ///
+    /// The first item is the current board, followed by each earlier position
+    /// back to the start of the recorded history. Positions are rebuilt by
+    /// undoing the action deltas, so no board snapshots are stored.
+    pub fn positions(&self) -> impl Iterator<Item = Board> + '_ {
+        let mut board = self.board;
+        std::iter::once(board).chain(self.history.iter().rev().map(move |(action, _, _)| {
+            board.swap_turn_();
+            board.apply_(action);
+            board
+        }))
+    }
+
     /// Returns all legal actions from the current position.
+    ///
+    /// Copies the list cached by [`legal_actions`](Self::legal_actions) if
+    /// there is one, and generates a fresh list otherwise. Prefer
+    /// `legal_actions` in play loops.
     #[inline]
     #[must_use]
     pub fn actions(&self) -> Vec<Action> {
-        self.board.actions()
+        match self.cached_actions() {
+            Some(actions) => actions.to_vec(),
+            None => self.board.actions(),
+        }
+    }
+
+    /// Returns the legal actions of the current position, in
+    /// [`Board::actions`] order.
+    ///
+    /// The list is generated on the first call for a ply, or by
+    /// [`status`](Self::status), and returned as is until the position
+    /// changes. Its buffer is reused across plies, so a play loop does not
+    /// allocate.
+    #[inline]
+    pub fn legal_actions(&self) -> &[Action] {
+        self.cache.actions.get_or_fill(&self.board)
+    }
+
+    /// Returns the legal actions cached by
+    /// [`legal_actions`](Self::legal_actions), if any.
+    #[inline]
+    fn cached_actions(&self) -> Option<&[Action]> {
+        self.cache.actions.get()
     }
 
     /// Computes the current game status, including draw conditions.
@@ -187,10 +433,31 @@ impl Game {
     /// 3. Draw by 1v1 (Rule 9.3)
     /// 4. Draw by threefold repetition (Rule 9.2)
     /// 5. Draw by insufficient progress (Rule 9.4) - 50 plies without capture
+    ///
+    /// The result is cached for the current ply. Whether the side to move is
+    /// blocked is read from [`legal_actions`](Self::legal_actions), which
+    /// generates and caches them if needed, so a later call reuses them.
+    /// Whether the opponent is blocked is still checked on the board.
     #[must_use]
     pub fn status(&self) -> GameStatus {
+        match self.cache.status.load(Ordering::Relaxed) {
+            UNKNOWN => {
+                let status = self.compute_status();
+                self.cache
+                    .status
+                    .store(encode_status(status), Ordering::Relaxed);
+                status
+            }
+            byte => decode_status(byte),
+        }
+    }
+
+    /// Computes [`status`](Self::status) without the cache.
+    fn compute_status(&self) -> GameStatus {
         // First check basic status (win/loss/1v1 draw)
-        let basic_status = self.board.status();
+        let basic_status = self
+            .board
+            .status_with_blocked(|_| self.legal_actions().is_empty());
         if basic_status != GameStatus::InProgress {
             return basic_status;
         }
@@ -226,6 +493,7 @@ impl Game {
         // Apply the action
         self.board.apply_(action);
         self.board.swap_turn_();
+        let key = self.position_hash() ^ action.zobrist_delta();
 
         // Update halfmove clock (only captures reset)
         if is_capture {
@@ -235,10 +503,11 @@ impl Game {
         }
 
         // Record position for repetition detection
-        self.record_position();
+        self.keys.push(key);
 
         // Push to history
         self.history.push((*action, prev_halfmove, is_capture));
+        self.cache.clear();
     }
 
     /// Undoes the last move, restoring the previous board state.
@@ -247,8 +516,8 @@ impl Game {
     #[inline]
     pub fn undo_move(&mut self) -> bool {
         if let Some((action, prev_halfmove, _)) = self.history.pop() {
-            // Decrement position count before undoing
-            self.decrement_position_count();
+            // Forget the current position before undoing
+            self.keys.pop();
 
             // Undo the turn swap
             self.board.swap_turn_();
@@ -258,6 +527,7 @@ impl Game {
 
             // Restore halfmove clock
             self.halfmove_clock = prev_halfmove;
+            self.cache.clear();
 
             true
         } else {
@@ -269,16 +539,34 @@ impl Game {
     #[inline]
     #[must_use]
     pub fn is_threefold_repetition(&self) -> bool {
-        let hash = self.position_hash();
-        self.position_counts.get(&hash).copied().unwrap_or(0) >= 3
+        self.position_occurrence_count() >= 3
     }
 
     /// Returns the number of times the current position has occurred.
+    ///
+    /// The count is cached for the current ply.
     #[inline]
     #[must_use]
     pub fn position_occurrence_count(&self) -> u8 {
-        let hash = self.position_hash();
-        self.position_counts.get(&hash).copied().unwrap_or(0)
+        match self.cache.occurrences.load(Ordering::Relaxed) {
+            UNKNOWN => {
+                let count = self.count_occurrences();
+                self.cache.occurrences.store(count, Ordering::Relaxed);
+                count
+            }
+            count => count,
+        }
+    }
+
+    /// Counts the occurrences of the current position in the recorded keys.
+    fn count_occurrences(&self) -> u8 {
+        let current = self.position_hash();
+        let last = self.keys.len() - 1;
+        // Same side to move only every other ply; stop at the last capture
+        (2..=self.repetition_span())
+            .step_by(2)
+            .filter(|&back| self.keys[last - back] == current)
+            .fold(1, |count: u8, _| count.saturating_add(1))
     }
 
     /// Clears the position history and resets the halfmove clock.
@@ -286,10 +574,24 @@ impl Game {
     /// This is useful when starting a new game from a position
     /// where prior history should not count.
     pub fn clear_history(&mut self) {
-        self.position_counts.clear();
+        let key = self.position_hash();
+        self.keys.clear();
+        self.keys.push(key);
         self.history.clear();
         self.halfmove_clock = 0;
-        self.record_position();
+        // The position is unchanged, so its legal actions still hold
+        self.cache.clear_history_values();
+    }
+
+    /// Restarts the game from `board`, like [`from_board`](Self::from_board),
+    /// but keeps the buffers of the history, keys and cached actions.
+    pub fn reset(&mut self, board: Board) {
+        self.board = board;
+        self.keys.clear();
+        self.keys.push(board.zobrist());
+        self.history.clear();
+        self.halfmove_clock = 0;
+        self.cache.clear();
     }
 
     /// Perft (performance test) - counts leaf nodes at a given depth.
@@ -316,7 +618,8 @@ impl Game {
             return 1;
         }
 
-        let actions = self.actions();
+        // Skip the cache: every child move would clear it again
+        let actions = self.board.actions();
         if actions.is_empty() {
             return 1; // Terminal node counts as 1
         }
@@ -334,34 +637,17 @@ impl Game {
     // Private helpers
     // =========================================================================
 
-    /// Computes a hash for the current position (state + turn).
+    /// Returns the key of the current position (state + turn).
     #[inline]
     fn position_hash(&self) -> PositionHash {
-        // XOR mixing with golden ratio constants for good distribution
-        let mut hash = self.board.state.pieces[0];
-        hash ^= self.board.state.pieces[1].wrapping_mul(0x9e37_79b9_7f4a_7c15);
-        hash ^= self.board.state.kings.wrapping_mul(0x517c_c1b7_2722_0a95);
-        hash ^= (self.board.turn.to_usize() as u64).wrapping_mul(0x2545_f491_4f6c_dd1d);
-        hash
+        // The current position is always recorded last
+        self.keys[self.keys.len() - 1]
     }
 
-    /// Records the current position in the occurrence map.
+    /// Number of earlier recorded plies that could repeat the current position.
     #[inline]
-    fn record_position(&mut self) {
-        let hash = self.position_hash();
-        *self.position_counts.entry(hash).or_insert(0) += 1;
-    }
-
-    /// Decrements the position count for the current position.
-    #[inline]
-    fn decrement_position_count(&mut self) {
-        let hash = self.position_hash();
-        if let Some(count) = self.position_counts.get_mut(&hash) {
-            *count = count.saturating_sub(1);
-            if *count == 0 {
-                self.position_counts.remove(&hash);
-            }
-        }
+    fn repetition_span(&self) -> usize {
+        usize::from(self.halfmove_clock).min(self.keys.len() - 1)
     }
 
     /// Checks if an action is a capture (removes opponent pieces).
@@ -546,8 +832,9 @@ mod tests {
         game.halfmove_clock = INSUFFICIENT_PROGRESS_THRESHOLD - 1;
         assert_eq!(game.status(), GameStatus::InProgress);
 
-        // Set clock to threshold (draw)
+        // Set clock to threshold (draw), dropping the cached status
         game.halfmove_clock = INSUFFICIENT_PROGRESS_THRESHOLD;
+        game.cache.clear();
         assert_eq!(game.status(), GameStatus::Draw);
     }
 
@@ -573,6 +860,21 @@ mod tests {
         assert_eq!(game.position_occurrence_count(), 1);
     }
 
+    #[test]
+    fn zobrist_tracks_moves_and_undo() {
+        let mut game = Game::new();
+        let start = game.zobrist();
+        for _ in 0..6 {
+            let action = game.actions()[0];
+            game.make_move(&action);
+            assert_eq!(game.zobrist(), game.board().zobrist());
+        }
+        while game.undo_move() {
+            assert_eq!(game.zobrist(), game.board().zobrist());
+        }
+        assert_eq!(game.zobrist(), start);
+    }
+
     #[test]
     fn position_count_decrements_on_undo() {
         let mut game = Game::new();
@@ -659,6 +961,18 @@ mod tests {
         }
     }
 
+    #[test]
+    fn positions_walks_back_to_start() {
+        let mut game = Game::new();
+        let start = *game.board();
+        game.make_move(&game.actions()[0]);
+        let middle = *game.board();
+        game.make_move(&game.actions()[0]);
+
+        let positions: Vec<Board> = game.positions().collect();
+        assert_eq!(positions, vec![*game.board(), middle, start]);
+    }
+
     #[test]
     fn perft_state_unchanged_after_call() {
         // Verify the game state is unchanged after perft
@@ -671,4 +985,205 @@ mod tests {
         assert_eq!(game.board, original_board);
         assert_eq!(game.move_count(), original_count);
     }
+
+    #[test]
+    fn fork_keeps_repetitions_since_last_capture() {
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::A1, Square::B1],
+            &[Square::H7, Square::H8],
+            &[Square::A1, Square::B1, Square::H7, Square::H8],
+        );
+        let mut game = Game::from_board(board);
+        let shuffle = |g: &mut Game| {
+            for (from, to) in [
+                (Square::A1, Square::A2),
+                (Square::H8, Square::G8),
+                (Square::A2, Square::A1),
+                (Square::G8, Square::H8),
+            ] {
+                let mask = from.to_mask() | to.to_mask();
+                let friendly = g.turn().to_usize();
+                let action = g
+                    .actions()
+                    .into_iter()
+                    .find(|a| a.delta.pieces[friendly] == mask)
+                    .expect("Move not found");
+                g.make_move(&action);
+            }
+        };
+
+        shuffle(&mut game);
+        let mut fork = game.fork();
+        assert_eq!(fork.board(), game.board());
+        assert_eq!(fork.zobrist(), game.zobrist());
+        assert_eq!(fork.halfmove_clock(), game.halfmove_clock());
+        assert_eq!(fork.position_occurrence_count(), 2);
+        assert_eq!(fork.move_count(), 0);
+        assert!(!fork.undo_move());
+
+        shuffle(&mut fork);
+        assert!(fork.is_threefold_repetition());
+        assert_eq!(fork.status(), GameStatus::Draw);
+    }
+
+    #[test]
+    fn fork_drops_history_before_capture() {
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::D4, Square::A1],
+            &[Square::D5, Square::H8],
+            &[],
+        );
+        let mut game = Game::from_board(board);
+        game.make_move(&game.actions()[0]);
+        assert_eq!(game.halfmove_clock(), 0);
+
+        let fork = game.fork();
+        assert_eq!(fork.keys, vec![game.zobrist()]);
+        assert_eq!(fork.status(), game.status());
+    }
+
+    /// Returns the status of `game` computed from scratch.
+    fn uncached_status(game: &Game) -> GameStatus {
+        match game.board.status() {
+            GameStatus::InProgress
+                if game.count_occurrences() >= 3
+                    || game.halfmove_clock >= INSUFFICIENT_PROGRESS_THRESHOLD =>
+            {
+                GameStatus::Draw
+            }
+            status => status,
+        }
+    }
+
+    #[test]
+    fn cached_queries_follow_moves_and_undos() {
+        let playouts = crate::Playouts {
+            seed: 5,
+            record_moves: true,
+            ..crate::Playouts::default()
+        };
+        for moves in playouts.run(&Board::new_default(), 8).moves {
+            let mut game = Game::new();
+            let mut statuses = Vec::new();
+            for &index in &moves {
+                // Alternate whether the actions are generated before the status
+                let expected = uncached_status(&game);
+                if index % 2 == 0 {
+                    assert_eq!(game.legal_actions().to_vec(), game.board().actions());
+                }
+                assert_eq!(game.status(), expected);
+                assert_eq!(game.legal_actions().to_vec(), game.board().actions());
+                assert_eq!(game.actions(), game.board().actions());
+                assert_eq!(game.position_occurrence_count(), game.count_occurrences());
+                statuses.push(game.status());
+                let action = game.legal_actions()[index as usize];
+                game.make_move(&action);
+            }
+            assert!(game.legal_actions().is_empty() || game.status().is_over());
+            assert_eq!(game.status(), uncached_status(&game));
+            while let Some(status) = statuses.pop() {
+                assert!(game.undo_move());
+                assert_eq!(game.status(), status);
+                assert_eq!(game.legal_actions().to_vec(), game.board().actions());
+            }
+        }
+    }
+
+    #[test]
+    fn status_uses_cached_actions_when_blocked() {
+        // White's man on A1 can neither move nor capture
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::A1],
+            &[Square::A2, Square::A3, Square::B1, Square::C1],
+            &[],
+        );
+        let game = Game::from_board(board);
+        assert!(game.legal_actions().is_empty());
+        assert_eq!(game.status(), GameStatus::Won(Team::Black));
+
+        // Cache the blocked board's empty list in a start game: with White
+        // able to move, only the cache can report it as blocked
+        let game = Game::new();
+        let _ = game.cache.actions.get_or_fill(&board);
+        assert_eq!(game.status(), GameStatus::Won(Team::Black));
+        assert_eq!(uncached_status(&game), GameStatus::InProgress);
+    }
+
+    #[test]
+    fn status_generates_actions_once() {
+        let game = Game::new();
+        assert_eq!(game.cached_actions(), None);
+        assert_eq!(game.status(), GameStatus::InProgress);
+        // The list generated by the status is the one returned afterwards
+        let generated = game.cached_actions().unwrap().as_ptr();
+        assert_eq!(game.legal_actions().as_ptr(), generated);
+        assert_eq!(game.actions(), game.board().actions());
+    }
+
+    #[test]
+    fn threads_share_generated_actions() {
+        let game = Game::new();
+        let expected = game.board().actions();
+        std::thread::scope(|scope| {
+            for _ in 0..4 {
+                scope.spawn(|| {
+                    assert_eq!(game.status(), GameStatus::InProgress);
+                    assert_eq!(game.legal_actions(), expected.as_slice());
+                });
+            }
+        });
+        assert_eq!(game.clone().cached_actions(), Some(expected.as_slice()));
+    }
+
+    #[test]
+    fn reset_matches_from_board() {
+        let mut game = Game::new();
+        for _ in 0..6 {
+            let action = game.legal_actions()[0];
+            game.make_move(&action);
+        }
+        let board = *game.board();
+        let capacity = game.history.capacity();
+        game.reset(board);
+        assert_eq!(game, Game::from_board(board));
+        assert_eq!(game.history.capacity(), capacity);
+        assert_eq!(game.status(), GameStatus::InProgress);
+        assert_eq!(game.legal_actions(), board.actions().as_slice());
+    }
+
+    #[test]
+    fn cache_does_not_affect_equality() {
+        let game = Game::new();
+        let cached = game.clone();
+        let _ = cached.legal_actions();
+        let _ = cached.status();
+        assert_eq!(game, cached);
+    }
+
+    #[test]
+    fn clear_history_resets_cached_status() {
+        // Shuffle the kings back and forth to repeat the start position
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::A1, Square::B1],
+            &[Square::H8, Square::G8],
+            &[Square::A1, Square::H8],
+        );
+        let mut game = Game::from_board(board);
+        let moves = ["a1-a2", "h8-h7", "a2-a1", "h7-h8"];
+        for _ in 0..2 {
+            for notation in moves {
+                game.make_move(&game.board().parse_action(notation).unwrap());
+            }
+        }
+        let actions = game.legal_actions().to_vec();
+        assert_eq!(game.status(), GameStatus::Draw);
+        game.clear_history();
+        assert_eq!(game.cached_actions(), Some(actions.as_slice()));
+        assert_eq!(game.status(), GameStatus::InProgress);
+        assert_eq!(game.position_occurrence_count(), 1);
+    }
 }
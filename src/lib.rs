@@ -92,6 +92,13 @@
 //! - [`Team`]: White or Black
 //! - [`State`]: Raw bitboard state without turn information
 //! - [`GameStatus`]: Current game status (`InProgress`, `Draw`, or `Won`)
+//! - [`Encoding`]: Feature-plane encoder for neural network input
+//! - [`ACTION_SPACE`]: Fixed source × destination action indices and legal masks for policy networks
+//! - [`Playouts`]: Parallel random playouts with built-in policies
+//! - [`Search`]: Alpha-beta search with iterative deepening and a transposition table
+//! - [`Network`]: Quantized NNUE-style evaluation with incrementally updated accumulators
+//! - [`Book`]: Memory-mapped opening book with weighted move selection
+//! - [`Mcts`]: Monte Carlo tree search with batched leaf evaluation
 //!
 //! ## Move Notation
 //!
@@ -133,19 +140,52 @@
 //! 6. **Blocking = Loss**: If you can't move, you lose.
 
 mod action;
+mod action_space;
 mod actiongen;
+mod archive;
 mod board;
+mod book;
+mod columns;
+mod dataset;
+mod encode;
 mod game;
 mod game_status;
+mod mcts;
+mod nnue;
+mod notation;
 mod perft;
+mod perft_job;
+mod playout;
+mod record;
+mod search;
 mod square;
 mod state;
+mod tablebase;
 mod team;
+mod transposition;
+mod zobrist;
 
 pub use action::{Action, ActionPath};
+pub use action_space::ACTION_SPACE;
+pub use actiongen::MoveGenerator;
+pub use archive::{parse_archive, ArchiveError, ArchiveGame, ArchiveReader};
 pub use board::Board;
+pub use book::{Book, BookBuilder, BookMove};
+pub use columns::BoardColumns;
+pub use dataset::{DatasetConfig, DatasetStats, DatasetWriter};
+pub use encode::{Encoding, PlaneValue, POSITION_PLANES};
 pub use game::Game;
 pub use game_status::GameStatus;
+pub use mcts::{ChildStats, Evaluation, Evaluator, Mcts, MctsConfig, Rollouts, Selection};
+pub use nnue::{Accumulator, Network, NetworkWeights};
+pub use notation::ParseActionError;
+pub use perft::{PerftCounts, PerftReport, PerftStats, ThreadLoad};
+pub use perft_job::{PerftJob, PerftProgress, PerftUnit, Shard};
+pub use playout::{HeuristicWeights, PlayoutStats, Playouts, Policy, Rng};
+pub use record::{GameRecord, RecordReader, RecordWriter};
+pub use search::{Search, SearchLimits, SearchResult, MATE_SCORE, MAX_DEPTH};
 pub use square::Square;
 pub use state::State;
+pub use tablebase::{Tablebase, TablebaseValue};
 pub use team::Team;
+pub use transposition::{Replacement, TableStats, TranspositionTable};
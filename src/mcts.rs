@@ -0,0 +1,833 @@
+//! Monte Carlo tree search (MCTS).
+//!
+//! This module provides [`Mcts`], a search tree over [`Game`] positions:
+//!
+//! - **Arena-allocated nodes**: the tree is a single `Vec` of fixed-size
+//!   nodes whose children are stored contiguously, so it has no per-node
+//!   allocations and re-rooting with [`Mcts::advance`] is one compacting copy
+//! - **PUCT or UCT selection** ([`Selection`]), with priors from the evaluator
+//!   or uniform priors when it gives none
+//! - **Batched leaf evaluation**: each round selects up to
+//!   [`MctsConfig::batch_size`] leaves, using **virtual loss** to steer the
+//!   selections apart, and hands them to an [`Evaluator`] in one call. The
+//!   built-in [`Rollouts`] evaluator plays the batch out in parallel on the
+//!   rayon pool, and a neural network can score the whole batch at once
+//! - **Game rules**: leaves are evaluated as [`Game`]s, so threefold
+//!   repetition and the insufficient-progress rule end lines exactly as in
+//!   normal play
+//!
+//! # Values
+//!
+//! Values are in `[-1, 1]` from the point of view of the side to move in the
+//! evaluated position: `1` is a win, `-1` a loss and `0` a draw.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Game, Mcts, MctsConfig, Playouts, Rollouts};
+//!
+//! let mut mcts = Mcts::new(&Game::new(), MctsConfig::default());
+//! let mut rollouts = Rollouts::new(Playouts {
+//!     seed: 7,
+//!     ..Playouts::default()
+//! });
+//!
+//! let done = mcts.run(256, &mut rollouts).unwrap();
+//! assert_eq!(done, 256);
+//! assert_eq!(mcts.simulations(), 256);
+//!
+//! let best = mcts.best_action().unwrap();
+//! assert!(Game::new().actions().contains(&best));
+//! ```
+
+use std::convert::Infallible;
+
+use rayon::prelude::*;
+
+use crate::{Action, Game, GameStatus, Playouts, Rng, Team};
+
+/// Index of the root node.
+const ROOT: u32 = 0;
+
+/// How a child is chosen during selection.
+#[derive(Debug, Default, Clone, Copy, PartialEq, Eq, Hash)]
+pub enum Selection {
+    /// AlphaZero-style PUCT: `Q + c * P * sqrt(N) / (1 + n)`, where unvisited
+    /// children have `Q = 0`.
+    #[default]
+    Puct,
+    /// UCB1: `Q + c * sqrt(ln N / n)`, visiting every child once first.
+    /// Priors are ignored.
+    Uct,
+}
+
+/// Configuration of an [`Mcts`] search.
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub struct MctsConfig {
+    /// Exploration constant `c` of the selection formula.
+    pub exploration: f32,
+    /// Selection formula.
+    pub selection: Selection,
+    /// Maximum number of leaves evaluated together.
+    pub batch_size: usize,
+    /// Number of losses a pending leaf temporarily adds to its path.
+    pub virtual_loss: u32,
+}
+
+impl Default for MctsConfig {
+    /// Returns PUCT with `c = 1.5`, batches of 32 and a virtual loss of 1.
+    fn default() -> Self {
+        Self {
+            exploration: 1.5,
+            selection: Selection::Puct,
+            batch_size: 32,
+            virtual_loss: 1,
+        }
+    }
+}
+
+/// The evaluation of a leaf position.
+#[derive(Debug, Default, Clone, PartialEq)]
+pub struct Evaluation {
+    /// Value in `[-1, 1]` from the side to move's point of view.
+    pub value: f32,
+    /// Prior probability of each legal action, in [`Board::actions`] order,
+    /// or empty for uniform priors.
+    ///
+    /// [`Board::actions`]: crate::Board::actions
+    pub priors: Vec<f32>,
+}
+
+/// Scores batches of leaf positions for [`Mcts::run`].
+pub trait Evaluator {
+    /// Error returned when a batch cannot be evaluated.
+    type Error;
+
+    /// Evaluates `games`, returning one [`Evaluation`] per game in order.
+    ///
+    /// The games are never over, and their history covers the positions
+    /// since the last capture, so repetitions can be detected.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error to abort [`Mcts::run`].
+    fn evaluate(&mut self, games: &[Game]) -> Result<Vec<Evaluation>, Self::Error>;
+}
+
+/// An [`Evaluator`] that scores leaves with one random playout each.
+///
+/// Playouts use the [`Playouts`] policy and ply limit, run in parallel on the
+/// rayon pool, and give uniform priors. Every leaf draws from its own stream,
+/// so results do not depend on the number of threads.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct Rollouts {
+    playouts: Playouts,
+    /// Stream of the next leaf.
+    next: u64,
+}
+
+impl Rollouts {
+    /// Creates a rollout evaluator from a playout configuration.
+    #[must_use]
+    pub const fn new(playouts: Playouts) -> Self {
+        Self { playouts, next: 0 }
+    }
+}
+
+impl Evaluator for Rollouts {
+    type Error = Infallible;
+
+    fn evaluate(&mut self, games: &[Game]) -> Result<Vec<Evaluation>, Infallible> {
+        let first = self.next;
+        self.next += games.len() as u64;
+        let playouts = &self.playouts;
+        Ok(games
+            .par_iter()
+            .enumerate()
+            .map(|(i, game)| {
+                let mover = game.turn();
+                let mut game = game.clone();
+                let mut rng = Rng::new(playouts.seed).fork(first + i as u64);
+                let (status, _) = playouts.finish(&mut game, &mut rng, None);
+                Evaluation {
+                    value: status_value(status, mover),
+                    priors: Vec::new(),
+                }
+            })
+            .collect())
+    }
+}
+
+/// Returns the value of `status` for `team`.
+#[inline]
+fn status_value(status: GameStatus, team: Team) -> f32 {
+    match status {
+        GameStatus::Won(winner) if winner == team => 1.0,
+        GameStatus::Won(_) => -1.0,
+        GameStatus::Draw | GameStatus::InProgress => 0.0,
+    }
+}
+
+/// Undoes every move played on `game` since it was forked.
+#[inline]
+fn rewind(game: &mut Game) {
+    while game.undo_move() {}
+}
+
+/// Search statistics of one root action.
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub struct ChildStats {
+    /// The action.
+    pub action: Action,
+    /// Number of simulations through the action.
+    pub visits: u32,
+    /// Mean value of the action for the side to move at the root.
+    pub value: f32,
+    /// Prior probability of the action.
+    pub prior: f32,
+}
+
+/// Expansion state of a node.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+enum NodeState {
+    /// Not evaluated yet.
+    Leaf,
+    /// Selected for evaluation in the current batch.
+    Pending,
+    /// Children created.
+    Expanded,
+    /// The game is over; the value is stored in `terminal`.
+    Terminal,
+}
+
+/// A node of the arena.
+#[derive(Debug, Clone, Copy)]
+struct Node {
+    /// Action leading to this node (empty for the root).
+    action: Action,
+    parent: u32,
+    first_child: u32,
+    child_count: u32,
+    state: NodeState,
+    prior: f32,
+    /// Value of a terminal node for its side to move.
+    terminal: f32,
+    visits: u32,
+    /// Visits added by pending simulations, each counted as a loss.
+    virtual_visits: u32,
+    /// Sum of values for the player who played `action`.
+    value_sum: f64,
+}
+
+impl Node {
+    const fn new(action: Action, parent: u32, prior: f32) -> Self {
+        Self {
+            action,
+            parent,
+            first_child: 0,
+            child_count: 0,
+            state: NodeState::Leaf,
+            prior,
+            terminal: 0.0,
+            visits: 0,
+            virtual_visits: 0,
+            value_sum: 0.0,
+        }
+    }
+
+    /// Mean value for the player who played `action`, counting virtual losses.
+    #[inline]
+    fn q(&self) -> f32 {
+        let n = self.visits + self.virtual_visits;
+        if n == 0 {
+            0.0
+        } else {
+            ((self.value_sum - f64::from(self.virtual_visits)) / f64::from(n)) as f32
+        }
+    }
+}
+
+/// Outcome of descending the tree once.
+enum Descent {
+    /// Reached a leaf to evaluate.
+    Leaf(u32),
+    /// Reached a finished game with this value for its side to move.
+    Terminal(u32, f32),
+    /// Reached a leaf already pending in this batch.
+    Collision(u32),
+}
+
+/// A Monte Carlo search tree rooted at a game position.
+///
+/// The tree keeps its statistics between calls to [`run`](Self::run), and
+/// [`advance`](Self::advance) re-roots it at a child so that the work spent on
+/// the chosen line is reused for the next move.
+#[derive(Debug, Clone)]
+pub struct Mcts {
+    config: MctsConfig,
+    root: Game,
+    nodes: Vec<Node>,
+}
+
+impl Mcts {
+    /// Creates an empty tree rooted at `game`.
+    ///
+    /// The tree holds a [`fork`](Game::fork) of the game, so positions
+    /// repeated since the last capture count towards threefold repetition.
+    #[must_use]
+    pub fn new(game: &Game, config: MctsConfig) -> Self {
+        Self {
+            config,
+            root: game.fork(),
+            nodes: vec![Node::new(Action::EMPTY, ROOT, 1.0)],
+        }
+    }
+
+    /// Returns the configuration.
+    #[inline]
+    #[must_use]
+    pub const fn config(&self) -> &MctsConfig {
+        &self.config
+    }
+
+    /// Returns the root position.
+    #[inline]
+    #[must_use]
+    pub const fn game(&self) -> &Game {
+        &self.root
+    }
+
+    /// Returns the number of nodes in the tree.
+    #[inline]
+    #[must_use]
+    pub fn node_count(&self) -> usize {
+        self.nodes.len()
+    }
+
+    /// Returns the number of completed simulations (the root's visit count).
+    #[inline]
+    #[must_use]
+    pub fn simulations(&self) -> u64 {
+        u64::from(self.nodes[ROOT as usize].visits)
+    }
+
+    /// Returns the mean value of the root for its side to move.
+    #[must_use]
+    pub fn root_value(&self) -> f32 {
+        let root = &self.nodes[ROOT as usize];
+        if root.visits == 0 {
+            0.0
+        } else {
+            (-root.value_sum / f64::from(root.visits)) as f32
+        }
+    }
+
+    /// Returns the statistics of every root action, in [`Board::actions`]
+    /// order, or an empty vector if the root has not been expanded.
+    ///
+    /// [`Board::actions`]: crate::Board::actions
+    #[must_use]
+    pub fn children(&self) -> Vec<ChildStats> {
+        self.child_range(ROOT)
+            .map(|index| {
+                let node = &self.nodes[index];
+                ChildStats {
+                    action: node.action,
+                    visits: node.visits,
+                    value: node.q(),
+                    prior: node.prior,
+                }
+            })
+            .collect()
+    }
+
+    /// Returns the most visited root action (ties go to the higher prior), or
+    /// `None` if the root has not been expanded.
+    #[must_use]
+    pub fn best_action(&self) -> Option<Action> {
+        let mut best: Option<ChildStats> = None;
+        for child in self.children() {
+            // Exact ties keep the earlier action
+            if best.map_or(true, |b| (child.visits, child.prior) > (b.visits, b.prior)) {
+                best = Some(child);
+            }
+        }
+        best.map(|child| child.action)
+    }
+
+    /// Runs `simulations` simulations, evaluating leaves with `evaluator`.
+    ///
+    /// Returns the number of simulations completed, which is `simulations`
+    /// unless the evaluator fails. Simulations that reach a finished game are
+    /// scored by the rules without calling the evaluator.
+    ///
+    /// # Errors
+    ///
+    /// Returns the evaluator's error. Simulations of earlier batches are kept;
+    /// those of the failed batch that needed the evaluator are discarded.
+    ///
+    /// # Panics
+    ///
+    /// Panics if the evaluator returns the wrong number of evaluations, or
+    /// priors whose length is neither zero nor the number of legal actions.
+    pub fn run<E: Evaluator>(
+        &mut self,
+        simulations: u64,
+        evaluator: &mut E,
+    ) -> Result<u64, E::Error> {
+        let batch_size = self.config.batch_size.max(1);
+        let mut leaves: Vec<u32> = Vec::with_capacity(batch_size);
+        let mut games: Vec<Game> = Vec::with_capacity(batch_size);
+        let mut done = 0;
+
+        while done < simulations {
+            let want = (simulations - done).min(batch_size as u64);
+            let mut game = self.root.fork();
+            leaves.clear();
+            games.clear();
+
+            for _ in 0..want {
+                rewind(&mut game);
+                match self.descend(&mut game) {
+                    Descent::Leaf(leaf) => {
+                        self.nodes[leaf as usize].state = NodeState::Pending;
+                        leaves.push(leaf);
+                        games.push(game.fork());
+                    }
+                    Descent::Terminal(leaf, value) => {
+                        self.backup(leaf, value);
+                        done += 1;
+                    }
+                    Descent::Collision(leaf) => {
+                        // The rest of the batch would mostly collide as well
+                        self.revert_virtual_loss(leaf);
+                        break;
+                    }
+                }
+            }
+
+            if games.is_empty() {
+                continue;
+            }
+            let evaluations = match evaluator.evaluate(&games) {
+                Ok(evaluations) => evaluations,
+                Err(error) => {
+                    for &leaf in &leaves {
+                        self.nodes[leaf as usize].state = NodeState::Leaf;
+                        self.revert_virtual_loss(leaf);
+                    }
+                    return Err(error);
+                }
+            };
+            assert_eq!(
+                evaluations.len(),
+                games.len(),
+                "evaluator must return one evaluation per game"
+            );
+            for ((&leaf, game), evaluation) in leaves.iter().zip(&games).zip(evaluations) {
+                self.expand(leaf, game, &evaluation.priors);
+                self.backup(leaf, evaluation.value);
+                done += 1;
+            }
+        }
+        Ok(done)
+    }
+
+    /// Re-roots the tree at the position after `action`, keeping its subtree.
+    ///
+    /// The action must be legal at the root. If it was never expanded, the
+    /// tree starts afresh from the new position.
+    pub fn advance(&mut self, action: &Action) {
+        let child = self
+            .child_range(ROOT)
+            .find(|&index| self.nodes[index].action == *action);
+        self.root.make_move(action);
+        self.root = self.root.fork();
+
+        let Some(child) = child else {
+            self.nodes = vec![Node::new(Action::EMPTY, ROOT, 1.0)];
+            return;
+        };
+
+        // Copy the subtree breadth-first; children stay contiguous
+        let mut nodes = Vec::with_capacity(self.nodes.len());
+        let mut sources = vec![child as u32];
+        let mut root = self.nodes[child];
+        root.action = Action::EMPTY;
+        root.parent = ROOT;
+        root.prior = 1.0;
+        nodes.push(root);
+        let mut next = 0;
+        while next < nodes.len() {
+            let source = self.nodes[sources[next] as usize];
+            if source.state == NodeState::Expanded {
+                let first = nodes.len() as u32;
+                for index in self.child_range(sources[next]) {
+                    let mut node = self.nodes[index];
+                    node.parent = next as u32;
+                    nodes.push(node);
+                    sources.push(index as u32);
+                }
+                nodes[next].first_child = first;
+            }
+            next += 1;
+        }
+        self.nodes = nodes;
+    }
+
+    /// Returns the arena indices of `node`'s children.
+    #[inline]
+    fn child_range(&self, node: u32) -> std::ops::Range<usize> {
+        let node = &self.nodes[node as usize];
+        if node.state == NodeState::Expanded {
+            let first = node.first_child as usize;
+            first..first + node.child_count as usize
+        } else {
+            0..0
+        }
+    }
+
+    /// Walks from the root to a leaf, playing the path on `game` and adding
+    /// virtual loss to every node on it.
+    fn descend(&mut self, game: &mut Game) -> Descent {
+        let virtual_loss = self.config.virtual_loss;
+        let mut current = ROOT;
+        loop {
+            let node = &mut self.nodes[current as usize];
+            node.virtual_visits += virtual_loss;
+            match node.state {
+                NodeState::Expanded => {}
+                NodeState::Terminal => return Descent::Terminal(current, node.terminal),
+                NodeState::Pending => return Descent::Collision(current),
+                NodeState::Leaf => {
+                    let status = game.status();
+                    if !status.is_over() {
+                        return Descent::Leaf(current);
+                    }
+                    node.state = NodeState::Terminal;
+                    node.terminal = status_value(status, game.turn());
+                    return Descent::Terminal(current, node.terminal);
+                }
+            }
+            current = self.select(current);
+            game.make_move(&self.nodes[current as usize].action);
+        }
+    }
+
+    /// Returns the child of `parent` with the highest selection score.
+    fn select(&self, parent: u32) -> u32 {
+        let node = &self.nodes[parent as usize];
+        let parent_visits = (node.visits + node.virtual_visits).max(1) as f32;
+        let c = self.config.exploration;
+        let score = |child: &Node| match self.config.selection {
+            Selection::Puct => {
+                let n = (child.visits + child.virtual_visits) as f32;
+                child.q() + c * child.prior * parent_visits.sqrt() / (1.0 + n)
+            }
+            Selection::Uct => {
+                let n = child.visits + child.virtual_visits;
+                if n == 0 {
+                    f32::INFINITY
+                } else {
+                    child.q() + c * (parent_visits.ln() / n as f32).sqrt()
+                }
+            }
+        };
+
+        let mut best = node.first_child;
+        let mut best_score = f32::NEG_INFINITY;
+        for index in self.child_range(parent) {
+            let score = score(&self.nodes[index]);
+            if score > best_score {
+                best = index as u32;
+                best_score = score;
+            }
+        }
+        best
+    }
+
+    /// Creates the children of `leaf` for the position of `game`.
+    fn expand(&mut self, leaf: u32, game: &Game, priors: &[f32]) {
+        let actions = game.actions();
+        assert!(
+            priors.is_empty() || priors.len() == actions.len(),
+            "expected {} priors, got {}",
+            actions.len(),
+            priors.len()
+        );
+        let uniform = 1.0 / actions.len() as f32;
+        let first = self.nodes.len() as u32;
+        self.nodes
+            .extend(actions.iter().enumerate().map(|(i, &action)| {
+                Node::new(action, leaf, priors.get(i).copied().unwrap_or(uniform))
+            }));
+        let node = &mut self.nodes[leaf as usize];
+        node.first_child = first;
+        node.child_count = actions.len() as u32;
+        node.state = NodeState::Expanded;
+    }
+
+    /// Adds `value` (for the side to move at `leaf`) to the path back to the
+    /// root, removing the path's virtual loss.
+    fn backup(&mut self, leaf: u32, value: f32) {
+        let virtual_loss = self.config.virtual_loss;
+        // Stored values are for the player who moved into the node
+        let mut value = -f64::from(value);
+        let mut current = leaf;
+        loop {
+            let node = &mut self.nodes[current as usize];
+            node.visits += 1;
+            node.value_sum += value;
+            node.virtual_visits -= virtual_loss;
+            if current == ROOT {
+                return;
+            }
+            current = node.parent;
+            value = -value;
+        }
+    }
+
+    /// Removes the virtual loss of an abandoned simulation ending at `leaf`.
+    fn revert_virtual_loss(&mut self, leaf: u32) {
+        let virtual_loss = self.config.virtual_loss;
+        let mut current = leaf;
+        loop {
+            let node = &mut self.nodes[current as usize];
+            node.virtual_visits -= virtual_loss;
+            if current == ROOT {
+                return;
+            }
+            current = node.parent;
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{Board, Square};
+
+    /// Evaluates every position as a draw, counting calls.
+    struct Neutral {
+        batches: Vec<usize>,
+    }
+
+    impl Evaluator for Neutral {
+        type Error = Infallible;
+
+        fn evaluate(&mut self, games: &[Game]) -> Result<Vec<Evaluation>, Infallible> {
+            self.batches.push(games.len());
+            Ok(vec![Evaluation::default(); games.len()])
+        }
+    }
+
+    /// Fails on every call.
+    struct Failing;
+
+    impl Evaluator for Failing {
+        type Error = &'static str;
+
+        fn evaluate(&mut self, _games: &[Game]) -> Result<Vec<Evaluation>, &'static str> {
+            Err("no network")
+        }
+    }
+
+    fn rollouts(seed: u64) -> Rollouts {
+        Rollouts::new(Playouts {
+            seed,
+            policy: crate::Policy::CapturePreferring,
+            ..Playouts::default()
+        })
+    }
+
+    fn assert_no_virtual_loss(mcts: &Mcts) {
+        assert!(mcts.nodes.iter().all(|node| node.virtual_visits == 0));
+        assert!(mcts
+            .nodes
+            .iter()
+            .all(|node| node.state != NodeState::Pending));
+    }
+
+    #[test]
+    fn run_counts_simulations() {
+        let mut mcts = Mcts::new(&Game::new(), MctsConfig::default());
+        let done = mcts.run(100, &mut rollouts(1)).unwrap();
+        assert_eq!(done, 100);
+        assert_eq!(mcts.simulations(), 100);
+        let visits: u32 = mcts.children().iter().map(|c| c.visits).sum();
+        // The first simulation expands the root
+        assert_eq!(visits, 99);
+        assert_no_virtual_loss(&mcts);
+    }
+
+    #[test]
+    fn children_follow_action_order() {
+        let game = Game::new();
+        let mut mcts = Mcts::new(&game, MctsConfig::default());
+        mcts.run(10, &mut rollouts(2)).unwrap();
+        let actions: Vec<Action> = mcts.children().iter().map(|c| c.action).collect();
+        assert_eq!(actions, game.actions());
+    }
+
+    #[test]
+    fn first_batch_collides_on_unexpanded_root() {
+        let mut mcts = Mcts::new(&Game::new(), MctsConfig::default());
+        let mut evaluator = Neutral {
+            batches: Vec::new(),
+        };
+        mcts.run(40, &mut evaluator).unwrap();
+        assert_eq!(evaluator.batches[0], 1);
+        // Virtual loss spreads later batches over several leaves
+        assert!(evaluator.batches[1] > 1);
+        assert_eq!(evaluator.batches.iter().sum::<usize>(), 40);
+        assert_no_virtual_loss(&mcts);
+    }
+
+    #[test]
+    fn run_is_deterministic() {
+        let run = || {
+            let mut mcts = Mcts::new(&Game::new(), MctsConfig::default());
+            mcts.run(300, &mut rollouts(3)).unwrap();
+            mcts.children()
+        };
+        assert_eq!(run(), run());
+    }
+
+    #[test]
+    fn terminal_root_is_scored_by_rules() {
+        // Black has no pieces left, so White has won
+        let board = Board::from_squares(Team::Black, &[Square::D4], &[], &[]);
+        let mut mcts = Mcts::new(&Game::from_board(board), MctsConfig::default());
+        let mut evaluator = Neutral {
+            batches: Vec::new(),
+        };
+        let done = mcts.run(5, &mut evaluator).unwrap();
+        assert_eq!(done, 5);
+        assert!(evaluator.batches.is_empty());
+        assert_eq!(mcts.root_value(), -1.0);
+        assert_eq!(mcts.best_action(), None);
+    }
+
+    #[test]
+    fn priors_steer_puct() {
+        struct Favourite;
+
+        impl Evaluator for Favourite {
+            type Error = Infallible;
+
+            fn evaluate(&mut self, games: &[Game]) -> Result<Vec<Evaluation>, Infallible> {
+                Ok(games
+                    .iter()
+                    .map(|game| {
+                        let count = game.actions().len();
+                        let mut priors = vec![0.0; count];
+                        priors[count - 1] = 1.0;
+                        Evaluation { value: 0.0, priors }
+                    })
+                    .collect())
+            }
+        }
+
+        let game = Game::new();
+        let mut mcts = Mcts::new(&game, MctsConfig::default());
+        mcts.run(50, &mut Favourite).unwrap();
+        assert_eq!(mcts.best_action(), game.actions().last().copied());
+    }
+
+    #[test]
+    fn uct_visits_every_child() {
+        let config = MctsConfig {
+            selection: Selection::Uct,
+            batch_size: 1,
+            ..MctsConfig::default()
+        };
+        let mut mcts = Mcts::new(&Game::new(), config);
+        let children = Game::new().actions().len() as u64;
+        mcts.run(children + 1, &mut rollouts(5)).unwrap();
+        assert!(mcts.children().iter().all(|c| c.visits == 1));
+    }
+
+    #[test]
+    fn evaluator_error_discards_batch() {
+        let mut mcts = Mcts::new(&Game::new(), MctsConfig::default());
+        mcts.run(20, &mut rollouts(6)).unwrap();
+        let nodes = mcts.node_count();
+        assert_eq!(mcts.run(20, &mut Failing), Err("no network"));
+        assert_eq!(mcts.simulations(), 20);
+        assert_eq!(mcts.node_count(), nodes);
+        assert_no_virtual_loss(&mcts);
+    }
+
+    #[test]
+    fn advance_keeps_subtree() {
+        let mut mcts = Mcts::new(&Game::new(), MctsConfig::default());
+        mcts.run(500, &mut rollouts(7)).unwrap();
+        let best = mcts
+            .children()
+            .into_iter()
+            .max_by_key(|c| c.visits)
+            .unwrap();
+
+        mcts.advance(&best.action);
+        assert_eq!(mcts.simulations(), u64::from(best.visits));
+        assert_eq!(mcts.game().board().turn, Team::Black);
+        let visits: u32 = mcts.children().iter().map(|c| c.visits).sum();
+        assert_eq!(u64::from(visits), mcts.simulations() - 1);
+        for (index, node) in mcts.nodes.iter().enumerate().skip(1) {
+            let parent = &mcts.nodes[node.parent as usize];
+            assert!(mcts.child_range(node.parent).contains(&index));
+            assert_eq!(parent.state, NodeState::Expanded);
+        }
+
+        mcts.run(10, &mut rollouts(8)).unwrap();
+        assert_eq!(mcts.simulations(), u64::from(best.visits) + 10);
+    }
+
+    #[test]
+    fn advance_to_unexpanded_action_resets() {
+        let game = Game::new();
+        let mut mcts = Mcts::new(&game, MctsConfig::default());
+        mcts.advance(&game.actions()[0]);
+        assert_eq!(mcts.node_count(), 1);
+        assert_eq!(mcts.simulations(), 0);
+    }
+
+    #[test]
+    fn root_draw_follows_game_history() {
+        // Shuffling kings back and forth twice repeats the start a third time
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::A1, Square::B1],
+            &[Square::H7, Square::H8],
+            &[Square::A1, Square::B1, Square::H7, Square::H8],
+        );
+        let mut game = Game::from_board(board);
+        for _ in 0..2 {
+            for (from, to) in [
+                (Square::A1, Square::A2),
+                (Square::H8, Square::G8),
+                (Square::A2, Square::A1),
+                (Square::G8, Square::H8),
+            ] {
+                let mask = from.to_mask() | to.to_mask();
+                let friendly = game.turn().to_usize();
+                let action = game
+                    .actions()
+                    .into_iter()
+                    .find(|a| a.delta.pieces[friendly] == mask)
+                    .unwrap();
+                game.make_move(&action);
+            }
+        }
+        assert_eq!(game.board().status(), GameStatus::InProgress);
+
+        let mut mcts = Mcts::new(&game, MctsConfig::default());
+        let mut evaluator = Neutral {
+            batches: Vec::new(),
+        };
+        mcts.run(3, &mut evaluator).unwrap();
+        assert!(evaluator.batches.is_empty());
+        assert_eq!(mcts.nodes[ROOT as usize].state, NodeState::Terminal);
+        assert_eq!(mcts.root_value(), 0.0);
+    }
+}
@@ -0,0 +1,804 @@
+//! NNUE-style static evaluation with integer inference.
+//!
+//! A [`Network`] is a small quantized network whose first layer, the
+//! *accumulator*, is a sum of weight rows over the pieces on the board. A move
+//! only touches the squares in its [`Action::delta`], so the accumulator is
+//! updated by subtracting and adding a few rows instead of being recomputed.
+//! Deltas are XORs, so the same update applied to the resulting position
+//! undoes the move, and a search can keep one accumulator per ply.
+//!
+//! # Architecture
+//!
+//! - **Features**: 256 per perspective: own men, own kings, opponent men and
+//!   opponent kings on each square. Black's perspective is rotated by 180
+//!   degrees, so both sides see the board from their own back row.
+//! - **Accumulator**: `256 → L1` with `i16` weights, kept for both
+//!   perspectives.
+//! - **Hidden layer**: the side to move's clipped accumulator followed by the
+//!   opponent's, `2·L1 → L2` with `i8` weights and `i32` sums.
+//! - **Output**: `L2 → 1` with `i16` weights, in centi-men from the side to
+//!   move's point of view.
+//!
+//! The inner loops are straight-line integer code over plain slices whose
+//! lengths are multiples of 16, which the compiler auto-vectorizes for
+//! whatever SIMD width the target supports (build with
+//! `-C target-cpu=native` for the widest vectors).
+//!
+//! # Quantization
+//!
+//! The float network it is trained from, for example in PyTorch, computes
+//!
+//! ```text
+//! a = clamp(ft(us), 0, 1) ++ clamp(ft(them), 0, 1)
+//! h = clamp(hidden(a), 0, 1)
+//! y = output(h)                  // in men
+//! ```
+//!
+//! [`Network::quantize`] scales activations by 127 and the hidden and output
+//! weights by 64, so that every layer runs in integers.
+//!
+//! # File Layout
+//!
+//! ```text
+//! magic            8 bytes          "KISHNN\0\x01"
+//! accumulator      u32              L1, a multiple of 16, at most 512
+//! hidden           u32              L2, at least 1, at most 256
+//! feature weights  i16 [256][L1]    one row per feature
+//! feature bias     i16 [L1]
+//! hidden weights   i8  [L2][2·L1]   one row per hidden unit
+//! hidden bias      i32 [L2]
+//! output weights   i16 [L2]
+//! output bias      i32
+//! ```
+//!
+//! All integers are little-endian. Feature `f` of a piece is
+//! `(kind · 64) + square`, with kinds own man, own king, opponent man and
+//! opponent king, and squares numbered as in [`Square`](crate::Square).
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, Network, NetworkWeights};
+//!
+//! // A toy network; trained weights come from `Network::load`
+//! let network = Network::quantize(&NetworkWeights {
+//!     feature_weights: &[0.01; 16 * 256],
+//!     feature_bias: &[0.0; 16],
+//!     hidden_weights: &[0.5; 32],
+//!     hidden_bias: &[0.0],
+//!     output_weights: &[1.0],
+//!     output_bias: 0.0,
+//! });
+//!
+//! let board = Board::new_default();
+//! let action = board.actions()[0];
+//! let mut accumulator = network.accumulator(&board);
+//! network.update(&mut accumulator, &board, &action);
+//!
+//! let mut child = board.apply(&action);
+//! child.swap_turn_();
+//! assert_eq!(accumulator, network.accumulator(&child));
+//! assert_eq!(
+//!     network.evaluate_accumulator(&accumulator, child.turn),
+//!     child.evaluate_network(&network),
+//! );
+//!
+//! // The same update from the child undoes the move
+//! network.update(&mut accumulator, &child, &action);
+//! assert_eq!(accumulator, network.accumulator(&board));
+//! ```
+
+use std::fs::File;
+use std::io::{self, BufReader, BufWriter, Read, Write};
+use std::path::Path;
+
+use rayon::prelude::*;
+
+use crate::{Action, Board, BoardColumns, State, Team};
+
+/// File signature and format version.
+const MAGIC: &[u8; 8] = b"KISHNN\0\x01";
+
+/// Number of input features per perspective.
+const FEATURES: usize = 256;
+
+/// The accumulator size is a multiple of this many lanes.
+const LANES: usize = 16;
+
+/// Largest supported accumulator size.
+const MAX_ACCUMULATOR: usize = 512;
+
+/// Largest supported hidden layer size.
+const MAX_HIDDEN: usize = 256;
+
+/// Quantized value of an activation of 1.0.
+const ACTIVATION_MAX: i32 = 127;
+
+/// Scale of the hidden and output weights, as a shift.
+const WEIGHT_SHIFT: u32 = 6;
+
+/// Scale of the hidden and output weights.
+const WEIGHT_SCALE: i32 = 1 << WEIGHT_SHIFT;
+
+/// Boards per parallel task in batch evaluation.
+const CHUNK: usize = 1024;
+
+/// Float weights of a network, in the `[out][in]` layout of PyTorch's
+/// `nn.Linear`, for [`Network::quantize`].
+#[derive(Debug, Clone, Copy)]
+pub struct NetworkWeights<'a> {
+    /// Accumulator weights, `[L1][256]`.
+    pub feature_weights: &'a [f32],
+    /// Accumulator bias, `[L1]`.
+    pub feature_bias: &'a [f32],
+    /// Hidden layer weights, `[L2][2·L1]`: side to move first.
+    pub hidden_weights: &'a [f32],
+    /// Hidden layer bias, `[L2]`.
+    pub hidden_bias: &'a [f32],
+    /// Output weights, `[L2]`.
+    pub output_weights: &'a [f32],
+    /// Output bias.
+    pub output_bias: f32,
+}
+
+/// The first layer of a [`Network`] for one position, from both sides'
+/// perspectives.
+///
+/// Create one with [`Network::accumulator`] and keep it in step with the
+/// position with [`Network::update`]. An accumulator only fits the network
+/// that created it.
+#[derive(Debug, Clone, Default, PartialEq, Eq)]
+pub struct Accumulator {
+    /// White's perspective, then Black's.
+    values: Vec<i16>,
+}
+
+/// A quantized NNUE-style evaluation network.
+///
+/// See the [module documentation](self) for the architecture and file
+/// layout. Networks are immutable and can be shared between threads.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct Network {
+    accumulator_size: usize,
+    hidden_size: usize,
+    /// `[256][L1]`, one row per feature.
+    feature_weights: Vec<i16>,
+    feature_bias: Vec<i16>,
+    /// `[L2][2·L1]`, `i8` values widened for the multiply-add.
+    hidden_weights: Vec<i16>,
+    hidden_bias: Vec<i32>,
+    output_weights: Vec<i16>,
+    output_bias: i32,
+}
+
+/// Returns an `InvalidData` error with `message`.
+fn invalid(message: impl Into<String>) -> io::Error {
+    io::Error::new(io::ErrorKind::InvalidData, message.into())
+}
+
+/// Returns the feature of a piece of `team` on `square` as seen by
+/// `perspective` (0 for White, 1 for Black).
+#[inline]
+const fn feature(perspective: usize, team: usize, king: bool, square: u32) -> usize {
+    let square = if perspective == 0 {
+        square
+    } else {
+        63 - square
+    };
+    ((team ^ perspective) * 2 + king as usize) * 64 + square as usize
+}
+
+/// Returns the team and kind of the piece on `square`, if any.
+#[inline]
+const fn piece_at(state: &State, square: u32) -> Option<(usize, bool)> {
+    let bit = 1 << square;
+    let king = state.kings & bit != 0;
+    if state.pieces[0] & bit != 0 {
+        Some((0, king))
+    } else if state.pieces[1] & bit != 0 {
+        Some((1, king))
+    } else {
+        None
+    }
+}
+
+/// Adds `row` to `values`.
+#[inline]
+fn add_row(values: &mut [i16], row: &[i16]) {
+    for (value, &weight) in values.iter_mut().zip(row) {
+        *value = value.wrapping_add(weight);
+    }
+}
+
+/// Subtracts `row` from `values`.
+#[inline]
+fn sub_row(values: &mut [i16], row: &[i16]) {
+    for (value, &weight) in values.iter_mut().zip(row) {
+        *value = value.wrapping_sub(weight);
+    }
+}
+
+/// Clips `values` to `[0, ACTIVATION_MAX]` into `out`.
+#[inline]
+fn clip(values: &[i16], out: &mut [i16]) {
+    for (out, &value) in out.iter_mut().zip(values) {
+        *out = value.clamp(0, ACTIVATION_MAX as i16);
+    }
+}
+
+/// Returns the dot product of `input` and `weights`.
+#[inline]
+fn dot(input: &[i16], weights: &[i16]) -> i32 {
+    input
+        .iter()
+        .zip(weights)
+        .map(|(&input, &weight)| i32::from(input) * i32::from(weight))
+        .sum()
+}
+
+/// Quantizes `value` times `scale`, saturating to `[min, max]`.
+#[inline]
+fn quantize(value: f32, scale: f32, min: i32, max: i32) -> i32 {
+    (value * scale).round().clamp(min as f32, max as f32) as i32
+}
+
+impl Network {
+    /// Quantizes float weights trained for the architecture in the
+    /// [module documentation](self).
+    ///
+    /// Weights outside the integer ranges saturate.
+    ///
+    /// # Panics
+    ///
+    /// Panics if the accumulator size `L1` (the length of `feature_bias`) is
+    /// not a multiple of 16 up to 512, if the hidden size `L2` (the length of
+    /// `hidden_bias`) is not between 1 and 256, or if any other slice does
+    /// not match them.
+    #[must_use]
+    pub fn quantize(weights: &NetworkWeights<'_>) -> Self {
+        let (l1, l2) = (weights.feature_bias.len(), weights.hidden_bias.len());
+        assert!(
+            l1 > 0 && l1 % LANES == 0 && l1 <= MAX_ACCUMULATOR,
+            "accumulator size must be a multiple of {LANES} up to {MAX_ACCUMULATOR}, got {l1}"
+        );
+        assert!(
+            (1..=MAX_HIDDEN).contains(&l2),
+            "hidden size must be between 1 and {MAX_HIDDEN}, got {l2}"
+        );
+        assert_eq!(
+            weights.feature_weights.len(),
+            l1 * FEATURES,
+            "feature weights must be [{l1}][{FEATURES}]"
+        );
+        assert_eq!(
+            weights.hidden_weights.len(),
+            l2 * 2 * l1,
+            "hidden weights must be [{l2}][{}]",
+            2 * l1
+        );
+        assert_eq!(
+            weights.output_weights.len(),
+            l2,
+            "output weights must be [{l2}]"
+        );
+
+        let activation = ACTIVATION_MAX as f32;
+        let weight = WEIGHT_SCALE as f32;
+        let (i16_min, i16_max) = (i32::from(i16::MIN), i32::from(i16::MAX));
+        let (i8_min, i8_max) = (i32::from(i8::MIN), i32::from(i8::MAX));
+
+        // Transpose the accumulator weights to one row per feature
+        let mut feature_weights = vec![0; FEATURES * l1];
+        for (unit, row) in weights.feature_weights.chunks_exact(FEATURES).enumerate() {
+            for (feature, &value) in row.iter().enumerate() {
+                feature_weights[feature * l1 + unit] =
+                    quantize(value, activation, i16_min, i16_max) as i16;
+            }
+        }
+        Self {
+            accumulator_size: l1,
+            hidden_size: l2,
+            feature_weights,
+            feature_bias: weights
+                .feature_bias
+                .iter()
+                .map(|&value| quantize(value, activation, i16_min, i16_max) as i16)
+                .collect(),
+            hidden_weights: weights
+                .hidden_weights
+                .iter()
+                .map(|&value| quantize(value, weight, i8_min, i8_max) as i16)
+                .collect(),
+            hidden_bias: weights
+                .hidden_bias
+                .iter()
+                .map(|&value| quantize(value, activation * weight, i32::MIN, i32::MAX))
+                .collect(),
+            output_weights: weights
+                .output_weights
+                .iter()
+                .map(|&value| quantize(value, weight, i16_min, i16_max) as i16)
+                .collect(),
+            output_bias: quantize(weights.output_bias, activation * weight, i32::MIN, i32::MAX),
+        }
+    }
+
+    /// Reads a network in the layout of the [module documentation](self).
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if reading fails, or [`io::ErrorKind::InvalidData`]
+    /// if the data is not a valid network.
+    pub fn read(mut reader: impl Read) -> io::Result<Self> {
+        let mut bytes = Vec::new();
+        reader.read_to_end(&mut bytes)?;
+        if bytes.len() < MAGIC.len() + 8 || &bytes[..MAGIC.len()] != MAGIC {
+            return Err(invalid("not a kish network"));
+        }
+        let word = |at: usize| u32::from_le_bytes(bytes[at..at + 4].try_into().unwrap()) as usize;
+        let (l1, l2) = (word(8), word(12));
+        if l1 == 0 || l1 % LANES != 0 || l1 > MAX_ACCUMULATOR {
+            return Err(invalid(format!("invalid accumulator size {l1}")));
+        }
+        if !(1..=MAX_HIDDEN).contains(&l2) {
+            return Err(invalid(format!("invalid hidden size {l2}")));
+        }
+        let expected = 16 + 2 * (FEATURES + 1) * l1 + 2 * l1 * l2 + 4 * l2 + 2 * l2 + 4;
+        if bytes.len() != expected {
+            return Err(invalid(format!(
+                "network of size {l1}x{l2} should take {expected} bytes, got {}",
+                bytes.len()
+            )));
+        }
+
+        let mut rest = &bytes[16..];
+        let mut take = |len: usize| {
+            let (head, tail) = rest.split_at(len);
+            rest = tail;
+            head
+        };
+        let i16s = |bytes: &[u8]| -> Vec<i16> {
+            bytes
+                .chunks_exact(2)
+                .map(|b| i16::from_le_bytes([b[0], b[1]]))
+                .collect()
+        };
+        let i32s = |bytes: &[u8]| -> Vec<i32> {
+            bytes
+                .chunks_exact(4)
+                .map(|b| i32::from_le_bytes(b.try_into().unwrap()))
+                .collect()
+        };
+        let feature_weights = i16s(take(2 * FEATURES * l1));
+        let feature_bias = i16s(take(2 * l1));
+        let hidden_weights = take(2 * l1 * l2)
+            .iter()
+            .map(|&byte| i16::from(byte as i8))
+            .collect();
+        let hidden_bias = i32s(take(4 * l2));
+        let output_weights = i16s(take(2 * l2));
+        let output_bias = i32s(take(4))[0];
+
+        Ok(Self {
+            accumulator_size: l1,
+            hidden_size: l2,
+            feature_weights,
+            feature_bias,
+            hidden_weights,
+            hidden_bias,
+            output_weights,
+            output_bias,
+        })
+    }
+
+    /// Loads a network file written by [`save`](Self::save) or exported
+    /// from Python.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the file cannot be read, or
+    /// [`io::ErrorKind::InvalidData`] if it is not a valid network.
+    pub fn load(path: impl AsRef<Path>) -> io::Result<Self> {
+        Self::read(BufReader::new(File::open(path)?))
+    }
+
+    /// Writes the network in the layout of the [module documentation](self).
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if writing fails.
+    pub fn write(&self, mut writer: impl Write) -> io::Result<()> {
+        writer.write_all(MAGIC)?;
+        writer.write_all(&(self.accumulator_size as u32).to_le_bytes())?;
+        writer.write_all(&(self.hidden_size as u32).to_le_bytes())?;
+        for value in self.feature_weights.iter().chain(&self.feature_bias) {
+            writer.write_all(&value.to_le_bytes())?;
+        }
+        let hidden: Vec<u8> = self
+            .hidden_weights
+            .iter()
+            .map(|&value| value as i8 as u8)
+            .collect();
+        writer.write_all(&hidden)?;
+        for value in &self.hidden_bias {
+            writer.write_all(&value.to_le_bytes())?;
+        }
+        for value in &self.output_weights {
+            writer.write_all(&value.to_le_bytes())?;
+        }
+        writer.write_all(&self.output_bias.to_le_bytes())
+    }
+
+    /// Writes the network to the file at `path`.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the file cannot be written.
+    pub fn save(&self, path: impl AsRef<Path>) -> io::Result<()> {
+        let mut writer = BufWriter::new(File::create(path)?);
+        self.write(&mut writer)?;
+        writer.flush()
+    }
+
+    /// Returns the accumulator size `L1`.
+    #[must_use]
+    pub const fn accumulator_size(&self) -> usize {
+        self.accumulator_size
+    }
+
+    /// Returns the hidden layer size `L2`.
+    #[must_use]
+    pub const fn hidden_size(&self) -> usize {
+        self.hidden_size
+    }
+
+    /// Returns the accumulator weights of `feature`.
+    #[inline]
+    fn row(&self, feature: usize) -> &[i16] {
+        let l1 = self.accumulator_size;
+        &self.feature_weights[feature * l1..(feature + 1) * l1]
+    }
+
+    /// Adds (or with `remove`, subtracts) a piece to both perspectives.
+    #[inline]
+    fn toggle(&self, values: &mut [i16], (team, king): (usize, bool), square: u32, remove: bool) {
+        for (perspective, values) in values.chunks_exact_mut(self.accumulator_size).enumerate() {
+            let row = self.row(feature(perspective, team, king, square));
+            if remove {
+                sub_row(values, row);
+            } else {
+                add_row(values, row);
+            }
+        }
+    }
+
+    /// Returns the accumulator of `board`, computed from scratch.
+    #[must_use]
+    pub fn accumulator(&self, board: &Board) -> Accumulator {
+        let mut accumulator = Accumulator::default();
+        self.refresh(&mut accumulator, board);
+        accumulator
+    }
+
+    /// Recomputes `accumulator` from scratch for `board`, reusing its memory.
+    pub fn refresh(&self, accumulator: &mut Accumulator, board: &Board) {
+        let values = &mut accumulator.values;
+        values.clear();
+        values.extend_from_slice(&self.feature_bias);
+        values.extend_from_slice(&self.feature_bias);
+        let mut occupied = board.state.pieces[0] | board.state.pieces[1];
+        while occupied != 0 {
+            let square = occupied.trailing_zeros();
+            occupied &= occupied - 1;
+            if let Some(piece) = piece_at(&board.state, square) {
+                self.toggle(values, piece, square, false);
+            }
+        }
+    }
+
+    /// Updates `accumulator` from `board` to `board.apply(action)`.
+    ///
+    /// Only the squares in the action's delta are visited. Calling it again
+    /// with the resulting board and the same action undoes the update.
+    pub fn update(&self, accumulator: &mut Accumulator, board: &Board, action: &Action) {
+        debug_assert_eq!(accumulator.values.len(), 2 * self.accumulator_size);
+        let before = &board.state;
+        let after = before.apply(&action.delta);
+        let mut changed = action.delta.pieces[0] | action.delta.pieces[1] | action.delta.kings;
+        while changed != 0 {
+            let square = changed.trailing_zeros();
+            changed &= changed - 1;
+            let (old, new) = (piece_at(before, square), piece_at(&after, square));
+            if old == new {
+                continue;
+            }
+            if let Some(piece) = old {
+                self.toggle(&mut accumulator.values, piece, square, true);
+            }
+            if let Some(piece) = new {
+                self.toggle(&mut accumulator.values, piece, square, false);
+            }
+        }
+    }
+
+    /// Evaluates a position from its accumulator, in centi-men from the
+    /// point of view of `turn`, the side to move.
+    #[must_use]
+    pub fn evaluate_accumulator(&self, accumulator: &Accumulator, turn: Team) -> i32 {
+        let l1 = self.accumulator_size;
+        debug_assert_eq!(accumulator.values.len(), 2 * l1);
+        let (white, black) = accumulator.values.split_at(l1);
+        let (ours, theirs) = match turn {
+            Team::White => (white, black),
+            Team::Black => (black, white),
+        };
+        let mut input = [0; 2 * MAX_ACCUMULATOR];
+        clip(ours, &mut input[..l1]);
+        clip(theirs, &mut input[l1..2 * l1]);
+        let input = &input[..2 * l1];
+
+        let mut output = i64::from(self.output_bias);
+        for ((weights, &bias), &weight) in self
+            .hidden_weights
+            .chunks_exact(2 * l1)
+            .zip(&self.hidden_bias)
+            .zip(&self.output_weights)
+        {
+            let sum = bias.wrapping_add(dot(input, weights));
+            let activation = (sum >> WEIGHT_SHIFT).clamp(0, ACTIVATION_MAX);
+            output += i64::from(activation * i32::from(weight));
+        }
+        (output * 100 / i64::from(ACTIVATION_MAX * WEIGHT_SCALE)) as i32
+    }
+
+    /// Evaluates `board` from scratch, in centi-men from the side to move's
+    /// point of view.
+    #[must_use]
+    pub fn evaluate(&self, board: &Board) -> i32 {
+        self.evaluate_accumulator(&self.accumulator(board), board.turn)
+    }
+
+    /// Evaluates every board into `out` on the rayon pool.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len()` is not `boards.len()`.
+    pub fn evaluate_many(&self, boards: &[Board], out: &mut [i32]) {
+        assert_eq!(
+            out.len(),
+            boards.len(),
+            "output must have one entry per board"
+        );
+        out.par_chunks_mut(CHUNK).enumerate().for_each_init(
+            Accumulator::default,
+            |accumulator, (chunk, out)| {
+                for (score, board) in out.iter_mut().zip(&boards[chunk * CHUNK..]) {
+                    self.refresh(accumulator, board);
+                    *score = self.evaluate_accumulator(accumulator, board.turn);
+                }
+            },
+        );
+    }
+
+    /// Evaluates every position of `columns` into `out` on the rayon pool.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `out.len()` is not `columns.len()`.
+    pub fn evaluate_columns(&self, columns: &BoardColumns<'_>, out: &mut [i32]) {
+        assert_eq!(
+            out.len(),
+            columns.len(),
+            "output must have one entry per board"
+        );
+        out.par_chunks_mut(CHUNK).enumerate().for_each_init(
+            Accumulator::default,
+            |accumulator, (chunk, out)| {
+                for (i, score) in out.iter_mut().enumerate() {
+                    let board = columns.board(chunk * CHUNK + i);
+                    self.refresh(accumulator, &board);
+                    *score = self.evaluate_accumulator(accumulator, board.turn);
+                }
+            },
+        );
+    }
+}
+
+impl Board {
+    /// Evaluates the position with `network`, in centi-men from the side to
+    /// move's point of view.
+    ///
+    /// Recomputes the accumulator; keep an [`Accumulator`] up to date with
+    /// [`Network::update`] to evaluate many related positions.
+    #[must_use]
+    pub fn evaluate_network(&self, network: &Network) -> i32 {
+        network.evaluate(self)
+    }
+}
+
+/// Returns a network with pseudo-random weights, for tests and benchmarks.
+#[cfg(test)]
+pub(crate) fn random_network(seed: u64, accumulator_size: usize, hidden_size: usize) -> Network {
+    let mut rng = crate::Rng::new(seed);
+    let mut uniform = |count: usize, scale: f32| -> Vec<f32> {
+        (0..count)
+            .map(|_| (rng.below(2001) as f32 / 1000.0 - 1.0) * scale)
+            .collect()
+    };
+    let feature_weights = uniform(accumulator_size * FEATURES, 0.2);
+    let feature_bias = uniform(accumulator_size, 0.2);
+    let hidden_weights = uniform(hidden_size * 2 * accumulator_size, 0.3);
+    let hidden_bias = uniform(hidden_size, 0.5);
+    let output_weights = uniform(hidden_size, 4.0);
+    Network::quantize(&NetworkWeights {
+        feature_weights: &feature_weights,
+        feature_bias: &feature_bias,
+        hidden_weights: &hidden_weights,
+        hidden_bias: &hidden_bias,
+        output_weights: &output_weights,
+        output_bias: 0.1,
+    })
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{Playouts, Square};
+
+    /// Returns the positions of a few random games, with the action played
+    /// from each.
+    fn game_positions() -> Vec<(Board, Action)> {
+        let playouts = Playouts {
+            seed: 7,
+            record_moves: true,
+            ..Playouts::default()
+        };
+        let mut positions = Vec::new();
+        for moves in playouts.run(&Board::new_default(), 8).moves {
+            let mut board = Board::new_default();
+            for index in moves {
+                let action = board.actions()[index as usize];
+                positions.push((board, action));
+                board.apply_(&action);
+                board.swap_turn_();
+            }
+        }
+        positions
+    }
+
+    #[test]
+    fn incremental_updates_match_refresh() {
+        let network = random_network(1, 32, 8);
+        let positions = game_positions();
+        assert!(positions
+            .iter()
+            .any(|(board, action)| action.is_capture(board.turn)));
+
+        let mut accumulator = network.accumulator(&positions[0].0);
+        for (board, action) in &positions {
+            if *board == Board::new_default() {
+                network.refresh(&mut accumulator, board);
+            }
+            assert_eq!(accumulator, network.accumulator(board));
+            network.update(&mut accumulator, board, action);
+            let mut child = board.apply(action);
+            child.swap_turn_();
+            assert_eq!(accumulator, network.accumulator(&child));
+            // Applying the same delta again undoes the move
+            let mut undone = accumulator.clone();
+            network.update(&mut undone, &child, action);
+            assert_eq!(undone, network.accumulator(board));
+        }
+    }
+
+    #[test]
+    fn promotion_and_king_capture_update() {
+        let network = random_network(2, 16, 4);
+        // A man promotes by capturing a king onto the back row
+        let board = Board::from_squares(Team::White, &[Square::D6], &[Square::D7], &[Square::D7]);
+        let actions = board.actions();
+        assert_eq!(actions.len(), 1);
+        let mut accumulator = network.accumulator(&board);
+        network.update(&mut accumulator, &board, &actions[0]);
+        let child = board.apply(&actions[0]);
+        assert_ne!(child.state.kings, 0);
+        assert_eq!(accumulator, network.accumulator(&child));
+    }
+
+    #[test]
+    fn evaluation_is_symmetric() {
+        let network = random_network(3, 32, 8);
+        for (board, _) in game_positions().iter().step_by(7) {
+            let mirrored = Board::new(!board.turn, board.state.rotate());
+            assert_eq!(network.evaluate(board), network.evaluate(&mirrored));
+        }
+    }
+
+    #[test]
+    fn quantized_output_matches_float() {
+        // Only the output bias: one and a half men
+        let network = Network::quantize(&NetworkWeights {
+            feature_weights: &[0.0; 16 * FEATURES],
+            feature_bias: &[0.0; 16],
+            hidden_weights: &[0.0; 32],
+            hidden_bias: &[0.0],
+            output_weights: &[0.0],
+            output_bias: 1.5,
+        });
+        assert_eq!(network.evaluate(&Board::new_default()), 150);
+
+        // One hidden unit counting own men minus opponent men, in men
+        let mut feature_weights = vec![0.0; 16 * FEATURES];
+        feature_weights[..64].fill(1.0 / 32.0);
+        let mut hidden_weights = vec![0.0; 32];
+        hidden_weights[0] = 1.0;
+        hidden_weights[16] = -1.0;
+        let network = Network::quantize(&NetworkWeights {
+            feature_weights: &feature_weights,
+            feature_bias: &[0.0; 16],
+            hidden_weights: &hidden_weights,
+            hidden_bias: &[0.0],
+            output_weights: &[32.0],
+            output_bias: 0.0,
+        });
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::A2, Square::B2, Square::C2, Square::D2],
+            &[Square::A7],
+            &[],
+        );
+        assert!((network.evaluate(&board) - 300).abs() <= 10);
+        // Clipped at zero when behind
+        assert_eq!(network.evaluate(&board.swap_turn()), 0);
+    }
+
+    #[test]
+    fn evaluate_many_matches_evaluate() {
+        let network = random_network(4, 32, 8);
+        let boards: Vec<Board> = game_positions().iter().map(|&(board, _)| board).collect();
+        let expected: Vec<i32> = boards.iter().map(|board| network.evaluate(board)).collect();
+
+        let mut out = vec![0; boards.len()];
+        network.evaluate_many(&boards, &mut out);
+        assert_eq!(out, expected);
+
+        let white: Vec<u64> = boards.iter().map(|b| b.state.pieces[0]).collect();
+        let black: Vec<u64> = boards.iter().map(|b| b.state.pieces[1]).collect();
+        let kings: Vec<u64> = boards.iter().map(|b| b.state.kings).collect();
+        let turn: Vec<u64> = boards.iter().map(|b| b.turn.to_usize() as u64).collect();
+        out.fill(0);
+        network.evaluate_columns(&BoardColumns::new(&white, &black, &kings, &turn), &mut out);
+        assert_eq!(out, expected);
+    }
+
+    #[test]
+    fn file_roundtrip() {
+        let network = random_network(5, 32, 8);
+        let mut bytes = Vec::new();
+        network.write(&mut bytes).unwrap();
+        assert_eq!(&bytes[..8], MAGIC);
+        assert_eq!(Network::read(bytes.as_slice()).unwrap(), network);
+
+        let error = Network::read(&bytes[..bytes.len() - 1]).unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidData);
+        let error = Network::read(&b"KISHGR\0\x01"[..]).unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidData);
+        let mut resized = bytes.clone();
+        resized[8] = 17;
+        let error = Network::read(resized.as_slice()).unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidData);
+    }
+
+    #[test]
+    #[should_panic(expected = "accumulator size")]
+    fn quantize_rejects_unaligned_accumulator() {
+        let _ = Network::quantize(&NetworkWeights {
+            feature_weights: &[0.0; 10 * FEATURES],
+            feature_bias: &[0.0; 10],
+            hidden_weights: &[0.0; 20],
+            hidden_bias: &[0.0],
+            output_weights: &[0.0],
+            output_bias: 0.0,
+        });
+    }
+}
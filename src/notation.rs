@@ -0,0 +1,372 @@
+//! Parsing moves from algebraic notation.
+//!
+//! [`Board::parse_action`] turns notation such as `d3-d4` or `d4xd6xf6` back
+//! into the matching legal [`Action`]. The candidates come from a
+//! [`MoveGenerator`] and are compared by their bitboard deltas, without
+//! building an [`ActionPath`](crate::ActionPath) for any of them: the moving
+//! piece's source and destination, and whether it captures. When the notation
+//! lists intermediate landing squares, the route is walked on the bitboards
+//! once and the pieces it jumps must be exactly the action's captures.
+//!
+//! Both the full notation written by
+//! [`ActionPath::to_notation`](crate::ActionPath::to_notation) and the short
+//! `fromxto` form of a multi-capture are accepted. Captures may also be
+//! written with `:` as in PDN, and the `=K` suffix may be left out.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, ParseActionError, Square, Team};
+//!
+//! let board = Board::from_squares(Team::White, &[Square::B3], &[Square::C3, Square::D4], &[]);
+//! let action = board.parse_action("b3xd3xd5")?;
+//! assert_eq!(action, board.parse_action("b3xd5")?);
+//! assert_eq!(board.parse_action("b3-b4"), Err(ParseActionError::Illegal));
+//! # Ok::<(), ParseActionError>(())
+//! ```
+
+use std::fmt;
+use std::mem;
+
+use crate::action::MAX_PATH_LEN;
+use crate::{Action, Board, MoveGenerator, Square};
+
+/// Error type for parsing an action from notation.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum ParseActionError {
+    /// The input is not well-formed notation.
+    Syntax,
+    /// No legal action of the position matches.
+    Illegal,
+    /// More than one legal action matches the short notation.
+    Ambiguous,
+}
+
+impl fmt::Display for ParseActionError {
+    fn fmt(&self, f: &mut fmt::Formatter) -> fmt::Result {
+        match self {
+            Self::Syntax => write!(f, "invalid notation, expected squares joined by '-' or 'x'"),
+            Self::Illegal => write!(f, "no legal action matches the notation"),
+            Self::Ambiguous => write!(f, "several legal actions match, give the full path"),
+        }
+    }
+}
+
+impl std::error::Error for ParseActionError {}
+
+/// A parsed notation string.
+struct Notation {
+    path: [Square; MAX_PATH_LEN],
+    len: usize,
+    is_capture: bool,
+    is_promotion: bool,
+}
+
+impl Notation {
+    fn parse(text: &str) -> Result<Self, ParseActionError> {
+        let text = text.trim();
+        let (text, is_promotion) = match text.strip_suffix("=K") {
+            Some(text) => (text, true),
+            None => (text, false),
+        };
+        let bytes = text.as_bytes();
+        if bytes.len() < 5 || (bytes.len() + 1) % 3 != 0 {
+            return Err(ParseActionError::Syntax);
+        }
+        let separator = bytes[2];
+        let is_capture = match separator {
+            b'-' => false,
+            b'x' | b'X' | b':' => true,
+            _ => return Err(ParseActionError::Syntax),
+        };
+        let len = (bytes.len() + 1) / 3;
+        if len > MAX_PATH_LEN || (!is_capture && len != 2) {
+            return Err(ParseActionError::Syntax);
+        }
+
+        let mut path = [Square::A1; MAX_PATH_LEN];
+        for (i, square) in path[..len].iter_mut().enumerate() {
+            let at = 3 * i;
+            if i > 0 && bytes[at - 1] != separator {
+                return Err(ParseActionError::Syntax);
+            }
+            *square = parse_square(bytes[at], bytes[at + 1]).ok_or(ParseActionError::Syntax)?;
+        }
+        Ok(Self {
+            path,
+            len,
+            is_capture,
+            is_promotion,
+        })
+    }
+
+    fn path(&self) -> &[Square] {
+        &self.path[..self.len]
+    }
+}
+
+/// Returns the square with the given file and rank characters.
+pub(crate) fn parse_square(file: u8, rank: u8) -> Option<Square> {
+    let column = match file {
+        b'a'..=b'h' => file - b'a',
+        b'A'..=b'H' => file - b'A',
+        _ => return None,
+    };
+    let row = match rank {
+        b'1'..=b'8' => rank - b'1',
+        _ => return None,
+    };
+    Square::try_from_usize(usize::from(row * 8 + column))
+}
+
+impl Board {
+    /// Returns the legal action written as `notation`.
+    ///
+    /// See the [module documentation](crate::notation) for the accepted forms.
+    ///
+    /// # Errors
+    ///
+    /// Returns [`ParseActionError::Syntax`] for malformed input,
+    /// [`ParseActionError::Illegal`] if no legal action matches and
+    /// [`ParseActionError::Ambiguous`] if a short capture notation matches
+    /// several.
+    pub fn parse_action(&self, notation: &str) -> Result<Action, ParseActionError> {
+        self.parse_action_index(notation, &mut Vec::new())
+            .map(|(_, action)| action)
+    }
+
+    /// Like [`parse_action`](Self::parse_action), also returning the index of
+    /// the action in [`actions`](Self::actions) order. Captures are collected
+    /// into `buffer`, reusing its allocation across calls.
+    pub(crate) fn parse_action_index(
+        &self,
+        notation: &str,
+        buffer: &mut Vec<Action>,
+    ) -> Result<(usize, Action), ParseActionError> {
+        let notation = Notation::parse(notation)?;
+        let source = notation.path[0].to_mask();
+        if self.friendly_pieces() & source == 0 {
+            return Err(ParseActionError::Illegal);
+        }
+        let mut generator = MoveGenerator::with_buffer(self, mem::take(buffer));
+        let found = self.select(&notation, source, &mut generator);
+        *buffer = generator.into_buffer();
+        found
+    }
+
+    /// Returns the only action of `generator` matching `notation`.
+    fn select(
+        &self,
+        notation: &Notation,
+        source: u64,
+        generator: &mut MoveGenerator,
+    ) -> Result<(usize, Action), ParseActionError> {
+        if generator.is_capturing() != notation.is_capture {
+            return Err(ParseActionError::Illegal);
+        }
+        let captured = if notation.len > 2 {
+            Some(
+                self.route_captures(notation.path())
+                    .ok_or(ParseActionError::Illegal)?,
+            )
+        } else {
+            None
+        };
+        let moved = source ^ notation.path[notation.len - 1].to_mask();
+        let team = self.turn;
+        let mut found: Option<(usize, Action)> = None;
+        for (index, action) in generator.enumerate() {
+            if action.delta.pieces[team.to_usize()] != moved
+                || captured.is_some_and(|captured| action.captured_pieces(team) != captured)
+                || (notation.is_promotion && !action.is_promotion(team, &self.state))
+            {
+                continue;
+            }
+            // Routes capturing the same pieces give identical actions.
+            match found {
+                Some((_, first)) if first == action => {}
+                Some(_) => return Err(ParseActionError::Ambiguous),
+                None => found = Some((index, action)),
+            }
+        }
+        found.ok_or(ParseActionError::Illegal)
+    }
+
+    /// Returns the pieces jumped along a capture route, or `None` if a leg
+    /// is not straight, lands on an occupied square or does not jump exactly
+    /// one hostile piece.
+    fn route_captures(&self, path: &[Square]) -> Option<u64> {
+        let hostile = self.hostile_pieces();
+        let mut occupied = !self.state.empty() & !path[0].to_mask();
+        let mut captured = 0;
+        for leg in path.windows(2) {
+            let jumped = squares_between(leg[0], leg[1])? & occupied;
+            if jumped.count_ones() != 1 || jumped & hostile == 0 {
+                return None;
+            }
+            occupied ^= jumped;
+            if occupied & leg[1].to_mask() != 0 {
+                return None;
+            }
+            captured |= jumped;
+        }
+        Some(captured)
+    }
+}
+
+/// Returns the squares strictly between `from` and `to`, or `None` if they
+/// do not share a row or a column.
+fn squares_between(from: Square, to: Square) -> Option<u64> {
+    let step: i32 = if from == to {
+        return None;
+    } else if from.row() == to.row() {
+        1
+    } else if from.column() == to.column() {
+        8
+    } else {
+        return None;
+    };
+    let (from, to) = (from as i32, to as i32);
+    let step = if to > from { step } else { -step };
+    let mut between = 0u64;
+    let mut square = from + step;
+    while square != to {
+        between |= 1 << square;
+        square += step;
+    }
+    Some(between)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{Playouts, Team};
+
+    /// Returns the positions of a few random games.
+    fn game_positions() -> Vec<Board> {
+        let playouts = Playouts {
+            seed: 11,
+            record_moves: true,
+            ..Playouts::default()
+        };
+        let start = Board::new_default();
+        let mut positions = Vec::new();
+        for moves in playouts.run(&start, 20).moves {
+            let mut board = start;
+            for index in moves {
+                positions.push(board);
+                board = board.apply(&board.actions()[index as usize]);
+                board.swap_turn_();
+            }
+        }
+        positions
+    }
+
+    #[test]
+    fn notation_round_trips() {
+        let mut buffer = Vec::new();
+        for board in game_positions() {
+            let actions = board.actions();
+            for action in &actions {
+                let notation = action.to_detailed(board.turn, &board.state).to_notation();
+                // Routes capturing the same pieces are listed once per route.
+                let index = actions.iter().position(|other| other == action).unwrap();
+                assert_eq!(
+                    board.parse_action_index(&notation, &mut buffer),
+                    Ok((index, *action)),
+                    "{notation} in\n{board}"
+                );
+            }
+        }
+    }
+
+    #[test]
+    fn short_capture_notation() {
+        let board = Board::from_squares(Team::White, &[Square::B3], &[Square::C3, Square::D4], &[]);
+        let action = board.parse_action("b3xd3xd5").unwrap();
+        assert_eq!(board.parse_action("b3xd5"), Ok(action));
+        assert_eq!(board.parse_action("B3:D5"), Ok(action));
+        assert_eq!(
+            board.parse_action("b3xd3xd5=K"),
+            Err(ParseActionError::Illegal)
+        );
+        assert_eq!(
+            board.parse_action("b3xc3xd5"),
+            Err(ParseActionError::Illegal)
+        );
+        assert_eq!(board.parse_action("b3-b4"), Err(ParseActionError::Illegal));
+    }
+
+    #[test]
+    fn short_notation_is_ambiguous_only_when_captures_differ() {
+        for board in game_positions() {
+            let mut actions: Vec<Action> = Vec::new();
+            for action in board.actions() {
+                if !actions.contains(&action) {
+                    actions.push(action);
+                }
+            }
+            for action in &actions {
+                let path = action.to_detailed(board.turn, &board.state);
+                if path.source() == path.destination() {
+                    continue;
+                }
+                let short = format!("{}x{}", path.source(), path.destination());
+                let alternatives = actions
+                    .iter()
+                    .filter(|other| {
+                        let other = other.to_detailed(board.turn, &board.state);
+                        other.source() == path.source() && other.destination() == path.destination()
+                    })
+                    .count();
+                let parsed = board.parse_action(&short);
+                if !path.is_capture() {
+                    assert_eq!(parsed, Err(ParseActionError::Illegal));
+                } else if alternatives > 1 {
+                    assert_eq!(parsed, Err(ParseActionError::Ambiguous), "{short}");
+                } else {
+                    assert_eq!(parsed, Ok(*action), "{short}");
+                }
+            }
+        }
+    }
+
+    #[test]
+    fn promotion_suffix_is_optional() {
+        let board = Board::from_squares(Team::White, &[Square::D7], &[Square::A7], &[]);
+        let action = board.parse_action("d7-d8=K").unwrap();
+        assert_eq!(board.parse_action("d7-d8"), Ok(action));
+        assert!(action.is_promotion(board.turn, &board.state));
+    }
+
+    #[test]
+    fn syntax_errors() {
+        let board = Board::new_default();
+        for notation in [
+            "", "d3", "d3-", "d3d4", "d3-d4-d5", "d3_d4", "i3-d4", "d9-d4", "d3-d4=Q", "d3-d4x",
+        ] {
+            assert_eq!(
+                board.parse_action(notation),
+                Err(ParseActionError::Syntax),
+                "{notation}"
+            );
+        }
+        assert_eq!(
+            board.parse_action(" d3-d4 "),
+            Ok(board.parse_action("d3-d4").unwrap())
+        );
+        assert_eq!(board.parse_action("d6-d5"), Err(ParseActionError::Illegal));
+        assert_eq!(board.parse_action("d3-d5"), Err(ParseActionError::Illegal));
+        assert_eq!(board.parse_action("d3xd5"), Err(ParseActionError::Illegal));
+    }
+
+    #[test]
+    fn error_display() {
+        assert!(ParseActionError::Syntax
+            .to_string()
+            .contains("invalid notation"));
+        assert!(ParseActionError::Ambiguous
+            .to_string()
+            .contains("full path"));
+    }
+}
@@ -4,6 +4,11 @@
 //! - [`Board::perft`] - Sequential perft (fast for shallow depths)
 //! - [`Board::perft_tt`] - Sequential perft with transposition table (for medium depths)
 //! - [`Board::perft_parallel`] - Parallel perft with transposition table (for deep searches)
+//! - [`Board::perft_split`] - Parallel perft with a configurable work split and
+//!   per-thread load report
+//! - [`Board::perft_with_table`] / [`Board::perft_parallel_with_table`] - The
+//!   same with a caller-owned, reusable table
+//! - [`Board::perft_detailed`] - Perft with per-ply move and position counters
 //!
 //! # Perft (Performance Test)
 //!
@@ -24,6 +29,22 @@
 //! println!("Positions after 2 plies: {}", nodes);
 //! ```
 //!
+//! # Detailed Perft
+//!
+//! When a move generator change shifts a count, [`Board::perft_detailed`] shows
+//! which kind of move moved: it counts captures (with a histogram of chain
+//! lengths), promotions, king moves, terminal positions and one-piece draws at
+//! every ply.
+//!
+//! ```rust
+//! use kish::Board;
+//!
+//! let stats = Board::new_default().perft_detailed(3);
+//! assert_eq!(stats.nodes, 708);
+//! assert_eq!(stats.plies[2].moves, 708);
+//! println!("Captures at ply 3: {}", stats.plies[2].captures);
+//! ```
+//!
 //! # Performance
 //!
 //! The sequential implementation uses:
@@ -32,14 +53,178 @@
 //! - Bulk leaf counting at depth 1 to avoid unnecessary recursion
 //!
 //! The parallel implementation adds:
-//! - Rayon for parallel traversal at top levels
-//! - Lock-free transposition table using DashMap for position caching
+//! - Rayon work stealing over subtrees split a few plies below the root, so
+//!   that threads stay busy even when root moves have very different sizes
+//! - Lock-free [`TranspositionTable`] keyed by incrementally updated Zobrist keys,
+//!   which callers can keep warm across runs with [`Board::perft_with_table`]
+//!   and [`Board::perft_parallel_with_table`]
 
 use super::{Action, Board};
+use crate::state::MASK_ROW_PROMOTIONS;
+use crate::TranspositionTable;
 use rayon::prelude::*;
-use rustc_hash::FxHasher;
-use std::hash::{BuildHasher, BuildHasherDefault, Hash, Hasher};
 use std::sync::atomic::{AtomicU64, Ordering};
+use std::time::{Duration, Instant};
+
+/// Largest number of pieces a single capture can take.
+const MAX_CHAIN: usize = 16;
+
+/// Move and position counters of one ply of a detailed perft.
+#[derive(Debug, Default, Clone, Copy, PartialEq, Eq)]
+pub struct PerftCounts {
+    /// Moves played into this ply (the number of positions at this ply).
+    pub moves: u64,
+    /// Capturing moves.
+    pub captures: u64,
+    /// Histogram of capture lengths: `chains[n]` captures took `n` pieces.
+    pub chains: [u64; MAX_CHAIN + 1],
+    /// Moves that promote a man to king.
+    pub promotions: u64,
+    /// Moves made by a king.
+    pub king_moves: u64,
+    /// Positions whose side to move has no actions (blocked or without pieces).
+    pub terminal: u64,
+    /// Positions drawn because each side has a single piece.
+    pub draws: u64,
+}
+
+impl PerftCounts {
+    /// Counts `action`, played on `board`.
+    #[inline]
+    fn record_move(&mut self, board: &Board, action: &Action) {
+        let team = board.turn;
+        let delta = action.delta.pieces[team.to_usize()];
+        self.moves += 1;
+        // A capture loop back to the start square can only be made by a king
+        if delta == 0 || delta & board.friendly_pieces() & board.state.kings != 0 {
+            self.king_moves += 1;
+        }
+        if action.is_promotion(team, &board.state) {
+            self.promotions += 1;
+        }
+        let captured = action.capture_count(team) as usize;
+        if captured > 0 {
+            self.captures += 1;
+            self.chains[captured] += 1;
+        }
+    }
+
+    /// Counts the position `board` reached at this ply and returns true if it is terminal.
+    #[inline]
+    fn record_position(&mut self, board: &Board) -> bool {
+        if board.friendly_pieces().is_power_of_two() && board.hostile_pieces().is_power_of_two() {
+            self.draws += 1;
+        }
+        let terminal = board.is_blocked();
+        if terminal {
+            self.terminal += 1;
+        }
+        terminal
+    }
+
+    /// Adds `other`'s counters to these.
+    fn merge(&mut self, other: &Self) {
+        self.moves += other.moves;
+        self.captures += other.captures;
+        for (total, count) in self.chains.iter_mut().zip(other.chains) {
+            *total += count;
+        }
+        self.promotions += other.promotions;
+        self.king_moves += other.king_moves;
+        self.terminal += other.terminal;
+        self.draws += other.draws;
+    }
+}
+
+/// Results of [`Board::perft_detailed`].
+#[derive(Debug, Default, Clone, PartialEq, Eq)]
+pub struct PerftStats {
+    /// Leaf count, equal to [`Board::perft`] at the same depth.
+    pub nodes: u64,
+    /// Counters of each ply: `plies[0]` counts the moves from the root and
+    /// the positions they reach.
+    pub plies: Vec<PerftCounts>,
+}
+
+impl PerftStats {
+    /// Returns empty statistics for `depth` plies.
+    fn new(depth: u64) -> Self {
+        Self {
+            nodes: 0,
+            plies: vec![PerftCounts::default(); depth as usize],
+        }
+    }
+
+    /// Adds `other`'s counts to these.
+    fn merge(&mut self, other: &Self) {
+        self.nodes += other.nodes;
+        for (total, counts) in self.plies.iter_mut().zip(&other.plies) {
+            total.merge(counts);
+        }
+    }
+}
+
+/// Work done by one thread during [`Board::perft_split`].
+#[derive(Debug, Default, Clone, Copy, PartialEq, Eq)]
+pub struct ThreadLoad {
+    /// Subtrees counted by the thread.
+    pub tasks: u64,
+    /// Leaves of those subtrees.
+    pub nodes: u64,
+    /// Time spent counting them.
+    pub busy: Duration,
+}
+
+/// Results of [`Board::perft_split`].
+#[derive(Debug, Default, Clone, PartialEq, Eq)]
+pub struct PerftReport {
+    /// Leaf count, equal to [`Board::perft`] at the same depth.
+    pub nodes: u64,
+    /// Work done by each thread of the pool, by thread index.
+    pub threads: Vec<ThreadLoad>,
+}
+
+impl PerftReport {
+    /// Returns the mean busy time of the threads over the largest one: 1.0
+    /// when the work was spread evenly, `1 / threads` when one thread did
+    /// all of it.
+    #[must_use]
+    pub fn balance(&self) -> f64 {
+        let busiest = self.threads.iter().map(|thread| thread.busy).max();
+        match busiest {
+            Some(busiest) if !busiest.is_zero() => {
+                let total: Duration = self.threads.iter().map(|thread| thread.busy).sum();
+                total.as_secs_f64() / (busiest.as_secs_f64() * self.threads.len() as f64)
+            }
+            _ => 1.0,
+        }
+    }
+}
+
+/// Per-thread counters of [`ThreadLoad`], updated concurrently.
+#[derive(Default)]
+struct LoadCounters {
+    tasks: AtomicU64,
+    nodes: AtomicU64,
+    busy_ns: AtomicU64,
+}
+
+impl LoadCounters {
+    fn record(&self, nodes: u64, busy: Duration) {
+        self.tasks.fetch_add(1, Ordering::Relaxed);
+        self.nodes.fetch_add(nodes, Ordering::Relaxed);
+        self.busy_ns
+            .fetch_add(busy.as_nanos() as u64, Ordering::Relaxed);
+    }
+
+    fn load(&self) -> ThreadLoad {
+        ThreadLoad {
+            tasks: self.tasks.load(Ordering::Relaxed),
+            nodes: self.nodes.load(Ordering::Relaxed),
+            busy: Duration::from_nanos(self.busy_ns.load(Ordering::Relaxed)),
+        }
+    }
+}
 
 impl Board {
     /// Perft (performance test) - counts leaf nodes at a given depth.
@@ -130,32 +315,175 @@ impl Board {
     /// ```
     #[must_use]
     pub fn perft_tt(&self, depth: u64, tt_size_mb: usize) -> u64 {
-        if depth == 0 {
-            return 1;
-        }
         if depth <= 2 || tt_size_mb == 0 {
             return self.perft(depth);
         }
+        self.perft_with_table(depth, &TranspositionTable::new(tt_size_mb))
+    }
 
-        // Calculate TT capacity based on size
-        // Each entry: ~16 bytes (key + value as AtomicU64)
-        // With overhead, estimate ~64 bytes per entry
-        let tt_capacity = (tt_size_mb * 1024 * 1024) / 64;
-
-        // Create transposition table
-        let tt = TranspositionTable::new(tt_capacity);
+    /// Sequential perft with a caller-owned transposition table.
+    ///
+    /// The table can be kept and reused: counts stored by earlier runs, at
+    /// any depth or from any root, are still valid hits.
+    #[must_use]
+    pub fn perft_with_table(&self, depth: u64, table: &TranspositionTable) -> u64 {
+        if depth <= 2 {
+            return self.perft(depth);
+        }
 
         // Pre-allocate scratch buffers
         let mut count_scratch = Vec::with_capacity(48);
         let mut scratches: Vec<Vec<Action>> = (1..depth).map(|_| Vec::with_capacity(48)).collect();
 
-        self.perft_tt_seq_inner(depth, &mut scratches, &mut count_scratch, &tt)
+        self.perft_tt_inner(
+            self.zobrist(),
+            depth,
+            &mut scratches,
+            &mut count_scratch,
+            table,
+        )
     }
 
-    /// Internal sequential perft with transposition table lookup.
+    /// Parallel perft with transposition table for deep searches.
+    ///
+    /// Uses rayon to parallelize at the top level and a lock-free transposition
+    /// table to cache and reuse results for positions that occur via transposition.
+    ///
+    /// # Arguments
+    /// * `depth` - The search depth
+    /// * `tt_size_mb` - Approximate size of transposition table in megabytes (0 to disable)
+    ///
+    /// # Example
+    ///
+    /// ```rust
+    /// use kish::Board;
+    ///
+    /// let board = Board::new_default();
+    /// // Use 256MB transposition table
+    /// let nodes = board.perft_parallel(9, 256);
+    /// println!("Perft(9) = {}", nodes);
+    /// ```
+    #[must_use]
+    pub fn perft_parallel(&self, depth: u64, tt_size_mb: usize) -> u64 {
+        if depth <= 2 {
+            return self.perft(depth);
+        }
+        self.perft_parallel_with_table(depth, &TranspositionTable::new(tt_size_mb))
+    }
+
+    /// Parallel perft sharing a caller-owned transposition table.
+    ///
+    /// Its [`stats`](TranspositionTable::stats) report how well the table
+    /// served the run; reuse it to keep it warm for the next one. Work is
+    /// split as in [`perft_split`](Self::perft_split) with the automatic
+    /// split depth.
+    #[must_use]
+    pub fn perft_parallel_with_table(&self, depth: u64, table: &TranspositionTable) -> u64 {
+        self.perft_split(depth, None, table).nodes
+    }
+
+    /// Parallel perft that splits the tree into many tasks and reports how
+    /// they were spread over the threads.
+    ///
+    /// Every position less than `split_depth` plies from the root is
+    /// expanded in parallel, and each position at `split_depth` becomes one
+    /// sequential task; rayon's work stealing balances the tasks over the
+    /// threads of the current pool (run it inside
+    /// [`ThreadPool::install`](rayon::ThreadPool::install) to choose the
+    /// pool). Split positions are also looked up in and stored to `table`.
+    ///
+    /// With `split_depth` at `None`, the split depth grows with `depth` up
+    /// to 4 plies, which gives tens of thousands of tasks from the start
+    /// position, while keeping each task at least 6 plies deep.
+    ///
+    /// # Example
+    ///
+    /// ```rust
+    /// use kish::{Board, TranspositionTable};
+    ///
+    /// let board = Board::new_default();
+    /// let report = board.perft_split(7, Some(2), &TranspositionTable::new(16));
+    /// assert_eq!(report.nodes, board.perft(7));
+    /// let tasks: u64 = report.threads.iter().map(|thread| thread.tasks).sum();
+    /// println!("{tasks} tasks, balance {:.2}", report.balance());
+    /// ```
+    #[must_use]
+    pub fn perft_split(
+        &self,
+        depth: u64,
+        split_depth: Option<u64>,
+        table: &TranspositionTable,
+    ) -> PerftReport {
+        let split_depth = split_depth.unwrap_or_else(|| depth.saturating_sub(6).clamp(1, 4));
+        let loads: Vec<LoadCounters> = (0..rayon::current_num_threads())
+            .map(|_| LoadCounters::default())
+            .collect();
+        let nodes = if depth == 0 {
+            1
+        } else {
+            self.perft_split_inner(self.zobrist(), depth, split_depth, table, &loads)
+        };
+        PerftReport {
+            nodes,
+            threads: loads.iter().map(LoadCounters::load).collect(),
+        }
+    }
+
+    /// Expands the tree in parallel down to `split` plies, then counts each
+    /// subtree sequentially as one task.
+    fn perft_split_inner(
+        &self,
+        key: u64,
+        depth: u64,
+        split: u64,
+        table: &TranspositionTable,
+        loads: &[LoadCounters],
+    ) -> u64 {
+        let start = Instant::now();
+        let nodes = if split == 0 || depth <= 2 {
+            let mut count_scratch = Vec::with_capacity(48);
+            let mut scratches: Vec<Vec<Action>> =
+                (1..depth).map(|_| Vec::with_capacity(48)).collect();
+            self.perft_tt_inner(key, depth, &mut scratches, &mut count_scratch, table)
+        } else if let Some(nodes) = table.get(key, depth as u8) {
+            nodes
+        } else {
+            let actions = self.actions();
+            if actions.is_empty() {
+                1
+            } else {
+                let nodes = actions
+                    .par_iter()
+                    .map(|action| {
+                        let mut board = self.apply(action);
+                        board.swap_turn_();
+                        board.perft_split_inner(
+                            key ^ action.zobrist_delta(),
+                            depth - 1,
+                            split - 1,
+                            table,
+                            loads,
+                        )
+                    })
+                    .sum();
+                table.insert(key, depth as u8, nodes);
+                // The children recorded their own work
+                return nodes;
+            }
+        };
+
+        let thread = rayon::current_thread_index().unwrap_or(0);
+        if let Some(load) = loads.get(thread) {
+            load.record(nodes, start.elapsed());
+        }
+        nodes
+    }
+
+    /// Internal perft with transposition table lookup.
     #[inline(always)]
-    fn perft_tt_seq_inner(
+    fn perft_tt_inner(
         &self,
+        key: u64,
         depth: u64,
         scratches: &mut [Vec<Action>],
         count_scratch: &mut Vec<Action>,
@@ -169,7 +497,7 @@ impl Board {
 
         // TT lookup (only for depth >= 3 to avoid overhead)
         if depth >= 3 {
-            if let Some(nodes) = tt.get(self, depth as u8) {
+            if let Some(nodes) = tt.get(key, depth as u8) {
                 return nodes;
             }
         }
@@ -180,132 +508,116 @@ impl Board {
             return 1;
         }
 
+        // Children are probed too: start loading their buckets now
+        if depth >= 4 {
+            for action in &scratches[idx] {
+                tt.prefetch(key ^ action.zobrist_delta());
+            }
+        }
+
         let action_count = scratches[idx].len();
         let mut nodes = 0u64;
         for i in 0..action_count {
             let action = scratches[idx][i];
             let mut board = self.apply(&action);
             board.swap_turn_();
-            nodes += board.perft_tt_seq_inner(depth - 1, scratches, count_scratch, tt);
+            nodes += board.perft_tt_inner(
+                key ^ action.zobrist_delta(),
+                depth - 1,
+                scratches,
+                count_scratch,
+                tt,
+            );
         }
 
         // Store in TT (only for depth >= 3)
         if depth >= 3 {
-            tt.insert(self, depth as u8, nodes);
+            tt.insert(key, depth as u8, nodes);
         }
 
         nodes
     }
+}
 
-    /// Parallel perft with transposition table for deep searches.
-    ///
-    /// Uses rayon to parallelize at the top level and a lock-free transposition
-    /// table to cache and reuse results for positions that occur via transposition.
+impl Board {
+    /// Perft that also counts the kinds of moves and positions at every ply.
     ///
-    /// # Arguments
-    /// * `depth` - The search depth
-    /// * `tt_size_mb` - Approximate size of transposition table in megabytes (0 to disable)
+    /// `nodes` matches [`perft`](Self::perft). Like it, the last ply is
+    /// counted in bulk: quiet moves are tallied from move bitboards without
+    /// being generated or played, so this stays within a small factor of
+    /// plain perft.
     ///
     /// # Example
     ///
     /// ```rust
     /// use kish::Board;
     ///
-    /// let board = Board::new_default();
-    /// // Use 256MB transposition table
-    /// let nodes = board.perft_parallel(9, 256);
-    /// println!("Perft(9) = {}", nodes);
+    /// let stats = Board::new_default().perft_detailed(2);
+    /// assert_eq!(stats.nodes, 64);
+    /// assert_eq!(stats.plies[0].moves, 8);
+    /// assert_eq!(stats.plies[1].captures, 0);
     /// ```
     #[must_use]
-    pub fn perft_parallel(&self, depth: u64, tt_size_mb: usize) -> u64 {
+    pub fn perft_detailed(&self, depth: u64) -> PerftStats {
+        let mut stats = PerftStats::new(depth);
         if depth == 0 {
-            return 1;
-        }
-        if depth <= 2 {
-            return self.perft(depth);
+            stats.nodes = 1;
+            return stats;
         }
 
-        // Calculate TT capacity based on size
-        // Each entry: Board (32 bytes key via hash) + u64 (8 bytes value) + u8 (1 byte depth)
-        // With overhead, estimate ~64 bytes per entry
-        let tt_capacity = if tt_size_mb > 0 {
-            (tt_size_mb * 1024 * 1024) / 64
-        } else {
-            0
-        };
-
-        // Create shared transposition table
-        let tt = TranspositionTable::new(tt_capacity);
-        let tt_hits = AtomicU64::new(0);
-        let tt_lookups = AtomicU64::new(0);
+        let mut count_scratch = Vec::with_capacity(48);
+        let mut scratches: Vec<Vec<Action>> = (1..depth).map(|_| Vec::with_capacity(48)).collect();
+        stats.nodes =
+            self.perft_detailed_inner(depth, &mut stats.plies, &mut scratches, &mut count_scratch);
+        stats
+    }
 
-        // Generate first-level actions
+    /// Parallel [`perft_detailed`](Self::perft_detailed), splitting the work
+    /// at the root.
+    #[must_use]
+    pub fn perft_detailed_parallel(&self, depth: u64) -> PerftStats {
+        if depth <= 2 {
+            return self.perft_detailed(depth);
+        }
         let actions = self.actions();
         if actions.is_empty() {
-            return 1;
+            return self.perft_detailed(depth);
         }
 
-        // Parallel search at top level
-        let nodes: u64 = actions
+        actions
             .par_iter()
             .map(|action| {
-                let mut board = self.apply(action);
-                board.swap_turn_();
-
-                // Each thread gets its own scratch buffers
+                // Each task gets its own counters and scratch buffers
+                let mut stats = PerftStats::new(depth);
                 let mut count_scratch = Vec::with_capacity(48);
                 let mut scratches: Vec<Vec<Action>> =
                     (1..depth).map(|_| Vec::with_capacity(48)).collect();
-
-                board.perft_tt_inner(
-                    depth - 1,
+                stats.nodes = self.perft_detailed_child(
+                    action,
+                    depth,
+                    &mut stats.plies,
                     &mut scratches,
                     &mut count_scratch,
-                    &tt,
-                    &tt_hits,
-                    &tt_lookups,
-                )
+                );
+                stats
             })
-            .sum();
-
-        // Print TT hit statistics
-        let hits = tt_hits.load(Ordering::Relaxed);
-        let lookups = tt_lookups.load(Ordering::Relaxed);
-        if lookups > 0 {
-            let hit_rate = (hits as f64 / lookups as f64) * 100.0;
-            eprintln!(
-                "TT hits: {} / {} lookups ({:.2}% hit rate)",
-                hits, lookups, hit_rate
-            );
-        }
-
-        nodes
+            .reduce_with(|mut total, stats| {
+                total.merge(&stats);
+                total
+            })
+            .unwrap_or_else(|| PerftStats::new(depth))
     }
 
-    /// Internal perft with transposition table lookup.
-    #[inline(always)]
-    fn perft_tt_inner(
+    /// Internal detailed perft; `plies[0]` counts the moves from this board.
+    fn perft_detailed_inner(
         &self,
         depth: u64,
+        plies: &mut [PerftCounts],
         scratches: &mut [Vec<Action>],
         count_scratch: &mut Vec<Action>,
-        tt: &TranspositionTable,
-        tt_hits: &AtomicU64,
-        tt_lookups: &AtomicU64,
     ) -> u64 {
-        // Bulk leaf optimization
         if depth == 1 {
-            let count = self.count_actions(count_scratch);
-            return if count == 0 { 1 } else { count };
-        }
-
-        // TT lookup (only for depth >= 3 to avoid overhead)
-        if depth >= 3 {
-            tt_lookups.fetch_add(1, Ordering::Relaxed);
-            if let Some(nodes) = tt.get(self, depth as u8) {
-                tt_hits.fetch_add(1, Ordering::Relaxed);
-                return nodes;
-            }
+            return self.perft_detailed_leaves(&mut plies[0], count_scratch);
         }
 
         let idx = depth as usize - 2;
@@ -318,113 +630,89 @@ impl Board {
         let mut nodes = 0u64;
         for i in 0..action_count {
             let action = scratches[idx][i];
-            let mut board = self.apply(&action);
-            board.swap_turn_();
-            nodes +=
-                board.perft_tt_inner(depth - 1, scratches, count_scratch, tt, tt_hits, tt_lookups);
-        }
-
-        // Store in TT (only for depth >= 3)
-        if depth >= 3 {
-            tt.insert(self, depth as u8, nodes);
+            nodes += self.perft_detailed_child(&action, depth, plies, scratches, count_scratch);
         }
-
         nodes
     }
-}
 
-/// Lock-free transposition table using a simple hash table with replacement.
-///
-/// Uses Zobrist-style hashing where collisions are handled by replacement.
-/// This is acceptable for perft since we're counting, not searching for best moves.
-struct TranspositionTable {
-    /// Table entries: (hash_verification, depth, nodes)
-    /// We store a verification hash to detect collisions
-    entries: Vec<AtomicEntry>,
-    mask: usize,
-}
-
-/// Atomic entry for lock-free access
-struct AtomicEntry {
-    /// Combined: upper 56 bits = hash verification, lower 8 bits = depth
-    key: AtomicU64,
-    /// Node count
-    value: AtomicU64,
-}
-
-impl TranspositionTable {
-    fn new(capacity: usize) -> Self {
-        if capacity == 0 {
-            return Self {
-                entries: Vec::new(),
-                mask: 0,
-            };
-        }
-
-        // Round up to power of 2
-        let capacity = capacity.next_power_of_two();
-        let mask = capacity - 1;
-
-        let mut entries = Vec::with_capacity(capacity);
-        for _ in 0..capacity {
-            entries.push(AtomicEntry {
-                key: AtomicU64::new(0),
-                value: AtomicU64::new(0),
-            });
+    /// Counts `action` and the subtree below it.
+    #[inline]
+    fn perft_detailed_child(
+        &self,
+        action: &Action,
+        depth: u64,
+        plies: &mut [PerftCounts],
+        scratches: &mut [Vec<Action>],
+        count_scratch: &mut Vec<Action>,
+    ) -> u64 {
+        let (counts, deeper) = plies.split_first_mut().unwrap();
+        counts.record_move(self, action);
+        let mut board = self.apply(action);
+        board.swap_turn_();
+        if counts.record_position(&board) {
+            return 1;
         }
-
-        Self { entries, mask }
+        board.perft_detailed_inner(depth - 1, deeper, scratches, count_scratch)
     }
 
-    /// XOR trick for lockless hashing: by XORing key with value on store,
-    /// we can detect torn reads where key and value come from different writes.
-    #[inline]
-    fn get(&self, board: &Board, depth: u8) -> Option<u64> {
-        if self.entries.is_empty() {
-            return None;
+    /// Counts the moves from this board and the positions they reach in bulk.
+    ///
+    /// Only captures are generated and played. Quiet moves are counted from
+    /// their destination bitboards, and the positions they reach are only
+    /// tested for being blocked when the opponent has fewer than two steps.
+    fn perft_detailed_leaves(&self, counts: &mut PerftCounts, scratch: &mut Vec<Action>) -> u64 {
+        self.captures_into(scratch);
+        if !scratch.is_empty() {
+            for action in scratch.iter() {
+                counts.record_move(self, action);
+                let mut board = self.apply(action);
+                board.swap_turn_();
+                counts.record_position(&board);
+            }
+            return scratch.len() as u64;
         }
 
-        let hash = self.hash_board(board);
-        let index = (hash as usize) & self.mask;
-        let entry = &self.entries[index];
-
-        // Load value first, then key (order matters for XOR trick)
-        let value = entry.value.load(Ordering::Relaxed);
-        let stored_key_xored = entry.key.load(Ordering::Relaxed);
-
-        // Recover original key by XORing with value
-        let recovered_key = stored_key_xored ^ value;
-        let expected_key = (hash & 0xFFFF_FFFF_FFFF_FF00) | (depth as u64);
-
-        if recovered_key == expected_key {
-            Some(value)
-        } else {
-            None
+        let team = self.turn.to_usize();
+        let kings = self.friendly_pieces() & self.state.kings;
+        let promotion_row = MASK_ROW_PROMOTIONS[team];
+        // A quiet move can only take away the step to its destination square
+        let opponent_mobile = self.swap_turn().step_targets().count_ones() >= 2;
+
+        let mut moves = 0u64;
+        self.for_each_quiet_move(|source, targets| {
+            let src_mask = 1u64 << source;
+            moves += u64::from(targets.count_ones());
+            if kings & src_mask != 0 {
+                counts.king_moves += u64::from(targets.count_ones());
+            } else {
+                counts.promotions += u64::from((targets & promotion_row).count_ones());
+            }
+            if opponent_mobile {
+                return;
+            }
+            let mut targets = targets;
+            while targets != 0 {
+                let dest_mask = targets & targets.wrapping_neg();
+                // Only occupancy matters to the opponent's mobility
+                let mut board = *self;
+                board.state.pieces[team] ^= src_mask | dest_mask;
+                board.swap_turn_();
+                if board.is_blocked() {
+                    counts.terminal += 1;
+                }
+                targets ^= dest_mask;
+            }
+        });
+        if moves == 0 {
+            return 1;
         }
-    }
 
-    #[inline]
-    fn insert(&self, board: &Board, depth: u8, nodes: u64) {
-        if self.entries.is_empty() {
-            return;
+        counts.moves += moves;
+        // Quiet moves keep the piece counts
+        if self.friendly_pieces().is_power_of_two() && self.hostile_pieces().is_power_of_two() {
+            counts.draws += moves;
         }
-
-        let hash = self.hash_board(board);
-        let index = (hash as usize) & self.mask;
-        let entry = &self.entries[index];
-
-        let key = (hash & 0xFFFF_FFFF_FFFF_FF00) | (depth as u64);
-        // XOR trick: store key ^ value so torn reads are detected
-        entry.key.store(key ^ nodes, Ordering::Relaxed);
-        entry.value.store(nodes, Ordering::Relaxed);
-    }
-
-    #[inline]
-    fn hash_board(&self, board: &Board) -> u64 {
-        let build_hasher = BuildHasherDefault::<FxHasher>::default();
-        let mut hasher = build_hasher.build_hasher();
-        board.hash(&mut hasher);
-        hasher.finish()
+        moves
     }
 }
 
@@ -499,6 +787,43 @@ mod tests {
         assert_eq!(seq, par);
     }
 
+    #[test]
+    fn perft_split_matches_sequential() {
+        let positions = [
+            Board::new_default(),
+            Board::from_squares(
+                Team::White,
+                &[Square::D4, Square::A2, Square::B2, Square::H2],
+                &[Square::E6, Square::C7, Square::F7],
+                &[Square::D4, Square::E6],
+            ),
+        ];
+        for board in &positions {
+            let expected = board.perft(6);
+            for split_depth in [None, Some(0), Some(1), Some(3), Some(6), Some(9)] {
+                let table = TranspositionTable::new(2);
+                let report = board.perft_split(6, split_depth, &table);
+                assert_eq!(report.nodes, expected, "{board} split {split_depth:?}");
+
+                // Every node is attributed to exactly one task
+                let nodes: u64 = report.threads.iter().map(|thread| thread.nodes).sum();
+                assert_eq!(nodes, expected);
+                assert!(report.balance() > 0.0 && report.balance() <= 1.0);
+            }
+        }
+    }
+
+    #[test]
+    fn perft_split_counts_tasks() {
+        let board = Board::new_default();
+        let table = TranspositionTable::new(0);
+        let report = board.perft_split(5, Some(2), &table);
+        let tasks: u64 = report.threads.iter().map(|thread| thread.tasks).sum();
+        assert_eq!(tasks, board.perft(2));
+        assert_eq!(report.threads.len(), rayon::current_num_threads());
+        assert_eq!(board.perft_split(0, None, &table).nodes, 1);
+    }
+
     #[test]
     fn perft_tt_matches_sequential() {
         let board = Board::new_default();
@@ -537,6 +862,113 @@ mod tests {
         assert_eq!(perft1, 1, "Should have exactly 1 capture");
     }
 
+    // ========== Detailed Perft Tests ==========
+
+    /// Straightforward reference for `perft_detailed`, generating every move.
+    fn detailed_reference(board: &Board, depth: usize, plies: &mut [PerftCounts]) -> u64 {
+        let actions = board.actions();
+        if depth == 0 || actions.is_empty() {
+            return 1;
+        }
+        let mut nodes = 0;
+        for action in &actions {
+            let path = action.to_detailed(board.turn, &board.state);
+            let counts = &mut plies[plies.len() - depth];
+            counts.moves += 1;
+            if board.state.kings & path.source().to_mask() != 0 {
+                counts.king_moves += 1;
+            }
+            if path.is_promotion() {
+                counts.promotions += 1;
+            }
+            if path.is_capture() {
+                counts.captures += 1;
+                counts.chains[path.path_len() - 1] += 1;
+            }
+            let mut next = board.apply(action);
+            next.swap_turn_();
+            if next.friendly_pieces().count_ones() == 1 && next.hostile_pieces().count_ones() == 1 {
+                counts.draws += 1;
+            }
+            if next.actions().is_empty() {
+                counts.terminal += 1;
+            }
+            nodes += detailed_reference(&next, depth - 1, plies);
+        }
+        nodes
+    }
+
+    fn assert_detailed_matches_reference(board: &Board, depth: u64) {
+        let mut expected = PerftStats {
+            nodes: 0,
+            plies: vec![PerftCounts::default(); depth as usize],
+        };
+        expected.nodes = detailed_reference(board, depth as usize, &mut expected.plies);
+        assert_eq!(board.perft_detailed(depth), expected);
+        assert_eq!(board.perft_detailed_parallel(depth), expected);
+        assert_eq!(expected.nodes, board.perft(depth));
+    }
+
+    #[test]
+    fn perft_detailed_matches_reference() {
+        assert_detailed_matches_reference(&Board::new_default(), 5);
+        // Flying king captures, promotions and a king capture loop
+        let positions = [
+            Board::from_squares(
+                Team::White,
+                &[Square::B6, Square::D4, Square::E3],
+                &[Square::D5, Square::C7, Square::F4, Square::G7],
+                &[Square::E3],
+            ),
+            Board::from_squares(
+                Team::Black,
+                &[Square::A3, Square::C5, Square::E3, Square::C1, Square::H7],
+                &[Square::A1, Square::G2, Square::B3],
+                &[Square::A1],
+            ),
+            Board::from_squares(
+                Team::White,
+                &[Square::C7, Square::F6],
+                &[Square::H2, Square::A4],
+                &[Square::H2],
+            ),
+            // Black is blocked unless White frees F5 or H3
+            Board::from_squares(
+                Team::White,
+                &[Square::F5, Square::G5, Square::H3, Square::H4, Square::H6],
+                &[Square::H5],
+                &[],
+            ),
+        ];
+        for board in &positions {
+            assert_detailed_matches_reference(board, 4);
+        }
+    }
+
+    #[test]
+    fn perft_detailed_counts_terminals_and_draws() {
+        // White captures the last black man but one, leaving a 1v1 draw
+        let board = Board::from_squares(Team::White, &[Square::D4], &[Square::D5, Square::A8], &[]);
+        let stats = board.perft_detailed(1);
+        assert_eq!(stats.plies[0].captures, 1);
+        assert_eq!(stats.plies[0].chains[1], 1);
+        assert_eq!(stats.plies[0].draws, 1);
+
+        // White wipes out Black, so the reached position is terminal
+        let board = Board::from_squares(Team::White, &[Square::D4], &[Square::D5], &[]);
+        let stats = board.perft_detailed(3);
+        assert_eq!(stats.nodes, 1);
+        assert_eq!(stats.plies[0].terminal, 1);
+        assert_eq!(stats.plies[1], PerftCounts::default());
+    }
+
+    #[test]
+    fn perft_detailed_depth_0() {
+        let stats = Board::new_default().perft_detailed(0);
+        assert_eq!(stats.nodes, 1);
+        assert!(stats.plies.is_empty());
+    }
+
     #[test]
     fn perft_terminal_position() {
         // White has no pieces - game over
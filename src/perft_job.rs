@@ -0,0 +1,488 @@
+//! Checkpointed, resumable and shardable deep perft runs.
+//!
+//! A [`PerftJob`] breaks a perft into work units: the distinct positions
+//! `split_depth` plies from the root, each with the number of move sequences
+//! reaching it. The total is the sum over units of multiplicity × perft of
+//! the remaining depth.
+//!
+//! Units are run in order and each result is appended to a checkpoint file
+//! as soon as it is known, so a run that stops can resume where it left off.
+//! Units can also be spread over processes or machines: shard `i` of `n`
+//! runs every unit whose index is `i` modulo `n`. Every shard writes its own
+//! file into a shared directory, and [`PerftJob::merge`] adds them up.
+//!
+//! # Checkpoint Files
+//!
+//! Files are named after the job and the shard, for example
+//! `perft-2231853371af975a-d12-k4.shard-0-of-8.txt`. They are plain text: a header
+//! identifying the job, then one `index nodes` line per completed unit. A
+//! line cut short by a crash is dropped on resume.
+//!
+//! ```text
+//! kish-perft 1
+//! root 0000000000ffff00 00ffff0000000000 0000000000000000 white
+//! depth 12
+//! split 4
+//! units 2924
+//! 0 1073527014
+//! 8 969331875
+//! ```
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, PerftJob, Shard, TranspositionTable};
+//!
+//! let dir = std::env::temp_dir().join(format!("kish-doc-job-{}", std::process::id()));
+//! let job = PerftJob::new(Board::new_default(), 6, 2);
+//! let table = TranspositionTable::new(16);
+//!
+//! // Two shards, as two processes would run them
+//! for index in 0..2 {
+//!     job.run(&dir, Shard { index, count: 2 }, &table, |_| {}).unwrap();
+//! }
+//! let total = job.merge(&dir).unwrap();
+//! assert!(total.is_complete());
+//! assert_eq!(total.nodes, 931_312);
+//! # std::fs::remove_dir_all(&dir).unwrap();
+//! ```
+
+use std::collections::HashMap;
+use std::fs::{self, File, OpenOptions};
+use std::io::{self, Write};
+use std::path::{Path, PathBuf};
+
+use crate::{Board, Team, TranspositionTable};
+
+/// First line of every checkpoint file.
+const MAGIC: &str = "kish-perft 1";
+
+/// A position to count, and the number of move sequences reaching it.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct PerftUnit {
+    /// The position, with its side to move.
+    pub board: Board,
+    /// Number of move sequences from the root reaching the position.
+    pub multiplicity: u64,
+}
+
+/// The part of a job run by one process: units whose index is `index`
+/// modulo `count`.
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub struct Shard {
+    /// Index of this shard, below `count`.
+    pub index: u32,
+    /// Number of shards.
+    pub count: u32,
+}
+
+impl Shard {
+    /// The whole job as a single shard.
+    pub const ALL: Self = Self { index: 0, count: 1 };
+
+    /// Returns true if unit `unit` belongs to this shard.
+    #[must_use]
+    pub const fn contains(&self, unit: usize) -> bool {
+        unit % self.count as usize == self.index as usize
+    }
+}
+
+/// Completed units and the nodes counted so far.
+#[derive(Debug, Default, Clone, Copy, PartialEq, Eq)]
+pub struct PerftProgress {
+    /// Units in scope (the shard for [`PerftJob::run`], the job for
+    /// [`PerftJob::merge`]).
+    pub units: usize,
+    /// Units completed.
+    pub done: usize,
+    /// Leaves of the completed units, weighted by multiplicity.
+    pub nodes: u64,
+}
+
+impl PerftProgress {
+    /// Returns true if every unit in scope is completed, so that `nodes` is
+    /// the final count.
+    #[must_use]
+    pub const fn is_complete(&self) -> bool {
+        self.done == self.units
+    }
+}
+
+/// A deep perft split into work units.
+#[derive(Debug, Clone)]
+pub struct PerftJob {
+    root: Board,
+    depth: u64,
+    split_depth: u64,
+    units: Vec<PerftUnit>,
+}
+
+impl PerftJob {
+    /// Creates the job of counting `root` to `depth`, with units
+    /// `split_depth` plies deep (at most `depth`).
+    ///
+    /// Units are deduplicated and sorted, so every process builds the same
+    /// list. Positions without moves before `split_depth` are units too:
+    /// they count as one leaf at any depth.
+    #[must_use]
+    pub fn new(root: Board, depth: u64, split_depth: u64) -> Self {
+        let split_depth = split_depth.min(depth);
+        let mut frontier = HashMap::from([(root, 1u64)]);
+        let mut terminal: HashMap<Board, u64> = HashMap::new();
+        for _ in 0..split_depth {
+            let mut next: HashMap<Board, u64> = HashMap::with_capacity(frontier.len() * 8);
+            for (board, count) in frontier {
+                let actions = board.actions();
+                if actions.is_empty() {
+                    *terminal.entry(board).or_default() += count;
+                }
+                for action in &actions {
+                    let mut child = board.apply(action);
+                    child.swap_turn_();
+                    *next.entry(child).or_default() += count;
+                }
+            }
+            frontier = next;
+        }
+        for (board, count) in terminal {
+            *frontier.entry(board).or_default() += count;
+        }
+
+        let mut units: Vec<PerftUnit> = frontier
+            .into_iter()
+            .map(|(board, multiplicity)| PerftUnit {
+                board,
+                multiplicity,
+            })
+            .collect();
+        units.sort_unstable_by_key(|unit| unit.board);
+        Self {
+            root,
+            depth,
+            split_depth,
+            units,
+        }
+    }
+
+    /// Returns the root position.
+    #[must_use]
+    pub const fn root(&self) -> &Board {
+        &self.root
+    }
+
+    /// Returns the perft depth.
+    #[must_use]
+    pub const fn depth(&self) -> u64 {
+        self.depth
+    }
+
+    /// Returns the depth of the units.
+    #[must_use]
+    pub const fn split_depth(&self) -> u64 {
+        self.split_depth
+    }
+
+    /// Returns the work units, in the order they are run.
+    #[must_use]
+    pub fn units(&self) -> &[PerftUnit] {
+        &self.units
+    }
+
+    /// Returns the name of the checkpoint file of `shard`.
+    #[must_use]
+    pub fn checkpoint_name(&self, shard: Shard) -> String {
+        format!(
+            "{}.shard-{}-of-{}.txt",
+            self.file_prefix(),
+            shard.index,
+            shard.count
+        )
+    }
+
+    /// Returns the part of the checkpoint names shared by all shards of this job.
+    fn file_prefix(&self) -> String {
+        format!(
+            "perft-{:016x}-d{}-k{}",
+            self.root.zobrist(),
+            self.depth,
+            self.split_depth
+        )
+    }
+
+    /// Returns the header that starts every checkpoint file of this job.
+    fn header(&self) -> String {
+        let state = &self.root.state;
+        let turn = match self.root.turn {
+            Team::White => "white",
+            Team::Black => "black",
+        };
+        format!(
+            "{MAGIC}\nroot {:016x} {:016x} {:016x} {turn}\ndepth {}\nsplit {}\nunits {}\n",
+            state.pieces[0],
+            state.pieces[1],
+            state.kings,
+            self.depth,
+            self.split_depth,
+            self.units.len()
+        )
+    }
+
+    /// Runs the units of `shard` that its checkpoint in `dir` does not
+    /// already hold, appending each result to it.
+    ///
+    /// Units are counted with [`Board::perft_parallel_with_table`] on the
+    /// current rayon pool, sharing `table`. `progress` is called after every
+    /// unit. Returns the progress of the shard, complete unless an error
+    /// stopped the run.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the directory or checkpoint cannot be read or
+    /// written, or if the checkpoint belongs to another job.
+    ///
+    /// # Panics
+    ///
+    /// Panics if `shard.index` is not below `shard.count`.
+    pub fn run(
+        &self,
+        dir: impl AsRef<Path>,
+        shard: Shard,
+        table: &TranspositionTable,
+        mut progress: impl FnMut(&PerftProgress),
+    ) -> io::Result<PerftProgress> {
+        assert!(shard.index < shard.count, "shard index out of range");
+        let dir = dir.as_ref();
+        fs::create_dir_all(dir)?;
+        let path = dir.join(self.checkpoint_name(shard));
+
+        let mut results = vec![None; self.units.len()];
+        if path.exists() {
+            self.read_checkpoint(&path, &mut results, true)?;
+        }
+        let mut file = OpenOptions::new().create(true).append(true).open(&path)?;
+        if file.metadata()?.len() == 0 {
+            file.write_all(self.header().as_bytes())?;
+            file.sync_data()?;
+        }
+
+        let mut state = PerftProgress::default();
+        for (index, result) in results.iter().enumerate() {
+            if shard.contains(index) {
+                state.units += 1;
+                if let Some(nodes) = result {
+                    state.done += 1;
+                    state.nodes += nodes * self.units[index].multiplicity;
+                }
+            }
+        }
+
+        let remaining = self.depth - self.split_depth;
+        for (index, unit) in self.units.iter().enumerate() {
+            if !shard.contains(index) || results[index].is_some() {
+                continue;
+            }
+            let nodes = unit.board.perft_parallel_with_table(remaining, table);
+            writeln!(file, "{index} {nodes}")?;
+            file.sync_data()?;
+            state.done += 1;
+            state.nodes += nodes * unit.multiplicity;
+            progress(&state);
+        }
+        Ok(state)
+    }
+
+    /// Adds up the checkpoints of this job in `dir`, from any number of shards.
+    ///
+    /// Returns the progress of the whole job; once it
+    /// [`is_complete`](PerftProgress::is_complete), `nodes` is the perft
+    /// count.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the directory or a checkpoint cannot be read, a
+    /// checkpoint is corrupt, or two checkpoints disagree on a unit.
+    pub fn merge(&self, dir: impl AsRef<Path>) -> io::Result<PerftProgress> {
+        let prefix = format!("{}.shard-", self.file_prefix());
+        let mut paths: Vec<PathBuf> = fs::read_dir(dir)?
+            .map(|entry| entry.map(|entry| entry.path()))
+            .collect::<io::Result<_>>()?;
+        paths.retain(|path| {
+            path.file_name()
+                .and_then(|name| name.to_str())
+                .is_some_and(|name| name.starts_with(&prefix))
+        });
+        paths.sort();
+
+        let mut results = vec![None; self.units.len()];
+        for path in &paths {
+            self.read_checkpoint(path, &mut results, false)?;
+        }
+        let mut total = PerftProgress {
+            units: self.units.len(),
+            ..PerftProgress::default()
+        };
+        for (result, unit) in results.iter().zip(&self.units) {
+            if let Some(nodes) = result {
+                total.done += 1;
+                total.nodes += nodes * unit.multiplicity;
+            }
+        }
+        Ok(total)
+    }
+
+    /// Reads the unit results of the checkpoint at `path` into `results`.
+    ///
+    /// A last line without its newline was cut short by a crash: it is
+    /// ignored and, with `repair`, truncated from the file.
+    fn read_checkpoint(
+        &self,
+        path: &Path,
+        results: &mut [Option<u64>],
+        repair: bool,
+    ) -> io::Result<()> {
+        let text = fs::read_to_string(path)?;
+        let complete = text.rfind('\n').map_or(0, |end| end + 1);
+        if repair && complete < text.len() {
+            File::options()
+                .write(true)
+                .open(path)?
+                .set_len(complete as u64)?;
+        }
+
+        let header = self.header();
+        let body = text[..complete]
+            .strip_prefix(&header)
+            .ok_or_else(|| invalid(path, "header does not match this job"))?;
+        for line in body.lines() {
+            let parsed: Option<(usize, u64)> = line
+                .split_once(' ')
+                .and_then(|(index, nodes)| Some((index.parse().ok()?, nodes.parse().ok()?)));
+            let Some((index, nodes)) = parsed else {
+                return Err(invalid(path, &format!("malformed line {line:?}")));
+            };
+            let slot: &mut Option<u64> = results
+                .get_mut(index)
+                .ok_or_else(|| invalid(path, &format!("unit {index} out of range")))?;
+            if slot.is_some_and(|previous| previous != nodes) {
+                return Err(invalid(
+                    path,
+                    &format!("conflicting counts for unit {index}"),
+                ));
+            }
+            *slot = Some(nodes);
+        }
+        Ok(())
+    }
+}
+
+/// Returns an `InvalidData` error about the checkpoint at `path`.
+fn invalid(path: &Path, message: &str) -> io::Error {
+    io::Error::new(
+        io::ErrorKind::InvalidData,
+        format!("{}: {message}", path.display()),
+    )
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::Square;
+
+    /// Returns an empty scratch directory for `name`.
+    fn scratch_dir(name: &str) -> PathBuf {
+        let dir = std::env::temp_dir().join(format!("kish-{name}-{}", std::process::id()));
+        fs::remove_dir_all(&dir).ok();
+        dir
+    }
+
+    #[test]
+    fn units_reproduce_perft() {
+        let board = Board::new_default();
+        for split_depth in 0..=4 {
+            let job = PerftJob::new(board, 5, split_depth);
+            let total: u64 = job
+                .units()
+                .iter()
+                .map(|unit| unit.multiplicity * unit.board.perft(5 - split_depth))
+                .sum();
+            assert_eq!(total, 85_090, "split {split_depth}");
+            let paths: u64 = job.units().iter().map(|unit| unit.multiplicity).sum();
+            assert_eq!(paths, board.perft(split_depth));
+        }
+        // Transpositions merge into one unit
+        assert!(PerftJob::new(board, 5, 4).units().len() < 7_538);
+    }
+
+    #[test]
+    fn terminal_positions_before_split_are_units() {
+        // White's only man is captured at once: Black wins after one ply
+        let board = Board::from_squares(Team::White, &[Square::D4], &[Square::D6, Square::A8], &[]);
+        let job = PerftJob::new(board, 4, 3);
+        let total: u64 = job
+            .units()
+            .iter()
+            .map(|unit| unit.multiplicity * unit.board.perft(1))
+            .sum();
+        assert_eq!(total, board.perft(4));
+    }
+
+    #[test]
+    fn shards_merge_to_total() {
+        let dir = scratch_dir("perft-shards");
+        let job = PerftJob::new(Board::new_default(), 6, 3);
+        let table = TranspositionTable::new(4);
+
+        let first = job
+            .run(&dir, Shard { index: 1, count: 3 }, &table, |_| {})
+            .unwrap();
+        assert!(first.is_complete());
+        let partial = job.merge(&dir).unwrap();
+        assert_eq!(partial.done, first.units);
+        assert!(!partial.is_complete());
+
+        for index in [0, 2] {
+            job.run(&dir, Shard { index, count: 3 }, &table, |_| {})
+                .unwrap();
+        }
+        let total = job.merge(&dir).unwrap();
+        assert!(total.is_complete());
+        assert_eq!(total.nodes, 931_312);
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn resumes_from_checkpoint() {
+        let dir = scratch_dir("perft-resume");
+        let job = PerftJob::new(Board::new_default(), 5, 2);
+        let table = TranspositionTable::new(4);
+        job.run(&dir, Shard::ALL, &table, |_| {}).unwrap();
+
+        // Simulate a crash: keep ten units and half of the next line
+        let path = dir.join(job.checkpoint_name(Shard::ALL));
+        let text = fs::read_to_string(&path).unwrap();
+        let lines: Vec<&str> = text.lines().collect();
+        let kept = lines[..5 + 10].join("\n") + "\n" + &lines[15][..1];
+        fs::write(&path, kept).unwrap();
+
+        let mut runs = 0;
+        let resumed = job.run(&dir, Shard::ALL, &table, |_| runs += 1).unwrap();
+        assert_eq!(runs, job.units().len() - 10);
+        assert!(resumed.is_complete());
+        assert_eq!(resumed.nodes, 85_090);
+        assert_eq!(job.merge(&dir).unwrap(), resumed);
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn rejects_checkpoint_of_another_job() {
+        let dir = scratch_dir("perft-mismatch");
+        let job = PerftJob::new(Board::new_default(), 4, 2);
+        fs::create_dir_all(&dir).unwrap();
+        let path = dir.join(job.checkpoint_name(Shard::ALL));
+        fs::write(&path, "kish-perft 1\nroot 0 0 0 white\n").unwrap();
+        let table = TranspositionTable::new(0);
+        let error = job.run(&dir, Shard::ALL, &table, |_| {}).unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidData);
+        fs::remove_dir_all(&dir).unwrap();
+    }
+}
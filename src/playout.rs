@@ -0,0 +1,518 @@
+//! Parallel random playouts (self-play) for Monte Carlo statistics.
+//!
+//! This module plays many complete games from a start position with a cheap
+//! built-in [`Policy`], spreading them across cores with rayon. It is meant for
+//! opening statistics and Monte Carlo evaluation, where millions of games are
+//! needed and per-move overhead dominates.
+//!
+//! # Determinism
+//!
+//! Every game draws from its own [`Rng`] stream derived from the seed and the
+//! game's index, so results depend only on the configuration and never on the
+//! number of threads or the order in which games are scheduled.
+//!
+//! # Rules
+//!
+//! Games are played with [`Game`], so threefold repetition and the
+//! insufficient-progress rule end games exactly as in normal play. Games still
+//! running after [`Playouts::max_plies`] are counted as truncated.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, Playouts, Policy};
+//!
+//! let playouts = Playouts {
+//!     seed: 7,
+//!     policy: Policy::CapturePreferring,
+//!     ..Playouts::default()
+//! };
+//! let stats = playouts.run(&Board::new_default(), 100);
+//!
+//! assert_eq!(stats.games(), 100);
+//! assert_eq!(stats.lengths.iter().sum::<u64>(), 100);
+//! ```
+
+use rayon::prelude::*;
+
+use crate::{Action, Board, Game, GameStatus, Team};
+
+/// Number of games played sequentially by one rayon task.
+const CHUNK_GAMES: u64 = 64;
+
+/// Increment of the SplitMix64 sequence (the 64-bit golden ratio).
+const GOLDEN_GAMMA: u64 = 0x9E37_79B9_7F4A_7C15;
+
+/// A small, fast, seedable pseudo-random number generator (SplitMix64).
+///
+/// Not suitable for cryptography. Streams for independent workers are derived
+/// with [`fork`](Self::fork).
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct Rng {
+    state: u64,
+}
+
+impl Rng {
+    /// Creates a generator from a seed.
+    #[inline]
+    #[must_use]
+    pub const fn new(seed: u64) -> Self {
+        Self { state: seed }
+    }
+
+    /// Returns an independent generator for stream `stream`.
+    #[inline]
+    #[must_use]
+    pub const fn fork(&self, stream: u64) -> Self {
+        Self::new(mix(self.state ^ mix(stream.wrapping_add(GOLDEN_GAMMA))))
+    }
+
+    /// Returns the next 64 random bits.
+    #[inline]
+    pub fn next_u64(&mut self) -> u64 {
+        self.state = self.state.wrapping_add(GOLDEN_GAMMA);
+        mix(self.state)
+    }
+
+    /// Returns a uniformly distributed value in `0..n`.
+    ///
+    /// # Panics
+    ///
+    /// Panics in debug builds if `n` is zero.
+    #[inline]
+    pub fn below(&mut self, n: u64) -> u64 {
+        debug_assert!(n > 0, "range must not be empty");
+        // Multiply-shift range reduction; the bias is negligible for small `n`.
+        ((u128::from(self.next_u64()) * u128::from(n)) >> 64) as u64
+    }
+}
+
+/// SplitMix64 output function.
+#[inline]
+const fn mix(mut z: u64) -> u64 {
+    z = (z ^ (z >> 30)).wrapping_mul(0xBF58_476D_1CE4_E5B9);
+    z = (z ^ (z >> 27)).wrapping_mul(0x94D0_49BB_1331_11EB);
+    z ^ (z >> 31)
+}
+
+/// Integer weights of the [`Policy::Heuristic`] policy.
+///
+/// Each legal action is chosen with probability proportional to
+/// `base + capture * pawns_captured + king_capture * kings_captured
+/// + promotion * promoted + advance * pawn_advanced`.
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub struct HeuristicWeights {
+    /// Weight every action receives.
+    pub base: u32,
+    /// Weight per captured man.
+    pub capture: u32,
+    /// Weight per captured king.
+    pub king_capture: u32,
+    /// Weight for promoting a man to king.
+    pub promotion: u32,
+    /// Weight for a man stepping forward.
+    pub advance: u32,
+}
+
+impl Default for HeuristicWeights {
+    fn default() -> Self {
+        Self {
+            base: 1,
+            capture: 4,
+            king_capture: 8,
+            promotion: 8,
+            advance: 1,
+        }
+    }
+}
+
+/// How a playout chooses among the legal actions.
+#[derive(Debug, Default, Clone, Copy, PartialEq, Eq, Hash)]
+pub enum Policy {
+    /// Every legal action is equally likely.
+    #[default]
+    Uniform,
+    /// Picks uniformly among the actions that gain the most material.
+    ///
+    /// Captures are already mandatory, so this prefers capturing kings over
+    /// men and promoting over not promoting.
+    CapturePreferring,
+    /// Samples actions in proportion to weighted features.
+    Heuristic(HeuristicWeights),
+}
+
+/// Material-relevant features of an action.
+#[derive(Debug, Clone, Copy)]
+struct Features {
+    pawns_captured: u32,
+    kings_captured: u32,
+    promoted: bool,
+    advanced: bool,
+}
+
+impl Features {
+    #[inline]
+    fn of(board: &Board, action: &Action) -> Self {
+        let team = board.turn.to_usize();
+        let ours = action.delta.pieces[team];
+        let captured = action.delta.pieces[1 - team];
+        let src = ours & board.state.pieces[team];
+        let dest = ours & !board.state.pieces[team];
+        let is_pawn = src & board.state.kings == 0;
+        let advanced = is_pawn
+            && captured == 0
+            && match board.turn {
+                Team::White => dest > src,
+                Team::Black => dest < src,
+            }
+            && (dest.trailing_zeros() / 8 != src.trailing_zeros() / 8);
+        Self {
+            pawns_captured: (captured & !board.state.kings).count_ones(),
+            kings_captured: (captured & board.state.kings).count_ones(),
+            promoted: is_pawn && action.delta.kings & dest != 0,
+            advanced,
+        }
+    }
+}
+
+impl Policy {
+    /// Chooses the index of one of `actions` (which must not be empty).
+    #[inline]
+    fn choose(&self, board: &Board, actions: &[Action], rng: &mut Rng) -> usize {
+        match self {
+            Self::Uniform => rng.below(actions.len() as u64) as usize,
+            Self::CapturePreferring => {
+                // Reservoir sampling over the best-scoring actions
+                let mut best = 0;
+                let mut best_score = 0;
+                let mut ties = 0;
+                for (i, action) in actions.iter().enumerate() {
+                    let f = Features::of(board, action);
+                    let score =
+                        2 * f.pawns_captured + 5 * f.kings_captured + 3 * u32::from(f.promoted);
+                    if ties == 0 || score > best_score {
+                        best = i;
+                        best_score = score;
+                        ties = 1;
+                    } else if score == best_score {
+                        ties += 1;
+                        if rng.below(ties) == 0 {
+                            best = i;
+                        }
+                    }
+                }
+                best
+            }
+            Self::Heuristic(w) => {
+                let weight = |action: &Action| {
+                    let f = Features::of(board, action);
+                    u64::from(w.base)
+                        + u64::from(w.capture) * u64::from(f.pawns_captured)
+                        + u64::from(w.king_capture) * u64::from(f.kings_captured)
+                        + u64::from(w.promotion) * u64::from(f.promoted)
+                        + u64::from(w.advance) * u64::from(f.advanced)
+                };
+                let total: u64 = actions.iter().map(weight).sum();
+                if total == 0 {
+                    return rng.below(actions.len() as u64) as usize;
+                }
+                let mut pick = rng.below(total);
+                for (i, action) in actions.iter().enumerate() {
+                    let w = weight(action);
+                    if pick < w {
+                        return i;
+                    }
+                    pick -= w;
+                }
+                actions.len() - 1
+            }
+        }
+    }
+}
+
+/// Configuration for a batch of playouts.
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub struct Playouts {
+    /// Seed of the random streams.
+    pub seed: u64,
+    /// How actions are chosen.
+    pub policy: Policy,
+    /// Games still in progress after this many plies are counted as truncated.
+    pub max_plies: u32,
+    /// Record the index (into [`Board::actions`]) of every move played.
+    pub record_moves: bool,
+}
+
+impl Default for Playouts {
+    /// Returns uniform playouts with seed 0, a 1000-ply limit and no recording.
+    fn default() -> Self {
+        Self {
+            seed: 0,
+            policy: Policy::Uniform,
+            max_plies: 1000,
+            record_moves: false,
+        }
+    }
+}
+
+/// Aggregated results of a batch of playouts.
+#[derive(Debug, Default, Clone, PartialEq, Eq)]
+pub struct PlayoutStats {
+    /// Games won by White.
+    pub white_wins: u64,
+    /// Games won by Black.
+    pub black_wins: u64,
+    /// Games drawn under the rules.
+    pub draws: u64,
+    /// Games stopped at [`Playouts::max_plies`].
+    pub truncated: u64,
+    /// Histogram of game lengths: `lengths[p]` games lasted `p` plies.
+    pub lengths: Vec<u64>,
+    /// Move indices of each game, in game order (empty unless recording).
+    pub moves: Vec<Vec<u16>>,
+}
+
+impl PlayoutStats {
+    /// Returns the total number of games played.
+    #[inline]
+    #[must_use]
+    pub const fn games(&self) -> u64 {
+        self.white_wins + self.black_wins + self.draws + self.truncated
+    }
+
+    fn record(&mut self, status: GameStatus, plies: u32) {
+        match status {
+            GameStatus::Won(Team::White) => self.white_wins += 1,
+            GameStatus::Won(Team::Black) => self.black_wins += 1,
+            GameStatus::Draw => self.draws += 1,
+            GameStatus::InProgress => self.truncated += 1,
+        }
+        let plies = plies as usize;
+        if self.lengths.len() <= plies {
+            self.lengths.resize(plies + 1, 0);
+        }
+        self.lengths[plies] += 1;
+    }
+
+    /// Adds `other`'s games after this batch's games.
+    fn merge(&mut self, other: Self) {
+        self.white_wins += other.white_wins;
+        self.black_wins += other.black_wins;
+        self.draws += other.draws;
+        self.truncated += other.truncated;
+        if self.lengths.len() < other.lengths.len() {
+            self.lengths.resize(other.lengths.len(), 0);
+        }
+        for (total, count) in self.lengths.iter_mut().zip(other.lengths) {
+            *total += count;
+        }
+        self.moves.extend(other.moves);
+    }
+}
+
+impl Playouts {
+    /// Plays `games` games from `start` in parallel and aggregates the results.
+    #[must_use]
+    pub fn run(&self, start: &Board, games: u64) -> PlayoutStats {
+        let chunks = (games + CHUNK_GAMES - 1) / CHUNK_GAMES;
+        let results: Vec<PlayoutStats> = (0..chunks)
+            .into_par_iter()
+            .map(|chunk| {
+                let first = chunk * CHUNK_GAMES;
+                let last = (first + CHUNK_GAMES).min(games);
+                let mut stats = PlayoutStats::default();
+                for index in first..last {
+                    let mut moves = Vec::new();
+                    let record = self.record_moves.then_some(&mut moves);
+                    let (status, plies) = self.play_into(start, index, record);
+                    stats.record(status, plies);
+                    if self.record_moves {
+                        stats.moves.push(moves);
+                    }
+                }
+                stats
+            })
+            .collect();
+
+        let mut total = PlayoutStats::default();
+        for stats in results {
+            total.merge(stats);
+        }
+        total
+    }
+
+    /// Plays game number `index` of this configuration from `start`.
+    ///
+    /// Returns the final status ([`GameStatus::InProgress`] if truncated) and
+    /// the number of plies played. This replays exactly the game that
+    /// [`run`](Self::run) plays for the same index.
+    #[must_use]
+    pub fn play(&self, start: &Board, index: u64) -> (GameStatus, u32) {
+        self.play_into(start, index, None)
+    }
+
+    pub(crate) fn play_into(
+        &self,
+        start: &Board,
+        index: u64,
+        moves: Option<&mut Vec<u16>>,
+    ) -> (GameStatus, u32) {
+        let mut rng = Rng::new(self.seed).fork(index);
+        self.finish(&mut Game::from_board(*start), &mut rng, moves)
+    }
+
+    /// Plays `game` to its end (or to [`max_plies`](Self::max_plies) more
+    /// plies) with this configuration's policy.
+    pub(crate) fn finish(
+        &self,
+        game: &mut Game,
+        rng: &mut Rng,
+        mut moves: Option<&mut Vec<u16>>,
+    ) -> (GameStatus, u32) {
+        let mut plies = 0;
+        loop {
+            let status = game.status();
+            if status.is_over() || plies >= self.max_plies {
+                return (status, plies);
+            }
+            // The status generated the legal actions, so this only reads them
+            let actions = game.legal_actions();
+            let choice = self.policy.choose(game.board(), actions, rng);
+            if let Some(moves) = moves.as_deref_mut() {
+                moves.push(choice as u16);
+            }
+            let action = actions[choice];
+            game.make_move(&action);
+            plies += 1;
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::Square;
+
+    #[test]
+    fn rng_is_deterministic() {
+        let mut a = Rng::new(42);
+        let mut b = Rng::new(42);
+        for _ in 0..100 {
+            assert_eq!(a.next_u64(), b.next_u64());
+        }
+    }
+
+    #[test]
+    fn rng_forks_differ() {
+        let rng = Rng::new(1);
+        assert_ne!(rng.fork(0).next_u64(), rng.fork(1).next_u64());
+    }
+
+    #[test]
+    fn rng_below_stays_in_range() {
+        let mut rng = Rng::new(3);
+        let mut seen = [false; 7];
+        for _ in 0..1000 {
+            let value = rng.below(7) as usize;
+            assert!(value < 7);
+            seen[value] = true;
+        }
+        assert!(seen.iter().all(|&s| s));
+    }
+
+    #[test]
+    fn run_counts_every_game() {
+        let stats = Playouts::default().run(&Board::new_default(), 150);
+        assert_eq!(stats.games(), 150);
+        assert_eq!(stats.lengths.iter().sum::<u64>(), 150);
+        assert!(stats.moves.is_empty());
+    }
+
+    #[test]
+    fn run_is_deterministic() {
+        let playouts = Playouts {
+            seed: 9,
+            ..Playouts::default()
+        };
+        let board = Board::new_default();
+        assert_eq!(playouts.run(&board, 70), playouts.run(&board, 70));
+    }
+
+    #[test]
+    fn recorded_moves_replay_the_game() {
+        let playouts = Playouts {
+            seed: 5,
+            policy: Policy::Heuristic(HeuristicWeights::default()),
+            record_moves: true,
+            ..Playouts::default()
+        };
+        let start = Board::new_default();
+        let stats = playouts.run(&start, 80);
+        assert_eq!(stats.moves.len(), 80);
+
+        for (index, moves) in stats.moves.iter().enumerate() {
+            let mut game = Game::from_board(start);
+            for &choice in moves {
+                game.make_move(&game.actions()[choice as usize]);
+            }
+            let (status, plies) = playouts.play(&start, index as u64);
+            assert_eq!(plies as usize, moves.len());
+            assert_eq!(game.status(), status);
+        }
+    }
+
+    #[test]
+    fn max_plies_truncates() {
+        let playouts = Playouts {
+            max_plies: 4,
+            ..Playouts::default()
+        };
+        let stats = playouts.run(&Board::new_default(), 10);
+        assert_eq!(stats.truncated, 10);
+        assert_eq!(stats.lengths, vec![0, 0, 0, 0, 10]);
+    }
+
+    #[test]
+    fn terminal_start_plays_no_moves() {
+        let board = Board::from_squares(Team::White, &[Square::A1], &[], &[]);
+        let stats = Playouts::default().run(&board, 3);
+        assert_eq!(stats.white_wins, 3);
+        assert_eq!(stats.lengths, vec![3]);
+    }
+
+    #[test]
+    fn capture_preferring_takes_the_king() {
+        // White king on D4 can capture either the man on B4 or the king on F4
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::D4],
+            &[Square::B4, Square::F4, Square::H8],
+            &[Square::D4, Square::F4],
+        );
+        let actions = board.actions();
+        let mut rng = Rng::new(0);
+        for _ in 0..20 {
+            let choice = Policy::CapturePreferring.choose(&board, &actions, &mut rng);
+            assert_eq!(
+                actions[choice].captured_pieces(Team::White),
+                Square::F4.to_mask()
+            );
+        }
+    }
+
+    #[test]
+    fn heuristic_weights_bias_choice() {
+        let weights = HeuristicWeights {
+            base: 0,
+            advance: 1,
+            ..HeuristicWeights::default()
+        };
+        let board = Board::new_default();
+        let actions = board.actions();
+        let mut rng = Rng::new(0);
+        for _ in 0..50 {
+            let choice = Policy::Heuristic(weights).choose(&board, &actions, &mut rng);
+            assert!(Features::of(&board, &actions[choice]).advanced);
+        }
+    }
+}
@@ -0,0 +1,686 @@
+//! Compact binary game records.
+//!
+//! A game is stored as its starting position and, for every ply, the index of
+//! the move played in [`Board::actions`] order. The index takes just enough
+//! bits to tell the legal moves of its position apart: none for a forced move,
+//! a few for most positions. Files hold any number of games back to back and
+//! are read by replaying each one, which also checks that every move is legal.
+//!
+//! # File Layout
+//!
+//! ```text
+//! magic       8 bytes  "KISHGR\0\x01"
+//! record*
+//!   flags     1 byte   bit 0: Black moves first, bit 1: a position follows
+//!   position  24 bytes white, black, kings (u64 little-endian), if flagged;
+//!                      otherwise the standard starting position
+//!   plies     varint   number of moves
+//!   length    varint   number of payload bytes
+//!   payload   bytes    move indices, packed least significant bit first
+//! ```
+//!
+//! Varints are LEB128. A move with `n` legal alternatives takes
+//! `ceil(log2(n))` bits. The byte length up front lets a reader skip a game
+//! without replaying it, and [`RecordWriter::write`] returns each game's byte
+//! offset so that [`RecordReader::seek`] can jump straight back to it.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, RecordReader, RecordWriter};
+//! use std::io::Cursor;
+//!
+//! let mut writer = RecordWriter::new(Vec::new())?;
+//! let first = writer.write(&Board::new_default(), &[0, 3, 1])?;
+//! let second = writer.write(&Board::new_default(), &[5])?;
+//! let bytes = writer.into_inner();
+//!
+//! let mut reader = RecordReader::new(Cursor::new(bytes))?;
+//! assert_eq!(reader.index()?, vec![first, second]);
+//! reader.seek(second)?;
+//! let record = reader.read()?.unwrap();
+//! assert_eq!(record.moves, vec![5]);
+//! assert_eq!(record.replay().unwrap().move_count(), 1);
+//! # Ok::<(), std::io::Error>(())
+//! ```
+
+use std::io::{self, Read, Seek, SeekFrom, Write};
+
+use crate::{Action, Board, Game, State, Team};
+
+/// File signature and format version.
+const MAGIC: &[u8; 8] = b"KISHGR\0\x01";
+
+/// Flag: Black moves first.
+const FLAG_BLACK: u8 = 1;
+/// Flag: the starting position follows the flags.
+const FLAG_POSITION: u8 = 2;
+
+/// Returns the number of bits needed for an index below `count`.
+const fn index_bits(count: usize) -> u32 {
+    if count <= 1 {
+        0
+    } else {
+        usize::BITS - (count - 1).leading_zeros()
+    }
+}
+
+/// Returns an `InvalidData` error with `message`.
+fn invalid(message: impl Into<String>) -> io::Error {
+    io::Error::new(io::ErrorKind::InvalidData, message.into())
+}
+
+/// A game decoded from a record: where it started and the index of every
+/// move in [`Board::actions`] order.
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
+pub struct GameRecord {
+    /// The starting position.
+    pub start: Board,
+    /// The index of each move among the legal actions of its position.
+    pub moves: Vec<u16>,
+}
+
+impl GameRecord {
+    /// Returns the record of `game`, from the start of its history.
+    ///
+    /// Returns `None` if a move of the game is not legal in its position.
+    #[must_use]
+    pub fn from_game(game: &Game) -> Option<Self> {
+        let mut positions: Vec<Board> = game.positions().collect();
+        positions.reverse();
+        let mut moves = Vec::with_capacity(positions.len() - 1);
+        for pair in positions.windows(2) {
+            let index = pair[0].actions().iter().position(|action| {
+                let mut child = pair[0].apply(action);
+                child.swap_turn_();
+                child == pair[1]
+            })?;
+            moves.push(index as u16);
+        }
+        Some(Self {
+            start: positions[0],
+            moves,
+        })
+    }
+
+    /// Replays the moves into a [`Game`], tracking repetitions and the
+    /// halfmove clock.
+    ///
+    /// Returns `None` if a move index is out of range for its position.
+    #[must_use]
+    pub fn replay(&self) -> Option<Game> {
+        let mut game = Game::from_board(self.start);
+        let mut actions = Vec::with_capacity(48);
+        for &index in &self.moves {
+            game.board().actions_into(&mut actions);
+            game.make_move(actions.get(index as usize)?);
+        }
+        Some(game)
+    }
+}
+
+/// Writes game records to a stream.
+///
+/// Records are encoded in memory and written in one piece, so a failed write
+/// never leaves half a record behind. Wrap files in a [`std::io::BufWriter`].
+#[derive(Debug)]
+pub struct RecordWriter<W: Write> {
+    inner: W,
+    offset: u64,
+    record: Vec<u8>,
+    scratch: Vec<Action>,
+}
+
+impl<W: Write> RecordWriter<W> {
+    /// Starts a record file at the beginning of `inner`.
+    ///
+    /// # Errors
+    ///
+    /// Returns any error from writing the file header.
+    pub fn new(mut inner: W) -> io::Result<Self> {
+        inner.write_all(MAGIC)?;
+        Ok(Self {
+            inner,
+            offset: MAGIC.len() as u64,
+            record: Vec::new(),
+            scratch: Vec::with_capacity(48),
+        })
+    }
+
+    /// Returns the byte offset at which the next record will start.
+    #[must_use]
+    pub const fn offset(&self) -> u64 {
+        self.offset
+    }
+
+    /// Writes a game given its starting position and move indices (as
+    /// recorded by [`Playouts`](crate::Playouts)), returning its byte offset.
+    ///
+    /// # Errors
+    ///
+    /// Returns [`io::ErrorKind::InvalidInput`] if a move index is out of range
+    /// for its position, in which case nothing is written, or any error from
+    /// the underlying writer.
+    pub fn write(&mut self, start: &Board, moves: &[u16]) -> io::Result<u64> {
+        self.record.clear();
+        if *start == Board::new_default() {
+            self.record.push(0);
+        } else {
+            let mut flags = FLAG_POSITION;
+            if start.turn == Team::Black {
+                flags |= FLAG_BLACK;
+            }
+            self.record.push(flags);
+            for bitboard in [
+                start.state.pieces[0],
+                start.state.pieces[1],
+                start.state.kings,
+            ] {
+                self.record.extend_from_slice(&bitboard.to_le_bytes());
+            }
+        }
+        write_varint(&mut self.record, moves.len() as u64);
+
+        let mut payload = BitWriter::default();
+        let mut board = *start;
+        for (ply, &index) in moves.iter().enumerate() {
+            board.actions_into(&mut self.scratch);
+            let Some(action) = self.scratch.get(index as usize) else {
+                return Err(io::Error::new(
+                    io::ErrorKind::InvalidInput,
+                    format!(
+                        "move {ply} has index {index} but only {} legal actions",
+                        self.scratch.len()
+                    ),
+                ));
+            };
+            payload.push(u32::from(index), index_bits(self.scratch.len()));
+            board.apply_(action);
+            board.swap_turn_();
+        }
+        let payload = payload.finish();
+        write_varint(&mut self.record, payload.len() as u64);
+        self.record.extend_from_slice(&payload);
+
+        self.inner.write_all(&self.record)?;
+        let offset = self.offset;
+        self.offset += self.record.len() as u64;
+        Ok(offset)
+    }
+
+    /// Writes `game` from the start of its history, returning its byte offset.
+    ///
+    /// # Errors
+    ///
+    /// Returns [`io::ErrorKind::InvalidInput`] if a move of the game is not
+    /// legal in its position, or any error from the underlying writer.
+    pub fn write_game(&mut self, game: &Game) -> io::Result<u64> {
+        let record = GameRecord::from_game(game).ok_or_else(|| {
+            io::Error::new(io::ErrorKind::InvalidInput, "game contains an illegal move")
+        })?;
+        self.write(&record.start, &record.moves)
+    }
+
+    /// Flushes the underlying writer.
+    ///
+    /// # Errors
+    ///
+    /// Returns any error from the underlying writer.
+    pub fn flush(&mut self) -> io::Result<()> {
+        self.inner.flush()
+    }
+
+    /// Returns the underlying writer.
+    #[must_use]
+    pub fn into_inner(self) -> W {
+        self.inner
+    }
+}
+
+/// Reads game records from a stream.
+///
+/// Iterating yields each [`GameRecord`] in turn. [`read_game`](Self::read_game)
+/// replays a record straight into a [`Game`] instead. Wrap files in a
+/// [`std::io::BufReader`].
+#[derive(Debug)]
+pub struct RecordReader<R: Read> {
+    inner: R,
+    offset: u64,
+    payload: Vec<u8>,
+    scratch: Vec<Action>,
+}
+
+impl<R: Read> RecordReader<R> {
+    /// Opens a record file at the beginning of `inner`.
+    ///
+    /// # Errors
+    ///
+    /// Returns [`io::ErrorKind::InvalidData`] if the stream does not start
+    /// with a record file header, or any error from reading it.
+    pub fn new(mut inner: R) -> io::Result<Self> {
+        let mut magic = [0; MAGIC.len()];
+        inner.read_exact(&mut magic)?;
+        if &magic != MAGIC {
+            return Err(invalid("not a game record file"));
+        }
+        Ok(Self {
+            inner,
+            offset: MAGIC.len() as u64,
+            payload: Vec::new(),
+            scratch: Vec::with_capacity(48),
+        })
+    }
+
+    /// Returns the byte offset of the next record.
+    #[must_use]
+    pub const fn offset(&self) -> u64 {
+        self.offset
+    }
+
+    /// Reads the next record, or returns `None` at the end of the stream.
+    ///
+    /// # Errors
+    ///
+    /// Returns [`io::ErrorKind::InvalidData`] if the record is corrupt or
+    /// holds an illegal move, [`io::ErrorKind::UnexpectedEof`] if it is cut
+    /// short, or any error from the underlying reader.
+    pub fn read(&mut self) -> io::Result<Option<GameRecord>> {
+        let Some((start, plies)) = self.read_header()? else {
+            return Ok(None);
+        };
+        let mut moves = Vec::with_capacity(plies.min(1024) as usize);
+        self.decode(start, plies, |index, _| moves.push(index))?;
+        Ok(Some(GameRecord { start, moves }))
+    }
+
+    /// Reads the next record and replays it into a [`Game`], or returns
+    /// `None` at the end of the stream.
+    ///
+    /// # Errors
+    ///
+    /// As for [`read`](Self::read).
+    pub fn read_game(&mut self) -> io::Result<Option<Game>> {
+        let Some((start, plies)) = self.read_header()? else {
+            return Ok(None);
+        };
+        let mut game = Game::from_board(start);
+        self.decode(start, plies, |_, action| game.make_move(action))?;
+        Ok(Some(game))
+    }
+
+    /// Skips the next record without replaying it. Returns false at the end
+    /// of the stream.
+    ///
+    /// # Errors
+    ///
+    /// As for [`read`](Self::read), except that moves are not checked.
+    pub fn skip(&mut self) -> io::Result<bool> {
+        Ok(self.read_header()?.is_some())
+    }
+
+    /// Reads the header and payload of the next record.
+    fn read_header(&mut self) -> io::Result<Option<(Board, u64)>> {
+        let mut flags = [0];
+        if self.inner.read(&mut flags)? == 0 {
+            return Ok(None);
+        }
+        let flags = flags[0];
+        if flags & !(FLAG_BLACK | FLAG_POSITION) != 0 {
+            return Err(invalid(format!("unknown record flags {flags:#04x}")));
+        }
+        let mut length = 1;
+        let mut start = Board::new_default();
+        if flags & FLAG_POSITION != 0 {
+            let mut position = [0; 24];
+            self.inner.read_exact(&mut position)?;
+            let bitboard = |i: usize| {
+                u64::from_le_bytes(position[i * 8..i * 8 + 8].try_into().expect("8 bytes"))
+            };
+            let (white, black, kings) = (bitboard(0), bitboard(1), bitboard(2));
+            if white & black != 0
+                || kings & !(white | black) != 0
+                || white.count_ones() > 16
+                || black.count_ones() > 16
+            {
+                return Err(invalid("record has an invalid starting position"));
+            }
+            start.state = State::new([white, black], kings);
+            length += position.len();
+        }
+        if flags & FLAG_BLACK != 0 {
+            start.turn = Team::Black;
+        }
+        let (plies, plies_length) = read_varint(&mut self.inner)?;
+        let (payload_length, payload_length_length) = read_varint(&mut self.inner)?;
+        if payload_length > plies.saturating_mul(2) {
+            return Err(invalid("record payload is longer than its moves"));
+        }
+
+        self.payload.clear();
+        self.inner
+            .by_ref()
+            .take(payload_length)
+            .read_to_end(&mut self.payload)?;
+        if self.payload.len() as u64 != payload_length {
+            return Err(io::ErrorKind::UnexpectedEof.into());
+        }
+        self.offset += (length + plies_length + payload_length_length) as u64 + payload_length;
+        Ok(Some((start, plies)))
+    }
+
+    /// Replays the loaded payload from `start`, calling `visit` with the
+    /// index and action of every move.
+    fn decode(
+        &mut self,
+        start: Board,
+        plies: u64,
+        mut visit: impl FnMut(u16, &Action),
+    ) -> io::Result<()> {
+        let mut bits = BitReader::new(&self.payload);
+        let mut board = start;
+        for ply in 0..plies {
+            board.actions_into(&mut self.scratch);
+            let index = bits
+                .read(index_bits(self.scratch.len()))
+                .ok_or_else(|| invalid("record payload ends before its moves"))?;
+            let action = self
+                .scratch
+                .get(index as usize)
+                .ok_or_else(|| invalid(format!("move {ply} has an illegal index {index}")))?;
+            visit(index as u16, action);
+            board.apply_(action);
+            board.swap_turn_();
+        }
+        if bits.bytes_used() != self.payload.len() {
+            return Err(invalid("record payload is longer than its moves"));
+        }
+        Ok(())
+    }
+}
+
+impl<R: Read + Seek> RecordReader<R> {
+    /// Moves to the record starting at byte `offset`, as returned by
+    /// [`RecordWriter::write`] or [`index`](Self::index).
+    ///
+    /// # Errors
+    ///
+    /// Returns any error from the underlying reader. Seeking to an offset
+    /// that is not the start of a record makes the next read fail or return
+    /// garbage.
+    pub fn seek(&mut self, offset: u64) -> io::Result<()> {
+        self.inner.seek(SeekFrom::Start(offset))?;
+        self.offset = offset;
+        Ok(())
+    }
+
+    /// Returns the byte offset of every record in the file, skipping over
+    /// the moves, then returns to the current position.
+    ///
+    /// # Errors
+    ///
+    /// As for [`skip`](Self::skip).
+    pub fn index(&mut self) -> io::Result<Vec<u64>> {
+        let current = self.offset;
+        self.seek(MAGIC.len() as u64)?;
+        let mut offsets = Vec::new();
+        loop {
+            let offset = self.offset;
+            if !self.skip()? {
+                break;
+            }
+            offsets.push(offset);
+        }
+        self.seek(current)?;
+        Ok(offsets)
+    }
+}
+
+impl<R: Read> Iterator for RecordReader<R> {
+    type Item = io::Result<GameRecord>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        self.read().transpose()
+    }
+}
+
+/// Appends `value` to `out` as a LEB128 varint.
+fn write_varint(out: &mut Vec<u8>, mut value: u64) {
+    while value >= 0x80 {
+        out.push(value as u8 | 0x80);
+        value >>= 7;
+    }
+    out.push(value as u8);
+}
+
+/// Reads a LEB128 varint, returning it and the number of bytes it took.
+fn read_varint(reader: &mut impl Read) -> io::Result<(u64, usize)> {
+    let mut value = 0u64;
+    for length in 1..=10 {
+        let mut byte = [0];
+        reader.read_exact(&mut byte)?;
+        value |= u64::from(byte[0] & 0x7F) << (7 * (length - 1));
+        if byte[0] & 0x80 == 0 {
+            return Ok((value, length));
+        }
+    }
+    Err(invalid("varint is too long"))
+}
+
+/// Packs values of varying bit widths, least significant bit first.
+#[derive(Default)]
+struct BitWriter {
+    bytes: Vec<u8>,
+    buffer: u64,
+    bits: u32,
+}
+
+impl BitWriter {
+    /// Appends the low `width` bits of `value`.
+    fn push(&mut self, value: u32, width: u32) {
+        self.buffer |= u64::from(value) << self.bits;
+        self.bits += width;
+        while self.bits >= 8 {
+            self.bytes.push(self.buffer as u8);
+            self.buffer >>= 8;
+            self.bits -= 8;
+        }
+    }
+
+    /// Returns the packed bytes, padding the last one with zeros.
+    fn finish(mut self) -> Vec<u8> {
+        if self.bits > 0 {
+            self.bytes.push(self.buffer as u8);
+        }
+        self.bytes
+    }
+}
+
+/// Unpacks values written by [`BitWriter`].
+struct BitReader<'a> {
+    bytes: &'a [u8],
+    position: usize,
+}
+
+impl<'a> BitReader<'a> {
+    const fn new(bytes: &'a [u8]) -> Self {
+        Self { bytes, position: 0 }
+    }
+
+    /// Reads `width` (at most 16) bits, or returns `None` past the end.
+    fn read(&mut self, width: u32) -> Option<u32> {
+        let end = self.position + width as usize;
+        if end > self.bytes.len() * 8 {
+            return None;
+        }
+        let byte = self.position / 8;
+        let window = (0..3).fold(0u32, |window, i| {
+            window | u32::from(self.bytes.get(byte + i).copied().unwrap_or(0)) << (8 * i)
+        });
+        let value = (window >> (self.position % 8)) & ((1 << width) - 1);
+        self.position = end;
+        Some(value)
+    }
+
+    /// Returns the number of bytes holding the bits read so far.
+    const fn bytes_used(&self) -> usize {
+        (self.position + 7) / 8
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{Playouts, Square};
+    use std::io::Cursor;
+
+    fn playout_games(games: u64) -> Vec<Vec<u16>> {
+        let playouts = Playouts {
+            seed: 3,
+            record_moves: true,
+            ..Playouts::default()
+        };
+        playouts.run(&Board::new_default(), games).moves
+    }
+
+    #[test]
+    fn round_trips_playouts() {
+        let games = playout_games(20);
+        let mut writer = RecordWriter::new(Vec::new()).unwrap();
+        let offsets: Vec<u64> = games
+            .iter()
+            .map(|moves| writer.write(&Board::new_default(), moves).unwrap())
+            .collect();
+        let end = writer.offset();
+        let bytes = writer.into_inner();
+        assert_eq!(bytes.len() as u64, end);
+
+        // A few bits per move, against two bytes as raw u16 indices
+        let plies: usize = games.iter().map(Vec::len).sum();
+        assert!(
+            bytes.len() < plies,
+            "{} bytes for {plies} plies",
+            bytes.len()
+        );
+
+        let mut reader = RecordReader::new(Cursor::new(bytes)).unwrap();
+        assert_eq!(reader.index().unwrap(), offsets);
+        let records: Vec<GameRecord> = reader.by_ref().map(Result::unwrap).collect();
+        assert_eq!(reader.offset(), end);
+        assert_eq!(records.len(), games.len());
+        for (record, moves) in records.iter().zip(&games) {
+            assert_eq!(&record.moves, moves);
+            assert_eq!(record.start, Board::new_default());
+        }
+    }
+
+    #[test]
+    fn read_game_matches_replay() {
+        let games = playout_games(5);
+        let mut writer = RecordWriter::new(Vec::new()).unwrap();
+        for moves in &games {
+            writer.write(&Board::new_default(), moves).unwrap();
+        }
+        let mut reader = RecordReader::new(Cursor::new(writer.into_inner())).unwrap();
+        for moves in &games {
+            let game = reader.read_game().unwrap().unwrap();
+            let expected = GameRecord {
+                start: Board::new_default(),
+                moves: moves.clone(),
+            };
+            assert_eq!(game, expected.replay().unwrap());
+            assert_eq!(GameRecord::from_game(&game).unwrap(), expected);
+        }
+        assert!(reader.read_game().unwrap().is_none());
+    }
+
+    #[test]
+    fn seek_reads_any_game() {
+        let games = playout_games(10);
+        let mut writer = RecordWriter::new(Vec::new()).unwrap();
+        let offsets: Vec<u64> = games
+            .iter()
+            .map(|moves| writer.write(&Board::new_default(), moves).unwrap())
+            .collect();
+        let mut reader = RecordReader::new(Cursor::new(writer.into_inner())).unwrap();
+        for i in [7, 2, 9, 0] {
+            reader.seek(offsets[i]).unwrap();
+            assert_eq!(reader.read().unwrap().unwrap().moves, games[i]);
+        }
+    }
+
+    #[test]
+    fn custom_start_position() {
+        let start = Board::from_squares(
+            Team::Black,
+            &[Square::D4, Square::A2],
+            &[Square::D5, Square::H8],
+            &[Square::H8],
+        );
+        let mut writer = RecordWriter::new(Vec::new()).unwrap();
+        writer.write(&start, &[0]).unwrap();
+        writer.write(&start, &[]).unwrap();
+        let records: Vec<GameRecord> = RecordReader::new(Cursor::new(writer.into_inner()))
+            .unwrap()
+            .map(Result::unwrap)
+            .collect();
+        assert_eq!(records[0].start, start);
+        assert_eq!(records[0].moves, vec![0]);
+        assert_eq!(records[1].moves, Vec::<u16>::new());
+    }
+
+    #[test]
+    fn rejects_illegal_moves() {
+        let mut writer = RecordWriter::new(Vec::new()).unwrap();
+        let error = writer.write(&Board::new_default(), &[0, 999]).unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidInput);
+        // Nothing was written
+        assert_eq!(writer.into_inner(), MAGIC.to_vec());
+    }
+
+    #[test]
+    fn rejects_corrupt_files() {
+        let error = RecordReader::new(Cursor::new(b"not a record".to_vec())).unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidData);
+
+        let mut writer = RecordWriter::new(Vec::new()).unwrap();
+        writer.write(&Board::new_default(), &[1, 2, 3]).unwrap();
+        let bytes = writer.into_inner();
+
+        // Cut short
+        let mut reader = RecordReader::new(Cursor::new(bytes[..bytes.len() - 1].to_vec())).unwrap();
+        let error = reader.read().unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::UnexpectedEof);
+
+        // Unknown flags
+        let mut corrupt = bytes.clone();
+        corrupt[MAGIC.len()] = 0x80;
+        let error = RecordReader::new(Cursor::new(corrupt))
+            .unwrap()
+            .read()
+            .unwrap_err();
+        assert_eq!(error.kind(), io::ErrorKind::InvalidData);
+    }
+
+    #[test]
+    fn varints_round_trip() {
+        for value in [0, 1, 127, 128, 300, u64::from(u32::MAX), u64::MAX] {
+            let mut bytes = Vec::new();
+            write_varint(&mut bytes, value);
+            assert_eq!(
+                read_varint(&mut bytes.as_slice()).unwrap(),
+                (value, bytes.len())
+            );
+        }
+    }
+
+    #[test]
+    fn index_bits_fit_counts() {
+        assert_eq!(index_bits(0), 0);
+        assert_eq!(index_bits(1), 0);
+        assert_eq!(index_bits(2), 1);
+        assert_eq!(index_bits(3), 2);
+        assert_eq!(index_bits(4), 2);
+        assert_eq!(index_bits(5), 3);
+        assert_eq!(index_bits(256), 8);
+    }
+}
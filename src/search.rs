@@ -0,0 +1,943 @@
+//! Alpha-beta search for finding the best move.
+//!
+//! This module provides [`Search`], a single-threaded principal variation
+//! search (PVS) over [`Board`] positions:
+//!
+//! - **Iterative deepening** with **aspiration windows** around the previous
+//!   iteration's score
+//! - **Move ordering**: transposition table move, then captures (by material
+//!   taken), then killer moves, then the history heuristic
+//! - **Quiescence search** over captures: since captures are mandatory, a
+//!   position with a pending capture is never evaluated statically
+//! - A **transposition table** using the same lockless XOR-verified layout as
+//!   the perft table, extended with a bound type and best move, and keyed by
+//!   incrementally updated Zobrist keys
+//! - **Node and time limits**, with the principal variation (PV) of the last
+//!   completed iteration in the result
+//! - An optional [`Network`] for the static evaluation, with one accumulator
+//!   per ply updated incrementally from each move's delta
+//!
+//! The table is kept between calls, so a [`Search`] reused across the moves
+//! of a game benefits from earlier work. Positions are searched without game
+//! history, so draws by repetition or insufficient progress are not seen;
+//! the one-piece-each draw is.
+//!
+//! # Scores
+//!
+//! Scores are in centi-men from the side to move's point of view (a man is
+//! worth 100). A forced win in `n` plies scores `MATE_SCORE - n`.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, Search, SearchLimits};
+//!
+//! let mut search = Search::new(16);
+//! let result = search.search(
+//!     &Board::new_default(),
+//!     &SearchLimits {
+//!         depth: 6,
+//!         ..SearchLimits::default()
+//!     },
+//! );
+//!
+//! assert_eq!(result.depth, 6);
+//! assert!(result.best_move.is_some());
+//! println!("score {} pv {:?}", result.score, result.pv);
+//! ```
+
+use std::mem;
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+
+use crate::{Accumulator, Action, Board, Network, Team};
+
+/// Score of a position where the side to move has already lost.
+pub const MATE_SCORE: i32 = 30_000;
+
+/// Maximum iterative deepening depth.
+pub const MAX_DEPTH: u8 = 64;
+
+/// Maximum search ply, including quiescence.
+const MAX_PLY: usize = 128;
+
+/// Bound on all scores (never returned).
+const INFINITY: i32 = 32_000;
+
+/// Scores beyond this are forced wins or losses.
+const MATE_BOUND: i32 = MATE_SCORE - MAX_PLY as i32;
+
+/// Value of a man.
+const MAN_VALUE: i32 = 100;
+
+/// Value of a king.
+const KING_VALUE: i32 = 300;
+
+/// Bonus per row a man has advanced.
+const ADVANCE_VALUE: i32 = 4;
+
+/// Half-width of the aspiration window.
+const ASPIRATION_WINDOW: i32 = 50;
+
+/// First depth searched with an aspiration window.
+const ASPIRATION_DEPTH: u8 = 4;
+
+/// Number of nodes between clock checks.
+const CHECK_INTERVAL: u64 = 1024;
+
+/// Limits of a search. The search stops at whichever is reached first.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct SearchLimits {
+    /// Maximum iterative deepening depth (clamped to [`MAX_DEPTH`]).
+    pub depth: u8,
+    /// Maximum number of nodes.
+    pub nodes: Option<u64>,
+    /// Maximum wall-clock time.
+    pub time: Option<Duration>,
+}
+
+impl Default for SearchLimits {
+    /// Returns limits that only stop at [`MAX_DEPTH`].
+    fn default() -> Self {
+        Self {
+            depth: MAX_DEPTH,
+            nodes: None,
+            time: None,
+        }
+    }
+}
+
+/// Result of the last completed iteration of a search.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct SearchResult {
+    /// The best move, or `None` if the side to move has no legal actions.
+    pub best_move: Option<Action>,
+    /// Score from the side to move's point of view.
+    pub score: i32,
+    /// Depth of the last completed iteration.
+    pub depth: u8,
+    /// Nodes searched, including the unfinished iteration.
+    pub nodes: u64,
+    /// Principal variation, starting with the best move.
+    pub pv: Vec<Action>,
+}
+
+impl SearchResult {
+    /// Returns the number of plies to a forced result if the score is one:
+    /// positive when the side to move wins, negative when it loses.
+    #[must_use]
+    pub const fn mate_in(&self) -> Option<i32> {
+        if self.score > MATE_BOUND {
+            Some(MATE_SCORE - self.score)
+        } else if self.score < -MATE_BOUND {
+            Some(-(MATE_SCORE + self.score))
+        } else {
+            None
+        }
+    }
+}
+
+impl Board {
+    /// Statically evaluates the position from the side to move's point of view.
+    ///
+    /// Counts material (men 100, kings 300) and how far each man has advanced.
+    #[must_use]
+    pub fn evaluate(&self) -> i32 {
+        let score = side_score(self, Team::White) - side_score(self, Team::Black);
+        match self.turn {
+            Team::White => score,
+            Team::Black => -score,
+        }
+    }
+}
+
+/// Material and advancement of one side.
+#[inline]
+fn side_score(board: &Board, team: Team) -> i32 {
+    let pieces = board.state.pieces[team.to_usize()];
+    let kings = pieces & board.state.kings;
+    let men = pieces & !board.state.kings;
+    let mut advance = 0;
+    for row in 1..7 {
+        let count = (men & (0xFF << (8 * row))).count_ones() as i32;
+        advance += count
+            * match team {
+                Team::White => row - 1,
+                Team::Black => 6 - row,
+            };
+    }
+    MAN_VALUE * men.count_ones() as i32
+        + KING_VALUE * kings.count_ones() as i32
+        + ADVANCE_VALUE * advance
+}
+
+/// True if both sides are down to a single piece (a draw by the rules).
+#[inline]
+const fn is_bare_draw(board: &Board) -> bool {
+    board.state.pieces[0].is_power_of_two() && board.state.pieces[1].is_power_of_two()
+}
+
+/// Index of an action's (source, destination) pair in the history table.
+#[inline]
+const fn history_index(board: &Board, action: &Action) -> usize {
+    let team = board.turn.to_usize();
+    let ours = action.delta.pieces[team];
+    let src = (ours & board.state.pieces[team]).trailing_zeros() as usize & 63;
+    let dest = (ours & !board.state.pieces[team]).trailing_zeros() as usize & 63;
+    src * 64 + dest
+}
+
+/// Adjusts a mate score from "plies from the root" to "plies from this node".
+#[inline]
+const fn score_to_table(score: i32, ply: usize) -> i32 {
+    if score > MATE_BOUND {
+        score + ply as i32
+    } else if score < -MATE_BOUND {
+        score - ply as i32
+    } else {
+        score
+    }
+}
+
+/// Inverse of [`score_to_table`].
+#[inline]
+const fn score_from_table(score: i32, ply: usize) -> i32 {
+    if score > MATE_BOUND {
+        score - ply as i32
+    } else if score < -MATE_BOUND {
+        score + ply as i32
+    } else {
+        score
+    }
+}
+
+/// How a stored score relates to the true value.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+enum Bound {
+    /// The score is exact.
+    Exact = 0,
+    /// The true value is at least the score (fail high).
+    Lower = 1,
+    /// The true value is at most the score (fail low).
+    Upper = 2,
+}
+
+/// A transposition table entry.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+struct TableEntry {
+    score: i32,
+    depth: u8,
+    bound: Bound,
+    /// Index of the best move in generation order.
+    move_index: Option<usize>,
+}
+
+impl TableEntry {
+    /// Packs as `score:16 | depth:8 | bound:8 | move_index + 1:16`.
+    #[inline]
+    fn pack(self) -> u64 {
+        let move_bits = self.move_index.map_or(0, |index| index as u64 + 1);
+        u64::from(self.score as i16 as u16)
+            | u64::from(self.depth) << 16
+            | (self.bound as u64) << 24
+            | move_bits << 32
+    }
+
+    #[inline]
+    fn unpack(data: u64) -> Self {
+        let bound = match (data >> 24) as u8 {
+            0 => Bound::Exact,
+            1 => Bound::Lower,
+            _ => Bound::Upper,
+        };
+        let move_bits = (data >> 32) as u16;
+        Self {
+            score: i32::from(data as u16 as i16),
+            depth: (data >> 16) as u8,
+            bound,
+            move_index: (move_bits != 0).then(|| move_bits as usize - 1),
+        }
+    }
+}
+
+/// Search transposition table.
+///
+/// Same layout as the perft table: one slot per index, with the key stored
+/// XORed with the data so that a mismatched pair is detected as a miss.
+struct SearchTable {
+    /// `[key ^ data, data]` pairs.
+    entries: Vec<[u64; 2]>,
+    mask: usize,
+}
+
+impl SearchTable {
+    /// Creates a table of at most `size_mb` megabytes (0 disables it).
+    fn new(size_mb: usize) -> Self {
+        let capacity = size_mb * 1024 * 1024 / mem::size_of::<[u64; 2]>();
+        if capacity == 0 {
+            return Self {
+                entries: Vec::new(),
+                mask: 0,
+            };
+        }
+        // Round down to a power of two so the table stays within budget
+        let capacity = 1 << (usize::BITS - 1 - capacity.leading_zeros());
+        Self {
+            entries: vec![[0, 0]; capacity],
+            mask: capacity - 1,
+        }
+    }
+
+    #[inline]
+    fn probe(&self, hash: u64) -> Option<TableEntry> {
+        let [key, data] = *self.entries.get(hash as usize & self.mask)?;
+        (key ^ data == hash).then(|| TableEntry::unpack(data))
+    }
+
+    #[inline]
+    fn store(&mut self, hash: u64, entry: TableEntry) {
+        if let Some(slot) = self.entries.get_mut(hash as usize & self.mask) {
+            let data = entry.pack();
+            *slot = [hash ^ data, data];
+        }
+    }
+
+    fn clear(&mut self) {
+        self.entries.fill([0, 0]);
+    }
+}
+
+/// Principal variation search with iterative deepening.
+///
+/// See the [module documentation](self) for the techniques used. Create one
+/// per thread and reuse it across searches to keep the transposition table.
+pub struct Search {
+    table: SearchTable,
+    /// Two killer moves per ply.
+    killers: Vec<[Action; 2]>,
+    /// History heuristic scores indexed by `source * 64 + destination`.
+    history: Vec<u32>,
+    /// Move list per ply, reused across nodes.
+    moves: Vec<Vec<Action>>,
+    /// Ordered `(score, move index)` list per ply.
+    order: Vec<Vec<(u32, usize)>>,
+    /// Triangular PV table: `pv[ply]` is the best line from `ply`.
+    pv: Vec<Vec<Action>>,
+    /// Evaluation network, replacing [`Board::evaluate`].
+    network: Option<Arc<Network>>,
+    /// Network accumulator per ply.
+    accumulators: Vec<Accumulator>,
+    nodes: u64,
+    limits: SearchLimits,
+    start: Instant,
+    stopped: bool,
+}
+
+impl Search {
+    /// Creates a search with a transposition table of about `tt_size_mb` megabytes.
+    #[must_use]
+    pub fn new(tt_size_mb: usize) -> Self {
+        Self {
+            table: SearchTable::new(tt_size_mb),
+            killers: vec![[Action::EMPTY; 2]; MAX_PLY],
+            history: vec![0; 64 * 64],
+            moves: (0..MAX_PLY).map(|_| Vec::with_capacity(48)).collect(),
+            order: (0..MAX_PLY).map(|_| Vec::with_capacity(48)).collect(),
+            pv: (0..=MAX_PLY).map(|_| Vec::with_capacity(MAX_PLY)).collect(),
+            network: None,
+            accumulators: Vec::new(),
+            nodes: 0,
+            limits: SearchLimits::default(),
+            start: Instant::now(),
+            stopped: false,
+        }
+    }
+
+    /// Creates a search that evaluates positions with `network` instead of
+    /// [`Board::evaluate`].
+    ///
+    /// Network scores are clamped below the forced win range.
+    #[must_use]
+    pub fn with_network(tt_size_mb: usize, network: Arc<Network>) -> Self {
+        Self {
+            network: Some(network),
+            accumulators: vec![Accumulator::default(); MAX_PLY],
+            ..Self::new(tt_size_mb)
+        }
+    }
+
+    /// Clears the transposition table and move ordering statistics.
+    pub fn clear(&mut self) {
+        self.table.clear();
+        self.history.fill(0);
+    }
+
+    /// Searches `board` within `limits` and returns the best move found.
+    ///
+    /// The result describes the last iteration that completed. If the limits
+    /// stop the search before depth 1 completes, the first move in search
+    /// order (the table move of an earlier search, if any) is returned with
+    /// depth 0.
+    pub fn search(&mut self, board: &Board, limits: &SearchLimits) -> SearchResult {
+        self.limits = *limits;
+        self.start = Instant::now();
+        self.nodes = 0;
+        self.stopped = false;
+        self.killers.fill([Action::EMPTY; 2]);
+        for score in &mut self.history {
+            *score /= 2;
+        }
+
+        let mut result = SearchResult {
+            best_move: None,
+            score: 0,
+            depth: 0,
+            nodes: 0,
+            pv: Vec::new(),
+        };
+
+        let root_moves = board.actions();
+        if root_moves.is_empty() {
+            result.score = -MATE_SCORE;
+            return result;
+        }
+        // Order the root like any node, so the table move of an earlier
+        // search comes first
+        let table_move = self
+            .table
+            .probe(board.zobrist())
+            .and_then(|entry| entry.move_index);
+        let mut order = mem::take(&mut self.order[0]);
+        self.order_moves(board, &root_moves, 0, table_move, &mut order);
+        result.best_move = Some(root_moves[order[0].1]);
+        self.order[0] = order;
+        if is_bare_draw(board) {
+            return result;
+        }
+        if let Some(network) = &self.network {
+            network.refresh(&mut self.accumulators[0], board);
+        }
+
+        for depth in 1..=limits.depth.min(MAX_DEPTH) {
+            let score = self.aspiration(board, depth, result.score);
+            if self.stopped {
+                break;
+            }
+            result.score = score;
+            result.depth = depth;
+            result.pv.clone_from(&self.pv[0]);
+            result.best_move = self.pv[0].first().copied().or(result.best_move);
+
+            // A forced result within the horizon cannot change with more depth
+            if result
+                .mate_in()
+                .is_some_and(|plies| plies.unsigned_abs() <= u32::from(depth))
+            {
+                break;
+            }
+        }
+
+        result.nodes = self.nodes;
+        result
+    }
+
+    /// Searches the root at `depth` with a window around `guess`, widening on failure.
+    fn aspiration(&mut self, board: &Board, depth: u8, guess: i32) -> i32 {
+        if depth < ASPIRATION_DEPTH || guess.abs() > MATE_BOUND {
+            return self.negamax(board, board.zobrist(), depth, 0, -INFINITY, INFINITY);
+        }
+        let mut alpha = guess - ASPIRATION_WINDOW;
+        let mut beta = guess + ASPIRATION_WINDOW;
+        loop {
+            let score = self.negamax(board, board.zobrist(), depth, 0, alpha, beta);
+            if self.stopped {
+                return score;
+            }
+            if score <= alpha {
+                alpha = -INFINITY;
+            } else if score >= beta {
+                beta = INFINITY;
+            } else {
+                return score;
+            }
+        }
+    }
+
+    /// Checks the node and time limits, latching `stopped`.
+    #[inline]
+    fn should_stop(&mut self) -> bool {
+        if !self.stopped {
+            let out_of_nodes = self.limits.nodes.is_some_and(|nodes| self.nodes >= nodes);
+            let out_of_time = self.nodes % CHECK_INTERVAL == 0
+                && self
+                    .limits
+                    .time
+                    .is_some_and(|time| self.start.elapsed() >= time);
+            self.stopped = out_of_nodes || out_of_time;
+        }
+        self.stopped
+    }
+
+    /// Searches `board`, whose Zobrist key is `key`, to `depth` plies.
+    fn negamax(
+        &mut self,
+        board: &Board,
+        key: u64,
+        depth: u8,
+        ply: usize,
+        mut alpha: i32,
+        beta: i32,
+    ) -> i32 {
+        if depth == 0 || ply >= MAX_PLY - 1 {
+            return self.quiescence(board, ply, alpha, beta);
+        }
+        self.pv[ply].clear();
+        if self.should_stop() {
+            return 0;
+        }
+        self.nodes += 1;
+        if is_bare_draw(board) {
+            return 0;
+        }
+
+        let mut table_move = None;
+        if let Some(entry) = self.table.probe(key) {
+            table_move = entry.move_index;
+            if ply > 0 && entry.depth >= depth {
+                let score = score_from_table(entry.score, ply);
+                match entry.bound {
+                    Bound::Exact => return score,
+                    Bound::Lower if score >= beta => return score,
+                    Bound::Upper if score <= alpha => return score,
+                    _ => {}
+                }
+            }
+        }
+
+        let mut moves = mem::take(&mut self.moves[ply]);
+        board.actions_into(&mut moves);
+        if moves.is_empty() {
+            self.moves[ply] = moves;
+            return -MATE_SCORE + ply as i32;
+        }
+        let mut order = mem::take(&mut self.order[ply]);
+        self.order_moves(board, &moves, ply, table_move, &mut order);
+
+        let alpha_orig = alpha;
+        let mut best_score = -INFINITY;
+        let mut best_index = order[0].1;
+        for (n, &(_, index)) in order.iter().enumerate() {
+            let action = moves[index];
+            let mut child = board.apply(&action);
+            child.swap_turn_();
+            let child_key = key ^ action.zobrist_delta();
+            self.update_accumulator(board, &action, ply);
+
+            let score = if n == 0 {
+                -self.negamax(&child, child_key, depth - 1, ply + 1, -beta, -alpha)
+            } else {
+                // Null-window probe, re-searched only if it lands inside the window
+                let score =
+                    -self.negamax(&child, child_key, depth - 1, ply + 1, -alpha - 1, -alpha);
+                if score > alpha && score < beta {
+                    -self.negamax(&child, child_key, depth - 1, ply + 1, -beta, -alpha)
+                } else {
+                    score
+                }
+            };
+            if self.stopped {
+                break;
+            }
+
+            if score > best_score {
+                best_score = score;
+                best_index = index;
+                if score > alpha {
+                    alpha = score;
+                    self.update_pv(ply, action);
+                    if alpha >= beta {
+                        if !action.is_capture(board.turn) {
+                            self.record_cutoff(board, &action, depth, ply);
+                        }
+                        break;
+                    }
+                }
+            }
+        }
+
+        if !self.stopped {
+            let bound = if best_score <= alpha_orig {
+                Bound::Upper
+            } else if best_score >= beta {
+                Bound::Lower
+            } else {
+                Bound::Exact
+            };
+            self.table.store(
+                key,
+                TableEntry {
+                    score: score_to_table(best_score, ply),
+                    depth,
+                    bound,
+                    move_index: Some(best_index),
+                },
+            );
+        }
+
+        self.moves[ply] = moves;
+        self.order[ply] = order;
+        best_score
+    }
+
+    /// Resolves pending captures before evaluating statically.
+    fn quiescence(&mut self, board: &Board, ply: usize, mut alpha: i32, beta: i32) -> i32 {
+        self.pv[ply].clear();
+        if self.should_stop() {
+            return 0;
+        }
+        self.nodes += 1;
+        if is_bare_draw(board) {
+            return 0;
+        }
+
+        // Quiet positions are scored without generating their moves
+        if !board.has_capture() {
+            return if board.has_legal_move() {
+                self.evaluate(board, ply)
+            } else {
+                -MATE_SCORE + ply as i32
+            };
+        }
+        if ply >= MAX_PLY - 1 {
+            return self.evaluate(board, ply);
+        }
+
+        // Captures are mandatory, so there is no stand-pat option
+        let mut moves = mem::take(&mut self.moves[ply]);
+        board.captures_into(&mut moves);
+        let mut best = -INFINITY;
+        for action in &moves {
+            let mut child = board.apply(action);
+            child.swap_turn_();
+            self.update_accumulator(board, action, ply);
+            let score = -self.quiescence(&child, ply + 1, -beta, -alpha);
+            if self.stopped {
+                break;
+            }
+            if score > best {
+                best = score;
+                if score > alpha {
+                    alpha = score;
+                    if alpha >= beta {
+                        break;
+                    }
+                }
+            }
+        }
+        self.moves[ply] = moves;
+        best
+    }
+
+    /// Statically evaluates `board`, the position at `ply`.
+    #[inline]
+    fn evaluate(&self, board: &Board, ply: usize) -> i32 {
+        match &self.network {
+            Some(network) => network
+                .evaluate_accumulator(&self.accumulators[ply], board.turn)
+                .clamp(-MATE_BOUND, MATE_BOUND),
+            None => board.evaluate(),
+        }
+    }
+
+    /// Sets the accumulator at `ply + 1` to that of `board`, the position at
+    /// `ply`, after `action`.
+    #[inline]
+    fn update_accumulator(&mut self, board: &Board, action: &Action, ply: usize) {
+        if let Some(network) = &self.network {
+            let (parents, children) = self.accumulators.split_at_mut(ply + 1);
+            children[0].clone_from(&parents[ply]);
+            network.update(&mut children[0], board, action);
+        }
+    }
+
+    /// Fills `order` with `(score, index)` pairs, best first.
+    fn order_moves(
+        &self,
+        board: &Board,
+        moves: &[Action],
+        ply: usize,
+        table_move: Option<usize>,
+        order: &mut Vec<(u32, usize)>,
+    ) {
+        const TABLE_MOVE: u32 = u32::MAX;
+        const CAPTURE: u32 = 1 << 30;
+        const KILLER: u32 = 1 << 29;
+
+        let team = board.turn.to_usize();
+        let killers = &self.killers[ply];
+        order.clear();
+        order.extend(moves.iter().enumerate().map(|(index, action)| {
+            let captured = action.delta.pieces[1 - team];
+            let score = if table_move == Some(index) {
+                TABLE_MOVE
+            } else if captured != 0 {
+                CAPTURE + 16 * captured.count_ones() + (captured & board.state.kings).count_ones()
+            } else if *action == killers[0] {
+                KILLER + 1
+            } else if *action == killers[1] {
+                KILLER
+            } else {
+                self.history[history_index(board, action)].min(KILLER - 1)
+            };
+            (score, index)
+        }));
+        order.sort_by(|a, b| b.0.cmp(&a.0));
+    }
+
+    /// Records a quiet move that caused a beta cutoff.
+    fn record_cutoff(&mut self, board: &Board, action: &Action, depth: u8, ply: usize) {
+        let killers = &mut self.killers[ply];
+        if killers[0] != *action {
+            killers[1] = killers[0];
+            killers[0] = *action;
+        }
+        let entry = &mut self.history[history_index(board, action)];
+        *entry = entry.saturating_add(u32::from(depth) * u32::from(depth));
+    }
+
+    /// Makes `action` followed by the child's PV the PV at `ply`.
+    fn update_pv(&mut self, ply: usize, action: Action) {
+        let (head, tail) = self.pv.split_at_mut(ply + 1);
+        let line = &mut head[ply];
+        line.clear();
+        line.push(action);
+        line.extend_from_slice(&tail[0]);
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::Square;
+
+    fn limits(depth: u8) -> SearchLimits {
+        SearchLimits {
+            depth,
+            ..SearchLimits::default()
+        }
+    }
+
+    /// Plain minimax with the same leaf rules as the search.
+    fn minimax(board: &Board, depth: u8, ply: usize) -> i32 {
+        minimax_with(board, depth, ply, &Board::evaluate)
+    }
+
+    /// [`minimax`] with `evaluate` as the static evaluation.
+    fn minimax_with(board: &Board, depth: u8, ply: usize, evaluate: &dyn Fn(&Board) -> i32) -> i32 {
+        if is_bare_draw(board) {
+            return 0;
+        }
+        let moves = board.actions();
+        if moves.is_empty() {
+            return -MATE_SCORE + ply as i32;
+        }
+        if depth == 0 && !moves[0].is_capture(board.turn) {
+            return evaluate(board);
+        }
+        moves
+            .iter()
+            .map(|action| {
+                let mut child = board.apply(action);
+                child.swap_turn_();
+                -minimax_with(&child, depth.saturating_sub(1), ply + 1, evaluate)
+            })
+            .max()
+            .unwrap()
+    }
+
+    #[test]
+    fn evaluate_start_is_balanced() {
+        let board = Board::new_default();
+        assert_eq!(board.evaluate(), 0);
+        assert_eq!(board.swap_turn().evaluate(), 0);
+    }
+
+    #[test]
+    fn evaluate_is_side_relative() {
+        let board = Board::from_squares(Team::White, &[Square::D4, Square::E4], &[Square::D7], &[]);
+        assert!(board.evaluate() > 0);
+        assert_eq!(board.swap_turn().evaluate(), -board.evaluate());
+    }
+
+    #[test]
+    fn table_entry_roundtrip() {
+        let entry = TableEntry {
+            score: -MATE_SCORE + 3,
+            depth: 17,
+            bound: Bound::Upper,
+            move_index: Some(41),
+        };
+        assert_eq!(TableEntry::unpack(entry.pack()), entry);
+        let entry = TableEntry {
+            move_index: None,
+            bound: Bound::Exact,
+            ..entry
+        };
+        assert_eq!(TableEntry::unpack(entry.pack()), entry);
+    }
+
+    #[test]
+    fn matches_minimax_without_table() {
+        let mut search = Search::new(0);
+        let board = Board::new_default();
+        for depth in 1..=3 {
+            let result = search.search(&board, &limits(depth));
+            assert_eq!(result.score, minimax(&board, depth, 0), "depth {depth}");
+        }
+    }
+
+    #[test]
+    fn matches_minimax_in_tactical_position() {
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::B2, Square::D3, Square::E3, Square::G2],
+            &[Square::C5, Square::D5, Square::F6, Square::H7],
+            &[],
+        );
+        for depth in 1..=4 {
+            let result = Search::new(0).search(&board, &limits(depth));
+            assert_eq!(result.score, minimax(&board, depth, 0), "depth {depth}");
+        }
+    }
+
+    #[test]
+    fn network_search_matches_minimax() {
+        let network = Arc::new(crate::nnue::random_network(9, 32, 8));
+        let evaluate = |board: &Board| network.evaluate(board).clamp(-MATE_BOUND, MATE_BOUND);
+        let board = Board::from_squares(
+            Team::White,
+            &[Square::B2, Square::D3, Square::E3, Square::G2],
+            &[Square::C5, Square::D5, Square::F6, Square::H7],
+            &[],
+        );
+        for depth in 1..=4 {
+            let result =
+                Search::with_network(0, Arc::clone(&network)).search(&board, &limits(depth));
+            assert_eq!(
+                result.score,
+                minimax_with(&board, depth, 0, &evaluate),
+                "depth {depth}"
+            );
+        }
+    }
+
+    #[test]
+    fn finds_winning_capture() {
+        // Capturing the last black piece wins immediately
+        let board = Board::from_squares(Team::White, &[Square::D4, Square::A1], &[Square::D5], &[]);
+        let result = Search::new(1).search(&board, &limits(5));
+        let best = result.best_move.unwrap();
+        assert!(best.is_capture(Team::White));
+        assert_eq!(result.score, MATE_SCORE - 1);
+        assert_eq!(result.mate_in(), Some(1));
+    }
+
+    #[test]
+    fn no_moves_is_lost() {
+        let board = Board::from_squares(Team::White, &[], &[Square::D5], &[]);
+        let result = Search::new(1).search(&board, &limits(4));
+        assert_eq!(result.best_move, None);
+        assert_eq!(result.score, -MATE_SCORE);
+    }
+
+    #[test]
+    fn bare_draw_scores_zero() {
+        let board = Board::from_squares(Team::White, &[Square::A1], &[Square::H8], &[Square::A1]);
+        let result = Search::new(1).search(&board, &limits(4));
+        assert_eq!(result.score, 0);
+        assert!(result.best_move.is_some());
+    }
+
+    #[test]
+    fn pv_is_legal_and_starts_with_best_move() {
+        let board = Board::new_default();
+        let result = Search::new(8).search(&board, &limits(6));
+        assert_eq!(result.depth, 6);
+        assert_eq!(result.pv.first().copied(), result.best_move);
+
+        let mut position = board;
+        for action in &result.pv {
+            assert!(position.actions().contains(action));
+            position.apply_(action);
+            position.swap_turn_();
+        }
+    }
+
+    #[test]
+    fn table_preserves_score() {
+        let board = Board::new_default();
+        let without = Search::new(0).search(&board, &limits(5));
+        let mut search = Search::new(8);
+        let with = search.search(&board, &limits(5));
+        assert_eq!(with.score, without.score);
+        // A second search reuses the table and agrees
+        assert_eq!(search.search(&board, &limits(5)).score, with.score);
+    }
+
+    #[test]
+    fn node_limit_stops_search() {
+        let result = Search::new(1).search(
+            &Board::new_default(),
+            &SearchLimits {
+                nodes: Some(5_000),
+                ..SearchLimits::default()
+            },
+        );
+        assert!(result.nodes <= 5_000);
+        assert!(result.depth < MAX_DEPTH);
+        assert!(result.best_move.is_some());
+    }
+
+    #[test]
+    fn stopped_search_returns_table_move() {
+        // Black's best reply to White's first move is not its first move
+        let start = Board::new_default();
+        let mut board = start.apply(&start.actions()[0]);
+        board.swap_turn_();
+        let mut search = Search::new(1);
+        let deep = search.search(&board, &limits(6));
+        assert_ne!(deep.best_move, board.actions().first().copied());
+        let stopped = search.search(
+            &board,
+            &SearchLimits {
+                nodes: Some(0),
+                ..SearchLimits::default()
+            },
+        );
+        assert_eq!(stopped.depth, 0);
+        assert_eq!(stopped.best_move, deep.best_move);
+    }
+
+    #[test]
+    fn time_limit_stops_search() {
+        let start = Instant::now();
+        let result = Search::new(1).search(
+            &Board::new_default(),
+            &SearchLimits {
+                time: Some(Duration::from_millis(20)),
+                ..SearchLimits::default()
+            },
+        );
+        assert!(start.elapsed() < Duration::from_secs(2));
+        assert!(result.best_move.is_some());
+    }
+
+    #[test]
+    fn clear_resets_state() {
+        let mut search = Search::new(1);
+        let board = Board::new_default();
+        let first = search.search(&board, &limits(4));
+        search.clear();
+        assert_eq!(search.search(&board, &limits(4)), first);
+    }
+}
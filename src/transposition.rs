@@ -0,0 +1,569 @@
+//! A reusable, lock-free transposition table for perft.
+//!
+//! [`TranspositionTable`] maps a Zobrist key and a remaining depth to a node
+//! count. It can be shared by any number of threads and kept warm across
+//! calls: a count never goes stale, so results from earlier runs are still
+//! hits, and a generation counter only decides which entries to evict first.
+//!
+//! # Layout
+//!
+//! Entries are 16 bytes and grouped in 4-way buckets of one cache line. A key
+//! selects a bucket; a store replaces, in order of preference:
+//!
+//! 1. the entry of the same position and depth,
+//! 2. an empty entry,
+//! 3. the shallowest entry of an older generation,
+//! 4. the shallowest entry of the current generation.
+//!
+//! With [`Replacement::DepthPreferred`] the last choice is only taken if the
+//! new entry is at least as deep; [`Replacement::Always`] always stores.
+//!
+//! # Example
+//!
+//! ```rust
+//! use kish::{Board, TranspositionTable};
+//!
+//! let mut table = TranspositionTable::new(16);
+//! let board = Board::new_default();
+//!
+//! assert_eq!(board.perft_with_table(6, &table), 931_312);
+//! // A second run reuses the warm table
+//! table.new_generation();
+//! assert_eq!(board.perft_with_table(6, &table), 931_312);
+//! assert!(table.stats().hits > 0);
+//! ```
+
+use std::io;
+use std::sync::atomic::{AtomicU64, AtomicUsize, Ordering};
+
+use memmap2::MmapMut;
+
+/// Entries per bucket.
+const WAYS: usize = 4;
+
+/// Bits of a stored key that hold the hash; the rest hold generation and depth.
+const HASH_MASK: u64 = !0xFFFF;
+
+/// Bits of a stored key that hold the depth.
+const DEPTH_MASK: u64 = 0xFF;
+
+/// Bytes in a megabyte.
+const MB: usize = 1024 * 1024;
+
+/// Number of counter shards; threads beyond this many share shards.
+const COUNTER_SHARDS: usize = 64;
+
+/// Policy for storing into a bucket whose entries are all in use.
+#[derive(Debug, Default, Clone, Copy, PartialEq, Eq, Hash)]
+pub enum Replacement {
+    /// Keep deeper entries of the current generation: a new entry that is
+    /// shallower than all of them is dropped.
+    #[default]
+    DepthPreferred,
+    /// Always store, evicting the least valuable entry.
+    Always,
+}
+
+/// Counters of a [`TranspositionTable`], accumulated since it was created or
+/// last cleared.
+#[derive(Debug, Default, Clone, Copy, PartialEq, Eq)]
+pub struct TableStats {
+    /// Lookups.
+    pub probes: u64,
+    /// Lookups that found their entry.
+    pub hits: u64,
+    /// Stores.
+    pub stores: u64,
+    /// Stores that found their bucket full of other entries.
+    pub collisions: u64,
+    /// Stores that evicted another entry.
+    pub overwrites: u64,
+}
+
+impl TableStats {
+    /// Returns the fraction of probes that hit, or 0 without probes.
+    #[must_use]
+    pub fn hit_rate(&self) -> f64 {
+        if self.probes == 0 {
+            0.0
+        } else {
+            self.hits as f64 / self.probes as f64
+        }
+    }
+}
+
+/// One entry: the key is stored XORed with the value, so that a torn read of
+/// an entry being written by another thread does not verify.
+#[derive(Default)]
+struct Entry {
+    key: AtomicU64,
+    value: AtomicU64,
+}
+
+impl Entry {
+    /// Returns the stored key and value.
+    #[inline]
+    fn load(&self) -> (u64, u64) {
+        // Load value first, then key (order matters for the XOR check)
+        let value = self.value.load(Ordering::Relaxed);
+        (self.key.load(Ordering::Relaxed) ^ value, value)
+    }
+
+    #[inline]
+    fn store(&self, key: u64, value: u64) {
+        self.key.store(key ^ value, Ordering::Relaxed);
+        self.value.store(value, Ordering::Relaxed);
+    }
+}
+
+/// A cache line of entries.
+#[derive(Default)]
+#[repr(C, align(64))]
+struct Bucket {
+    entries: [Entry; WAYS],
+}
+
+/// Memory holding the buckets.
+enum Storage {
+    Heap(Box<[Bucket]>),
+    /// Anonymous mapping, advised for transparent huge pages on Linux.
+    Mapped(MmapMut),
+}
+
+/// Operation counters of one shard, on a cache line of their own so that
+/// threads counting in different shards do not contend.
+#[derive(Default)]
+#[repr(C, align(64))]
+struct Counters {
+    probes: AtomicU64,
+    hits: AtomicU64,
+    stores: AtomicU64,
+    collisions: AtomicU64,
+    overwrites: AtomicU64,
+}
+
+/// Returns the counter shard of the current thread.
+#[inline]
+fn counter_shard() -> usize {
+    static NEXT: AtomicUsize = AtomicUsize::new(0);
+    thread_local! {
+        static SHARD: usize = NEXT.fetch_add(1, Ordering::Relaxed) % COUNTER_SHARDS;
+    }
+    SHARD.with(|shard| *shard)
+}
+
+/// Returns zeroed counter shards.
+fn counter_shards() -> Box<[Counters]> {
+    (0..COUNTER_SHARDS).map(|_| Counters::default()).collect()
+}
+
+/// A lock-free transposition table of perft node counts.
+///
+/// Keyed by [`Board::zobrist`](crate::Board::zobrist) and the remaining
+/// depth. All operations take `&self` and are safe to call from many threads;
+/// only [`new_generation`](Self::new_generation) and [`clear`](Self::clear)
+/// need exclusive access.
+pub struct TranspositionTable {
+    storage: Storage,
+    /// Number of buckets, a power of two (0 for a disabled table).
+    len: usize,
+    generation: u8,
+    replacement: Replacement,
+    /// Counters sharded by thread, summed by [`stats`](Self::stats).
+    counters: Box<[Counters]>,
+}
+
+impl TranspositionTable {
+    /// Creates a depth-preferred table of at most `size_mb` megabytes.
+    ///
+    /// The bucket count is rounded down to a power of two. A size of 0 gives
+    /// a disabled table that stores nothing.
+    #[must_use]
+    pub fn new(size_mb: usize) -> Self {
+        let len = Self::bucket_count(size_mb);
+        let buckets: Box<[Bucket]> = (0..len).map(|_| Bucket::default()).collect();
+        Self::from_storage(Storage::Heap(buckets), len)
+    }
+
+    /// Creates a table like [`new`](Self::new), in an anonymous memory map
+    /// that Linux is asked to back with transparent huge pages.
+    ///
+    /// Large tables are probed at random, so huge pages save many TLB
+    /// misses. Elsewhere, or if the kernel declines, the table still works
+    /// with normal pages.
+    ///
+    /// # Errors
+    ///
+    /// Returns an error if the memory cannot be mapped.
+    pub fn with_huge_pages(size_mb: usize) -> io::Result<Self> {
+        let len = Self::bucket_count(size_mb);
+        if len == 0 {
+            return Ok(Self::new(0));
+        }
+        let map = MmapMut::map_anon(len * std::mem::size_of::<Bucket>())?;
+        #[cfg(target_os = "linux")]
+        {
+            // Only a hint: the table works without huge pages
+            let _ = map.advise(memmap2::Advice::HugePage);
+        }
+        Ok(Self::from_storage(Storage::Mapped(map), len))
+    }
+
+    /// Returns the table with the given replacement policy.
+    #[must_use]
+    pub fn with_replacement(mut self, replacement: Replacement) -> Self {
+        self.replacement = replacement;
+        self
+    }
+
+    /// Returns the number of buckets fitting in `size_mb` megabytes.
+    fn bucket_count(size_mb: usize) -> usize {
+        let buckets = size_mb.saturating_mul(MB) / std::mem::size_of::<Bucket>();
+        if buckets == 0 {
+            0
+        } else {
+            1 << (usize::BITS - 1 - buckets.leading_zeros())
+        }
+    }
+
+    fn from_storage(storage: Storage, len: usize) -> Self {
+        Self {
+            storage,
+            len,
+            generation: 0,
+            replacement: Replacement::default(),
+            counters: counter_shards(),
+        }
+    }
+
+    /// Returns the buckets.
+    #[inline]
+    fn buckets(&self) -> &[Bucket] {
+        match &self.storage {
+            Storage::Heap(buckets) => buckets,
+            // SAFETY: the mapping is page aligned, `len` buckets long and
+            // zero-initialized, which is a valid `Bucket` (all atomics at 0).
+            // It lives as long as `self` and is only accessed through atomics.
+            Storage::Mapped(map) => unsafe {
+                std::slice::from_raw_parts(map.as_ptr().cast::<Bucket>(), self.len)
+            },
+        }
+    }
+
+    /// Returns the bucket of `hash`.
+    #[inline]
+    fn bucket(&self, hash: u64) -> &Bucket {
+        &self.buckets()[hash as usize & (self.len - 1)]
+    }
+
+    /// Returns the number of entries.
+    #[must_use]
+    pub const fn capacity(&self) -> usize {
+        self.len * WAYS
+    }
+
+    /// Returns the replacement policy.
+    #[must_use]
+    pub const fn replacement(&self) -> Replacement {
+        self.replacement
+    }
+
+    /// Returns the current generation.
+    #[must_use]
+    pub const fn generation(&self) -> u8 {
+        self.generation
+    }
+
+    /// Starts a new generation, typically before a new run.
+    ///
+    /// Entries are kept and still hit, but entries of earlier generations
+    /// are evicted first when buckets fill up.
+    pub fn new_generation(&mut self) {
+        self.generation = self.generation.wrapping_add(1);
+    }
+
+    /// Empties the table and resets its statistics and generation.
+    pub fn clear(&mut self) {
+        for bucket in self.buckets() {
+            for entry in &bucket.entries {
+                entry.store(0, 0);
+            }
+        }
+        self.generation = 0;
+        self.counters = counter_shards();
+    }
+
+    /// Returns the statistics accumulated since the table was created or cleared.
+    #[must_use]
+    pub fn stats(&self) -> TableStats {
+        let sum = |counter: fn(&Counters) -> &AtomicU64| -> u64 {
+            self.counters
+                .iter()
+                .map(|counters| counter(counters).load(Ordering::Relaxed))
+                .sum()
+        };
+        TableStats {
+            probes: sum(|counters| &counters.probes),
+            hits: sum(|counters| &counters.hits),
+            stores: sum(|counters| &counters.stores),
+            collisions: sum(|counters| &counters.collisions),
+            overwrites: sum(|counters| &counters.overwrites),
+        }
+    }
+
+    /// Returns the fraction of entries in use, estimated from the first
+    /// thousand buckets.
+    #[must_use]
+    pub fn occupancy(&self) -> f64 {
+        let sample = &self.buckets()[..self.len.min(1000)];
+        if sample.is_empty() {
+            return 0.0;
+        }
+        let used = sample
+            .iter()
+            .flat_map(|bucket| &bucket.entries)
+            .filter(|entry| entry.load().0 != 0)
+            .count();
+        used as f64 / (sample.len() * WAYS) as f64
+    }
+
+    /// Starts loading the bucket of `hash` into the cache.
+    ///
+    /// Call it as soon as a key is known, some work before the matching
+    /// [`get`](Self::get) or [`insert`](Self::insert).
+    #[inline]
+    pub fn prefetch(&self, hash: u64) {
+        if self.len == 0 {
+            return;
+        }
+        #[cfg(target_arch = "x86_64")]
+        {
+            use std::arch::x86_64::{_mm_prefetch, _MM_HINT_T0};
+            let bucket: *const Bucket = self.bucket(hash);
+            // SAFETY: prefetching is a hint with no observable effect, and
+            // the pointer is into the table.
+            unsafe { _mm_prefetch::<_MM_HINT_T0>(bucket.cast()) };
+        }
+    }
+
+    /// Returns the counters of the current thread.
+    #[inline]
+    fn counters(&self) -> &Counters {
+        &self.counters[counter_shard()]
+    }
+
+    /// Returns the stored key of `hash` at `depth`, before the generation is added.
+    #[inline]
+    const fn key(hash: u64, depth: u8) -> u64 {
+        (hash & HASH_MASK) | depth as u64
+    }
+
+    /// Returns the node count stored for `hash` at `depth`.
+    #[inline]
+    pub fn get(&self, hash: u64, depth: u8) -> Option<u64> {
+        if self.len == 0 {
+            return None;
+        }
+        let counters = self.counters();
+        counters.probes.fetch_add(1, Ordering::Relaxed);
+        let expected = Self::key(hash, depth);
+        for entry in &self.bucket(hash).entries {
+            let (key, value) = entry.load();
+            if key != 0 && key & (HASH_MASK | DEPTH_MASK) == expected {
+                counters.hits.fetch_add(1, Ordering::Relaxed);
+                return Some(value);
+            }
+        }
+        None
+    }
+
+    /// Stores the node count of `hash` at `depth`.
+    pub fn insert(&self, hash: u64, depth: u8, nodes: u64) {
+        if self.len == 0 {
+            return;
+        }
+        let counters = self.counters();
+        counters.stores.fetch_add(1, Ordering::Relaxed);
+        let expected = Self::key(hash, depth);
+        let key = expected | (u64::from(self.generation) << 8);
+        let entries = &self.bucket(hash).entries;
+
+        // Least valuable entry so far: (entry, older generation, depth)
+        let mut victim: Option<(&Entry, bool, u64)> = None;
+        for entry in entries {
+            let (stored, _) = entry.load();
+            if stored == 0 || stored & (HASH_MASK | DEPTH_MASK) == expected {
+                entry.store(key, nodes);
+                return;
+            }
+            let stale = (stored >> 8) as u8 != self.generation;
+            let depth = stored & DEPTH_MASK;
+            let evict_first = victim.map_or(true, |(_, victim_stale, victim_depth)| {
+                if stale == victim_stale {
+                    depth < victim_depth
+                } else {
+                    stale
+                }
+            });
+            if evict_first {
+                victim = Some((entry, stale, depth));
+            }
+        }
+
+        counters.collisions.fetch_add(1, Ordering::Relaxed);
+        let Some((entry, stale, victim_depth)) = victim else {
+            return;
+        };
+        if stale || self.replacement == Replacement::Always || victim_depth <= u64::from(depth) {
+            counters.overwrites.fetch_add(1, Ordering::Relaxed);
+            entry.store(key, nodes);
+        }
+    }
+}
+
+impl std::fmt::Debug for TranspositionTable {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        f.debug_struct("TranspositionTable")
+            .field("capacity", &self.capacity())
+            .field("generation", &self.generation)
+            .field("replacement", &self.replacement)
+            .field("stats", &self.stats())
+            .finish()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::Board;
+
+    /// Returns `n` keys that share a bucket.
+    fn same_bucket(n: u64) -> impl Iterator<Item = u64> {
+        (1..=n).map(|i| (i << 40) | 5)
+    }
+
+    #[test]
+    fn stores_and_finds_counts() {
+        let table = TranspositionTable::new(1);
+        assert_eq!(table.capacity(), 1024 * 1024 / 16);
+        table.insert(0x1234_5678_9ABC_DEF0, 5, 42);
+        assert_eq!(table.get(0x1234_5678_9ABC_DEF0, 5), Some(42));
+        assert_eq!(table.get(0x1234_5678_9ABC_DEF0, 4), None);
+        assert_eq!(table.get(0x4321_5678_9ABC_DEF0, 5), None);
+
+        let stats = table.stats();
+        assert_eq!((stats.probes, stats.hits, stats.stores), (3, 1, 1));
+        assert_eq!((stats.collisions, stats.overwrites), (0, 0));
+    }
+
+    #[test]
+    fn stats_sum_counts_of_all_threads() {
+        let table = TranspositionTable::new(1);
+        std::thread::scope(|scope| {
+            for thread in 0..8u64 {
+                let table = &table;
+                scope.spawn(move || {
+                    for i in 0..1000 {
+                        let hash = (thread << 56) | (i << 16);
+                        table.insert(hash, 1, i);
+                        assert_eq!(table.get(hash, 1), Some(i));
+                    }
+                });
+            }
+        });
+        let stats = table.stats();
+        assert_eq!((stats.probes, stats.hits, stats.stores), (8000, 8000, 8000));
+    }
+
+    #[test]
+    fn disabled_table_stores_nothing() {
+        let table = TranspositionTable::new(0);
+        assert_eq!(table.capacity(), 0);
+        table.prefetch(7);
+        table.insert(7, 3, 1);
+        assert_eq!(table.get(7, 3), None);
+        assert_eq!(table.stats(), TableStats::default());
+    }
+
+    #[test]
+    fn depth_preferred_keeps_deeper_entries() {
+        let table = TranspositionTable::new(1);
+        for (depth, key) in same_bucket(4).enumerate() {
+            table.insert(key, depth as u8 + 5, 1);
+        }
+        let shallow = (9 << 40) | 5;
+        table.insert(shallow, 3, 2);
+        assert_eq!(table.get(shallow, 3), None);
+
+        // A deeper entry replaces the shallowest one
+        table.insert(shallow, 7, 2);
+        assert_eq!(table.get(shallow, 7), Some(2));
+        assert_eq!(table.get(1 << 40 | 5, 5), None);
+        let stats = table.stats();
+        assert_eq!((stats.collisions, stats.overwrites), (2, 1));
+    }
+
+    #[test]
+    fn always_replace_stores_every_entry() {
+        let table = TranspositionTable::new(1).with_replacement(Replacement::Always);
+        for key in same_bucket(4) {
+            table.insert(key, 9, 1);
+        }
+        table.insert((9 << 40) | 5, 3, 2);
+        assert_eq!(table.get((9 << 40) | 5, 3), Some(2));
+    }
+
+    #[test]
+    fn older_generations_are_evicted_first() {
+        let mut table = TranspositionTable::new(1);
+        let keys: Vec<u64> = same_bucket(5).collect();
+        table.insert(keys[0], 9, 1);
+        table.new_generation();
+        for &key in &keys[1..4] {
+            table.insert(key, 9, 1);
+        }
+        // Entries survive a new generation
+        assert_eq!(table.get(keys[0], 9), Some(1));
+
+        table.insert(keys[4], 3, 2);
+        assert_eq!(table.get(keys[4], 3), Some(2));
+        assert_eq!(table.get(keys[0], 9), None);
+    }
+
+    #[test]
+    fn clear_empties_table() {
+        let mut table = TranspositionTable::new(1);
+        table.insert(99, 4, 10);
+        table.new_generation();
+        table.clear();
+        assert_eq!(table.get(99, 4), None);
+        assert_eq!(table.generation(), 0);
+        assert_eq!(table.stats().stores, 0);
+        assert_eq!(table.occupancy(), 0.0);
+    }
+
+    #[test]
+    fn warm_table_is_reused_across_runs() {
+        let board = Board::new_default();
+        let expected = board.perft(6);
+        let mut table = TranspositionTable::new(4);
+        assert_eq!(board.perft_with_table(6, &table), expected);
+        let cold = table.stats();
+        assert!(table.occupancy() > 0.0);
+
+        table.new_generation();
+        assert_eq!(board.perft_parallel_with_table(6, &table), expected);
+        let warm = table.stats();
+        // The root is now answered from the table
+        assert_eq!(warm.probes - cold.probes, 1);
+        assert_eq!(warm.hits - cold.hits, 1);
+    }
+
+    #[test]
+    fn huge_page_table_matches_perft() {
+        let table = TranspositionTable::with_huge_pages(2).unwrap();
+        assert_eq!(table.capacity(), 2 * 1024 * 1024 / 16);
+        let board = Board::new_default();
+        assert_eq!(board.perft_parallel_with_table(7, &table), board.perft(7));
+    }
+}
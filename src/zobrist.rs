@@ -0,0 +1,153 @@
+//! Zobrist keys for positions.
+//!
+//! A position's key is the XOR of one random key per occupied
+//! (bitboard, square) pair, plus a side key when Black is to move. Because the
+//! key is linear in the bitboards and an [`Action`] is an XOR delta of the
+//! state, the key of the position after an action is the current key XORed
+//! with the key of the delta, so it can be updated incrementally instead of
+//! rehashing the whole board:
+//!
+//! ```rust
+//! use kish::Board;
+//!
+//! let board = Board::new_default();
+//! let action = board.actions()[0];
+//!
+//! let mut next = board.apply(&action);
+//! next.swap_turn_();
+//!
+//! assert_eq!(next.zobrist(), board.zobrist() ^ action.zobrist_delta());
+//! ```
+
+use crate::{Action, Board, State, Team};
+
+/// Keys for white pieces, black pieces and kings, indexed by square.
+const KEYS: [[u64; 64]; 3] = generate_keys();
+
+/// Key XORed in when Black is to move.
+const SIDE_KEY: u64 = KEYS[0][0].rotate_left(32) ^ 0xD1B5_4A32_D192_ED03;
+
+/// Generates the key tables with SplitMix64 from a fixed seed.
+const fn generate_keys() -> [[u64; 64]; 3] {
+    let mut keys = [[0u64; 64]; 3];
+    let mut state: u64 = 0x4B49_5348_5A4F_4252;
+    let mut table = 0;
+    while table < 3 {
+        let mut square = 0;
+        while square < 64 {
+            state = state.wrapping_add(0x9E37_79B9_7F4A_7C15);
+            let mut z = state;
+            z = (z ^ (z >> 30)).wrapping_mul(0xBF58_476D_1CE4_E5B9);
+            z = (z ^ (z >> 27)).wrapping_mul(0x94D0_49BB_1331_11EB);
+            keys[table][square] = z ^ (z >> 31);
+            square += 1;
+        }
+        table += 1;
+    }
+    keys
+}
+
+/// XORs the keys of every square set in `bits`.
+#[inline]
+const fn bitboard_key(mut bits: u64, keys: &[u64; 64]) -> u64 {
+    let mut key = 0;
+    while bits != 0 {
+        key ^= keys[bits.trailing_zeros() as usize];
+        bits &= bits - 1;
+    }
+    key
+}
+
+impl State {
+    /// Returns the Zobrist key of the piece placement (without the side to move).
+    #[inline]
+    #[must_use]
+    pub const fn zobrist(&self) -> u64 {
+        bitboard_key(self.pieces[0], &KEYS[0])
+            ^ bitboard_key(self.pieces[1], &KEYS[1])
+            ^ bitboard_key(self.kings, &KEYS[2])
+    }
+}
+
+impl Board {
+    /// Returns the Zobrist key of the position, including the side to move.
+    ///
+    /// Equal boards have equal keys. Use [`Action::zobrist_delta`] to update a
+    /// key after a move without recomputing it.
+    #[inline]
+    #[must_use]
+    pub const fn zobrist(&self) -> u64 {
+        let key = self.state.zobrist();
+        match self.turn {
+            Team::White => key,
+            Team::Black => key ^ SIDE_KEY,
+        }
+    }
+}
+
+impl Action {
+    /// Returns the change in [`Board::zobrist`] caused by playing this action.
+    ///
+    /// This includes the turn change, so for a board `b` on which the action is
+    /// legal, `b.apply(a)` followed by `swap_turn_()` has key
+    /// `b.zobrist() ^ a.zobrist_delta()`. Undoing the move applies the same XOR.
+    #[inline]
+    #[must_use]
+    pub const fn zobrist_delta(&self) -> u64 {
+        self.delta.zobrist() ^ SIDE_KEY
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::Square;
+
+    #[test]
+    fn keys_are_distinct() {
+        let mut all: Vec<u64> = KEYS.iter().flatten().copied().collect();
+        all.push(SIDE_KEY);
+        let count = all.len();
+        all.sort_unstable();
+        all.dedup();
+        assert_eq!(all.len(), count);
+    }
+
+    #[test]
+    fn side_to_move_changes_key() {
+        let board = Board::new_default();
+        assert_ne!(board.zobrist(), board.swap_turn().zobrist());
+    }
+
+    #[test]
+    fn empty_state_has_zero_key() {
+        assert_eq!(State::zeros().zobrist(), 0);
+    }
+
+    #[test]
+    fn incremental_update_matches_recomputation() {
+        // Walk a few plies of the game tree, including captures and promotions
+        fn walk(board: &Board, key: u64, depth: u32) {
+            assert_eq!(board.zobrist(), key);
+            if depth == 0 {
+                return;
+            }
+            for action in board.actions() {
+                let mut next = board.apply(&action);
+                next.swap_turn_();
+                walk(&next, key ^ action.zobrist_delta(), depth - 1);
+            }
+        }
+
+        let start = Board::new_default();
+        walk(&start, start.zobrist(), 4);
+
+        let tactical = Board::from_squares(
+            Team::White,
+            &[Square::B6, Square::D4, Square::E3],
+            &[Square::D5, Square::C7, Square::F4, Square::G7],
+            &[Square::E3],
+        );
+        walk(&tactical, tactical.zobrist(), 4);
+    }
+}